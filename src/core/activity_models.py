@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+Multicomponent Activity Coefficient Models
+Matrix forms of the Wilson, NRTL, UNIQUAC, Margules and van Laar equations,
+vectorized over any number of compositions, with analytic composition and
+temperature derivatives of ln γ
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+from . import jit
+
+UNIQUAC_Z = 10.0  # Lattice coordination number
+
+
+def _asarray(value):
+    return None if value is None else np.asarray(value, dtype=float)
+
+
+def _wilson_terms(x, Lambda, dLambda=None):
+    """
+    Wilson ln γ, its partial derivatives with respect to each x_m (x treated
+    as independent) and, when dLambda = dΛ/dT is given, its T derivative
+    """
+    S = np.einsum('...ij,...j->...i', Lambda, x)              # Σ_j Λ_ij x_j
+    w = x / S
+    ln_gamma = 1 - np.log(S) - np.einsum('...k,...ki->...i', w, Lambda)
+    # ∂/∂x_m: -Λ_im/S_i - Λ_mi/S_m + Σ_k x_k Λ_ki Λ_km / S_k²
+    d_x = (-Lambda / S[..., :, None] - np.swapaxes(Lambda / S[..., :, None], -1, -2)
+           + np.einsum('...k,...ki,...km->...im', w / S, Lambda, Lambda))
+    d_T = None
+    if dLambda is not None:
+        dS = np.einsum('...ij,...j->...i', dLambda, x)
+        d_T = (-dS / S - np.einsum('...k,...ki->...i', w, dLambda)
+               + np.einsum('...k,...ki->...i', w * dS / S, Lambda))
+    return ln_gamma, d_x, d_T
+
+
+def _jit_ln_gamma(name, x, *parameters):
+    """ln γ from a compiled kernel (see src.core.jit), any leading shape of x"""
+    n = x.shape[-1]
+    ln_gamma = jit.kernel(name)(np.ascontiguousarray(x.reshape(-1, n)),
+                                *(np.ascontiguousarray(np.broadcast_to(a, (n, n)))
+                                  for a in parameters))
+    return ln_gamma.reshape(x.shape)
+
+
+def _mole_number_derivative(x, d_x):
+    """
+    Convert partial derivatives in independent x_m to ∂ ln γ_i/∂n_m at one
+    mole of mixture (the derivative along any composition change dx with
+    Σ dx = 0 is then d_n @ dx)
+    """
+    return d_x - np.einsum('...im,...m->...i', d_x, x)[..., None]
+
+
+class ActivityModel:
+    """
+    Base class of the activity coefficient models
+
+    Subclasses precompute their parameter matrices in __init__ and implement
+    _evaluate(x, T, derivatives). Compositions are arrays of shape
+    (..., n_components), usually (n_points, n_components).
+    """
+
+    name = None
+
+    def _evaluate(self, x, T, derivatives):
+        raise NotImplementedError
+
+    def _prepare(self, x, T):
+        x = np.asarray(x, dtype=float)
+        if x.shape[-1] != self.n_components:
+            raise ValueError(f"{self.name} model has {self.n_components} components, "
+                             f"got compositions with {x.shape[-1]}")
+        return x, None if T is None else np.asarray(T, dtype=float)[..., None]
+
+    def ln_gamma(self, x, T=None):
+        """
+        Logarithms of the activity coefficients
+
+        Parameters:
+        x: Mole fractions, shape (..., n)
+        T: Temperature (K), needed by temperature-dependent parameters
+
+        Returns:
+        ndarray: ln γ, shape (..., n)
+        """
+        x, T = self._prepare(x, T)
+        return self._evaluate(x, T, False)[0]
+
+    def gamma(self, x, T=None):
+        """Activity coefficients, shape (..., n) (see ln_gamma)"""
+        return np.exp(self.ln_gamma(x, T))
+
+    def derivatives(self, x, T=None):
+        """
+        ln γ with its analytic composition and temperature derivatives
+
+        Parameters:
+        x: Mole fractions, shape (..., n)
+        T: Temperature (K), needed by temperature-dependent parameters
+
+        Returns:
+        dict: ln_gamma (..., n); dln_gamma_dx (..., n, n), the derivatives
+              ∂ ln γ_i/∂n_j at one mole of mixture (symmetric, satisfy
+              Gibbs-Duhem; d ln γ = dln_gamma_dx @ dx for Σ dx = 0);
+              dln_gamma_dT (..., n), zero for temperature-independent
+              parameters
+        """
+        x, T = self._prepare(x, T)
+        ln_gamma, d_x, d_T = self._evaluate(x, T, True)
+        if d_T is None:
+            d_T = np.zeros_like(ln_gamma)
+        return {
+            'ln_gamma': ln_gamma,
+            'dln_gamma_dx': _mole_number_derivative(x, d_x),
+            'dln_gamma_dT': d_T,
+        }
+
+    def _require_T(self, T):
+        if T is None:
+            raise ValueError(f"{self.name} parameters depend on temperature; pass T")
+
+
+class Wilson(ActivityModel):
+    """
+    Wilson equation: either constant Λ_ij, or Λ_ij = (V_j/V_i) exp(-a_ij/T)
+    """
+
+    name = 'wilson'
+
+    def __init__(self, Lambda=None, a=None, V=None):
+        """
+        Parameters:
+        Lambda: Constant parameters Λ_ij, shape (n, n), Λ_ii = 1
+                (Λ_12 and Λ_21 are the binary A12 and A21)
+        a: Energy parameters a_ij (K), shape (n, n), instead of Lambda
+        V: Liquid molar volumes (any unit), shape (n,), used with a
+        """
+        if (Lambda is None) == (a is None):
+            raise ValueError("Give either Lambda or a")
+        self.Lambda = _asarray(Lambda)
+        self.a = _asarray(a)
+        if a is not None:
+            V = np.ones(self.a.shape[0]) if V is None else np.asarray(V, dtype=float)
+            self.volume_ratio = V[None, :] / V[:, None]
+        self.n_components = (self.Lambda if a is None else self.a).shape[-1]
+
+    def parameters(self, T=None):
+        """Λ (and dΛ/dT, None if constant) at temperature T"""
+        if self.a is None:
+            return self.Lambda, None
+        self._require_T(T)
+        T = T[..., None]
+        Lambda = self.volume_ratio * np.exp(-self.a / T)
+        return Lambda, Lambda * self.a / T ** 2
+
+    def _evaluate(self, x, T, derivatives):
+        Lambda, dLambda = self.parameters(T)
+        if not derivatives and jit.enabled() and Lambda.ndim == 2:
+            return (_jit_ln_gamma('wilson_ln_gamma', x, Lambda),)
+        if not derivatives:
+            S = np.einsum('...ij,...j->...i', Lambda, x)
+            return (1 - np.log(S) - np.einsum('...k,...ki->...i', x / S, Lambda),)
+        return _wilson_terms(x, Lambda, dLambda)
+
+
+class NRTL(ActivityModel):
+    """
+    NRTL equation with τ_ij = a_ij + b_ij/T and G_ij = exp(-α_ij τ_ij)
+    """
+
+    name = 'nrtl'
+
+    def __init__(self, tau=None, alpha=0.3, b=None):
+        """
+        Parameters:
+        tau: Interaction parameters τ_ij (or their constant part a_ij),
+             shape (n, n), τ_ii = 0
+        alpha: Non-randomness parameters α_ij (matrix or scalar)
+        b: Temperature coefficients b_ij (K), shape (n, n), optional
+        """
+        self.tau = _asarray(tau)
+        self.alpha = _asarray(alpha)
+        self.b = _asarray(b)
+        if self.tau is None:
+            self.tau = np.zeros_like(self.b)
+        self.n_components = self.tau.shape[-1]
+
+    def _evaluate(self, x, T, derivatives):
+        if self.b is None:
+            tau, dtau = self.tau, None
+        else:
+            self._require_T(T)
+            T = T[..., None]
+            tau, dtau = self.tau + self.b / T, -self.b / T ** 2
+        G = np.exp(-self.alpha * tau)
+        if not derivatives and jit.enabled() and G.ndim == 2:
+            return (_jit_ln_gamma('nrtl_ln_gamma', x, tau, G),)
+        S = np.einsum('...k,...kj->...j', x, G)               # Σ_k x_k G_kj
+        E = np.einsum('...k,...kj->...j', x, tau * G) / S     # Σ_k x_k τ_kj G_kj / S_j
+        M = G * (tau - E[..., None, :]) / S[..., None, :]     # M_ij
+        ln_gamma = E + np.einsum('...j,...ij->...i', x, M)
+        if not derivatives:
+            return (ln_gamma,)
+
+        # ∂/∂x_m: M_mi + M_im - Σ_j x_j (G_ij M_mj + M_ij G_mj) / S_j
+        w = x / S
+        d_x = (np.swapaxes(M, -1, -2) + M
+               - np.einsum('...j,...ij,...mj->...im', w, G, M)
+               - np.einsum('...j,...ij,...mj->...im', w, M, G))
+        d_T = None
+        if dtau is not None:
+            dG = -self.alpha * dtau * G
+            dS = np.einsum('...k,...kj->...j', x, dG)
+            dE = (np.einsum('...k,...kj->...j', x, dtau * G + tau * dG) - E * dS) / S
+            dM = ((dG * (tau - E[..., None, :]) + G * (dtau - dE[..., None, :]))
+                  / S[..., None, :] - M * (dS / S)[..., None, :])
+            d_T = dE + np.einsum('...j,...ij->...i', x, dM)
+        return ln_gamma, d_x, d_T
+
+
+class UNIQUAC(ActivityModel):
+    """
+    UNIQUAC equation (combinatorial + residual parts) with constant τ_ij or
+    τ_ij = exp(-a_ij/T)
+    """
+
+    name = 'uniquac'
+
+    def __init__(self, r, q, tau=None, a=None, z=UNIQUAC_Z):
+        """
+        Parameters:
+        r: Volume parameters, shape (n,)
+        q: Surface area parameters, shape (n,)
+        tau: Constant interaction parameters τ_ij, shape (n, n), τ_ii = 1
+        a: Energy parameters a_ij (K), shape (n, n), instead of tau
+        z: Lattice coordination number
+        """
+        if (tau is None) == (a is None):
+            raise ValueError("Give either tau or a")
+        self.r = np.asarray(r, dtype=float)
+        self.q = np.asarray(q, dtype=float)
+        self.tau = _asarray(tau)
+        self.a = _asarray(a)
+        self.z = z
+        self.l = z / 2 * (self.r - self.q) - (self.r - 1)
+        self.n_components = self.r.size
+
+    def _evaluate(self, x, T, derivatives):
+        r, q, l, z = self.r, self.q, self.l, self.z
+        R = np.sum(x * r, axis=-1, keepdims=True)
+        Q = np.sum(x * q, axis=-1, keepdims=True)
+        L = np.sum(x * l, axis=-1, keepdims=True)
+        ln_combinatorial = (np.log(r / R) + z / 2 * q * np.log(q * R / (r * Q))
+                            + l - r / R * L)
+
+        if self.a is None:
+            tau, dtau = self.tau, None
+        else:
+            self._require_T(T)
+            T = T[..., None]
+            tau = np.exp(-self.a / T)
+            dtau = tau * self.a / T ** 2
+        # The residual part is the Wilson form in θ with Λ = τᵀ
+        theta = x * q / Q
+        Lambda = np.swapaxes(np.broadcast_to(tau, x.shape[:-1] + tau.shape[-2:]), -1, -2)
+        dLambda = None if dtau is None else np.swapaxes(
+            np.broadcast_to(dtau, Lambda.shape), -1, -2)
+        ln_wilson, d_theta, d_T = _wilson_terms(theta, Lambda, dLambda)
+        ln_gamma = ln_combinatorial + q * ln_wilson
+        if not derivatives:
+            return (ln_gamma,)
+
+        # Combinatorial: -r_m/R + z/2 q_i (r_m/R - q_m/Q) - r_i l_m/R + r_i r_m L/R²
+        r_R, q_Q = r / R, q / Q
+        d_combinatorial = (-r_R[..., None, :]
+                           + z / 2 * q[:, None] * (r_R - q_Q)[..., None, :]
+                           - r_R[..., :, None] * l
+                           + r_R[..., :, None] * r_R[..., None, :] * L[..., None])
+        # Residual: chain rule with ∂θ_j/∂x_m = (q_m/Q)(δ_jm - θ_j)
+        dtheta_dx = q_Q[..., None, :] * (np.eye(self.n_components) - theta[..., :, None])
+        d_x = d_combinatorial + q[:, None] * np.einsum('...ij,...jm->...im', d_theta, dtheta_dx)
+        return ln_gamma, d_x, None if d_T is None else q * d_T
+
+
+class Margules(ActivityModel):
+    """
+    Three-suffix Margules equation, g^E/RT = Σ_ij A_ij x_i x_j² with
+    A_ij = A_ij + B_ij/T (A_12 and A_21 are the binary ln γ1∞ and ln γ2∞)
+    """
+
+    name = 'margules'
+
+    def __init__(self, A=None, B=None):
+        """
+        Parameters:
+        A: Parameters A_ij, shape (n, n), A_ii = 0
+        B: Temperature coefficients B_ij (K), shape (n, n), optional
+        """
+        self.A = _asarray(A)
+        self.B = _asarray(B)
+        if self.A is None:
+            self.A = np.zeros_like(self.B)
+        self.n_components = self.A.shape[-1]
+
+    @staticmethod
+    def _terms(x, A, derivatives):
+        # g = Σ_ij A_ij x_i x_j², ln γ_i = ∂g/∂x_i - 2g (g is cubic)
+        x2 = x ** 2
+        Ax = np.einsum('...ki,...k->...i', A, x)              # Σ_k A_ki x_k
+        g_i = np.einsum('...ij,...j->...i', A, x2) + 2 * x * Ax
+        g = np.sum(x * Ax * x, axis=-1, keepdims=True)
+        ln_gamma = g_i - 2 * g
+        if not derivatives:
+            return ln_gamma, None
+        # ∂²g/∂x_i∂x_m = 2 A_im x_m + 2 x_i A_mi + 2 δ_im Σ_k A_ki x_k
+        g_im = (2 * A * x[..., None, :] + 2 * x[..., :, None] * np.swapaxes(A, -1, -2)
+                + 2 * np.eye(x.shape[-1]) * Ax[..., None, :])
+        return ln_gamma, g_im - 2 * g_i[..., None, :]
+
+    def _evaluate(self, x, T, derivatives):
+        A = self.A
+        if self.B is not None:
+            self._require_T(T)
+            A = A + self.B / T[..., None]
+        ln_gamma, d_x = self._terms(x, A, derivatives)
+        if not derivatives:
+            return (ln_gamma,)
+        # ln γ is linear in A
+        d_T = None if self.B is None else self._terms(x, -self.B / T[..., None] ** 2, False)[0]
+        return ln_gamma, d_x, d_T
+
+
+class VanLaar(ActivityModel):
+    """
+    Van Laar equation, g^E/RT = (Σ_k q_k x_k) ½ Σ_ij W_ij z_i z_j with
+    z_i = q_i x_i / Σ_k q_k x_k. A binary is given by A12, A21
+    (q = (A12, A21), W_12 = W_21 = 1).
+    """
+
+    name = 'van_laar'
+
+    def __init__(self, A=None, q=None, W=None, T_reference=None):
+        """
+        Parameters:
+        A: Binary parameters [[0, A12], [A21, 0]] (or (A12, A21))
+        q: Effective size parameters, shape (n,), instead of A
+        W: Symmetric interaction matrix, shape (n, n), W_ii = 0
+        T_reference: Temperature (K) at which q applies; q then scales as
+                     T_reference/T (regular-solution temperature dependence)
+        """
+        if A is not None:
+            A = np.asarray(A, dtype=float)
+            A12, A21 = (A[0, 1], A[1, 0]) if A.ndim == 2 else A
+            q, W = [A12, A21], [[0.0, 1.0], [1.0, 0.0]]
+        self.q = np.asarray(q, dtype=float)
+        self.W = np.asarray(W, dtype=float)
+        self.T_reference = T_reference
+        self.n_components = self.q.size
+
+    def _evaluate(self, x, T, derivatives):
+        q = self.q
+        if self.T_reference is not None:
+            self._require_T(T)
+            q = q * self.T_reference / T
+        s = np.sum(q * x, axis=-1, keepdims=True)
+        z = q * x / s
+        Wz = np.einsum('...ij,...j->...i', self.W, z)
+        zWz = np.sum(z * Wz, axis=-1, keepdims=True)
+        ln_gamma = q * (Wz - zWz / 2)
+        if not derivatives:
+            return (ln_gamma,)
+        # ∂/∂x_m: q_i (q_m/s) [W_im - (Wz)_i - (Wz)_m + zᵀWz]
+        d_x = ((q[..., :, None] * (q / s)[..., None, :])
+               * (self.W - Wz[..., :, None] - Wz[..., None, :] + zWz[..., None]))
+        d_T = None if self.T_reference is None else -ln_gamma / T
+        return ln_gamma, d_x, d_T
+
+
+ACTIVITY_MODELS = {model.name: model for model in (Wilson, NRTL, UNIQUAC, Margules, VanLaar)}
+
+
+def get_activity_model(name, **parameters):
+    """
+    Build an activity coefficient model from the registry
+
+    Parameters:
+    name: 'wilson', 'nrtl', 'uniquac', 'margules' or 'van_laar'
+    parameters: Model parameters (see the model classes)
+
+    Returns:
+    ActivityModel: Model with its parameter matrices precomputed
+    """
+    if name not in ACTIVITY_MODELS:
+        raise ValueError(f"Unknown activity model '{name}'; use one of {tuple(ACTIVITY_MODELS)}")
+    return ACTIVITY_MODELS[name](**parameters)
+
+
+def wilson_gamma(x, Lambda):
+    """
+    Wilson activity coefficients of an N-component liquid
+
+    Parameters:
+    x: Mole fractions, shape (..., n)
+    Lambda: Wilson parameters Λ_ij, shape (n, n) or (..., n, n), with
+            Λ_ii = 1 (Λ_12 and Λ_21 are the binary A12 and A21)
+
+    Returns:
+    ndarray: Activity coefficients, shape (..., n)
+    """
+    return Wilson(Lambda=Lambda).gamma(x)
+
+
+def nrtl_gamma(x, tau, alpha):
+    """
+    NRTL activity coefficients of an N-component liquid
+
+    Parameters:
+    x: Mole fractions, shape (..., n)
+    tau: Interaction parameters τ_ij, shape (n, n) or (..., n, n), τ_ii = 0
+    alpha: Non-randomness parameters α_ij (matrix or scalar)
+
+    Returns:
+    ndarray: Activity coefficients, shape (..., n)
+    """
+    return NRTL(tau=tau, alpha=alpha).gamma(x)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Binary Azeotrope Detection
+Vectorized search for azeotropes (relative volatility = 1) across
+composition at many temperatures or pressures at once: sign changes of
+ln α12 on a composition grid are bracketed and refined with Newton's method
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+from .activity_models import ActivityModel
+from .flash import bubble_temperature
+
+# Azeotrope types, from the slope of ln α12 across the azeotrope
+MINIMUM_BOILING = 'minimum_boiling'   # pressure maximum, positive deviations
+MAXIMUM_BOILING = 'maximum_boiling'   # pressure minimum, negative deviations
+
+
+def _volatility_terms(gamma, P_sat_func, x1, T, dT=1e-3):
+    """
+    ln α12 = ln(γ1 P_sat_1) - ln(γ2 P_sat_2), the bubble condition
+    φ = ln Σ x_i γ_i P_sat_i and their partial derivatives in x1 and T
+    """
+    x = np.stack([x1, 1 - x1], axis=-1)
+    d = gamma.derivatives(x, T)
+    ln_P_sat = np.log(P_sat_func(T))
+    slope = (np.log(P_sat_func(T + dT)) - ln_P_sat) / dT
+    ln_K = d['ln_gamma'] + ln_P_sat                          # ln(γ_i P_sat_i)
+    dK_dx = d['dln_gamma_dx'][..., 0] - d['dln_gamma_dx'][..., 1]   # along dx = (1, -1)
+    dK_dT = d['dln_gamma_dT'] + slope
+    p = x * np.exp(ln_K)
+    y = p / p.sum(axis=-1, keepdims=True)
+    return {
+        'f': ln_K[..., 0] - ln_K[..., 1],
+        'f_x': dK_dx[..., 0] - dK_dx[..., 1],
+        'f_T': dK_dT[..., 0] - dK_dT[..., 1],
+        'ln_P': np.log(p.sum(axis=-1)),
+        'phi_x': np.sum(y * dK_dx, axis=-1) + (np.exp(ln_K[..., 0]) - np.exp(ln_K[..., 1]))
+                 / p.sum(axis=-1),
+        'phi_T': np.sum(y * dK_dT, axis=-1),
+    }
+
+
+def find_azeotropes(gamma, P_sat_func, T=None, P=None, n_grid=201, T_guess=350.0,
+                    tol=1e-12, max_iter=50):
+    """
+    Azeotropes of a binary mixture at one or many temperatures or pressures
+
+    ln α12 is evaluated on a composition grid for all conditions at once
+    (at isobaric conditions on the bubble temperatures of the grid, from one
+    vectorized bubble point solve). Every sign change is an azeotrope,
+    refined by Newton's method kept inside its grid bracket (with bisection
+    along isotherms); at constant pressure the Newton step solves for x1 and
+    T together.
+
+    Parameters:
+    gamma: Binary ActivityModel (constant or temperature-dependent parameters)
+    P_sat_func: Callable P_sat_func(T) returning both saturation pressures
+                (Pa), shape T.shape + (2,)
+    T: Temperature(s) (K) for isothermal azeotropes, scalar or 1-D array
+    P: Pressure(s) (Pa) for isobaric azeotropes (give T or P)
+    n_grid: Number of grid compositions from x1 = 0 to 1
+    T_guess: Initial temperature of the bubble point solve (K, isobaric)
+    tol: Tolerance on x1
+    max_iter: Maximum number of Newton steps
+
+    Returns:
+    dict: count (number of azeotropes at each condition) and arrays of
+          shape (conditions, most azeotropes found, at least 1), NaN or ''
+          where there are fewer: x1 (= y1), T (K), P (Pa), kind
+          ('minimum_boiling' or 'maximum_boiling'), converged; the
+          leading axis is dropped for a scalar T or P
+    """
+    if (T is None) == (P is None):
+        raise ValueError("Give either T (isothermal) or P (isobaric)")
+    if not isinstance(gamma, ActivityModel) or gamma.n_components != 2:
+        raise ValueError("gamma must be a binary ActivityModel")
+    isobaric = P is not None
+    condition = np.asarray(P if isobaric else T, dtype=float)
+    scalar = condition.ndim == 0
+    condition = np.atleast_1d(condition)
+    x_grid = np.broadcast_to(np.linspace(0.0, 1.0, n_grid), (condition.size, n_grid))
+
+    # ln α12 on the grid
+    if isobaric:
+        ln_P = np.log(condition)
+        with np.errstate(all='ignore'):
+            T_grid = bubble_temperature(np.stack([x_grid, 1 - x_grid], axis=-1),
+                                        condition[:, None], P_sat_func, gamma,
+                                        T0=T_guess)['T']
+    else:
+        T_grid = np.broadcast_to(condition[:, None], x_grid.shape)
+    with np.errstate(all='ignore'):
+        f = _volatility_terms(gamma, P_sat_func, x_grid, T_grid)['f']
+
+    # Brackets: sign changes, or interior grid points that are exact roots
+    change = (f[:, :-1] * f[:, 1:] < 0) | ((f[:, 1:] == 0) & (np.arange(1, n_grid) < n_grid - 1))
+    rows, k = np.nonzero(change)
+    lo, hi = x_grid[rows, k], x_grid[rows, k + 1]
+    f_lo = f[rows, k]
+    x = 0.5 * (lo + hi)
+    T_az = 0.5 * (T_grid[rows, k] + T_grid[rows, k + 1])
+    converged = np.zeros(rows.size, dtype=bool)
+
+    with np.errstate(all='ignore'):
+        for _ in range(max_iter):
+            if converged.all():
+                break
+            terms = _volatility_terms(gamma, P_sat_func, x, T_az)
+            if isobaric:
+                # Newton on f = 0 and φ = ln P together
+                phi = terms['ln_P'] - ln_P[rows]
+                det = terms['f_x'] * terms['phi_T'] - terms['f_T'] * terms['phi_x']
+                dx = -(terms['f'] * terms['phi_T'] - terms['f_T'] * phi) / det
+                dT = -(terms['f_x'] * phi - terms['phi_x'] * terms['f']) / det
+            else:
+                # f is exact along the isotherm, so the bracket can shrink
+                below = np.sign(terms['f']) == np.sign(f_lo)
+                lo = np.where(below, x, lo)
+                hi = np.where(below, hi, x)
+                dx = -terms['f'] / terms['f_x']
+                dT = np.zeros_like(x)
+            x_new = x + dx
+            if isobaric:
+                # f is only exact at the bubble temperature: clip to the bracket
+                outside = np.isnan(x_new)
+                x_new = np.where(outside, 0.5 * (lo + hi), np.clip(x_new, lo, hi))
+            else:
+                outside = ~((x_new >= lo) & (x_new <= hi))
+                x_new = np.where(outside, 0.5 * (lo + hi), x_new)
+            step = np.where(converged, 0.0, x_new - x)
+            x = x + step
+            T_az = np.where(converged | outside, T_az, T_az + dT)
+            converged |= np.abs(dx) < tol
+        if isobaric:
+            # Final temperature consistent with the composition
+            for _ in range(5):
+                terms = _volatility_terms(gamma, P_sat_func, x, T_az)
+                T_az = T_az - (terms['ln_P'] - ln_P[rows]) / terms['phi_T']
+        terms = _volatility_terms(gamma, P_sat_func, x, T_az)
+
+    # Pad to (conditions, most azeotropes at one condition)
+    count = np.bincount(rows, minlength=condition.size)
+    width = max(int(count.max()) if count.size else 0, 1)
+    slot = np.arange(rows.size) - np.searchsorted(rows, rows)
+    result = {'count': count}
+    for key, values, fill in (('x1', x, np.nan), ('T', T_az, np.nan),
+                              ('P', np.exp(terms['ln_P']), np.nan),
+                              ('kind', np.where(terms['f_x'] < 0, MINIMUM_BOILING,
+                                                MAXIMUM_BOILING), ''),
+                              ('converged', converged, False)):
+        padded = np.full((condition.size, width), fill, dtype=np.asarray(values).dtype)
+        padded[rows, slot] = values
+        result[key] = padded[0] if scalar else padded
+    if scalar:
+        result['count'] = int(count[0])
+    return result
+
+
+def azeotrope_map(systems, T=None, P=None, model='wilson', **options):
+    """
+    Map azeotrope composition, temperature and pressure of several binary
+    systems across a range of temperatures or pressures
+
+    Each system is solved for all conditions in one vectorized call of
+    find_azeotropes.
+
+    Parameters:
+    systems: Pairs of component names from the component database, e.g.
+             [('Ethanol', 'Water'), ('Acetone', 'Methanol')], or a dict
+             name -> (ActivityModel, P_sat_func)
+    T: Temperatures (K), 1-D array (isothermal map)
+    P: Pressures (Pa), 1-D array (isobaric map)
+    model: Activity model of database systems ('wilson' or 'nrtl')
+    options: n_grid, T_guess, tol, max_iter (see find_azeotropes)
+
+    Returns:
+    dict: System name ('A/B' for database pairs) -> find_azeotropes result
+    """
+    if not isinstance(systems, dict):
+        from .components import get_component_database
+        database = get_component_database()
+        systems = {'/'.join(pair): (database.activity_model(list(pair), model),
+                                    database.P_sat_function(list(pair)))
+                   for pair in systems}
+    return {name: find_azeotropes(gamma, P_sat_func, T=T, P=P, **options)
+            for name, (gamma, P_sat_func) in systems.items()}
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Component Property Database
+Critical constants, acentric factors, liquid molar volumes, DIPPR-101 and
+Antoine vapour-pressure coefficients and binary Wilson/NRTL parameters read
+from columnar .npy files (see src/data/generate_component_database.py)
+@author: Bryan Piguave Llano
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from .activity_models import NRTL, Wilson
+from .cubic_eos import CubicEOS
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data' / 'components'
+
+DATABASE_VERSION = 1
+VAPOUR_PRESSURE_METHODS = ('dippr', 'antoine')
+# Scalar properties returned by ComponentDatabase.properties
+PROPERTIES = ('name', 'cas', 'formula', 'molar_mass', 'Tc', 'Pc', 'Vc', 'omega',
+              'Tb', 'T_triple', 'V_liquid')
+
+
+class ComponentDatabase:
+    """
+    Pure-component and binary-pair data (SI units: K, Pa, m³/mol, g/mol)
+
+    Every column is a separate .npy file, opened memory-mapped on first
+    use, so only the columns a calculation touches are read. Components are
+    looked up by name, CAS number or formula (case-insensitive) through a
+    sorted key index; a formula shared by several components (isomers) must
+    be replaced by the name.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        """
+        Parameters:
+        data_dir: Directory with the generated .npy columns
+        """
+        self.data_dir = Path(data_dir)
+        self._columns = {}
+        self._pairs = None
+
+    def column(self, key):
+        """
+        Raw column by name, memory-mapped (e.g. 'Tc', 'dippr', 'wilson_a')
+        """
+        if key not in self._columns:
+            path = self.data_dir / f'{key}.npy'
+            if not path.exists():
+                raise ValueError(f"No column '{key}' in {self.data_dir}")
+            if not self._columns:
+                self._check_version()
+            self._columns[key] = np.load(path, mmap_mode='r')
+        return self._columns[key]
+
+    def _check_version(self):
+        version = np.load(self.data_dir / 'version.npy')
+        if int(version) != DATABASE_VERSION:
+            raise ValueError(f"{self.data_dir} was generated with another database version; "
+                             "rerun src/data/generate_component_database.py")
+
+    @property
+    def names(self):
+        """Component names, in row order"""
+        return self.column('name')
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, key):
+        """
+        Row of a component
+
+        Parameters:
+        key: Name, CAS number or formula (case-insensitive), or a row number
+
+        Returns:
+        int: Row index
+        """
+        if isinstance(key, (int, np.integer)):
+            if not 0 <= key < len(self):
+                raise ValueError(f"Component row {key} out of range")
+            return int(key)
+        keys = self.column('index_keys')
+        lookup = str(key).strip().lower()
+        start = np.searchsorted(keys, lookup, side='left')
+        stop = np.searchsorted(keys, lookup, side='right')
+        rows = np.unique(self.column('index_rows')[start:stop])
+        if len(rows) == 0:
+            raise ValueError(f"Unknown component '{key}'")
+        if len(rows) > 1:
+            raise ValueError(f"'{key}' matches {', '.join(self.names[rows])}; use the name")
+        return int(rows[0])
+
+    def indices(self, components):
+        """
+        Rows of one or several components
+
+        Parameters:
+        components: Key or sequence of keys (see index)
+
+        Returns:
+        ndarray: Row indices, shape (n,)
+        """
+        if isinstance(components, (str, int, np.integer)):
+            components = [components]
+        return np.array([self.index(key) for key in components], dtype=int)
+
+    def get(self, key, default=None):
+        """Row of a component, or default when it is not in the database"""
+        try:
+            return self.index(key)
+        except ValueError:
+            return default
+
+    def properties(self, components):
+        """
+        Scalar properties of one or several components
+
+        Parameters:
+        components: Key or sequence of keys
+
+        Returns:
+        dict: Arrays of name, cas, formula, molar_mass (g/mol), Tc (K),
+              Pc (Pa), Vc (m³/mol), omega, Tb (K, normal boiling point),
+              T_triple (K), V_liquid (m³/mol, saturated liquid at 298.15 K
+              or the normal boiling point)
+        """
+        rows = self.indices(components)
+        return {key: np.asarray(self.column(key)[rows]) for key in PROPERTIES}
+
+    def P_sat(self, components, T, method='dippr'):
+        """
+        Vapour pressures of several components at once
+
+        DIPPR-101: ln P = A + B/T + C ln T + D T^E over the whole saturation
+        line; Antoine: ln P = A - B/(T + C), fitted over about 1 kPa - 1 MPa.
+
+        Parameters:
+        components: Key or sequence of keys, n components
+        T: Temperature (K), scalar or array
+        method: 'dippr' or 'antoine'
+
+        Returns:
+        ndarray: Vapour pressures (Pa), shape T.shape + (n,); NaN outside
+                 the fitted range
+        """
+        if method not in VAPOUR_PRESSURE_METHODS:
+            raise ValueError(f"Unknown method '{method}'; use one of {VAPOUR_PRESSURE_METHODS}")
+        rows = self.indices(components)
+        c = np.asarray(self.column(method)[rows]).T
+        low, high = np.asarray(self.column(f'{method}_range')[rows]).T
+        T = np.asarray(T, dtype=float)[..., None]
+        if method == 'dippr':
+            ln_P = c[0] + c[1] / T + c[2] * np.log(T) + c[3] * T ** c[4]
+        else:
+            ln_P = c[0] - c[1] / (T + c[2])
+        return np.where((T >= low) & (T <= high), np.exp(ln_P), np.nan)
+
+    def P_sat_function(self, components, method='dippr'):
+        """
+        Vapour-pressure function for the bubble/dew point and Txy solvers
+
+        Returns:
+        callable: T -> P_sat (Pa), shape T.shape + (n,)
+        """
+        rows = self.indices(components)
+        return lambda T: self.P_sat(rows, T, method)
+
+    def _pair_rows(self):
+        """Dict (i, j) -> (pair row, transposed) for both orders of each pair"""
+        if self._pairs is None:
+            self._pairs = {}
+            for row, (i, j) in enumerate(np.asarray(self.column('pair_index'))):
+                self._pairs[(i, j)] = (row, False)
+                self._pairs[(j, i)] = (row, True)
+        return self._pairs
+
+    def interaction_parameters(self, components, model='wilson'):
+        """
+        Binary interaction matrix of a mixture
+
+        Parameters:
+        components: Sequence of keys, n components
+        model: 'wilson' (a_ij, K, Λ_ij = V_j/V_i exp(-a_ij/T)) or 'nrtl'
+               (b_ij, K, τ_ij = b_ij/T, α = 0.3)
+
+        Returns:
+        dict: parameters (n, n) and T_range (K), the intersection of the
+              temperature ranges the pairs were regressed over
+        """
+        column = {'wilson': 'wilson_a', 'nrtl': 'nrtl_b'}.get(model)
+        if column is None:
+            raise ValueError(f"Unknown model '{model}'; use 'wilson' or 'nrtl'")
+        rows = self.indices(components)
+        pairs = self._pair_rows()
+        n = len(rows)
+        parameters = np.zeros((n, n))
+        T_range = [0.0, np.inf]
+        for i in range(n):
+            for j in range(i + 1, n):
+                if (rows[i], rows[j]) not in pairs:
+                    raise ValueError(f"No {model} parameters for "
+                                     f"{self.names[rows[i]]}/{self.names[rows[j]]}")
+                row, transposed = pairs[(rows[i], rows[j])]
+                p_ij, p_ji = self.column(column)[row][::-1] if transposed \
+                    else self.column(column)[row]
+                parameters[i, j], parameters[j, i] = p_ij, p_ji
+                low, high = self.column('pair_range')[row]
+                T_range = [max(T_range[0], low), min(T_range[1], high)]
+        return {'parameters': parameters, 'T_range': tuple(T_range)}
+
+    def activity_model(self, components, model='wilson'):
+        """
+        Activity coefficient model of a mixture from the stored pair parameters
+
+        Parameters:
+        components: Sequence of keys
+        model: 'wilson' or 'nrtl'
+
+        Returns:
+        ActivityModel: Wilson or NRTL instance with temperature-dependent
+                       parameters (pass T when evaluating)
+        """
+        parameters = self.interaction_parameters(components, model)['parameters']
+        if model == 'wilson':
+            return Wilson(a=parameters, V=self.properties(components)['V_liquid'])
+        alpha = np.full_like(parameters, float(self.column('nrtl_alpha')[0]))
+        return NRTL(alpha=alpha, b=parameters)
+
+    def cubic_eos(self, components, family='pr', kij=None):
+        """
+        Cubic equation of state of a mixture from the stored critical constants
+
+        Parameters:
+        components: Sequence of keys
+        family: 'pr' or 'srk'
+        kij: Binary interaction parameters, shape (n, n) (default zero)
+
+        Returns:
+        CubicEOS: Equation of state of the mixture
+        """
+        properties = self.properties(components)
+        return CubicEOS(properties['Tc'], properties['Pc'], properties['omega'], kij, family)
+
+
+_database = None
+
+
+def get_component_database():
+    """
+    Get the shared ComponentDatabase instance
+
+    Returns:
+    ComponentDatabase: Database reading src/data/components
+    """
+    global _database
+    if _database is None:
+        _database = ComponentDatabase()
+    return _database
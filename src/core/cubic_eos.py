@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Cubic Equations of State
+Peng-Robinson and Soave-Redlich-Kwong with van der Waals one-fluid mixing
+rules and binary interaction parameters: closed-form compressibility roots,
+fugacity coefficients and a phi-phi isothermal flash, all vectorized over
+any number of states
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+from .flash import _substitution_flash
+
+R_GAS = 8.314462618  # J/(mol·K)
+
+# P = RT/(v - b) - a(T)/((v + δ1 b)(v + δ2 b)), a(T) = Ωa R²Tc²/Pc α(T),
+# α = [1 + m(ω)(1 - √Tr)]², b = Ωb R Tc/Pc
+EOS_FAMILIES = {
+    'pr': {'delta': (1 + np.sqrt(2), 1 - np.sqrt(2)), 'omega_a': 0.45723553,
+           'omega_b': 0.07779607, 'm': (0.37464, 1.54226, -0.26992)},
+    'srk': {'delta': (1.0, 0.0), 'omega_a': 0.42748023, 'omega_b': 0.08664035,
+            'm': (0.480, 1.574, -0.176)},
+}
+PHASES = ('liquid', 'vapour', 'stable')
+NEWTON_POLISH_STEPS = 2  # Newton steps on each closed-form root
+
+
+def cubic_roots(c2, c1, c0):
+    """
+    Real roots of Z³ + c2 Z² + c1 Z + c0 = 0 for arrays of coefficients
+
+    Cardano's formula where there is one real root, the trigonometric form
+    where there are three, each root polished by Newton steps on the cubic.
+
+    Parameters:
+    c2, c1, c0: Coefficients, broadcastable arrays
+
+    Returns:
+    ndarray: Roots in ascending order, shape (..., 3); NaN in place of a
+             complex pair
+    """
+    c2, c1, c0 = np.broadcast_arrays(*(np.asarray(c, dtype=float) for c in (c2, c1, c0)))
+    shift = c2 / 3
+    p = c1 - c2 * shift                          # depressed cubic t³ + p t + q
+    q = shift * (2 * shift ** 2 - c1) + c0
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+    one_root = disc > 0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = np.sqrt(np.where(one_root, disc, 0.0))
+        t_one = np.cbrt(-q / 2 + s) + np.cbrt(-q / 2 - s)
+        r = np.sqrt(np.maximum(-p / 3, 0.0))
+        cos_3phi = np.clip(np.where(r > 0, -q / (2 * r ** 3), 0.0), -1.0, 1.0)
+        phi = np.arccos(cos_3phi)[..., None] / 3 - 2 * np.pi / 3 * np.arange(3)
+        t = 2 * r[..., None] * np.cos(phi)
+    t = np.where(one_root[..., None],
+                 np.stack([t_one, np.full_like(t_one, np.nan), np.full_like(t_one, np.nan)],
+                          axis=-1), t)
+    Z = t - shift[..., None]
+
+    a2, a1, a0 = c2[..., None], c1[..., None], c0[..., None]
+    for _ in range(NEWTON_POLISH_STEPS):
+        f = ((Z + a2) * Z + a1) * Z + a0
+        df = (3 * Z + 2 * a2) * Z + a1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            Z = np.where(df != 0, Z - f / df, Z)
+    return np.sort(Z, axis=-1)
+
+
+def wilson_K(Tc, Pc, omega, T, P):
+    """
+    Wilson's K-value correlation, the usual flash initialization
+
+    Parameters:
+    Tc, Pc, omega: Critical temperatures (K), pressures (Pa) and acentric
+                   factors, shape (n,)
+    T, P: Temperature (K) and pressure (Pa), shape (...)
+
+    Returns:
+    ndarray: ln K, shape (..., n)
+    """
+    T = np.asarray(T, dtype=float)[..., None]
+    P = np.asarray(P, dtype=float)[..., None]
+    return np.log(Pc / P) + 5.373 * (1 + omega) * (1 - Tc / T)
+
+
+class CubicEOS:
+    """
+    Peng-Robinson or Soave-Redlich-Kwong equation of state of a mixture
+
+    a = Σ_i Σ_j x_i x_j (1 - k_ij) √(a_i a_j) and b = Σ_i x_i b_i. States
+    are arrays: compositions of shape (..., n_components) with temperatures
+    and pressures of shape (...) (or broadcastable).
+    """
+
+    def __init__(self, Tc, Pc, omega, kij=None, family='pr'):
+        """
+        Parameters:
+        Tc: Critical temperatures (K), shape (n,)
+        Pc: Critical pressures (Pa), shape (n,)
+        omega: Acentric factors, shape (n,)
+        kij: Binary interaction parameters, shape (n, n) (default zero)
+        family: 'pr' (Peng-Robinson) or 'srk' (Soave-Redlich-Kwong)
+        """
+        if family not in EOS_FAMILIES:
+            raise ValueError(f"Unknown equation of state '{family}'; use one of "
+                             f"{tuple(EOS_FAMILIES)}")
+        self.family = family
+        self.Tc = np.atleast_1d(np.asarray(Tc, dtype=float))
+        self.Pc = np.atleast_1d(np.asarray(Pc, dtype=float))
+        self.omega = np.atleast_1d(np.asarray(omega, dtype=float))
+        self.n_components = self.Tc.size
+        if self.Pc.size != self.n_components or self.omega.size != self.n_components:
+            raise ValueError("Tc, Pc and omega must have one entry per component")
+        n = self.n_components
+        self.kij = np.zeros((n, n)) if kij is None else np.asarray(kij, dtype=float)
+        if self.kij.shape != (n, n):
+            raise ValueError(f"kij must have shape ({n}, {n})")
+
+        constants = EOS_FAMILIES[family]
+        self.delta = constants['delta']
+        m0, m1, m2 = constants['m']
+        self.m = m0 + m1 * self.omega + m2 * self.omega ** 2
+        self.a_c = constants['omega_a'] * (R_GAS * self.Tc) ** 2 / self.Pc
+        self.b = constants['omega_b'] * R_GAS * self.Tc / self.Pc
+        self._one_minus_k = 1 - self.kij
+
+    def _check(self, x):
+        x = np.asarray(x, dtype=float)
+        if x.shape[-1] != self.n_components:
+            raise ValueError(f"Equation of state has {self.n_components} components, "
+                             f"got compositions with {x.shape[-1]}")
+        return x
+
+    def mixture(self, x, T, P):
+        """
+        Dimensionless mixture parameters
+
+        Parameters:
+        x: Mole fractions, shape (..., n)
+        T: Temperature (K), shape (...)
+        P: Pressure (Pa), shape (...)
+
+        Returns:
+        dict: A = aP/(RT)², B = bP/(RT), shape (...); b_ratio = b_i/b and
+              a_ratio = 2 Σ_j x_j a_ij / a, shape (..., n)
+        """
+        x = self._check(x)
+        T = np.asarray(T, dtype=float)[..., None]
+        P = np.asarray(P, dtype=float)[..., None]
+        sqrt_a = np.sqrt(self.a_c) * (1 + self.m * (1 - np.sqrt(T / self.Tc)))
+        # Σ_j a_ij x_j = √a_i Σ_j (1 - k_ij) √a_j x_j, without an (n, n) array per state
+        s = sqrt_a * ((sqrt_a * x) @ self._one_minus_k.T)
+        a = np.sum(x * s, axis=-1, keepdims=True)
+        b = np.sum(x * self.b, axis=-1, keepdims=True)
+        RT = R_GAS * T
+        return {'A': (a * P / RT ** 2)[..., 0], 'B': (b * P / RT)[..., 0],
+                'b_ratio': self.b / b, 'a_ratio': 2 * s / a}
+
+    def _coefficients(self, A, B):
+        d1, d2 = self.delta
+        u, w = d1 + d2, d1 * d2
+        return ((u - 1) * B - 1,
+                A + w * B ** 2 - u * B * (1 + B),
+                -(A * B + w * B ** 2 * (1 + B)))
+
+    def _log_ratio(self, Z, B):
+        """A/B factor of the attraction term: ln((Z + δ1 B)/(Z + δ2 B))/(δ1 - δ2)"""
+        d1, d2 = self.delta
+        return np.log((Z + d1 * B) / (Z + d2 * B)) / (d1 - d2)
+
+    def _select(self, roots, A, B, phase):
+        """Liquid (smallest), vapour (largest) or lowest-Gibbs-energy root above B"""
+        with np.errstate(invalid='ignore'):
+            roots = np.where(roots > B[..., None], roots, np.nan)
+        liquid = np.fmin.reduce(roots, axis=-1)
+        vapour = np.fmax.reduce(roots, axis=-1)
+        if phase == 'liquid':
+            return liquid
+        if phase == 'vapour':
+            return vapour
+        # Difference of the mixture ln φ between the two roots
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g_liquid = liquid - 1 - np.log(liquid - B) - A / B * self._log_ratio(liquid, B)
+            g_vapour = vapour - 1 - np.log(vapour - B) - A / B * self._log_ratio(vapour, B)
+        return np.where(g_liquid < g_vapour, liquid, vapour)
+
+    def compressibility(self, x, T, P, phase='stable'):
+        """
+        Compressibility factors of many states at once
+
+        Parameters:
+        x: Mole fractions, shape (..., n)
+        T: Temperature (K), shape (...)
+        P: Pressure (Pa), shape (...)
+        phase: 'liquid' (smallest root), 'vapour' (largest root) or 'stable'
+               (the root of lower Gibbs energy)
+
+        Returns:
+        ndarray: Z, shape (...)
+        """
+        if phase not in PHASES:
+            raise ValueError(f"phase must be one of {PHASES}")
+        m = self.mixture(x, T, P)
+        return self._select(cubic_roots(*self._coefficients(m['A'], m['B'])),
+                            m['A'], m['B'], phase)
+
+    def ln_phi(self, x, T, P, phase='stable'):
+        """
+        Logarithms of the fugacity coefficients
+
+        ln φ_i = (b_i/b)(Z - 1) - ln(Z - B)
+                 - A/B (2 Σ_j x_j a_ij/a - b_i/b) ln((Z + δ1 B)/(Z + δ2 B))/(δ1 - δ2)
+
+        Parameters:
+        x: Mole fractions, shape (..., n)
+        T: Temperature (K), shape (...)
+        P: Pressure (Pa), shape (...)
+        phase: 'liquid', 'vapour' or 'stable' (see compressibility)
+
+        Returns:
+        dict: ln_phi (..., n) and Z (...)
+        """
+        if phase not in PHASES:
+            raise ValueError(f"phase must be one of {PHASES}")
+        m = self.mixture(x, T, P)
+        A, B = m['A'], m['B']
+        Z = self._select(cubic_roots(*self._coefficients(A, B)), A, B, phase)
+        Zc, Bc = Z[..., None], B[..., None]
+        ln_phi = (m['b_ratio'] * (Zc - 1) - np.log(Zc - Bc)
+                  - (A / B)[..., None] * (m['a_ratio'] - m['b_ratio'])
+                  * self._log_ratio(Zc, Bc))
+        return {'ln_phi': ln_phi, 'Z': Z}
+
+    def fugacity_coefficients(self, x, T, P, phase='stable'):
+        """Fugacity coefficients φ, shape (..., n) (see ln_phi)"""
+        return np.exp(self.ln_phi(x, T, P, phase)['ln_phi'])
+
+    def molar_volume(self, x, T, P, phase='stable'):
+        """Molar volumes (m³/mol), shape (...) (see compressibility)"""
+        return self.compressibility(x, T, P, phase) * R_GAS * np.asarray(T, dtype=float) \
+            / np.asarray(P, dtype=float)
+
+
+def phi_phi_flash(eos, z, P, T, K0=None, tol=1e-10, max_iter=200, acceleration='dem'):
+    """
+    Isothermal flash with K_i = φ_i^L(x) / φ_i^V(y) for many feeds at once
+
+    Successive substitution on ln K from Wilson's K-values, with the same
+    Rachford-Rice solver and accelerations as modified_raoult_flash; every
+    step evaluates the liquid and vapour fugacity coefficients of all
+    unconverged feeds in one pass. Feeds that end up single-phase return V = 0 or 1 (close to
+    the critical point the iteration may fall to the trivial solution K = 1).
+
+    Parameters:
+    eos: CubicEOS instance
+    z: Feed mole fractions, shape (..., n)
+    P: Pressure (Pa), shape (...)
+    T: Temperature (K), shape (...)
+    K0: Optional initial K-values, shape (..., n)
+    tol: Tolerance on ln K
+    max_iter: Maximum number of K-value updates
+    acceleration: 'dem', 'anderson' or None (plain substitution)
+
+    Returns:
+    dict: V (vapour fraction), x, y, K, Z_liquid, Z_vapour, iterations and
+          converged mask
+    """
+    z = eos._check(z)
+    P = np.asarray(P, dtype=float)
+    T = np.asarray(T, dtype=float)
+    shape = np.broadcast_shapes(z.shape, P.shape + (1,), T.shape + (1,))
+    z = np.broadcast_to(z, shape)
+    P = np.broadcast_to(P, shape[:-1])
+    T = np.broadcast_to(T, shape[:-1])
+    if K0 is None:
+        ln_K = wilson_K(eos.Tc, eos.Pc, eos.omega, T, P)
+    else:
+        ln_K = np.log(np.asarray(K0, dtype=float))
+    ln_K = np.array(np.broadcast_to(ln_K, shape))
+
+    T_flat, P_flat = T.reshape(-1), P.reshape(-1)
+
+    def update(rows, x, y):
+        return (eos.ln_phi(x, T_flat[rows], P_flat[rows], 'liquid')['ln_phi']
+                - eos.ln_phi(y, T_flat[rows], P_flat[rows], 'vapour')['ln_phi'])
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        result = _substitution_flash(z, ln_K, update, tol, max_iter, acceleration,
+                                     active_set=True)
+    result['Z_liquid'] = eos.compressibility(result['x'], T, P, 'liquid')
+    result['Z_vapour'] = eos.compressibility(result['y'], T, P, 'vapour')
+    return result
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""
+Binary Distillation by Stage Stepping
+McCabe-Thiele minimum reflux, minimum stages and stage-by-stage column
+profiles stepped on a cached equilibrium-curve interpolant, for one column
+or many reflux ratios and feed stages at once
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+from .flash import bubble_pressure, bubble_temperature, _gamma_at
+from ..utils.state_cache import StateCache
+
+MAX_STAGES = 200
+PINCH_POINTS = 200       # Grid points of the tangent-pinch search in each section
+BISECTION_STEPS = 60     # q-line / equilibrium-curve intersection
+PINCH_TOLERANCE = 1e-9   # Smallest liquid composition change of a stage
+
+
+class EquilibriumCurve:
+    """
+    y1(x1) of a binary mixture at constant pressure (or temperature) as a
+    monotone (PCHIP) interpolant, with its inverse x1(y1) and the bubble
+    temperatures (or pressures) along it
+
+    The curve is built once; every stage of every column is then one
+    interpolant evaluation instead of a VLE solve. The curve is cut off
+    where y1 stops increasing (a liquid-liquid split); stepping beyond it
+    gives NaN.
+    """
+
+    def __init__(self, x1, y1, T=None, P=None):
+        """
+        Parameters:
+        x1: Liquid mole fractions of component 1, increasing
+        y1: Equilibrium vapour mole fractions of component 1
+        T: Bubble temperatures (K) at x1 (isobaric curves), optional
+        P: Bubble pressures (Pa) at x1 (isothermal curves), optional
+        """
+        x1 = np.asarray(x1, dtype=float)
+        y1 = np.asarray(y1, dtype=float)
+        keep = np.isfinite(x1) & np.isfinite(y1)
+        # The pure-component end points y1 = x1 = 0 and 1 are exact
+        ends = np.array([0.0, 1.0])
+        ends = ends[~np.isin(ends, x1[keep])]
+        x = np.concatenate([x1[keep], ends])
+        y = np.concatenate([y1[keep], ends])
+        order = np.argsort(x)
+        x, y = x[order], y[order]
+        increasing = np.diff(y) > 0
+        stop = x.size if increasing.all() else int(np.argmin(increasing)) + 1
+        if stop < 3:
+            raise ValueError("The equilibrium curve needs at least 3 points with increasing y1")
+        self.x1, self.y1 = x[:stop], y[:stop]
+        self.x1_max = self.x1[-1]
+        self._y = PchipInterpolator(self.x1, self.y1, extrapolate=False)
+        self._x = PchipInterpolator(self.y1, self.x1, extrapolate=False)
+
+        self.T = self.P = None
+        if T is not None or P is not None:
+            values = np.asarray(T if T is not None else P, dtype=float)
+            known = keep & np.isfinite(values)
+            boiling = PchipInterpolator(x1[known], values[known])
+            if T is not None:
+                self.T = boiling
+            else:
+                self.P = boiling
+
+    @classmethod
+    def from_model(cls, gamma, P_sat_func, P=None, T=None, n_points=201, T_guess=350.0):
+        """
+        Equilibrium curve from an activity model, solved in one vectorized pass
+
+        Parameters:
+        gamma: Binary ActivityModel or callable gamma(x) (None for ideal)
+        P_sat_func: Callable P_sat_func(T) returning both saturation pressures
+                    (Pa), shape T.shape + (2,)
+        P: Pressure (Pa) of an isobaric curve (give P or T)
+        T: Temperature (K) of an isothermal curve
+        n_points: Number of compositions, clustered towards both ends
+        T_guess: Initial temperature of the bubble point solve (K)
+
+        Returns:
+        EquilibriumCurve: Interpolated curve
+        """
+        if (T is None) == (P is None):
+            raise ValueError("Give either P (isobaric) or T (isothermal)")
+        x1 = 0.5 * (1 - np.cos(np.linspace(0.0, np.pi, n_points)))
+        x = np.stack([x1, 1 - x1], axis=-1)
+        with np.errstate(all='ignore'):
+            if P is not None:
+                bubble = bubble_temperature(x, P, P_sat_func, gamma, T0=T_guess)
+                return cls(x1, bubble['y'][:, 0], T=bubble['T'])
+            bubble = bubble_pressure(x, P_sat_func(np.asarray(T, dtype=float)),
+                                     lambda x: _gamma_at(gamma, x, T))
+        return cls(x1, bubble['y'][:, 0], P=bubble['P'])
+
+    @classmethod
+    def from_diagram(cls, data):
+        """
+        Equilibrium curve from PhaseEquilibrium.generate_txy_diagram or
+        generate_pxy_diagram output
+
+        Parameters:
+        data: Diagram dict (x1_bubble, y1_bubble, T_bubble for Txy; x1, y1,
+              P for Pxy)
+
+        Returns:
+        EquilibriumCurve: Interpolated curve
+        """
+        if 'x1_bubble' in data:
+            return cls(data['x1_bubble'], data['y1_bubble'], T=data['T_bubble'])
+        return cls(data['x1'], data['y1'], P=data['P'])
+
+    def y(self, x1):
+        """Equilibrium vapour composition of liquid x1 (NaN outside the curve)"""
+        return self._y(np.asarray(x1, dtype=float))
+
+    def x(self, y1):
+        """Equilibrium liquid composition of vapour y1 (NaN outside the curve)"""
+        return self._x(np.asarray(y1, dtype=float))
+
+    def intersect_q_line(self, z_F, q):
+        """
+        Intersection of the q-line (q - 1) y = q x - z_F with the curve
+
+        Parameters:
+        z_F: Feed mole fraction of component 1, array
+        q: Feed liquid fraction (1: saturated liquid, 0: saturated vapour)
+
+        Returns:
+        tuple: Arrays x1, y1 of the intersection
+        """
+        z_F, q = np.broadcast_arrays(np.asarray(z_F, dtype=float), np.asarray(q, dtype=float))
+        lo = np.zeros(z_F.shape)
+        hi = np.full(z_F.shape, self.x1_max)
+        # g = (q - 1) y(x) - q x + z_F falls from z_F > 0 at x = 0
+        for _ in range(BISECTION_STEPS):
+            mid = 0.5 * (lo + hi)
+            positive = (q - 1) * self.y(mid) - q * mid + z_F > 0
+            lo = np.where(positive, mid, lo)
+            hi = np.where(positive, hi, mid)
+        x1 = 0.5 * (lo + hi)
+        return x1, self.y(x1)
+
+
+def _operating_lines(x_D, x_B, z_F, q, R):
+    """
+    Rectifying and stripping lines, y = slope x + intercept, and the
+    liquid composition where they meet on the q-line
+    """
+    x_i = ((q - 1) * x_D + z_F * (R + 1)) / (q + R)
+    y_i = (R * x_i + x_D) / (R + 1)
+    slope_s = (y_i - x_B) / (x_i - x_B)
+    return {'slope_r': R / (R + 1), 'intercept_r': x_D / (R + 1),
+            'slope_s': slope_s, 'intercept_s': x_B * (1 - slope_s), 'x_i': x_i}
+
+
+def minimum_reflux(curve, x_D, x_B, z_F, q=1.0):
+    """
+    Minimum reflux ratios of many separations at once
+
+    The pinch is where the q-line meets the equilibrium curve, unless the
+    curve bends across an operating line first (tangent pinch, e.g. close to
+    an azeotrope): both sections are searched on a grid and the larger
+    reflux ratio is kept.
+
+    Parameters:
+    curve: EquilibriumCurve
+    x_D: Distillate mole fraction of component 1 (the light key)
+    x_B: Bottoms mole fraction of component 1
+    z_F: Feed mole fraction of component 1
+    q: Feed liquid fraction
+
+    Returns:
+    dict: R_min and the pinch point x_pinch, y_pinch (arrays broadcast
+          from the inputs)
+    """
+    x_D, x_B, z_F, q = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                             for a in (x_D, x_B, z_F, q)))
+    x_p, y_p = curve.intersect_q_line(z_F, q)
+    s = np.linspace(0.0, 1.0, PINCH_POINTS)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Rectifying section: steepest line from (x_D, x_D) to the curve on [x_p, x_D)
+        x = x_p[..., None] + (x_D - x_p)[..., None] * s[:-1]
+        y = curve.y(x)
+        slope_r = (x_D[..., None] - y) / (x_D[..., None] - x)
+        k = np.argmax(np.where(np.isnan(slope_r), -np.inf, slope_r), axis=-1)[..., None]
+        slope_r = np.take_along_axis(slope_r, k, axis=-1)[..., 0]
+        pinch_x = np.take_along_axis(x, k, axis=-1)[..., 0]
+        # A slope of 1 or more means the distillate lies beyond an azeotrope
+        R_rect = np.where(slope_r < 1, slope_r / (1 - slope_r), np.nan)
+
+        # Stripping section: flattest line from (x_B, x_B) to the curve on (x_B, x_p],
+        # continued to the q-line and from there to the distillate
+        x = x_B[..., None] + (x_p - x_B)[..., None] * s[1:]
+        slope_s = np.fmin.reduce((curve.y(x) - x_B[..., None]) / (x - x_B[..., None]), axis=-1)
+        x_i = (z_F + (q - 1) * x_B * (1 - slope_s)) / (q - (q - 1) * slope_s)
+        y_i = x_B + slope_s * (x_i - x_B)
+        slope = (x_D - y_i) / (x_D - x_i)
+        R_strip = slope / (1 - slope)
+    R_min = np.maximum(R_rect, R_strip)
+    pinch_x = np.where(R_rect >= R_strip, pinch_x, x_p)
+    feasible = np.isfinite(R_min) & (x_D <= curve.x1_max)
+    R_min = np.where(feasible, R_min, np.nan)
+    return {'R_min': R_min, 'x_pinch': pinch_x, 'y_pinch': curve.y(pinch_x)}
+
+
+def _step(curve, x_D, x_B, lines, max_stages):
+    """
+    Step stages down from a total condenser, y_1 = x_D
+
+    lines(n, x) returns the composition of the vapour rising into stage n
+    (1-based) given the liquid x leaving it, and whether that is on the
+    stripping line; the first such stage is the feed stage.
+    """
+    shape = x_D.shape
+    x = np.full(shape + (max_stages,), np.nan)
+    y = np.full(shape + (max_stages,), np.nan)
+    stages = np.full(shape, np.nan)
+    feed = np.zeros(shape, dtype=int)
+    y_n = x_D.copy()
+    x_prev = x_D.copy()
+    active = np.ones(shape, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for n in range(max_stages):
+            x_n = curve.x(y_n)
+            x[..., n] = np.where(active, x_n, np.nan)
+            y[..., n] = np.where(active, y_n, np.nan)
+            finished = active & (x_n <= x_B)
+            # Fractional last stage: the part of the step that reaches x_B
+            stages = np.where(finished, n + (x_prev - x_B) / (x_prev - x_n), stages)
+            stuck = active & ~finished & ~(x_prev - x_n > PINCH_TOLERANCE)
+            active &= ~finished & ~stuck
+            if not active.any():
+                break
+            y_next, stripping = lines(n + 1, x_n)
+            feed = np.where(active & stripping & (feed == 0), n + 1, feed)
+            y_n, x_prev = np.where(active, y_next, y_n), np.where(active, x_n, x_prev)
+    return {'stages': stages, 'feed_stage': np.where(np.isfinite(stages), feed, 0),
+            'x': x, 'y': y}
+
+
+def minimum_stages(curve, x_D, x_B, max_stages=MAX_STAGES):
+    """
+    Minimum numbers of equilibrium stages (total reflux, y_{n+1} = x_n)
+
+    Parameters:
+    curve: EquilibriumCurve
+    x_D, x_B: Distillate and bottoms mole fractions of component 1, arrays
+    max_stages: Stages stepped before a separation counts as infeasible
+
+    Returns:
+    dict: N_min (fractional, including the reboiler; NaN if the curve
+          pinches, e.g. at an azeotrope), x and y stage profiles
+    """
+    x_D, x_B = np.broadcast_arrays(np.asarray(x_D, dtype=float), np.asarray(x_B, dtype=float))
+    result = _step(curve, x_D, x_B, lambda n, x: (x, np.zeros(x.shape, dtype=bool)),
+                   max_stages)
+    return {'N_min': result['stages'], 'x': result['x'], 'y': result['y']}
+
+
+def mccabe_thiele(curve, x_D, x_B, z_F, q=1.0, R=None, R_factor=None, feed_stage=None,
+                  max_stages=MAX_STAGES):
+    """
+    Stage-by-stage McCabe-Thiele design of many columns at once
+
+    Every argument broadcasts, so one call steps a whole grid of reflux
+    ratios, feed conditions and feed stages; each stage is one evaluation
+    of the equilibrium interpolant for all columns. Stages are counted
+    from the top with a total condenser (y_1 = x_D), and the reboiler
+    counts as the last stage.
+
+    Parameters:
+    curve: EquilibriumCurve (see EquilibriumCurve.from_model / from_diagram)
+    x_D: Distillate mole fraction of component 1 (the light key)
+    x_B: Bottoms mole fraction of component 1
+    z_F: Feed mole fraction of component 1
+    q: Feed liquid fraction (1: saturated liquid, 0: saturated vapour)
+    R: Reflux ratios L/D
+    R_factor: Reflux ratios as multiples of the minimum (instead of R)
+    feed_stage: Fixed feed stages (first stage on the stripping line);
+                None switches lines where the operating lines cross, which
+                gives the fewest stages
+    max_stages: Stages stepped before a column counts as infeasible
+
+    Returns:
+    dict: stages (fractional, NaN where the reflux is too low or the feed
+          stage unworkable), feed_stage, R, R_min, feasible, x and y stage
+          profiles (shape (..., max_stages), NaN past the last stage) and
+          T or P along the profile when the curve carries them
+    """
+    if (R is None) == (R_factor is None):
+        raise ValueError("Give either R or R_factor")
+    x_D, x_B, z_F, q = (np.asarray(a, dtype=float) for a in (x_D, x_B, z_F, q))
+    if np.any(~((x_B < z_F) & (z_F < x_D))):
+        raise ValueError("Need x_B < z_F < x_D")
+    R_min = minimum_reflux(curve, x_D, x_B, z_F, q)['R_min']
+    R = R_min * np.asarray(R_factor, dtype=float) if R is None else np.asarray(R, dtype=float)
+    shape = np.broadcast_shapes(x_D.shape, x_B.shape, z_F.shape, q.shape, R.shape,
+                                np.shape(feed_stage) if feed_stage is not None else ())
+    x_D, x_B, z_F, q, R, R_min = (np.broadcast_to(a, shape) for a in (x_D, x_B, z_F, q, R, R_min))
+    lines = _operating_lines(x_D, x_B, z_F, q, R)
+    fixed = None if feed_stage is None else np.broadcast_to(feed_stage, shape)
+
+    def step_lines(n, x):
+        if fixed is None:
+            stripping = x < lines['x_i']
+        else:
+            stripping = n >= fixed
+        slope = np.where(stripping, lines['slope_s'], lines['slope_r'])
+        intercept = np.where(stripping, lines['intercept_s'], lines['intercept_r'])
+        return slope * x + intercept, stripping
+
+    result = _step(curve, x_D, x_B, step_lines, max_stages)
+    feasible = np.isfinite(result['stages'])
+    result.update(R=R, R_min=R_min, feasible=feasible)
+    if fixed is not None:
+        # The feed stage must be one of the column's stages
+        reached = np.ceil(result['stages']) >= fixed
+        result['feasible'] = feasible & reached
+        result['stages'] = np.where(result['feasible'], result['stages'], np.nan)
+        result['feed_stage'] = np.where(result['feasible'], fixed, 0)
+    if curve.T is not None:
+        result['T'] = curve.T(result['x'])
+    if curve.P is not None:
+        result['P'] = curve.P(result['x'])
+    return result
+
+
+def column_design_sweep(curve, x_D, x_B, z_F, q=1.0, R_factors=None, feed_stages=None,
+                        max_stages=MAX_STAGES):
+    """
+    Stages over a grid of reflux ratios and feed stages of one separation
+
+    Parameters:
+    curve: EquilibriumCurve
+    x_D, x_B, z_F, q: Separation (scalars)
+    R_factors: Reflux ratios as multiples of the minimum, 1-D array
+               (default 1.05 to 3)
+    feed_stages: Feed stages, 1-D array (default: the optimal feed stage only)
+    max_stages: Stages stepped before a column counts as infeasible
+
+    Returns:
+    dict: R_factor, R, R_min, N_min, feed_stage and stages, shape
+          (len(R_factors),) or (len(R_factors), len(feed_stages)), and the
+          feed_stage of the optimal design at each reflux ratio
+    """
+    if R_factors is None:
+        R_factors = np.linspace(1.05, 3.0, 40)
+    R_factors = np.asarray(R_factors, dtype=float)
+    optimal = mccabe_thiele(curve, x_D, x_B, z_F, q, R_factor=R_factors,
+                            max_stages=max_stages)
+    result = {
+        'R_factor': R_factors,
+        'R': optimal['R'],
+        'R_min': float(np.asarray(optimal['R_min']).flat[0]),
+        'N_min': float(minimum_stages(curve, x_D, x_B, max_stages)['N_min']),
+        'optimal_stages': optimal['stages'],
+        'optimal_feed_stage': optimal['feed_stage'],
+    }
+    if feed_stages is None:
+        result.update(stages=optimal['stages'], feed_stage=optimal['feed_stage'])
+        return result
+    feed_stages = np.asarray(feed_stages)
+    fixed = mccabe_thiele(curve, x_D, x_B, z_F, q, R_factor=R_factors[:, None],
+                          feed_stage=feed_stages[None, :], max_stages=max_stages)
+    result.update(stages=fixed['stages'],
+                  feed_stage=np.broadcast_to(feed_stages, fixed['stages'].shape))
+    return result
+
+
+# Bounded LRU of the curves built by get_equilibrium_curve
+_curves = StateCache(maxsize=64)
+
+
+def get_equilibrium_curve(components, P=None, T=None, model='wilson', method='dippr',
+                          n_points=201):
+    """
+    Get the shared equilibrium curve of a database binary, built on first use
+    (the 64 most recently used curves are kept)
+
+    Parameters:
+    components: Pair of component keys from the component database
+    P: Pressure (Pa) of an isobaric curve (give P or T)
+    T: Temperature (K) of an isothermal curve
+    model: Activity model ('wilson' or 'nrtl')
+    method: Vapour-pressure correlation ('dippr' or 'antoine')
+    n_points: Number of compositions of the interpolant
+
+    Returns:
+    EquilibriumCurve: Cached curve
+    """
+    from .components import get_component_database
+    database = get_component_database()
+    rows = tuple(int(row) for row in database.indices(components))
+    if len(rows) != 2:
+        raise ValueError("An equilibrium curve needs exactly two components")
+    key = _curves.make_key(model, method, n_points, P, T, *rows)
+
+    def build():
+        gamma = database.activity_model(list(rows), model)
+        P_sat_func = database.P_sat_function(list(rows), method)
+        return EquilibriumCurve.from_model(gamma, P_sat_func, P=P, T=T, n_points=n_points)
+    return _curves.get_or_compute(key, build)
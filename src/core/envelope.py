@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Phase Envelope Tracing by Arc-Length Continuation
+Predictor-corrector tracing of implicit curves F(u) = 0 (bubble/dew curves
+of binary mixtures, bubble-point isotherms of ternaries) with curvature
+controlled steps, boundary landing and event location
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+DEFAULT_MAX_ANGLE = 0.1  # rad, largest tangent turn per step
+
+
+def _jacobian(F, v, f, h=1e-7):
+    """Forward-difference Jacobian of F at v, shape (len(f), len(v))"""
+    J = np.empty((f.size, v.size))
+    for j in range(v.size):
+        dv = np.zeros_like(v)
+        dv[j] = h
+        J[:, j] = (F(v + dv) - f) / h
+    return J
+
+
+def _tangent(J, previous=None):
+    """Unit null vector of J, oriented along the previous tangent"""
+    t = np.linalg.svd(J)[2][-1]
+    if previous is not None and np.dot(t, previous) < 0:
+        t = -t
+    return t
+
+
+def _newton(F, G, v, tol, max_iter):
+    """
+    Newton iteration on the square system [F(v); G(v)] = 0
+
+    Returns:
+    tuple: (solution, iterations) or (None, iterations) without convergence
+    """
+    for iterations in range(1, max_iter + 1):
+        f = np.append(F(v), G(v))
+        if not np.all(np.isfinite(f)):
+            return None, iterations
+        J = _jacobian(lambda w: np.append(F(w), G(w)), v, f)
+        try:
+            dv = np.linalg.solve(J, -f)
+        except np.linalg.LinAlgError:
+            return None, iterations
+        v = v + dv
+        if np.max(np.abs(dv)) < tol:
+            return v, iterations
+    return None, max_iter
+
+
+def trace_curve(residual, u0, direction, scale=None, constraints=(), events=None,
+                step=0.02, step_min=1e-6, step_max=0.2, max_angle=DEFAULT_MAX_ANGLE,
+                max_points=2000, tol=1e-10, max_corrector=8):
+    """
+    Trace the curve residual(u) = 0 from u0 by pseudo-arc-length continuation
+
+    Each step predicts along the tangent and corrects with Newton's method
+    on the residual plus the arc-length condition, starting from the
+    previous point. The step shrinks when the corrector fails or the
+    tangent turns by more than max_angle, and grows on flat stretches.
+    The trace stops on the first constraint it would violate, with the last
+    point placed exactly on that boundary. Sign changes of the event
+    functions between two points are located on the curve.
+
+    Parameters:
+    residual: Function of u (shape (n,)) returning n - 1 residuals
+    u0: Point on (or near) the curve, shape (n,)
+    direction: Vector giving the initial direction of travel
+    scale: Typical size of each variable (the arc length is measured in u / scale)
+    constraints: Functions c(u), the trace continues while every c(u) >= 0
+    events: Dict name -> scalar function g(u) whose zeros are located
+    step: Initial arc-length step (scaled variables)
+    step_min, step_max: Limits of the step
+    max_angle: Largest tangent turn per step (rad)
+    max_points: Maximum number of points
+    tol: Corrector tolerance (scaled variables)
+    max_corrector: Maximum Newton iterations per corrector
+
+    Returns:
+    dict: points (shape (m, n)), tangents, events (list of dicts with name
+          and u), terminated_by ('constraint <k>', 'max_points' or
+          'step_min'), residual_evaluations
+    """
+    u0 = np.asarray(u0, dtype=float)
+    scale = np.ones_like(u0) if scale is None else np.asarray(scale, dtype=float)
+    events = events or {}
+    calls = [0]
+
+    def F(v):
+        calls[0] += 1
+        return np.atleast_1d(residual(v * scale))
+
+    def constraint_values(v):
+        return np.array([c(v * scale) for c in constraints])
+
+    def event_values(v):
+        return np.array([g(v * scale) for g in events.values()])
+
+    # Put the starting point on the curve
+    v = u0 / scale
+    t = _tangent(_jacobian(F, v, F(v)), np.asarray(direction, dtype=float) / scale)
+    v_start, _ = _newton(F, lambda w: np.dot(t, w - v), v, tol, max_corrector)
+    if v_start is None:
+        raise ValueError("Could not converge the starting point onto the curve")
+    v = v_start
+    t = _tangent(_jacobian(F, v, F(v)), t)
+
+    points, tangents, found = [v], [t], []
+    g_last = event_values(v)
+    h = step
+    terminated_by = 'max_points'
+    while len(points) < max_points:
+        v_pred = v + h * t
+        v_new, iterations = _newton(F, lambda w: np.dot(t, w - v_pred), v_pred, tol,
+                                    max_corrector)
+        if v_new is not None:
+            t_new = _tangent(_jacobian(F, v_new, F(v_new)), t)
+            angle = np.arccos(np.clip(np.dot(t, t_new), -1, 1))
+        if v_new is None or angle > max_angle:
+            h /= 2
+            if h < step_min:
+                terminated_by = 'step_min'
+                break
+            continue
+
+        # Land on the first violated constraint and stop there
+        c_new = constraint_values(v_new)
+        if np.any(c_new < 0):
+            k = int(np.argmin(c_new))
+            c_old = constraints[k](v * scale)
+            s = c_old / (c_old - c_new[k])
+            v_edge, _ = _newton(F, lambda w: np.array([constraints[k](w * scale)]),
+                                v + s * (v_new - v), tol, max_corrector)
+            if v_edge is not None:
+                v_new = v_edge
+                t_new = _tangent(_jacobian(F, v_new, F(v_new)), t)
+            terminated_by = f'constraint {k}'
+
+        # Locate event zeros crossed by this step
+        g_new = event_values(v_new)
+        for i in np.flatnonzero(g_last * g_new < 0):
+            g = list(events.values())[i]
+            s = g_last[i] / (g_last[i] - g_new[i])
+            v_event, _ = _newton(F, lambda w: np.array([g(w * scale)]),
+                                 v + s * (v_new - v), tol, max_corrector)
+            if v_event is None:
+                v_event = v + s * (v_new - v)
+            # Zeros on the boundary (e.g. y1 = x1 at a pure component) are not events
+            if np.all(constraint_values(v_event) > 1e-9):
+                found.append({'name': list(events)[i], 'u': v_event * scale})
+
+        points.append(v_new)
+        tangents.append(t_new)
+        v, t, g_last = v_new, t_new, g_new
+        if terminated_by.startswith('constraint'):
+            break
+        if iterations <= 3 and angle < max_angle / 2:
+            h = min(1.5 * h, step_max)
+
+    return {
+        'points': np.array(points) * scale,
+        'tangents': np.array(tangents),
+        'events': found,
+        'terminated_by': terminated_by,
+        'residual_evaluations': calls[0],
+    }
@@ -0,0 +1,531 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized Flash Calculations
+Rachford-Rice solver (safeguarded Halley/Newton), modified-Raoult
+isothermal flash with accelerated K-value successive substitution, and
+bubble/dew point pressures and temperatures
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+from . import jit
+from .activity_models import ActivityModel
+
+ACCELERATIONS = ('dem', 'anderson', None)
+# Successive-substitution steps between two dominant-eigenvalue steps
+ACCELERATION_INTERVAL = 5
+# Number of previous iterates used by Anderson acceleration
+ANDERSON_MEMORY = 4
+# Largest change of any ln K in one Anderson step, and largest mixing
+# coefficient (larger ones come from nearly singular normal equations)
+ANDERSON_MAX_STEP = 1.0
+ANDERSON_MAX_COEFFICIENT = 1e3
+
+
+def rachford_rice(z, K, V0=None, tol=1e-12, max_iter=50):
+    """
+    Solve the Rachford-Rice equation for the vapour fraction
+
+    Works on any number of flashes at once: the last axis of z and K holds
+    the components. Halley steps are kept inside a bisection bracket, so
+    convergence is guaranteed. Feeds below their bubble point return V = 0
+    and feeds above their dew point return V = 1.
+
+    Parameters:
+    z: Feed mole fractions, shape (..., nc)
+    K: K-values, shape (..., nc)
+    V0: Optional initial vapour fractions, shape (...)
+    tol: Tolerance on the vapour fraction
+    max_iter: Maximum number of iterations
+
+    Returns:
+    ndarray: Vapour fractions, shape (...)
+    """
+    z, K = np.broadcast_arrays(np.asarray(z, dtype=float), np.asarray(K, dtype=float))
+    if jit.enabled():
+        shape, n = z.shape[:-1], z.shape[-1]
+        V0 = np.full(shape, np.nan) if V0 is None else np.broadcast_to(V0, shape)
+        V = jit.kernel('rachford_rice')(np.ascontiguousarray(z.reshape(-1, n)),
+                                        np.ascontiguousarray(K.reshape(-1, n)),
+                                        np.asarray(V0, dtype=float).reshape(-1), tol, max_iter)
+        return V.reshape(shape)
+    c = K - 1
+    f_0 = np.sum(z * c, axis=-1)                  # f(V = 0)
+    f_1 = np.sum(z * c / K, axis=-1)              # f(V = 1)
+    two_phase = (f_0 > 0) & (f_1 < 0)
+
+    # Tightest bracket within [0, 1] from the individual components
+    # (Leibovici and Neoschil): x_i <= 1 and y_i <= 1 at the root
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lo = np.max(np.where(K > 1, (K * z - 1) / c, 0.0), axis=-1)
+        hi = np.min(np.where(K < 1, (1 - z) / (1 - K), 1.0), axis=-1)
+    lo = np.clip(lo, 0, 1)
+    hi = np.clip(hi, lo, 1)
+    if V0 is None:
+        V = 0.5 * (lo + hi)
+    else:
+        # NaN entries start from the middle of the bracket, as in the compiled kernel
+        V0 = np.broadcast_to(np.asarray(V0, dtype=float), f_0.shape)
+        V = np.where(np.isnan(V0), 0.5 * (lo + hi), np.clip(V0, lo, hi))
+    # Iterate only on the flashes that have not converged yet; converged
+    # roots are frozen so round-off cannot move them again
+    V, lo, hi = (np.array(a, dtype=float) for a in (V, lo, hi))
+    active = np.flatnonzero(two_phase)
+    V_flat, lo_flat, hi_flat = V.reshape(-1), lo.reshape(-1), hi.reshape(-1)
+    z_flat, c_flat = z.reshape(-1, z.shape[-1]), c.reshape(-1, c.shape[-1])
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        Va, za, ca = V_flat[active], z_flat[active], c_flat[active]
+        d = 1 / (1 + Va[:, None] * ca)
+        t = za * ca * d
+        f = np.sum(t, axis=-1)
+        df = -np.sum(t * ca * d, axis=-1)
+        d2f = 2 * np.sum(t * (ca * d) ** 2, axis=-1)
+        # f is decreasing in V: tighten the bracket around the root
+        lo_a = np.where(f > 0, Va, lo_flat[active])
+        hi_a = np.where(f < 0, Va, hi_flat[active])
+        step = 2 * f * df / (2 * df ** 2 - f * d2f)
+        converged = (np.abs(step) < tol) | (f == 0)
+        V_new = Va - step
+        outside = ~((V_new > lo_a) & (V_new < hi_a)) & ~converged
+        V_new = np.where(outside, 0.5 * (lo_a + hi_a), V_new)
+        V_flat[active], lo_flat[active], hi_flat[active] = V_new, lo_a, hi_a
+        active = active[~converged]
+    V = np.where(two_phase, V, np.where(f_0 <= 0, 0.0, 1.0))
+    return V
+
+
+def _anderson_step(history, u, g):
+    """
+    Anderson-accelerated fixed-point update for many problems at once
+
+    The mixed update is safeguarded per problem: it is replaced by the plain
+    fixed-point step g where the residual grew since the previous iterate,
+    where the mixing coefficients blow up (nearly singular normal
+    equations) or where it would move any entry by more than
+    ANDERSON_MAX_STEP.
+
+    Parameters:
+    history: List of previous (u, g) pairs (modified in place)
+    u: Current iterates, shape (..., n)
+    g: Fixed-point map at u, shape (..., n)
+
+    Returns:
+    ndarray: Next iterates
+    """
+    history.append((u, g))
+    del history[:-(ANDERSON_MEMORY + 1)]
+    if len(history) < 2:
+        return g
+    R = np.stack([gk - uk for uk, gk in history], axis=-1)     # residuals
+    G = np.stack([gk for _, gk in history], axis=-1)
+    dR = np.diff(R, axis=-1)
+    dG = np.diff(G, axis=-1)
+    A = np.einsum('...ik,...il->...kl', dR, dR)
+    b = np.einsum('...ik,...i->...k', dR, R[..., -1])
+    # Small Tikhonov term keeps the normal equations solvable
+    A = A + 1e-12 * (np.trace(A, axis1=-2, axis2=-1)[..., None, None] + 1e-30) * np.eye(A.shape[-1])
+    with np.errstate(invalid='ignore', over='ignore'):
+        theta = np.linalg.solve(A, b[..., None])[..., 0]
+        u_new = g - np.einsum('...ik,...k->...i', dG, theta)
+        residual = np.sum(R * R, axis=-2)
+        ok = (np.all(np.isfinite(u_new), axis=-1)
+              & (residual[..., -1] <= residual[..., -2])
+              & (np.max(np.abs(theta), axis=-1) <= ANDERSON_MAX_COEFFICIENT)
+              & (np.max(np.abs(u_new - u), axis=-1) <= ANDERSON_MAX_STEP))
+    return np.where(ok[..., None], u_new, g)
+
+
+def _anderson_rows_step(history, rows, u, g):
+    """
+    Anderson step for the active rows of many fixed-point problems
+
+    history holds (rows, u, g) of earlier steps; the active rows only ever
+    shrink, so each is found in every earlier step by a sorted search.
+    """
+    past = [(u_k[np.searchsorted(rows_k, rows)], g_k[np.searchsorted(rows_k, rows)])
+            for rows_k, u_k, g_k in history]
+    history.append((rows, u, g))
+    del history[:-ANDERSON_MEMORY]
+    return _anderson_step(past, u, g)
+
+
+def _substitution_flash(z, ln_K, update, tol, max_iter, acceleration, active_set=False):
+    """
+    Accelerated successive substitution on ln K shared by the flash solvers
+
+    Parameters:
+    z: Feed mole fractions, shape (..., nc)
+    ln_K: Initial ln K, shape (..., nc)
+    update: Callable update(rows, x, y) returning the next ln K from the
+            current phase compositions. With active_set the flashes are
+            flattened and only the unconverged ones are passed (rows indexes
+            the flattened flashes, x and y have shape (len(rows), nc));
+            otherwise rows is None and x, y have the full shape
+    tol, max_iter, acceleration: See modified_raoult_flash
+    active_set: Stop updating each flash once it has converged
+
+    Returns:
+    dict: V, x, y, K, iterations and converged mask
+    """
+    if acceleration not in ACCELERATIONS:
+        raise ValueError(f"acceleration must be one of {ACCELERATIONS}")
+    shape = z.shape
+    nc = shape[-1]
+    z = z.reshape(-1, nc)
+    ln_K = np.array(np.broadcast_to(ln_K, shape), dtype=float).reshape(-1, nc)
+
+    def phases(rows, ln_K, V):
+        K = np.exp(ln_K)
+        V = rachford_rice(z[rows], K, V0=V)
+        x = z[rows] / (1 + V[..., None] * (K - 1))
+        x /= np.sum(x, axis=-1, keepdims=True)
+        y = K * x
+        y /= np.sum(y, axis=-1, keepdims=True)
+        return K, V, x, y
+
+    V = np.full(z.shape[0], np.nan)
+    delta_prev = np.zeros_like(ln_K)
+    history = []
+    iterations = 0
+    converged = np.zeros(z.shape[0], dtype=bool)
+    rows = np.arange(z.shape[0])
+    active = rows if active_set else slice(None)   # plain slices avoid copies
+    for iterations in range(1, max_iter + 1):
+        K, V[active], x, y = phases(active, ln_K[active], V[active])
+        if active_set:
+            ln_K_new = update(rows, x, y)
+        else:
+            ln_K_new = update(None, x.reshape(shape), y.reshape(shape)).reshape(-1, nc)
+        delta = ln_K_new - ln_K[active]
+        done = np.max(np.abs(delta), axis=-1) < tol
+        converged[active] |= done
+        if np.all(converged):
+            ln_K[active] = ln_K_new
+            break
+        if acceleration == 'anderson':
+            # Copy: the history must not see the in-place updates of ln_K
+            ln_K_new = _anderson_rows_step(history, rows, ln_K[active].copy(), ln_K_new)
+        elif acceleration == 'dem' and iterations > 1 and iterations % ACCELERATION_INTERVAL == 0:
+            # Dominant-eigenvalue extrapolation of the fixed-point iteration
+            with np.errstate(divide='ignore', invalid='ignore'):
+                lam = (np.sum(delta * delta, axis=-1)
+                       / np.sum(delta_prev[active] * delta, axis=-1))
+            accelerate = np.isfinite(lam) & (lam > 0) & (lam < 1) & ~done
+            factor = np.where(accelerate, lam / (1 - np.where(accelerate, lam, 0)), 0)
+            ln_K_new = ln_K_new + factor[..., None] * delta
+        delta_prev[active] = delta
+        ln_K[active] = ln_K_new
+        if active_set:
+            rows = active = rows[~done]
+
+    K, V, x, y = phases(slice(None), ln_K, V)
+    return {'V': V.reshape(shape[:-1]), 'x': x.reshape(shape), 'y': y.reshape(shape),
+            'K': K.reshape(shape), 'iterations': iterations,
+            'converged': converged.reshape(shape[:-1])}
+
+
+def modified_raoult_flash(z, P, P_sat, gamma=None, tol=1e-10, max_iter=100, acceleration='dem'):
+    """
+    Isothermal flash with K = gamma(x) P_sat / P for many feeds at once
+
+    The K-values are found by successive substitution on ln K, accelerated
+    either by a dominant-eigenvalue extrapolation every
+    ACCELERATION_INTERVAL steps ('dem') or by Anderson mixing of the last
+    ANDERSON_MEMORY iterates ('anderson'). Each step solves Rachford-Rice
+    for every unconverged flash in one vectorized pass; converged flashes
+    are frozen.
+
+    Parameters:
+    z: Feed mole fractions, shape (..., nc)
+    P: Pressure, shape (...) (same unit as P_sat)
+    P_sat: Saturation pressures, shape (..., nc)
+    gamma: Callable gamma(x) returning activity coefficients of the liquid
+           compositions x, shape (..., nc); None for an ideal liquid
+    tol: Tolerance on ln K
+    max_iter: Maximum number of K-value updates
+    acceleration: 'dem', 'anderson' or None (plain substitution)
+
+    Returns:
+    dict: V (vapour fraction), x, y, K, iterations and converged mask
+    """
+    z = np.asarray(z, dtype=float)
+    P = np.asarray(P, dtype=float)[..., None]
+    K_ideal = np.asarray(P_sat, dtype=float) / P
+    shape = np.broadcast_shapes(z.shape, K_ideal.shape)
+    z = np.broadcast_to(z, shape)
+    K_ideal = np.broadcast_to(K_ideal, shape)
+    if gamma is None:
+        gamma = np.ones_like
+    nc = shape[-1]
+    K_ideal_flat = K_ideal.reshape(-1, nc)
+    x_all = np.array(z)
+
+    def update(rows, x, y):
+        # gamma may carry per-feed parameters, so it sees every feed; the
+        # converged ones keep their last liquid
+        x_all.reshape(-1, nc)[rows] = x
+        return np.log(K_ideal_flat[rows] * gamma(x_all).reshape(-1, nc)[rows])
+
+    return _substitution_flash(z, np.log(K_ideal * gamma(z)), update, tol, max_iter,
+                               acceleration, active_set=True)
+
+
+def bubble_pressure(x, P_sat, gamma=None):
+    """
+    Bubble point pressures (modified Raoult's law, no iteration needed)
+
+    Parameters:
+    x: Liquid mole fractions, shape (..., nc)
+    P_sat: Saturation pressures, shape (..., nc)
+    gamma: Activity coefficient callable gamma(x) (None for ideal)
+
+    Returns:
+    dict: P and incipient vapour composition y
+    """
+    x = np.asarray(x, dtype=float)
+    g = np.ones_like(x) if gamma is None else gamma(x)
+    p = x * g * np.asarray(P_sat, dtype=float)
+    P = np.sum(p, axis=-1)
+    return {'P': P, 'y': p / P[..., None]}
+
+
+def dew_pressure(y, P_sat, gamma=None, tol=1e-10, max_iter=200):
+    """
+    Dew point pressures by substitution on the incipient liquid composition
+
+    Parameters:
+    y: Vapour mole fractions, shape (..., nc)
+    P_sat: Saturation pressures, shape (..., nc)
+    gamma: Activity coefficient callable gamma(x) (None for ideal)
+    tol: Tolerance on the liquid mole fractions
+    max_iter: Maximum number of iterations
+
+    Returns:
+    dict: P, incipient liquid composition x and iterations
+    """
+    y = np.asarray(y, dtype=float)
+    P_sat = np.asarray(P_sat, dtype=float)
+    g = np.ones(np.broadcast_shapes(y.shape, P_sat.shape))
+    history = []
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        P = 1 / np.sum(y / (g * P_sat), axis=-1)
+        x = y * P[..., None] / (g * P_sat)
+        if gamma is None:
+            break
+        ln_g = np.log(g)
+        ln_g_new = _anderson_step(history, ln_g, np.log(gamma(x)))
+        g = np.exp(ln_g_new)
+        if np.max(np.abs(ln_g_new - ln_g)) < tol:
+            break
+    P = 1 / np.sum(y / (g * P_sat), axis=-1)
+    x = y * P[..., None] / (g * P_sat)
+    return {'P': P, 'x': x / np.sum(x, axis=-1, keepdims=True), 'iterations': iterations}
+
+
+def _gamma_at(gamma, x, T):
+    """Activity coefficients of a callable gamma(x), or of an ActivityModel at temperature T"""
+    if gamma is None:
+        return np.ones_like(x)
+    if isinstance(gamma, ActivityModel):
+        return gamma.gamma(x, T)
+    return gamma(x)
+
+
+def _ln_gamma_dT(gamma, x, T):
+    """
+    ln γ and d ln γ/dT at fixed composition; the derivative is analytic for
+    an ActivityModel and zero for callables gamma(x) and ideal liquids
+    """
+    if isinstance(gamma, ActivityModel):
+        terms = gamma.derivatives(x, T)
+        return terms['ln_gamma'], terms['dln_gamma_dT']
+    ln_gamma = np.log(_gamma_at(gamma, x, T))
+    return ln_gamma, np.zeros_like(ln_gamma)
+
+
+def _newton_T_step(residual, T, max_step=20.0, dT=1e-4):
+    """One vectorized Newton step on residual(T) with a finite-difference slope"""
+    f, extra = residual(T)
+    f_h, _ = residual(T + dT)
+    return np.clip(-f * dT / (f_h - f), -max_step, max_step), extra
+
+
+def bubble_temperature(x, P, P_sat_func, gamma=None, T0=350.0, tol=1e-9, max_iter=50,
+                       max_step=20.0, dT=1e-4):
+    """
+    Bubble point temperatures at pressure P
+
+    Newton steps on ln(Σ x γ P_sat / P). Its slope Σ y (d ln P_sat/dT +
+    d ln γ/dT) takes d ln P_sat/dT from a forward difference and, for an
+    ActivityModel, d ln γ/dT from its analytic derivatives.
+
+    Parameters:
+    x: Liquid mole fractions, shape (..., nc)
+    P: Pressure, shape (...)
+    P_sat_func: Callable P_sat_func(T) returning saturation pressures of
+                every component, shape (..., nc), for temperatures shape (...)
+    gamma: Activity coefficient callable gamma(x), or an ActivityModel with
+           temperature-dependent parameters (None for ideal)
+    T0: Initial temperature (K)
+    tol: Tolerance on the temperature (K)
+    max_iter: Maximum number of Newton steps
+    max_step: Largest temperature change per step (K)
+    dT: Temperature increment of the d ln P_sat/dT difference (K)
+
+    Returns:
+    dict: T and incipient vapour composition y
+    """
+    x = np.asarray(x, dtype=float)
+    P = np.asarray(P, dtype=float)
+
+    def partial_pressures(T):
+        ln_gamma, dln_gamma_dT = _ln_gamma_dT(gamma, x, T)
+        P_sat = P_sat_func(T)
+        return x * np.exp(ln_gamma) * P_sat, P_sat, dln_gamma_dT
+
+    T = np.array(np.broadcast_to(np.asarray(T0, dtype=float),
+                                 np.broadcast_shapes(x.shape[:-1], P.shape)))
+    for _ in range(max_iter):
+        p, P_sat, dln_gamma_dT = partial_pressures(T)
+        total = np.sum(p, axis=-1)
+        slope = (np.log(P_sat_func(T + dT)) - np.log(P_sat)) / dT + dln_gamma_dT
+        df = np.sum(p * slope, axis=-1) / total
+        step = np.clip(-np.log(total / P) / df, -max_step, max_step)
+        T = T + step
+        if np.all(np.abs(step) < tol):
+            break
+    p = partial_pressures(T)[0]
+    return {'T': T, 'y': p / np.sum(p, axis=-1, keepdims=True)}
+
+
+def dew_temperature(y, P, P_sat_func, gamma=None, T0=350.0, tol=1e-9, max_iter=100):
+    """
+    Dew point temperatures at pressure P
+
+    Each iteration takes one Newton step in temperature and updates the
+    incipient liquid composition (and its activity coefficients) at the
+    same time.
+
+    Parameters:
+    y: Vapour mole fractions, shape (..., nc)
+    P: Pressure, shape (...)
+    P_sat_func: Callable P_sat_func(T) returning saturation pressures,
+                shape (..., nc)
+    gamma: Activity coefficient callable gamma(x), or an ActivityModel with
+           temperature-dependent parameters (None for ideal)
+    T0: Initial temperature (K)
+    tol: Tolerance on the temperature (K) and liquid mole fractions
+    max_iter: Maximum number of iterations
+
+    Returns:
+    dict: T and incipient liquid composition x
+    """
+    y = np.asarray(y, dtype=float)
+    P = np.asarray(P, dtype=float)
+    g = np.ones_like(y)
+
+    def residual(T):
+        q = y * P[..., None] / (g * P_sat_func(T))
+        total = np.sum(q, axis=-1)
+        return np.log(total), q / total[..., None]
+
+    T = np.array(np.broadcast_to(np.asarray(T0, dtype=float),
+                                 np.broadcast_shapes(y.shape[:-1], P.shape)))
+    x = y
+    for _ in range(max_iter):
+        step, x_new = _newton_T_step(residual, T)
+        T = T + step
+        change = np.max(np.abs(x_new - x))
+        x = x_new
+        if gamma is not None:
+            g = _gamma_at(gamma, x, T)
+        if np.all(np.abs(step) < tol) and change < tol:
+            break
+    return {'T': T, 'x': residual(T)[1]}
+
+
+def bubble_dew_temperatures(x, y, P, P_sat_func, gamma=None, T_bubble=350.0, T_dew=350.0,
+                            x_dew=None, tol=1e-9, max_iter=100, max_step=20.0, dT=1e-3):
+    """
+    Bubble point temperatures of liquids x and dew point temperatures of
+    vapours y, solved together
+
+    Both problems are stacked into one Newton iteration on ln(Σ x γ P_sat / P)
+    and ln(Σ y P / (γ P_sat)). Each residual depends only on its own
+    temperature, so the Jacobian is diagonal and both diagonals come from a
+    single slope d ln P_sat/dT of the stacked temperatures plus, for an
+    ActivityModel, the analytic d ln γ/dT at fixed composition. The incipient
+    liquid of the dew points (and its activity coefficients) is updated
+    alongside the temperatures, with Anderson mixing on its ln γ.
+
+    Parameters:
+    x: Liquid mole fractions of the bubble points, shape (m, nc)
+    y: Vapour mole fractions of the dew points, shape (n, nc)
+    P: Pressure
+    P_sat_func: Callable P_sat_func(T) returning saturation pressures,
+                shape T.shape + (nc,)
+    gamma: Activity coefficient callable gamma(x), or an ActivityModel with
+           temperature-dependent parameters (None for ideal)
+    T_bubble, T_dew: Initial temperatures (K), scalars or shape (m,), (n,)
+    x_dew: Initial incipient liquid compositions, shape (n, nc)
+    tol: Tolerance on the temperatures (K) and liquid mole fractions
+    max_iter: Maximum number of Newton steps
+    max_step: Largest temperature change per step (K)
+    dT: Temperature increment of the d ln P_sat/dT difference (K)
+
+    Returns:
+    dict: T_bubble, y_bubble (incipient vapour), T_dew, x_dew (incipient
+          liquid), converged masks of both and the number of iterations
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    m = x.shape[0]
+    T = np.concatenate([np.broadcast_to(np.asarray(T_bubble, dtype=float), (m,)),
+                        np.broadcast_to(np.asarray(T_dew, dtype=float), (y.shape[0],))])
+    x_dew = y if x_dew is None else np.asarray(x_dew, dtype=float)
+    ln_g_bubble, dln_g_dT_bubble = _ln_gamma_dT(gamma, x, T[:m])
+    ln_g_dew, dln_g_dT_dew = _ln_gamma_dT(gamma, x_dew, T[m:])
+    g_bubble, g_dew = np.exp(ln_g_bubble), np.exp(ln_g_dew)
+    active = np.ones(T.shape, dtype=bool)
+    history = []
+
+    for iterations in range(1, max_iter + 1):
+        P_sat = P_sat_func(T)
+        slope = (np.log(P_sat_func(T + dT)) - np.log(P_sat)) / dT   # d ln P_sat/dT
+        # Bubble rows: partial pressures; dew rows: liquid fugacity ratios
+        p = x * g_bubble * P_sat[:m]
+        q = y * P / (g_dew * P_sat[m:])
+        p_total, q_total = np.sum(p, axis=-1), np.sum(q, axis=-1)
+        y_bubble = p / p_total[:, None]
+        x_new = q / q_total[:, None]
+        f = np.concatenate([np.log(p_total / P), np.log(q_total)])
+        df = np.concatenate([np.sum(y_bubble * (slope[:m] + dln_g_dT_bubble), axis=-1),
+                             -np.sum(x_new * (slope[m:] + dln_g_dT_dew), axis=-1)])
+        step = np.where(active, np.clip(-f / df, -max_step, max_step), 0.0)
+        T = T + step
+        change = np.concatenate([np.zeros(m), np.max(np.abs(x_new - x_dew), axis=-1)])
+        x_dew = x_new
+        if gamma is not None:
+            ln_g_dew, dln_g_dT_dew = _ln_gamma_dT(gamma, x_dew, T[m:])
+            g_dew = np.exp(_anderson_step(history, np.log(g_dew), ln_g_dew))
+        if isinstance(gamma, ActivityModel):
+            ln_g_bubble, dln_g_dT_bubble = _ln_gamma_dT(gamma, x, T[:m])
+            g_bubble = np.exp(ln_g_bubble)
+        active &= ~((np.abs(step) < tol) & (change < tol))
+        if not active.any():
+            break
+
+    # Compositions consistent with the final temperatures
+    P_sat = P_sat_func(T)
+    p = x * g_bubble * P_sat[:m]
+    q = y * P / (g_dew * P_sat[m:])
+    return {
+        'T_bubble': T[:m], 'y_bubble': p / np.sum(p, axis=-1, keepdims=True),
+        'T_dew': T[m:], 'x_dew': q / np.sum(q, axis=-1, keepdims=True),
+        'converged_bubble': ~active[:m], 'converged_dew': ~active[m:],
+        'iterations': iterations,
+    }
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Ideal-Gas Properties from NASA 7-Coefficient Polynomials
+Variable specific heat properties of air and combustion products with
+tabulated s°(T) and h(T) inversion for vectorized isentropic calculations
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+R_UNIVERSAL = 8.314462618e-3  # kJ/mol·K
+T_REFERENCE = 298.15  # K, zero of the sensible enthalpy
+
+# NASA 7-coefficient polynomials (GRI-Mech 3.0 thermodynamic data):
+# molar mass (g/mol), switch temperature (K), low-T and high-T coefficients
+# a1..a7 with cp/R = a1 + a2 T + a3 T² + a4 T³ + a5 T⁴
+NASA7 = {
+    'N2': (28.0134, 1000.0,
+           (3.298677, 1.4082404e-03, -3.963222e-06, 5.641515e-09,
+            -2.444854e-12, -1020.8999, 3.950372),
+           (2.92664, 1.4879768e-03, -5.68476e-07, 1.0097038e-10,
+            -6.753351e-15, -922.7977, 5.980528)),
+    'O2': (31.9988, 1000.0,
+           (3.78245636, -2.99673416e-03, 9.84730201e-06, -9.68129509e-09,
+            3.24372837e-12, -1063.94356, 3.65767573),
+           (3.28253784, 1.48308754e-03, -7.57966669e-07, 2.09470555e-10,
+            -2.16717794e-14, -1088.45772, 5.45323129)),
+    'Ar': (39.948, 1000.0,
+           (2.5, 0.0, 0.0, 0.0, 0.0, -745.375, 4.366),
+           (2.5, 0.0, 0.0, 0.0, 0.0, -745.375, 4.366)),
+    'CO2': (44.0095, 1000.0,
+            (2.35677352, 8.98459677e-03, -7.12356269e-06, 2.45919022e-09,
+             -1.43699548e-13, -48371.9697, 9.90105222),
+            (3.85746029, 4.41437026e-03, -2.21481404e-06, 5.23490188e-10,
+             -4.72084164e-14, -48759.166, 2.27163806)),
+    'H2O': (18.01528, 1000.0,
+            (4.19864056, -2.0364341e-03, 6.52040211e-06, -5.48797062e-09,
+             1.77197817e-12, -30293.7267, -0.849032208),
+            (3.03399249, 2.17691804e-03, -1.64072518e-07, -9.7041987e-11,
+             1.68200992e-14, -30004.2971, 4.9667701)),
+}
+
+# Mole fractions of the predefined gas mixtures
+MIXTURES = {
+    'air': {'N2': 0.7808, 'O2': 0.2095, 'Ar': 0.0093, 'CO2': 0.0004},
+    # Methane burnt with 200 % theoretical air:
+    # CH4 + 4 (O2 + 3.76 N2) -> CO2 + 2 H2O + 2 O2 + 15.04 N2
+    'combustion_products': {'CO2': 1 / 20.04, 'H2O': 2 / 20.04,
+                            'O2': 2 / 20.04, 'N2': 15.04 / 20.04},
+}
+
+
+class IdealGas:
+    """
+    Ideal-gas mixture with NASA 7-coefficient specific heats
+
+    Enthalpies are sensible (zero at 298.15 K) and s° is the entropy at the
+    standard pressure, both per unit mass. T(s°) and T(h) are inverted on
+    a precomputed 1 K table followed by one Newton correction, which keeps
+    every calculation vectorized.
+    """
+
+    def __init__(self, composition, T_min=200.0, T_max=3500.0, dT=1.0):
+        """
+        Parameters:
+        composition: Name of a predefined mixture ('air',
+                     'combustion_products') or dict of species mole fractions
+        T_min: Lower end of the inversion table (K)
+        T_max: Upper end of the inversion table (K)
+        dT: Spacing of the inversion table (K)
+        """
+        if isinstance(composition, str):
+            if composition not in MIXTURES:
+                raise ValueError(f"Unknown gas '{composition}'; use one of {tuple(MIXTURES)}")
+            composition = MIXTURES[composition]
+        unknown = set(composition) - set(NASA7)
+        if unknown:
+            raise ValueError(f"No NASA polynomials for {sorted(unknown)}")
+        total = sum(composition.values())
+        self.composition = {name: y / total for name, y in composition.items()}
+        self.molar_mass = sum(y * NASA7[name][0] for name, y in self.composition.items())
+        self.R = R_UNIVERSAL * 1000 / self.molar_mass  # kJ/kg·K
+
+        # Mole-fraction weighted coefficients (all species switch at 1000 K)
+        self._T_switch = 1000.0
+        self._low = sum(y * np.array(NASA7[name][2]) for name, y in self.composition.items())
+        self._high = sum(y * np.array(NASA7[name][3]) for name, y in self.composition.items())
+        self._h_reference = 0.0
+        self._h_reference = float(self.h(T_REFERENCE))
+
+        self.T_min = T_min
+        self.T_max = T_max
+        self._T_table = np.arange(T_min, T_max + dT / 2, dT)
+        self._s0_table = self.s0(self._T_table)
+        self._h_table = self.h(self._T_table)
+
+    def _coefficients(self, T):
+        """Coefficient rows for each temperature, shape (7,) + T.shape"""
+        T = np.asarray(T, dtype=float)
+        return np.where(T < self._T_switch, self._low.reshape((7,) + (1,) * T.ndim),
+                        self._high.reshape((7,) + (1,) * T.ndim))
+
+    def cp(self, T):
+        """Specific heat at constant pressure (kJ/kg·K)"""
+        T = np.asarray(T, dtype=float)
+        a = self._coefficients(T)
+        return self.R * (a[0] + T * (a[1] + T * (a[2] + T * (a[3] + T * a[4]))))
+
+    def h(self, T):
+        """Sensible enthalpy, zero at 298.15 K (kJ/kg)"""
+        T = np.asarray(T, dtype=float)
+        a = self._coefficients(T)
+        h_RT = (a[0] + T * (a[1] / 2 + T * (a[2] / 3 + T * (a[3] / 4 + T * a[4] / 5)))
+                + a[5] / T)
+        return self.R * T * h_RT - self._h_reference
+
+    def s0(self, T):
+        """Standard-state entropy s°(T) (kJ/kg·K)"""
+        T = np.asarray(T, dtype=float)
+        a = self._coefficients(T)
+        s_R = (a[0] * np.log(T) + T * (a[1] + T * (a[2] / 2 + T * (a[3] / 3 + T * a[4] / 4)))
+               + a[6])
+        return self.R * s_R
+
+    def T_from_s0(self, s0):
+        """Temperature (K) with standard-state entropy s0 (kJ/kg·K)"""
+        T = np.interp(s0, self._s0_table, self._T_table)
+        # Newton step on ds°/dT = cp/T
+        return T + (s0 - self.s0(T)) * T / self.cp(T)
+
+    def T_from_h(self, h):
+        """Temperature (K) with sensible enthalpy h (kJ/kg)"""
+        T = np.interp(h, self._h_table, self._T_table)
+        # Newton step on dh/dT = cp
+        return T + (h - self.h(T)) / self.cp(T)
+
+    def isentropic_T(self, T_1, P_1, P_2):
+        """
+        Temperature after an isentropic change of state
+
+        Parameters:
+        T_1: Initial temperature (K)
+        P_1: Initial pressure
+        P_2: Final pressure (same unit as P_1)
+
+        Returns:
+        ndarray: Final temperature (K)
+        """
+        return self.T_from_s0(self.s0(T_1) + self.R * np.log(np.asarray(P_2) / np.asarray(P_1)))
+
+
+_gases = {}
+
+
+def get_gas(name):
+    """
+    Get a shared IdealGas instance of a predefined mixture
+
+    Parameters:
+    name: 'air' or 'combustion_products'
+
+    Returns:
+    IdealGas: Mixture with its inversion tables built
+    """
+    if name not in _gases:
+        _gases[name] = IdealGas(name)
+    return _gases[name]
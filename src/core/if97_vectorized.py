@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized IAPWS-IF97 Steam Properties
+Batch evaluation of the IF97 region equations over NumPy arrays
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+from iapws import IAPWS97
+from iapws import _iapws97Constants as Const
+from iapws._iapws import R, Tc, Pc
+
+# Region limits (IAPWS-IF97)
+P_MIN = 611.212677 / 1e6  # Triple point pressure (MPa)
+P_MAX = 100.0             # Upper pressure limit of regions 1-3 (MPa)
+P_MAX_REGION5 = 50.0      # Upper pressure limit of region 5 (MPa)
+P_SAT_623 = 16.5291642526  # Saturation pressure at 623.15 K (MPa)
+T_MIN = 273.15            # K
+T_13 = 623.15             # Boundary between regions 1 and 3 (K)
+T_25 = 1073.15            # Boundary between regions 2 and 5 (K)
+T_MAX = 2273.15           # Upper temperature limit of region 5 (K)
+
+# Phase codes returned in the 'phase' column of batch results
+PHASE_INVALID = -1
+PHASE_LIQUID = 0
+PHASE_TWO_PHASE = 1
+PHASE_VAPOUR = 2
+PHASE_SUPERCRITICAL = 3
+PHASE_GAS = 4
+PHASE_COMPRESSIBLE_LIQUID = 5
+PHASE_CRITICAL_POINT = 6
+
+PHASE_NAMES = {
+    PHASE_INVALID: None,
+    PHASE_LIQUID: 'Liquid',
+    PHASE_TWO_PHASE: 'Two phases',
+    PHASE_VAPOUR: 'Vapour',
+    PHASE_SUPERCRITICAL: 'Supercritical fluid',
+    PHASE_GAS: 'Gas',
+    PHASE_COMPRESSIBLE_LIQUID: 'Compressible liquid',
+    PHASE_CRITICAL_POINT: 'Critical point',
+}
+_PHASE_CODES = {name: code for code, name in PHASE_NAMES.items() if name}
+_PHASE_CODES['Saturated liquid'] = PHASE_LIQUID
+_PHASE_CODES['Saturated vapor'] = PHASE_VAPOUR
+
+PROPERTY_KEYS = ('P', 'T', 'v', 'h', 's', 'u', 'x', 'phase', 'region')
+
+
+def _power_sums(n, I, J, a, b):
+    """
+    Evaluate sum(n * a**I * b**J) and its first and second partial
+    derivatives with respect to a and b for every element of a and b
+
+    Returns:
+    tuple: (g, g_a, g_aa, g_b, g_bb) arrays shaped like a
+    """
+    a = a[:, None]
+    b = b[:, None]
+    aI = a ** I
+    bJ = b ** J
+    g = np.sum(n * aI * bJ, axis=1)
+    g_a = np.sum(n * I * a ** (I - 1) * bJ, axis=1)
+    g_aa = np.sum(n * I * (I - 1) * a ** (I - 2) * bJ, axis=1)
+    g_b = np.sum(n * J * aI * b ** (J - 1), axis=1)
+    g_bb = np.sum(n * J * (J - 1) * aI * b ** (J - 2), axis=1)
+    return g, g_a, g_aa, g_b, g_bb
+
+
+def _ideal_sums(no, Jo, Tr, Pr):
+    """Ideal-gas part of the Gibbs energy for regions 2 and 5"""
+    Tr_ = Tr[:, None]
+    go = np.log(Pr) + np.sum(no * Tr_ ** Jo, axis=1)
+    got = np.sum(no * Jo * Tr_ ** (Jo - 1), axis=1)
+    gott = np.sum(no * Jo * (Jo - 1) * Tr_ ** (Jo - 2), axis=1)
+    return go, got, gott
+
+
+def region1(T, P):
+    """
+    Basic equation for region 1 (compressed liquid) over arrays
+
+    Parameters:
+    T: Temperature array (K)
+    P: Pressure array (MPa)
+
+    Returns:
+    dict: Arrays of v (m³/kg), h (kJ/kg), s (kJ/kg·K), cp (kJ/kg·K)
+    """
+    Tr = 1386 / T
+    Pr = P / 16.53
+    g, ga, _, gb, gbb = _power_sums(Const.Region1_n, Const.Region1_Li,
+                                    Const.Region1_Lj, 7.1 - Pr, Tr - 1.222)
+    return {
+        'v': -Pr * ga * R * T / P / 1000,
+        'h': Tr * gb * R * T,
+        's': R * (Tr * gb - g),
+        'cp': -R * Tr ** 2 * gbb
+    }
+
+
+def region2(T, P):
+    """
+    Basic equation for region 2 (superheated vapour) over arrays
+
+    Parameters:
+    T: Temperature array (K)
+    P: Pressure array (MPa)
+
+    Returns:
+    dict: Arrays of v (m³/kg), h (kJ/kg), s (kJ/kg·K), cp (kJ/kg·K)
+    """
+    Tr = 540 / T
+    Pr = P / 1
+    go, got, gott = _ideal_sums(Const.Region2_cp0_no, Const.Region2_cp0_Jo, Tr, Pr)
+    gr, grp, _, grt, grtt = _power_sums(Const.Region2_n, Const.Region2_Li,
+                                        Const.Region2_Lj, Pr, Tr - 0.5)
+    return {
+        'v': (1 + Pr * grp) * R * T / P / 1000,
+        'h': Tr * (got + grt) * R * T,
+        's': R * (Tr * (got + grt) - (go + gr)),
+        'cp': -R * Tr ** 2 * (gott + grtt)
+    }
+
+
+def region5(T, P):
+    """
+    Basic equation for region 5 (high-temperature steam) over arrays
+
+    Parameters:
+    T: Temperature array (K)
+    P: Pressure array (MPa)
+
+    Returns:
+    dict: Arrays of v (m³/kg), h (kJ/kg), s (kJ/kg·K), cp (kJ/kg·K)
+    """
+    Tr = 1000 / T
+    Pr = P / 1
+    go, got, gott = _ideal_sums(Const.Region5_cp0_no, Const.Region5_cp0_Jo, Tr, Pr)
+    gr, grp, _, grt, grtt = _power_sums(Const.Region5_n, Const.Region5_Li,
+                                        Const.Region5_Lj, Pr, Tr)
+    return {
+        'v': (1 + Pr * grp) * R * T / P / 1000,
+        'h': Tr * (got + grt) * R * T,
+        's': R * (Tr * (got + grt) - (go + gr)),
+        'cp': -R * Tr ** 2 * (gott + grtt)
+    }
+
+
+_SAT_N = (0, 0.11670521452767E+04, -0.72421316703206E+06, -0.17073846940092E+02,
+          0.12020824702470E+05, -0.32325550322333E+07, 0.14915108613530E+02,
+          -0.48232657361591E+04, 0.40511340542057E+06, -0.23855557567849E+00,
+          0.65017534844798E+03)
+
+
+def saturation_pressure(T):
+    """
+    Saturation pressure P=f(T) of the region 4 equation over arrays
+
+    Parameters:
+    T: Temperature (K), valid between 273.15 K and the critical point
+
+    Returns:
+    ndarray: Saturation pressure (MPa)
+    """
+    n = _SAT_N
+    T = np.asarray(T, dtype=float)
+    tita = T + n[9] / (T - n[10])
+    A = tita ** 2 + n[1] * tita + n[2]
+    B = n[3] * tita ** 2 + n[4] * tita + n[5]
+    C = n[6] * tita ** 2 + n[7] * tita + n[8]
+    return (2 * C / (-B + np.sqrt(B ** 2 - 4 * A * C))) ** 4
+
+
+def saturation_temperature(P):
+    """
+    Saturation temperature T=f(P) of the region 4 equation over arrays
+
+    Parameters:
+    P: Pressure (MPa), valid between the triple and critical points
+
+    Returns:
+    ndarray: Saturation temperature (K)
+    """
+    n = _SAT_N
+    beta = np.asarray(P, dtype=float) ** 0.25
+    E = beta ** 2 + n[3] * beta + n[6]
+    F = n[1] * beta ** 2 + n[4] * beta + n[7]
+    G = n[2] * beta ** 2 + n[5] * beta + n[8]
+    D = 2 * G / (-F - np.sqrt(F ** 2 - 4 * E * G))
+    return (n[10] + D - np.sqrt((n[10] + D) ** 2 - 4 * (n[9] + n[10] * D))) / 2
+
+
+def _t_b23(P):
+    """Boundary between regions 2 and 3, T=f(P)"""
+    return 0.57254459862746e3 + np.sqrt((P - 0.1391883977870e2) / 0.10192970039326e-2)
+
+
+def _backward1_T(P, h=None, s=None):
+    """Backward equations T(P,h) and T(P,s) for region 1"""
+    if h is not None:
+        n, I, J = Const.Backward1_T_Ph_n, Const.Backward1_T_Ph_Li, Const.Backward1_T_Ph_Lj
+        b = h / 2500 + 1
+    else:
+        n, I, J = Const.Backward1_T_Ps_n, Const.Backward1_T_Ps_Li, Const.Backward1_T_Ps_Lj
+        b = s + 2
+    return np.sum(n * P[:, None] ** I * b[:, None] ** J, axis=1)
+
+
+def _backward2_T(P, h=None, s=None):
+    """Backward equations T(P,h) and T(P,s) for region 2 (subregions a, b, c)"""
+    T = np.empty_like(P)
+    if h is not None:
+        h_bc = 0.26526571908428e4 + np.sqrt(np.clip(P - 4.5257578905948, 0, None)
+                                            / 1.2809002730136e-4)
+        sub_a = P <= 4
+        sub_b = ~sub_a & ((P <= 6.546699678) | (h >= h_bc))
+        nu = h / 2000
+        subregions = [
+            (sub_a, 'Backward2a_T_Ph', P, nu - 2.1),
+            (sub_b, 'Backward2b_T_Ph', P - 2, nu - 2.6),
+            (~sub_a & ~sub_b, 'Backward2c_T_Ph', P + 25, nu - 1.8),
+        ]
+    else:
+        sub_a = P <= 4
+        sub_b = ~sub_a & (s >= 5.85)
+        subregions = [
+            (sub_a, 'Backward2a_T_Ps', P, s / 2 - 2),
+            (sub_b, 'Backward2b_T_Ps', P, 10 - s / 0.7853),
+            (~sub_a & ~sub_b, 'Backward2c_T_Ps', P, 2 - s / 2.9251),
+        ]
+    for mask, name, a, b in subregions:
+        if np.any(mask):
+            n = getattr(Const, name + '_n')
+            I = getattr(Const, name + '_Li')
+            J = getattr(Const, name + '_Lj')
+            T[mask] = np.sum(n * a[mask, None] ** I * b[mask, None] ** J, axis=1)
+    sub = P <= Pc
+    T[sub] = np.maximum(T[sub], saturation_temperature(P[sub]))
+    return T
+
+
+def _newton_T(region, P, target, T0, prop, T_bounds, tol=1e-10, max_iter=20):
+    """
+    Vectorized Newton iteration on temperature so that region(T, P)[prop]
+    matches the target enthalpy or entropy
+    """
+    T = np.clip(T0, *T_bounds)
+    for _ in range(max_iter):
+        state = region(T, P)
+        slope = state['cp'] if prop == 'h' else state['cp'] / T
+        dT = (state[prop] - target) / slope
+        T = np.clip(T - dT, *T_bounds)
+        if np.all(np.abs(dT) < tol * T):
+            break
+    return T
+
+
+def _phase_codes(P, T, x, region):
+    """Vectorized equivalent of the IAPWS97 phase naming"""
+    phase = np.full(P.shape, PHASE_INVALID, dtype=int)
+    phase[x == 0] = PHASE_LIQUID
+    phase[x == 1] = PHASE_VAPOUR
+    phase[(region == 4) & (x > 0) & (x < 1)] = PHASE_TWO_PHASE
+    phase[P > Pc] = PHASE_COMPRESSIBLE_LIQUID
+    phase[T > Tc] = PHASE_GAS
+    phase[(P > Pc) & (T > Tc)] = PHASE_SUPERCRITICAL
+    phase[region == 0] = PHASE_INVALID
+    return phase
+
+
+def _classify_PT(P, T):
+    """Region of each (P, T) point; 0 marks points outside IF97"""
+    region = np.zeros(P.shape, dtype=int)
+    valid = (P >= P_MIN) & (P <= P_MAX) & (T >= T_MIN)
+    reg5 = valid & (T > T_25) & (T <= T_MAX) & (P <= P_MAX_REGION5)
+    low = valid & (P <= P_SAT_623) & (T <= T_25)
+    T_sat = np.full(P.shape, np.inf)
+    T_sat[low] = saturation_temperature(P[low])
+    high = valid & (P > P_SAT_623) & (T <= T_25)
+    T_b23 = np.full(P.shape, np.inf)
+    T_b23[high] = _t_b23(P[high])
+    region[low & (T <= T_sat)] = 1
+    region[low & (T > T_sat)] = 2
+    region[high & (T <= T_13)] = 1
+    region[high & (T > T_13) & (T < T_b23)] = 3
+    region[high & (T >= T_b23)] = 2
+    region[reg5] = 5
+    return region
+
+
+def _classify_P_hs(P, y, prop):
+    """
+    Region of each (P, h) or (P, s) point. Points inside the region 3/4
+    lens above 623.15 K are marked 3 and evaluated point by point.
+    """
+    region = np.zeros(P.shape, dtype=int)
+    valid = (P >= P_MIN) & (P <= P_MAX)
+    if not np.any(valid):
+        return region
+    Pv = P[valid]
+    yv = y[valid]
+    reg = np.zeros(Pv.shape, dtype=int)
+    y_min = region1(np.full(Pv.shape, T_MIN), Pv)[prop]
+    y_25 = region2(np.full(Pv.shape, T_25), Pv)[prop]
+    y_max = np.full(Pv.shape, -np.inf)
+    r5 = Pv <= P_MAX_REGION5
+    y_max[r5] = region5(np.full(np.count_nonzero(r5), T_MAX), Pv[r5])[prop]
+
+    low = Pv <= P_SAT_623
+    T_sat = saturation_temperature(Pv[low])
+    y_liq = region1(T_sat, Pv[low])[prop]
+    y_vap = region2(T_sat, Pv[low])[prop]
+    Pl, yl = Pv[low], yv[low]
+    reg_low = np.zeros(Pl.shape, dtype=int)
+    reg_low[(yl >= y_min[low]) & (yl <= y_liq)] = 1
+    reg_low[(yl > y_liq) & (yl < y_vap)] = 4
+    reg_low[(yl >= y_vap) & (yl <= y_25[low])] = 2
+    reg_low[(yl > y_25[low]) & (yl <= y_max[low])] = 5
+    reg[low] = reg_low
+
+    high = ~low
+    Ph, yh = Pv[high], yv[high]
+    y_13 = region1(np.full(Ph.shape, T_13), Ph)[prop]
+    y_32 = region2(_t_b23(Ph), Ph)[prop]
+    reg_high = np.zeros(Ph.shape, dtype=int)
+    reg_high[(yh >= y_min[high]) & (yh <= y_13)] = 1
+    reg_high[(yh > y_13) & (yh < y_32)] = 3
+    reg_high[(yh >= y_32) & (yh <= y_25[high])] = 2
+    reg_high[(yh > y_25[high]) & (yh <= y_max[high])] = 5
+    reg[high] = reg_high
+
+    region[valid] = reg
+    return region
+
+
+def _iapws97_point(**kwargs):
+    """Exact single-point evaluation used where no vectorized path exists"""
+    try:
+        state = IAPWS97(**kwargs)
+        return (state.T, state.v, state.h, state.s, state.u,
+                getattr(state, 'x', np.nan), _PHASE_CODES.get(state.phase, PHASE_INVALID),
+                state.region)
+    except Exception:
+        return (np.nan,) * 6 + (PHASE_INVALID, 0)
+
+
+def steam_properties_batch(P, T=None, x=None, h=None, s=None):
+    """
+    Evaluate IAPWS-IF97 steam properties for whole arrays of states
+
+    Regions 1, 2, 4 (below 623.15 K) and 5 are evaluated with vectorized
+    region equations; backward (P,h) and (P,s) problems start from the IF97
+    backward equations and are polished with a vectorized Newton step on T.
+    Points in region 3 or on the near-critical saturation line fall back to
+    a per-point IAPWS97 call. Points outside the formulation come back as
+    NaN with phase code PHASE_INVALID instead of raising.
+
+    Parameters:
+    P: Pressure (MPa), scalar or array
+    T: Temperature (K), scalar or array
+    x: Quality (0-1), scalar or array
+    h: Enthalpy (kJ/kg), scalar or array
+    s: Entropy (kJ/kg·K), scalar or array
+
+    Returns:
+    dict: Arrays (broadcast shape of the inputs) for P, T, v, h, s, u, x,
+          phase (integer codes, see PHASE_NAMES) and region
+    """
+    if P is None:
+        raise ValueError("Insufficient parameters provided")
+    for name, value in (('T', T), ('x', x), ('h', h), ('s', s)):
+        if value is not None:
+            mode, second = name, value
+            break
+    else:
+        raise ValueError("Insufficient parameters provided")
+
+    P_b, y_b = np.broadcast_arrays(np.asarray(P, dtype=float),
+                                   np.asarray(second, dtype=float))
+    shape = P_b.shape
+    P_arr = P_b.ravel().copy()
+    y = y_b.ravel().copy()
+    n = P_arr.size
+
+    out = {key: np.full(n, np.nan) for key in ('T', 'v', 'h', 's', 'u', 'x')}
+    region = np.zeros(n, dtype=int)
+    fallback = np.zeros(n, dtype=bool)
+
+    if mode == 'T':
+        region = _classify_PT(P_arr, y)
+        out['T'][:] = y
+        fallback = region == 3
+        for reg, func, quality in ((1, region1, 0.0), (2, region2, 1.0), (5, region5, 1.0)):
+            mask = region == reg
+            if np.any(mask):
+                state = func(y[mask], P_arr[mask])
+                for key in ('v', 'h', 's'):
+                    out[key][mask] = state[key]
+                out['x'][mask] = quality
+
+    elif mode == 'x':
+        valid = (P_arr >= P_MIN) & (P_arr <= Pc) & (y >= 0) & (y <= 1)
+        fallback = valid & (P_arr > P_SAT_623)
+        sat = valid & ~fallback
+        if np.any(sat):
+            Ps = P_arr[sat]
+            xs = y[sat]
+            T_sat = saturation_temperature(Ps)
+            liq = region1(T_sat, Ps)
+            vap = region2(T_sat, Ps)
+            out['T'][sat] = T_sat
+            out['x'][sat] = xs
+            for key in ('v', 'h', 's'):
+                out[key][sat] = liq[key] + xs * (vap[key] - liq[key])
+            region[sat] = np.where(xs == 0, 1, np.where(xs == 1, 2, 4))
+
+    else:
+        region = _classify_P_hs(P_arr, y, mode)
+        fallback = region == 3
+        for reg, func, backward, bounds, quality in (
+                (1, region1, _backward1_T, (T_MIN, T_13), 0.0),
+                (2, region2, _backward2_T, (T_MIN, T_25), 1.0),
+                (5, region5, None, (T_25, T_MAX), 1.0)):
+            mask = region == reg
+            if not np.any(mask):
+                continue
+            Pm, ym = P_arr[mask], y[mask]
+            if backward is not None:
+                T0 = backward(Pm, **{mode: ym})
+            else:
+                T0 = np.full(Pm.shape, 1500.0)
+            Tm = _newton_T(func, Pm, ym, T0, mode, bounds)
+            state = func(Tm, Pm)
+            out['T'][mask] = Tm
+            for key in ('v', 'h', 's'):
+                out[key][mask] = state[key]
+            out['x'][mask] = quality
+
+        two_phase = region == 4
+        if np.any(two_phase):
+            Pm, ym = P_arr[two_phase], y[two_phase]
+            T_sat = saturation_temperature(Pm)
+            liq = region1(T_sat, Pm)
+            vap = region2(T_sat, Pm)
+            xm = (ym - liq[mode]) / (vap[mode] - liq[mode])
+            out['T'][two_phase] = T_sat
+            out['x'][two_phase] = xm
+            for key in ('v', 'h', 's'):
+                out[key][two_phase] = liq[key] + xm * (vap[key] - liq[key])
+
+    out['u'] = out['h'] - P_arr * 1000 * out['v']
+    phase = _phase_codes(P_arr, out['T'], out['x'], region)
+
+    for i in np.flatnonzero(fallback):
+        values = _iapws97_point(**{'P': P_arr[i], mode: y[i]})
+        for key, value in zip(('T', 'v', 'h', 's', 'u', 'x'), values[:6]):
+            out[key][i] = value
+        phase[i], region[i] = values[6], values[7]
+
+    out['P'] = np.where(region > 0, P_arr, np.nan)
+    out['phase'] = phase
+    out['region'] = region
+    return {key: out[key].reshape(shape) for key in PROPERTY_KEYS}
+
+
+def phase_names(phase):
+    """
+    Convert an array of phase codes into IAPWS97 phase names
+
+    Parameters:
+    phase: Array of phase codes from steam_properties_batch
+
+    Returns:
+    ndarray: Object array of phase names (None for invalid points)
+    """
+    phase = np.asarray(phase)
+    names = np.empty(phase.shape, dtype=object)
+    for code, name in PHASE_NAMES.items():
+        names[phase == code] = name
+    return names
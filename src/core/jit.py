@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Optional JIT-Compiled Kernels
+Numba versions of the Wilson/NRTL activity coefficients and the
+Rachford-Rice iteration for many small independent problems, with a
+runtime switch between the compiled and the pure-NumPy backend
+@author: Bryan Piguave Llano
+"""
+
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba is optional; the NumPy backend is always available
+    numba = None
+
+BACKENDS = ('numpy', 'numba')
+# Default backend, overridable with the PYTHONCHEME_BACKEND environment variable
+_backend = os.environ.get('PYTHONCHEME_BACKEND', 'numba')
+if _backend not in BACKENDS or numba is None:
+    _backend = 'numpy'
+_compiled = {}
+
+
+def available_backends():
+    """Backends usable in this environment"""
+    return BACKENDS if numba is not None else ('numpy',)
+
+
+def get_backend():
+    """Name of the active backend ('numpy' or 'numba')"""
+    return _backend
+
+
+def set_backend(name):
+    """
+    Select the backend of the activity-coefficient and Rachford-Rice kernels
+
+    Parameters:
+    name: 'numpy' (reference path) or 'numba' (compiled kernels)
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'; use one of {BACKENDS}")
+    if name == 'numba' and numba is None:
+        raise ImportError("The 'numba' backend needs Numba installed")
+    _backend = name
+
+
+@contextmanager
+def use_backend(name):
+    """Temporarily switch backend, e.g. to compare against the reference path"""
+    previous = get_backend()
+    set_backend(name)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+def enabled():
+    """True when the compiled kernels are in use"""
+    return _backend == 'numba' and numba is not None
+
+
+def kernel(name):
+    """
+    Compiled kernel by name, built on first use
+
+    Kernels are compiled with cache=True, so the machine code of every
+    signature is stored next to this module and later processes skip the
+    compilation.
+    """
+    if name not in _compiled:
+        _compiled[name] = numba.njit(cache=True, nogil=True)(_KERNELS[name])
+    return _compiled[name]
+
+
+def _wilson_ln_gamma(x, Lambda):
+    """Wilson ln γ of compositions x (m, n) with parameters Λ (n, n)"""
+    m, n = x.shape
+    out = np.empty((m, n))
+    S = np.empty(n)
+    for p in range(m):
+        for i in range(n):
+            s = 0.0
+            for j in range(n):
+                s += Lambda[i, j] * x[p, j]
+            S[i] = s
+        for i in range(n):
+            t = 0.0
+            for k in range(n):
+                t += x[p, k] * Lambda[k, i] / S[k]
+            out[p, i] = 1.0 - np.log(S[i]) - t
+    return out
+
+
+def _nrtl_ln_gamma(x, tau, G):
+    """NRTL ln γ of compositions x (m, n) with τ and G = exp(-α τ) (n, n)"""
+    m, n = x.shape
+    out = np.empty((m, n))
+    S = np.empty(n)
+    E = np.empty(n)
+    for p in range(m):
+        for j in range(n):
+            s = 0.0
+            c = 0.0
+            for k in range(n):
+                s += x[p, k] * G[k, j]
+                c += x[p, k] * tau[k, j] * G[k, j]
+            S[j] = s
+            E[j] = c / s
+        for i in range(n):
+            t = E[i]
+            for j in range(n):
+                t += x[p, j] * G[i, j] * (tau[i, j] - E[j]) / S[j]
+            out[p, i] = t
+    return out
+
+
+def _rachford_rice(z, K, V0, tol, max_iter):
+    """
+    Rachford-Rice vapour fractions of m flashes (z, K of shape (m, n));
+    NaN entries of V0 start from the middle of the bracket
+    """
+    m, n = z.shape
+    V = np.empty(m)
+    for p in range(m):
+        f_0 = 0.0
+        f_1 = 0.0
+        lo = 0.0
+        hi = 1.0
+        for i in range(n):
+            c = K[p, i] - 1.0
+            f_0 += z[p, i] * c
+            f_1 += z[p, i] * c / K[p, i]
+            # Leibovici-Neoschil bracket
+            if K[p, i] > 1.0:
+                lo = max(lo, (K[p, i] * z[p, i] - 1.0) / c)
+            elif K[p, i] < 1.0:
+                hi = min(hi, (1.0 - z[p, i]) / (1.0 - K[p, i]))
+        if f_0 <= 0.0:
+            V[p] = 0.0
+            continue
+        if f_1 >= 0.0:
+            V[p] = 1.0
+            continue
+        lo = min(max(lo, 0.0), 1.0)
+        hi = min(max(hi, lo), 1.0)
+        v = 0.5 * (lo + hi) if np.isnan(V0[p]) else min(max(V0[p], lo), hi)
+        for _ in range(max_iter):
+            f = 0.0
+            df = 0.0
+            d2f = 0.0
+            for i in range(n):
+                c = K[p, i] - 1.0
+                d = 1.0 / (1.0 + v * c)
+                t = z[p, i] * c * d
+                f += t
+                df -= t * c * d
+                d2f += 2.0 * t * (c * d) ** 2
+            if f == 0.0:
+                break
+            if f > 0.0:
+                lo = v
+            else:
+                hi = v
+            step = 2.0 * f * df / (2.0 * df ** 2 - f * d2f)
+            if abs(step) < tol:
+                v -= step
+                break
+            v_new = v - step
+            if not (lo < v_new < hi):
+                v_new = 0.5 * (lo + hi)
+            v = v_new
+        V[p] = v
+    return V
+
+
+_KERNELS = {
+    'wilson_ln_gamma': _wilson_ln_gamma,
+    'nrtl_ln_gamma': _nrtl_ln_gamma,
+    'rachford_rice': _rachford_rice,
+}
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Liquid-Liquid Equilibrium
+Michelsen tangent-plane stability test of liquid mixtures with all trial
+phases iterated in one vectorized batch, two-liquid flash (successive
+substitution followed by Newton's method), and binodal curves and tie lines
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+from .activity_models import ActivityModel
+from .flash import rachford_rice, _anderson_rows_step
+
+# Trial compositions start from pure component i with this much of the others
+TRIAL_IMPURITY = 1e-3
+# Tangent plane distances below -STABILITY_TOLERANCE mean the liquid splits
+STABILITY_TOLERANCE = 1e-8
+# Trials closer than this to the feed have collapsed onto the trivial solution
+TRIVIAL_DISTANCE = 1e-5
+# Successive substitution steps of the two-liquid flash before Newton's method
+SUBSTITUTION_STEPS = 10
+
+
+def _ln_gamma(gamma, x, T):
+    """ln γ of compositions x (..., n), with T broadcast over the points"""
+    if T is not None:
+        T = np.broadcast_to(np.asarray(T, dtype=float), x.shape[:-1])
+    return gamma.ln_gamma(x, T)
+
+
+def _newton_step(gamma, z, beta, x_a, x_b, T, ln_K_ss):
+    """
+    Newton step on the Gibbs energy of two liquids in the mole numbers v of
+    liquid II (per mole of feed)
+
+    The gradient is ln(x^II γ^II) - ln(x^I γ^I) and the Hessian
+    M(x^II)/β + M(x^I)/(1 - β), with M_ij = δ_ij/x_i - 1 + ∂ ln γ_i/∂n_j.
+    The step is shortened to keep both phases' mole numbers positive.
+    Where the Hessian is not positive definite (far from the solution) its
+    diagonal is shifted until it is (modified Newton). The successive
+    substitution value ln_K_ss is kept where the step gives no finite ln K.
+
+    Returns:
+    ndarray: ln K = ln(x^II/x^I) after the step
+    """
+    n = z.shape[-1]
+    d_a = gamma.derivatives(x_a, T)
+    d_b = gamma.derivatives(x_b, T)
+    grad = np.log(x_b) + d_b['ln_gamma'] - np.log(x_a) - d_a['ln_gamma']
+    eye = np.eye(n)
+    M_a = eye / x_a[:, :, None] - 1 + d_a['dln_gamma_dx']
+    M_b = eye / x_b[:, :, None] - 1 + d_b['dln_gamma_dx']
+    H = M_b / beta[:, None, None] + M_a / (1 - beta)[:, None, None]
+    H[~np.all(np.isfinite(H), axis=(-2, -1))] = eye
+    eigenvalues = np.linalg.eigvalsh(H)
+    convex = eigenvalues[:, 0] > 1e-12 * eigenvalues[:, -1]
+    # Shift indefinite Hessians to positive definite (modified Newton)
+    shift = np.where(convex, 0.0, 1e-3 * np.abs(eigenvalues[:, -1]) - eigenvalues[:, 0])
+    H = H + shift[:, None, None] * eye
+    v = beta[:, None] * x_b
+    dv = -np.linalg.solve(H, grad[..., None])[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        room = np.where(dv < 0, v / -dv, np.where(dv > 0, (z - v) / dv, np.inf))
+    scale = np.minimum(1.0, 0.9 * np.min(room, axis=-1))[:, None]
+    v = v + scale * dv
+    l = z - v
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ln_K = np.log(v / v.sum(axis=-1, keepdims=True)) - np.log(l / l.sum(axis=-1, keepdims=True))
+    usable = np.all(np.isfinite(ln_K), axis=-1)
+    return np.where(usable[:, None], ln_K, ln_K_ss)
+
+
+def _check_model(gamma):
+    if not isinstance(gamma, ActivityModel):
+        raise ValueError("gamma must be an ActivityModel (see src.core.activity_models)")
+
+
+def stability_test(gamma, z, T=None, trials=None, tol=1e-10, max_iter=100):
+    """
+    Tangent plane stability test of liquid feeds (Michelsen)
+
+    For each feed z the modified tangent plane distance
+    tm(W) = 1 + Σ W_i (ln W_i + ln γ_i(w) - ln z_i - ln γ_i(z) - 1),
+    w = W/ΣW, is minimized by successive substitution
+    ln W_i = ln z_i + ln γ_i(z) - ln γ_i(w) from every trial phase. All
+    feeds and trials are iterated together; a feed stops as soon as one of
+    its trials reaches tm < 0, and trials that collapse onto the feed are
+    dropped.
+
+    Parameters:
+    gamma: ActivityModel of the liquid
+    z: Feed mole fractions, shape (n,) or (m, n)
+    T: Temperature (K), scalar or shape (m,), for temperature-dependent models
+    trials: Trial compositions, shape (t, n) or (m, t, n) (default: the n
+            near-pure components)
+    tol: Tolerance on ln W of the stationary points
+    max_iter: Maximum number of substitution steps
+
+    Returns:
+    dict: stable mask, tpd (lowest tm found, negative when unstable), w
+          (trial composition of the lowest tm, the incipient second liquid)
+          and iterations; scalars for a single feed
+    """
+    _check_model(gamma)
+    z = np.asarray(z, dtype=float)
+    single = z.ndim == 1
+    z = np.atleast_2d(z)
+    m, n = z.shape
+    if trials is None:
+        trials = (1 - n * TRIAL_IMPURITY) * np.eye(n) + TRIAL_IMPURITY
+    w = np.array(np.broadcast_to(trials, (m,) + np.shape(trials)[-2:]), dtype=float)
+    T_feed = None if T is None else np.broadcast_to(np.asarray(T, dtype=float), (m,))
+
+    with np.errstate(divide='ignore'):
+        d = np.log(z) + _ln_gamma(gamma, z, T_feed)       # ln z_i + ln γ_i(z)
+    t = w.shape[1]
+    feed = np.repeat(np.arange(m), t)
+    d = np.repeat(d, t, axis=0)
+    T_flat = None if T is None else np.repeat(T_feed, t)
+    ln_W = np.log(w.reshape(-1, n))
+    tm = np.full(m * t, np.inf)
+    # Only unfinished trials are evaluated; the fixed point of each is
+    # accelerated by Anderson mixing over the active set
+    active = np.arange(m * t)
+    history = []
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        u = ln_W[active]
+        x = np.exp(u - np.max(u, axis=-1, keepdims=True))
+        x /= np.sum(x, axis=-1, keepdims=True)
+        ln_gamma_w = _ln_gamma(gamma, x, None if T is None else T_flat[active])
+        tm[active] = 1 + np.sum(np.exp(u) * (u + ln_gamma_w - d[active] - 1), axis=-1)
+        g = d[active] - ln_gamma_w
+        step = np.max(np.abs(g - u), axis=-1)
+        ln_W[active] = np.clip(_anderson_rows_step(history, active, u, g), -700, 50)
+        trivial = np.max(np.abs(x - z[feed[active]]), axis=-1) < TRIVIAL_DISTANCE
+        unstable = np.zeros(m, dtype=bool)
+        np.logical_or.at(unstable, feed[active], tm[active] < -STABILITY_TOLERANCE)
+        active = active[~trivial & (step > tol) & ~unstable[feed[active]]]
+        if active.size == 0:
+            break
+    w = np.exp(ln_W - np.max(ln_W, axis=-1, keepdims=True))
+    w = (w / np.sum(w, axis=-1, keepdims=True)).reshape(m, t, n)
+    tm = tm.reshape(m, t)
+
+    # Stationary points: tm = 1 - Σ W; trivial trials do not count
+    trivial = np.max(np.abs(w - z[:, None, :]), axis=-1) < TRIVIAL_DISTANCE
+    tm = np.where(trivial, 0.0, tm)
+    best = np.argmin(tm, axis=-1)
+    tpd = tm[np.arange(m), best]
+    result = {
+        'stable': tpd >= -STABILITY_TOLERANCE,
+        'tpd': tpd,
+        'w': w[np.arange(m), best],
+        'iterations': iterations,
+    }
+    if single:
+        result.update({key: result[key][0] for key in ('stable', 'tpd', 'w')})
+    return result
+
+
+def liquid_liquid_flash(gamma, z, T=None, K0=None, tol=1e-10, max_iter=500):
+    """
+    Two-liquid flash of many feeds at once
+
+    K_i = γ_i(x^I)/γ_i(x^II) is updated by successive substitution, with
+    one vectorized Rachford-Rice solve per step. Feeds still unconverged
+    after SUBSTITUTION_STEPS switch to Newton's method on the Gibbs energy,
+    using the analytic composition derivatives of the activity model, which
+    keeps convergence fast near plait points.
+    Without K0, every feed is first checked with stability_test: stable
+    feeds come back as one liquid and unstable ones start from the
+    composition of their incipient phase.
+
+    Parameters:
+    gamma: ActivityModel of the liquid
+    z: Feed mole fractions, shape (n,) or (m, n)
+    T: Temperature (K), scalar or shape (m,)
+    K0: Initial K-values x^II/x^I, shape (n,) or (m, n) (skips the stability test)
+    tol: Tolerance on ln K
+    max_iter: Maximum number of K-value updates
+
+    Returns:
+    dict: beta (mole fraction of liquid II), x1 (liquid I), x2 (liquid II),
+          K, two_phase and converged masks; one-liquid feeds have beta = 0,
+          x1 = z and x2 = NaN
+    """
+    _check_model(gamma)
+    z = np.asarray(z, dtype=float)
+    single = z.ndim == 1
+    z = np.atleast_2d(z)
+    m, n = z.shape
+    T_feed = None if T is None else np.broadcast_to(np.asarray(T, dtype=float), (m,))
+    if K0 is None:
+        stability = stability_test(gamma, z, T_feed)
+        split = ~stability['stable']
+        with np.errstate(divide='ignore'):
+            ln_K = np.log(stability['w']) - np.log(z)
+    else:
+        split = np.ones(m, dtype=bool)
+        ln_K = np.array(np.broadcast_to(np.log(np.asarray(K0, dtype=float)), (m, n)))
+
+    beta = np.zeros(m)
+    x1 = z.copy()
+    x2 = np.full((m, n), np.nan)
+    K = np.ones((m, n))
+    converged = ~split
+    idx = np.flatnonzero(split)
+    if idx.size:
+        zs = z[idx]
+        Ts = None if T_feed is None else T_feed[idx]
+        ln_K = np.clip(ln_K[idx], -50, 50)
+        V = np.full(idx.size, np.nan)
+        done = np.zeros(idx.size, dtype=bool)
+        active = np.arange(idx.size)
+        for iteration in range(max_iter):
+            if active.size == 0:
+                break
+            K_a = np.exp(ln_K[active])
+            V[active] = rachford_rice(zs[active], K_a, V0=V[active])
+            xa = zs[active] / (1 + V[active, None] * (K_a - 1))
+            xa /= np.sum(xa, axis=-1, keepdims=True)
+            xb = K_a * xa
+            xb /= np.sum(xb, axis=-1, keepdims=True)
+            T_a = None if Ts is None else Ts[active]
+            ln_K_new = _ln_gamma(gamma, xa, T_a) - _ln_gamma(gamma, xb, T_a)
+            # Converged when the liquids have equal activities
+            finished = np.max(np.abs(ln_K_new - ln_K[active]), axis=-1) < tol
+            newton = (V[active] > 0) & (V[active] < 1) & ~finished
+            if iteration >= SUBSTITUTION_STEPS and newton.any():
+                T_n = None if T_a is None else T_a[newton]
+                ln_K_new[newton] = _newton_step(gamma, zs[active[newton]], V[active[newton]],
+                                                xa[newton], xb[newton], T_n, ln_K_new[newton])
+            done[active] = finished
+            ln_K[active] = np.clip(ln_K_new, -50, 50)
+            active = active[~finished]
+
+        K_s = np.exp(ln_K)
+        V = rachford_rice(zs, K_s, V0=V)
+        xa = zs / (1 + V[:, None] * (K_s - 1))
+        xa /= np.sum(xa, axis=-1, keepdims=True)
+        xb = K_s * xa
+        xb /= np.sum(xb, axis=-1, keepdims=True)
+        # Collapsed to one liquid (trivial K = 1) or a single-phase feed
+        two = (V > 0) & (V < 1) & (np.max(np.abs(xa - xb), axis=-1) > TRIVIAL_DISTANCE)
+        beta[idx] = np.where(two, V, 0.0)
+        x1[idx] = np.where(two[:, None], xa, zs)
+        x2[idx] = np.where(two[:, None], xb, np.nan)
+        K[idx] = np.where(two[:, None], K_s, 1.0)
+        split[idx] = two
+        converged[idx] = done | ~two
+
+    result = {'beta': beta, 'x1': x1, 'x2': x2, 'K': K, 'two_phase': split,
+              'converged': converged}
+    if single:
+        result = {key: value[0] for key, value in result.items()}
+    return result
+
+
+def tie_lines(gamma, feeds, T=None, **options):
+    """
+    Tie lines through many feeds (e.g. a grid covering a ternary diagram)
+
+    Parameters:
+    gamma: ActivityModel of the liquid
+    feeds: Feed mole fractions, shape (m, n)
+    T: Temperature (K), scalar or shape (m,)
+    options: tol, max_iter (see liquid_liquid_flash)
+
+    Returns:
+    dict: feed, x1, x2 and beta of every feed that splits (the ends of the
+          tie lines trace the binodal curve)
+    """
+    result = liquid_liquid_flash(gamma, np.atleast_2d(feeds), T, **options)
+    split = result['two_phase'] & result['converged']
+    return {'feed': np.atleast_2d(feeds)[split], 'x1': result['x1'][split],
+            'x2': result['x2'][split], 'beta': result['beta'][split]}
+
+
+def binary_binodal(gamma, T, n_feeds=19, **options):
+    """
+    Binodal (mutual solubility) curve of a binary mixture over temperature
+
+    Feeds across the whole composition range are tested at every
+    temperature in one batch; the most unstable feed of each temperature is
+    flashed.
+
+    Parameters:
+    gamma: Binary ActivityModel
+    T: Temperatures (K), 1-D array
+    n_feeds: Number of feeds tested per temperature
+    options: tol, max_iter (see liquid_liquid_flash)
+
+    Returns:
+    dict: T, x1_I and x1_II (mole fraction of component 1 in the liquid
+          poor and rich in component 1), NaN where the liquid does not split
+    """
+    _check_model(gamma)
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    z1 = np.linspace(0, 1, n_feeds + 2)[1:-1]
+    feeds = np.stack(np.broadcast_arrays(z1, 1 - z1), axis=-1)
+    grid = np.repeat(feeds[None], T.size, axis=0).reshape(-1, 2)
+    stability = stability_test(gamma, grid, np.repeat(T, n_feeds))
+    tpd = stability['tpd'].reshape(T.size, n_feeds)
+    best = np.argmin(tpd, axis=-1)
+    flash = liquid_liquid_flash(gamma, feeds[best], T, **options)
+    x_a, x_b = flash['x1'][:, 0], flash['x2'][:, 0]
+    ok = flash['two_phase'] & flash['converged']
+    return {
+        'T': T,
+        'x1_I': np.where(ok, np.minimum(x_a, x_b), np.nan),
+        'x1_II': np.where(ok, np.maximum(x_a, x_b), np.nan),
+    }
@@ -7,10 +7,21 @@ VLE, LLE, and flash calculations for binary and multicomponent systems
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.optimize import fsolve, minimize
+from scipy.optimize import brentq
 from scipy.integrate import quad
 import pandas as pd
 
+from .flash import (modified_raoult_flash, bubble_pressure, dew_pressure,
+                    bubble_temperature, dew_temperature, bubble_dew_temperatures,
+                    _gamma_at)
+from .activity_models import ActivityModel, Wilson, NRTL, wilson_gamma, nrtl_gamma
+from .envelope import trace_curve
+from .regression import fit_binary_parameters
+from .azeotropes import find_azeotropes
+from .lle import stability_test, liquid_liquid_flash, binary_binodal
+from .cubic_eos import CubicEOS, phi_phi_flash
+from .distillation import EquilibriumCurve, mccabe_thiele, minimum_stages
+
 class PhaseEquilibrium:
     """
     Phase equilibrium calculations for chemical engineering applications
@@ -60,13 +71,9 @@ class PhaseEquilibrium:
         Returns:
         tuple: (gamma1, gamma2) activity coefficients
         """
-        x2 = 1 - x1
-        
-        # Wilson equation
-        ln_gamma1 = -np.log(x1 + A12 * x2) + x2 * (A12 / (x1 + A12 * x2) - A21 / (x2 + A21 * x1))
-        ln_gamma2 = -np.log(x2 + A21 * x1) - x1 * (A12 / (x1 + A12 * x2) - A21 / (x2 + A21 * x1))
-        
-        return np.exp(ln_gamma1), np.exp(ln_gamma2)
+        x = np.stack(np.broadcast_arrays(x1, 1 - np.asarray(x1)), axis=-1)
+        gamma = Wilson(Lambda=[[1.0, A12], [A21, 1.0]]).gamma(x)
+        return gamma[..., 0], gamma[..., 1]
     
     def nrtl_activity_coefficients(self, x1, tau12, tau21, alpha12, T):
         """
@@ -81,166 +88,396 @@ class PhaseEquilibrium:
         Returns:
         tuple: (gamma1, gamma2) activity coefficients
         """
-        x2 = 1 - x1
-        
-        # NRTL equation
-        G12 = np.exp(-alpha12 * tau12)
-        G21 = np.exp(-alpha12 * tau21)
-        
-        ln_gamma1 = x2**2 * (tau21 * G21**2 / (x1 + x2 * G21)**2 + tau12 * G12 / (x2 + x1 * G12)**2)
-        ln_gamma2 = x1**2 * (tau12 * G12**2 / (x2 + x1 * G12)**2 + tau21 * G21 / (x1 + x2 * G21)**2)
-        
-        return np.exp(ln_gamma1), np.exp(ln_gamma2)
+        x = np.stack(np.broadcast_arrays(x1, 1 - np.asarray(x1)), axis=-1)
+        gamma = NRTL(tau=[[0.0, tau12], [tau21, 0.0]], alpha=alpha12).gamma(x)
+        return gamma[..., 0], gamma[..., 1]
+    
+    def _check_binary_parameters(self, gamma_model, A12, A21, tau12, tau21, alpha12):
+        """Raise a ValueError naming the Wilson/NRTL parameters that were not given"""
+        if isinstance(gamma_model, ActivityModel):
+            return
+        if gamma_model == 'wilson':
+            given = {'A12': A12, 'A21': A21}
+        elif gamma_model == 'nrtl':
+            given = {'tau12': tau12, 'tau21': tau21, 'alpha12': alpha12}
+        else:
+            return
+        missing = [name for name, value in given.items() if value is None]
+        if missing:
+            names = ', '.join(f"'{name}'" for name in missing)
+            raise ValueError(f"Missing parameter{'s' if len(missing) > 1 else ''} {names} "
+                             f"for the {gamma_model} model")
+    
+    def _binary_activity_model(self, gamma_model, A12, A21, tau12, tau21, alpha12):
+        """Binary ActivityModel from the Wilson/NRTL keyword parameters (None if ideal)"""
+        self._check_binary_parameters(gamma_model, A12, A21, tau12, tau21, alpha12)
+        if isinstance(gamma_model, ActivityModel):
+            return gamma_model
+        if gamma_model == 'wilson':
+            return Wilson(Lambda=[[1.0, A12], [A21, 1.0]])
+        if gamma_model == 'nrtl':
+            return NRTL(tau=[[0.0, tau12], [tau21, 0.0]], alpha=alpha12)
+        return None
+    
+    def _binary_gamma_function(self, gamma_model, A12, A21, tau12, tau21, alpha12, T):
+        """
+        Activity coefficient callable gamma(x), x of shape (..., 2), of a
+        binary model; an ActivityModel without T is returned as is (evaluate
+        it with flash._gamma_at at the solved temperature)
+        """
+        self._check_binary_parameters(gamma_model, A12, A21, tau12, tau21, alpha12)
+        if isinstance(gamma_model, ActivityModel):
+            return self._gamma_function(gamma_model, T=T)
+        if gamma_model == 'wilson':
+            def gamma(x):
+                return np.stack(self.wilson_activity_coefficients(x[..., 0], A12, A21, T), axis=-1)
+        elif gamma_model == 'nrtl':
+            def gamma(x):
+                return np.stack(self.nrtl_activity_coefficients(x[..., 0], tau12, tau21,
+                                                                alpha12, T), axis=-1)
+        else:
+            gamma = None  # Ideal solution
+        return gamma
     
     def flash_calculation(self, z1, P, T, P_sat_1, P_sat_2, gamma_model='wilson', 
-                         A12=None, A21=None, tau12=None, tau21=None, alpha12=None):
+                         A12=None, A21=None, tau12=None, tau21=None, alpha12=None,
+                         check_stability=False):
         """
         Perform flash calculation for binary mixture
         
+        Every numeric argument may be an array; all flashes are solved
+        together (Rachford-Rice by safeguarded Halley steps, K-values by
+        accelerated successive substitution, see src.core.flash).
+        
         Parameters:
         z1: Feed mole fraction of component 1
         P: System pressure (Pa)
         T: Temperature (K)
         P_sat_1, P_sat_2: Saturation pressures (Pa)
-        gamma_model: Activity coefficient model ('wilson' or 'nrtl')
+        gamma_model: Activity coefficient model ('wilson' or 'nrtl'; any
+                     other value is treated as an ideal solution)
         A12, A21: Wilson parameters
         tau12, tau21, alpha12: NRTL parameters
+        check_stability: Also run the tangent plane test on the liquid; the
+                         result gets liquid_stable (False where the liquid
+                         would split into two liquids, see src.core.lle)
         
         Returns:
         dict: Flash calculation results
         """
-        def objective_function(V):
-            """Objective function for flash calculation"""
-            V = V[0]  # Vapor fraction
-            if V < 0 or V > 1:
-                return 1e6
-            
-            # Initial guess for x1
-            x1 = z1
-            
-            # Iterative solution for x1 and y1
-            for _ in range(10):
-                x2 = 1 - x1
-                
-                # Calculate activity coefficients
-                if gamma_model == 'wilson':
-                    gamma1, gamma2 = self.wilson_activity_coefficients(x1, A12, A21, T)
-                elif gamma_model == 'nrtl':
-                    gamma1, gamma2 = self.nrtl_activity_coefficients(x1, tau12, tau21, alpha12, T)
-                else:
-                    gamma1, gamma2 = 1.0, 1.0  # Ideal solution
-                
-                # Calculate K-values
-                K1 = gamma1 * P_sat_1 / P
-                K2 = gamma2 * P_sat_2 / P
-                
-                # Rachford-Rice equation
-                f = z1 * (K1 - 1) / (1 + V * (K1 - 1)) + (1 - z1) * (K2 - 1) / (1 + V * (K2 - 1))
-                
-                # Update x1
-                x1_new = z1 / (1 + V * (K1 - 1))
-                
-                if abs(x1_new - x1) < 1e-6:
-                    break
-                x1 = x1_new
-            
-            return abs(f)
+        gamma = self._binary_gamma_function(gamma_model, A12, A21, tau12, tau21, alpha12, T)
+        scalar = all(np.ndim(value) == 0 for value in (z1, P, T, P_sat_1, P_sat_2))
+        z1 = np.asarray(z1, dtype=float)
+        z = np.stack([z1, 1 - z1], axis=-1)
+        P_sat = np.stack(np.broadcast_arrays(np.asarray(P_sat_1, dtype=float),
+                                             np.asarray(P_sat_2, dtype=float)), axis=-1)
+        flash = modified_raoult_flash(z, P, P_sat, gamma)
+        
+        result = {
+            'V': flash['V'],  # Vapor fraction
+            'x1': flash['x'][..., 0], 'x2': flash['x'][..., 1],  # Liquid compositions
+            'y1': flash['y'][..., 0], 'y2': flash['y'][..., 1],  # Vapor compositions
+            'K1': flash['K'][..., 0], 'K2': flash['K'][..., 1],  # K-values
+            'P': P, 'T': T
+        }
+        if scalar:
+            result.update({key: float(value) for key, value in result.items()})
+        if check_stability:
+            model = self._binary_activity_model(gamma_model, A12, A21, tau12, tau21, alpha12)
+            x = np.asarray(flash['x'], dtype=float)
+            stable = np.ones(x.shape[:-1], dtype=bool)
+            if model is not None:
+                stable = stability_test(model, x.reshape(-1, 2))['stable'].reshape(x.shape[:-1])
+            result['liquid_stable'] = bool(stable) if scalar else stable
+        return result
+    
+    def _gamma_function(self, gamma_model, Lambda=None, tau=None, alpha=None, T=None):
+        """
+        Activity coefficient callable gamma(x) of an N-component model; an
+        ActivityModel without T is returned as is, for the temperature solvers
+        """
+        if isinstance(gamma_model, ActivityModel):
+            if T is None:
+                return gamma_model
+            return lambda x: gamma_model.gamma(x, T)
+        if gamma_model == 'wilson':
+            return lambda x: wilson_gamma(x, Lambda)
+        if gamma_model == 'nrtl':
+            return lambda x: nrtl_gamma(x, tau, alpha)
+        if gamma_model == 'ideal':
+            return None
+        raise ValueError(f"Unknown activity model '{gamma_model}'")
+    
+    def multicomponent_flash(self, z, P, T, P_sat, gamma_model='ideal', Lambda=None, tau=None,
+                             alpha=None, acceleration='anderson', tol=1e-10, max_iter=200):
+        """
+        Isothermal flash of an N-component mixture (modified Raoult's law)
         
-        # Solve for vapor fraction
-        V_guess = 0.5
-        result = minimize(objective_function, [V_guess], method='L-BFGS-B', 
-                        bounds=[(0, 1)])
+        Parameters:
+        z: Feed mole fractions, shape (n,) or (..., n) for many feeds
+        P: System pressure (Pa), scalar or array
+        T: Temperature (K)
+        P_sat: Saturation pressures at T (Pa), shape (n,) or (..., n)
+        gamma_model: 'ideal', 'wilson', 'nrtl' or an ActivityModel instance
+                     (see src.core.activity_models)
+        Lambda: Wilson parameter matrix (n x n)
+        tau, alpha: NRTL parameter matrices (n x n; alpha may be scalar)
+        acceleration: K-value acceleration ('anderson', 'dem' or None)
+        tol: Tolerance on ln K
+        max_iter: Maximum number of K-value updates
         
-        V = result.x[0]
+        Returns:
+        dict: V (vapour fraction), x, y, K, iterations and converged mask
+        """
+        gamma = self._gamma_function(gamma_model, Lambda, tau, alpha, T)
+        result = modified_raoult_flash(z, P, P_sat, gamma, tol=tol, max_iter=max_iter,
+                                       acceleration=acceleration)
+        result.update(P=P, T=T)
+        return result
+    
+    def eos_flash(self, z, P, T, Tc=None, Pc=None, omega=None, kij=None, eos='pr',
+                  acceleration='dem', tol=1e-10, max_iter=200):
+        """
+        Isothermal flash with a cubic equation of state for both phases (phi-phi)
         
-        # Calculate final compositions
-        x1 = z1 / (1 + V * (K1 - 1))
-        x2 = 1 - x1
-        y1 = K1 * x1
-        y2 = 1 - y1
+        Parameters:
+        z: Feed mole fractions, shape (n,) or (..., n) for many feeds
+        P: System pressure (Pa), scalar or array
+        T: Temperature (K), scalar or array
+        Tc, Pc, omega: Critical temperatures (K), pressures (Pa) and acentric
+                       factors, shape (n,)
+        kij: Binary interaction parameters (n x n, default zero)
+        eos: 'pr', 'srk' or a CubicEOS instance (see src.core.cubic_eos)
+        acceleration: K-value acceleration ('dem', 'anderson' or None)
+        tol: Tolerance on ln K
+        max_iter: Maximum number of K-value updates
         
-        return {
-            'V': V,  # Vapor fraction
-            'x1': x1, 'x2': x2,  # Liquid compositions
-            'y1': y1, 'y2': y2,  # Vapor compositions
-            'K1': K1, 'K2': K2,  # K-values
-            'P': P, 'T': T
-        }
+        Returns:
+        dict: V (vapour fraction), x, y, K, Z_liquid, Z_vapour, iterations
+              and converged mask
+        """
+        if not isinstance(eos, CubicEOS):
+            eos = CubicEOS(Tc, Pc, omega, kij, family=eos)
+        result = phi_phi_flash(eos, z, P, T, tol=tol, max_iter=max_iter,
+                               acceleration=acceleration)
+        result.update(P=P, T=T)
+        return result
+    
+    def bubble_point_pressure(self, x, T, P_sat, gamma_model='ideal', Lambda=None, tau=None,
+                              alpha=None):
+        """
+        Bubble point pressure of an N-component liquid
+        
+        Parameters:
+        x: Liquid mole fractions, shape (n,) or (..., n)
+        T: Temperature (K)
+        P_sat: Saturation pressures at T (Pa), shape (n,) or (..., n)
+        gamma_model, Lambda, tau, alpha: Activity model (see multicomponent_flash)
+        
+        Returns:
+        dict: P (Pa), incipient vapour composition y and T
+        """
+        result = bubble_pressure(x, P_sat, self._gamma_function(gamma_model, Lambda, tau, alpha, T))
+        result['T'] = T
+        return result
+    
+    def dew_point_pressure(self, y, T, P_sat, gamma_model='ideal', Lambda=None, tau=None,
+                           alpha=None):
+        """
+        Dew point pressure of an N-component vapour
+        
+        Parameters:
+        y: Vapour mole fractions, shape (n,) or (..., n)
+        T: Temperature (K)
+        P_sat: Saturation pressures at T (Pa), shape (n,) or (..., n)
+        gamma_model, Lambda, tau, alpha: Activity model (see multicomponent_flash)
+        
+        Returns:
+        dict: P (Pa), incipient liquid composition x and T
+        """
+        result = dew_pressure(y, P_sat, self._gamma_function(gamma_model, Lambda, tau, alpha, T))
+        result['T'] = T
+        return result
+    
+    def bubble_point_temperature(self, x, P, P_sat_func, gamma_model='ideal', Lambda=None,
+                                 tau=None, alpha=None, T_guess=350.0):
+        """
+        Bubble point temperature of an N-component liquid
+        
+        Parameters:
+        x: Liquid mole fractions, shape (n,) or (..., n)
+        P: System pressure (Pa)
+        P_sat_func: Function returning the saturation pressures (Pa) of all
+                    components at temperature T, shape (..., n)
+        gamma_model, Lambda, tau, alpha: Activity model (see multicomponent_flash)
+        T_guess: Initial temperature (K)
+        
+        Returns:
+        dict: T (K), incipient vapour composition y and P
+        """
+        result = bubble_temperature(x, P, P_sat_func,
+                                    self._gamma_function(gamma_model, Lambda, tau, alpha),
+                                    T0=T_guess)
+        result['P'] = P
+        return result
+    
+    def dew_point_temperature(self, y, P, P_sat_func, gamma_model='ideal', Lambda=None,
+                              tau=None, alpha=None, T_guess=350.0):
+        """
+        Dew point temperature of an N-component vapour
+        
+        Parameters:
+        y: Vapour mole fractions, shape (n,) or (..., n)
+        P: System pressure (Pa)
+        P_sat_func: Function returning the saturation pressures (Pa) of all
+                    components at temperature T, shape (..., n)
+        gamma_model, Lambda, tau, alpha: Activity model (see multicomponent_flash)
+        T_guess: Initial temperature (K)
+        
+        Returns:
+        dict: T (K), incipient liquid composition x and P
+        """
+        result = dew_temperature(y, P, P_sat_func,
+                                 self._gamma_function(gamma_model, Lambda, tau, alpha),
+                                 T0=T_guess)
+        result['P'] = P
+        return result
+    
+    def fit_interaction_parameters(self, x1, y1, P, P_sat_1, P_sat_2, gamma_model='wilson',
+                                   **options):
+        """
+        Regress binary Wilson or NRTL parameters from VLE data
+        
+        Parameters:
+        x1, y1: Measured liquid and vapour mole fractions of component 1
+                (y1 may contain NaN where it was not measured)
+        P: Measured pressures (Pa)
+        P_sat_1, P_sat_2: Saturation pressures (Pa) at the measured temperatures
+        gamma_model: 'wilson' (A12, A21) or 'nrtl' (tau12, tau21, alpha12)
+        options: alpha12, fit_alpha, sigma_P, sigma_y, initial, n_starts,
+                 n_workers, confidence, seed (see src.core.regression)
+        
+        Returns:
+        dict: Fitted parameters (keyword names of the other methods, e.g.
+              A12/A21), confidence intervals and fit statistics
+        """
+        return fit_binary_parameters(x1, y1, P, P_sat_1, P_sat_2, model=gamma_model, **options)
     
     def generate_txy_diagram(self, P_sat_1_func, P_sat_2_func, P_total, 
                             gamma_model='wilson', A12=None, A21=None, 
-                            tau12=None, tau21=None, alpha12=None, T_range=None):
+                            tau12=None, tau21=None, alpha12=None, T_range=None,
+                            n_points=50, tol=1e-9, max_iter=100):
         """
         Generate Txy diagram for binary mixture
         
+        Bubble and dew temperatures of all compositions are solved together
+        by one vectorized Newton iteration (see src.core.flash). The grid is
+        filled coarse to fine, each new point starting from its solved
+        neighbours.
+        
         Parameters:
         P_sat_1_func, P_sat_2_func: Functions that return saturation pressure vs T
+                                    (must accept arrays of temperatures)
         P_total: Total system pressure (Pa)
-        gamma_model: Activity coefficient model
+        gamma_model: Activity coefficient model ('wilson', 'nrtl' or an ActivityModel,
+                     e.g. ComponentDatabase.activity_model)
         A12, A21: Wilson parameters
         tau12, tau21, alpha12: NRTL parameters
-        T_range: Temperature range (K) [T_min, T_max]
+        T_range: Temperature range (K) [T_min, T_max]; points outside it are NaN
+        n_points: Number of compositions between x1 = 0.01 and 0.99
+        tol: Tolerance on the temperatures (K)
+        max_iter: Maximum number of Newton steps per refinement level
         
         Returns:
-        dict: Txy diagram data
+        dict: Txy diagram data (bubble curve T_bubble vs x1_bubble with the
+              incipient vapour y1_bubble, dew curve T_dew vs y1_dew with the
+              incipient liquid x1_dew)
         """
         if T_range is None:
             T_range = [273.15, 373.15]  # Default range
         
-        T_values = np.linspace(T_range[0], T_range[1], 100)
-        x1_values = np.linspace(0.01, 0.99, 50)
-        
-        T_bubble = []
-        T_dew = []
-        x1_bubble = []
-        y1_dew = []
-        
-        for x1 in x1_values:
-            # Bubble point calculation
-            def bubble_objective(T):
-                P_sat_1 = P_sat_1_func(T)
-                P_sat_2 = P_sat_2_func(T)
-                
-                if gamma_model == 'wilson':
-                    gamma1, gamma2 = self.wilson_activity_coefficients(x1, A12, A21, T)
-                elif gamma_model == 'nrtl':
-                    gamma1, gamma2 = self.nrtl_activity_coefficients(x1, tau12, tau21, alpha12, T)
-                else:
-                    gamma1, gamma2 = 1.0, 1.0
-                
-                P_calc = x1 * gamma1 * P_sat_1 + (1 - x1) * gamma2 * P_sat_2
-                return P_calc - P_total
+        gamma = self._binary_gamma_function(gamma_model, A12, A21, tau12, tau21, alpha12, None)
+        
+        def P_sat_func(T):
+            return np.stack([P_sat_1_func(T), P_sat_2_func(T)], axis=-1)
+        
+        x1_values = np.linspace(0.01, 0.99, n_points)
+        z = np.stack([x1_values, 1 - x1_values], axis=-1)
+        T_bubble = np.full(n_points, 0.5 * (T_range[0] + T_range[1]))
+        T_dew = T_bubble.copy()
+        x_dew = z.copy()
+        y_bubble = z.copy()
+        converged = np.zeros((2, n_points), dtype=bool)
+        solved = np.zeros(n_points, dtype=bool)
+        
+        # Coarse-to-fine continuation: halve the stride until every point is solved
+        stride = 1 << max(int(np.log2(max(n_points - 1, 1) / 8)), 0)
+        while True:
+            level = np.union1d(np.arange(0, n_points, stride), [n_points - 1])
+            new = level[~solved[level]]
+            if solved.any():
+                known = np.flatnonzero(solved)
+                T_bubble[new] = np.interp(new, known, T_bubble[known])
+                T_dew[new] = np.interp(new, known, T_dew[known])
+                x1_guess = np.interp(new, known, x_dew[known, 0])
+                x_dew[new] = np.stack([x1_guess, 1 - x1_guess], axis=-1)
             
-            # Solve for bubble point temperature
-            T_bubble_sol = fsolve(bubble_objective, T_range[0] + (T_range[1] - T_range[0]) / 2)
-            
-            if 0 < T_bubble_sol[0] < T_range[1]:
-                T_bubble.append(T_bubble_sol[0])
-                x1_bubble.append(x1)
-                
-                # Calculate y1 at bubble point
-                P_sat_1 = P_sat_1_func(T_bubble_sol[0])
-                P_sat_2 = P_sat_2_func(T_bubble_sol[0])
-                
-                if gamma_model == 'wilson':
-                    gamma1, gamma2 = self.wilson_activity_coefficients(x1, A12, A21, T_bubble_sol[0])
-                elif gamma_model == 'nrtl':
-                    gamma1, gamma2 = self.nrtl_activity_coefficients(x1, tau12, tau21, alpha12, T_bubble_sol[0])
-                else:
-                    gamma1, gamma2 = 1.0, 1.0
-                
-                y1 = x1 * gamma1 * P_sat_1 / P_total
-                T_dew.append(T_bubble_sol[0])
-                y1_dew.append(y1)
+            result = bubble_dew_temperatures(z[new], z[new], P_total, P_sat_func, gamma,
+                                             T_bubble[new], T_dew[new], x_dew[new],
+                                             tol=tol, max_iter=max_iter)
+            T_bubble[new], T_dew[new] = result['T_bubble'], result['T_dew']
+            x_dew[new] = result['x_dew']
+            converged[0, new] = result['converged_bubble']
+            converged[1, new] = result['converged_dew']
+            y_bubble[new] = result['y_bubble']
+            solved[new] = True
+            if stride == 1:
+                break
+            stride //= 2
+        
+        inside = (T_range[0] <= np.stack([T_bubble, T_dew])) & \
+                 (np.stack([T_bubble, T_dew]) <= T_range[1])
+        valid = converged & inside
         
         return {
-            'T_bubble': T_bubble,
-            'T_dew': T_dew,
-            'x1_bubble': x1_bubble,
-            'y1_dew': y1_dew,
+            'T_bubble': np.where(valid[0], T_bubble, np.nan),
+            'T_dew': np.where(valid[1], T_dew, np.nan),
+            'x1_bubble': x1_values,
+            'y1_bubble': np.where(valid[0], y_bubble[:, 0], np.nan),
+            'y1_dew': x1_values,
+            'x1_dew': np.where(valid[1], x_dew[:, 0], np.nan),
             'P_total': P_total
         }
     
+    def mccabe_thiele(self, diagram_data, x_D, x_B, z_F, q=1.0, R=None, R_factor=1.3,
+                      feed_stage=None):
+        """
+        McCabe-Thiele column design on a Txy or Pxy diagram
+        
+        The diagram is turned into an equilibrium-curve interpolant once and
+        stages are stepped on it; every argument after diagram_data may be
+        an array to design many columns at once (see src.core.distillation).
+        
+        Parameters:
+        diagram_data: Output of generate_txy_diagram or generate_pxy_diagram
+        x_D, x_B: Distillate and bottoms mole fractions of component 1
+        z_F: Feed mole fraction of component 1
+        q: Feed liquid fraction (1: saturated liquid)
+        R: Reflux ratio (overrides R_factor)
+        R_factor: Reflux ratio as a multiple of the minimum
+        feed_stage: Fixed feed stage (None: optimal feed stage)
+        
+        Returns:
+        dict: stages, feed_stage, R, R_min, N_min, feasible and the x, y
+              (and T or P) stage profiles
+        """
+        curve = EquilibriumCurve.from_diagram(diagram_data)
+        result = mccabe_thiele(curve, x_D, x_B, z_F, q, R=R,
+                               R_factor=None if R is not None else R_factor,
+                               feed_stage=feed_stage)
+        result['N_min'] = minimum_stages(curve, x_D, x_B)['N_min']
+        return result
+    
     def generate_pxy_diagram(self, T, P_sat_1, P_sat_2, gamma_model='wilson',
                            A12=None, A21=None, tau12=None, tau21=None, alpha12=None):
         """
@@ -281,6 +518,300 @@ class PhaseEquilibrium:
             'T': T
         }
     
+    def _binary_envelope(self, gamma, log_p, u0, scale, isothermal=True, **options):
+        """
+        Trace a binary bubble/dew envelope in u = (x1, y1, v)
+
+        log_p(x1, v) returns the logarithms of the pure-component terms
+        (ln P_sat,i - ln P for Txy with v = T, ln P_sat,i - v for Pxy with
+        v = ln P); both bubble and dew curves come from the same points.
+        For Txy (isothermal=False) an ActivityModel gamma is evaluated at
+        the traced temperature u[2].
+        """
+        def gamma_at(x, u):
+            return _gamma_at(gamma, x, None if isothermal else u[2])
+        
+        def terms(u):
+            x = np.array([u[0], 1 - u[0]])
+            return x * gamma_at(x, u) * np.exp(log_p(u[0], u[2]))
+        
+        def residual(u):
+            p = terms(u)
+            total = np.sum(p)
+            return np.array([np.log(total), u[1] - p[0] / total])
+        
+        def stability(u, dx=1e-6):
+            # 1 + x1 d ln γ1/dx1 = d ln a1/d ln x1, zero at the liquid stability limit
+            if gamma is None:
+                return 1.0
+            x1 = min(max(u[0], dx), 1 - 2 * dx)
+            g = gamma_at(np.array([[x1, 1 - x1], [x1 + dx, 1 - x1 - dx]]), u)
+            return 1 + x1 * (np.log(g[1, 0]) - np.log(g[0, 0])) / dx
+        
+        return trace_curve(residual, u0, direction=[1.0, 1.0, 0.0], scale=scale,
+                           constraints=(lambda u: u[0], lambda u: 1 - u[0]),
+                           events={'azeotrope': lambda u: u[1] - u[0],
+                                   'liquid_instability': stability},
+                           **options)
+    
+    @staticmethod
+    def _envelope_events(trace, name, variable):
+        """Event list of one kind as dicts of x1 and the third variable"""
+        return [{'x1': float(event['u'][0]), variable: float(event['u'][2])}
+                for event in trace['events'] if event['name'] == name]
+    
+    def trace_txy_envelope(self, P_sat_1_func, P_sat_2_func, P_total, gamma_model='wilson',
+                           A12=None, A21=None, tau12=None, tau21=None, alpha12=None,
+                           T_guess=350.0, step_max=0.2, max_angle=0.1, max_points=2000):
+        """
+        Trace the Txy diagram by arc-length continuation
+        
+        Starts at the boiling point of pure component 2 and follows the
+        bubble curve to pure component 1 with predictor-corrector steps
+        whose size adapts to the curvature of both the bubble and the dew
+        curve, so sharp features near azeotropes and pinches get more
+        points than flat stretches. Azeotropes (y1 = x1) and the limits of
+        liquid stability (d ln a1/d ln x1 = 0, where the liquid would split)
+        are located along the way.
+        
+        Parameters:
+        P_sat_1_func, P_sat_2_func: Functions that return saturation pressure vs T
+        P_total: Total system pressure (Pa)
+        gamma_model: Activity coefficient model
+        A12, A21: Wilson parameters
+        tau12, tau21, alpha12: NRTL parameters
+        T_guess: Initial estimate of the boiling point of component 2 (K)
+        step_max: Largest arc-length step (mole fraction units; 1 unit = 10 K)
+        max_angle: Largest tangent turn per step (rad)
+        max_points: Maximum number of points
+        
+        Returns:
+        dict: Txy diagram data (same keys as generate_txy_diagram) plus
+              azeotropes, liquid_instability and residual_evaluations
+        """
+        gamma = self._binary_gamma_function(gamma_model, A12, A21, tau12, tau21, alpha12, None)
+        ln_P = np.log(P_total)
+        
+        def log_p(x1, T):
+            return np.log([P_sat_1_func(T), P_sat_2_func(T)]) - ln_P
+        
+        # Boiling point of pure component 2 by Newton's method
+        T = T_guess
+        for _ in range(50):
+            f = log_p(0.0, T)[1]
+            step = -f * 1e-4 / (log_p(0.0, T + 1e-4)[1] - f)
+            T += np.clip(step, -20, 20)
+            if abs(step) < 1e-10:
+                break
+        
+        trace = self._binary_envelope(gamma, log_p, [0.0, 0.0, T], scale=[1.0, 1.0, 10.0],
+                                      isothermal=False, step_max=step_max, max_angle=max_angle,
+                                      max_points=max_points)
+        points = trace['points']
+        return {
+            'T_bubble': points[:, 2],
+            'T_dew': points[:, 2],
+            'x1_bubble': points[:, 0],
+            'y1_bubble': points[:, 1],
+            'y1_dew': points[:, 1],
+            'x1_dew': points[:, 0],
+            'P_total': P_total,
+            'azeotropes': self._envelope_events(trace, 'azeotrope', 'T'),
+            'liquid_instability': self._envelope_events(trace, 'liquid_instability', 'T'),
+            'residual_evaluations': trace['residual_evaluations']
+        }
+    
+    def trace_pxy_envelope(self, T, P_sat_1, P_sat_2, gamma_model='wilson', A12=None,
+                           A21=None, tau12=None, tau21=None, alpha12=None, step_max=0.2,
+                           max_angle=0.1, max_points=2000):
+        """
+        Trace the Pxy diagram by arc-length continuation
+        
+        Follows the bubble curve from pure component 2 to pure component 1
+        with curvature-controlled steps and locates azeotropes and liquid
+        stability limits (see trace_txy_envelope).
+        
+        Parameters:
+        T: Temperature (K)
+        P_sat_1, P_sat_2: Saturation pressures at temperature T (Pa)
+        gamma_model: Activity coefficient model
+        A12, A21: Wilson parameters
+        tau12, tau21, alpha12: NRTL parameters
+        step_max: Largest arc-length step (mole fraction units; 1 unit = 0.1 in ln P)
+        max_angle: Largest tangent turn per step (rad)
+        max_points: Maximum number of points
+        
+        Returns:
+        dict: Pxy diagram data (same keys as generate_pxy_diagram) plus
+              azeotropes, liquid_instability and residual_evaluations
+        """
+        gamma = self._binary_gamma_function(gamma_model, A12, A21, tau12, tau21, alpha12, T)
+        ln_P_sat = np.log([P_sat_1, P_sat_2])
+        
+        def log_p(x1, ln_P):
+            return ln_P_sat - ln_P
+        
+        trace = self._binary_envelope(gamma, log_p, [0.0, 0.0, ln_P_sat[1]],
+                                      scale=[1.0, 1.0, 0.1], step_max=step_max,
+                                      max_angle=max_angle, max_points=max_points)
+        points = trace['points']
+        events = {name: [{'x1': event['x1'], 'P': float(np.exp(event['ln_P']))}
+                         for event in self._envelope_events(trace, name, 'ln_P')]
+                  for name in ('azeotrope', 'liquid_instability')}
+        return {
+            'x1': points[:, 0],
+            'y1': points[:, 1],
+            'P': np.exp(points[:, 2]),
+            'T': T,
+            'azeotropes': events['azeotrope'],
+            'liquid_instability': events['liquid_instability'],
+            'residual_evaluations': trace['residual_evaluations']
+        }
+    
+    def trace_ternary_bubble_isotherm(self, T, P, P_sat, gamma_model='ideal', Lambda=None,
+                                      tau=None, alpha=None, step_max=0.05, max_angle=0.1,
+                                      max_points=2000, n_edge=101):
+        """
+        Trace the liquid compositions of a ternary mixture that boil at
+        temperature T and pressure P (and the matching dew compositions)
+        
+        Every branch of the isotherm starts where it meets a binary edge of
+        the composition triangle and is followed by arc-length continuation
+        until it leaves the triangle again.
+        
+        Parameters:
+        T: Temperature (K)
+        P: Pressure (Pa)
+        P_sat: Saturation pressures of the three components at T (Pa)
+        gamma_model, Lambda, tau, alpha: Activity model (see multicomponent_flash)
+        step_max: Largest arc-length step (mole fraction units)
+        max_angle: Largest tangent turn per step (rad)
+        max_points: Maximum number of points per branch
+        n_edge: Number of points per edge scanned for branch ends
+        
+        Returns:
+        dict: branches (list of dicts with liquid compositions x and vapour
+              compositions y, shape (m, 3)), T, P and residual_evaluations
+        """
+        gamma = self._gamma_function(gamma_model, Lambda, tau, alpha, T)
+        ln_P_sat = np.log(np.asarray(P_sat, dtype=float))
+        
+        def composition(u):
+            return np.array([u[0], u[1], 1 - u[0] - u[1]])
+        
+        def terms(x):
+            g = np.ones_like(x) if gamma is None else gamma(x)
+            return x * g * np.exp(ln_P_sat - np.log(P))
+        
+        def residual(u):
+            return np.log(np.sum(terms(composition(u))))
+        
+        # Branch ends: roots of the residual along the three edges
+        corners = np.eye(3)
+        s = np.linspace(0, 1, n_edge)
+        ends = []
+        for i, j in ((0, 1), (1, 2), (2, 0)):
+            def edge_residual(s_edge):
+                return residual(((1 - s_edge) * corners[i] + s_edge * corners[j])[:2])
+            f = np.array([edge_residual(s_k) for s_k in s])
+            for k in np.flatnonzero(f[:-1] * f[1:] < 0):
+                s_end = brentq(edge_residual, s[k], s[k + 1], xtol=1e-14)
+                ends.append((1 - s_end) * corners[i] + s_end * corners[j])
+        
+        branches = []
+        calls = 0
+        used = np.zeros(len(ends), dtype=bool)
+        for k, x_end in enumerate(ends):
+            if used[k]:
+                continue
+            used[k] = True
+            # Head into the triangle
+            direction = np.full(3, 1 / 3) - x_end
+            trace = trace_curve(residual, x_end[:2], direction[:2], step=step_max / 4,
+                                step_max=step_max, max_angle=max_angle,
+                                max_points=max_points,
+                                constraints=(lambda u: u[0], lambda u: u[1],
+                                             lambda u: 1 - u[0] - u[1]))
+            calls += trace['residual_evaluations']
+            x = np.array([composition(u) for u in trace['points']])
+            # The far end of this branch is another edge crossing
+            for m in np.flatnonzero(~used):
+                if np.max(np.abs(ends[m] - x[-1])) < 1e-6:
+                    used[m] = True
+            y = np.array([terms(xi) for xi in x])
+            branches.append({'x': x, 'y': y / y.sum(axis=1, keepdims=True)})
+        
+        return {
+            'branches': branches,
+            'T': T,
+            'P': P,
+            'residual_evaluations': calls
+        }
+    
+    def liquid_liquid_flash(self, z, T=None, gamma_model='nrtl', tau=None, alpha=0.3):
+        """
+        Liquid-liquid flash of one or many feeds, with a stability test first
+        
+        Parameters:
+        z: Feed mole fractions, shape (n,) or (m, n)
+        T: Temperature (K), needed by temperature-dependent models
+        gamma_model: 'nrtl' or an ActivityModel instance
+        tau, alpha: NRTL parameter matrices (n x n; alpha may be scalar)
+        
+        Returns:
+        dict: beta (fraction of liquid II), x1 and x2 (liquid compositions),
+              K, two_phase and converged (see src.core.lle)
+        """
+        if not isinstance(gamma_model, ActivityModel):
+            gamma_model = NRTL(tau=tau, alpha=alpha)
+        return liquid_liquid_flash(gamma_model, z, T)
+    
+    def generate_binodal_curve(self, T, gamma_model='nrtl', tau12=None, tau21=None,
+                               alpha12=0.3):
+        """
+        Mutual solubility (binodal) curve of a partially miscible binary
+        
+        Parameters:
+        T: Temperatures (K), array
+        gamma_model: 'nrtl' or a binary ActivityModel with temperature-dependent
+                     parameters
+        tau12, tau21, alpha12: NRTL parameters
+        
+        Returns:
+        dict: T, x1_I and x1_II (the two liquid compositions; NaN where the
+              liquid does not split)
+        """
+        model = self._binary_activity_model(gamma_model, None, None, tau12, tau21, alpha12)
+        return binary_binodal(model, T)
+    
+    def find_azeotropes(self, P_sat_1_func, P_sat_2_func, T=None, P=None,
+                        gamma_model='wilson', A12=None, A21=None, tau12=None, tau21=None,
+                        alpha12=None, T_guess=350.0, n_grid=201):
+        """
+        Locate binary azeotropes at one or many temperatures or pressures
+        
+        Parameters:
+        P_sat_1_func, P_sat_2_func: Functions that return saturation pressure vs T
+                                    (must accept arrays of temperatures)
+        T: Temperature(s) (K) for isothermal azeotropes, scalar or 1-D array
+        P: Pressure(s) (Pa) for isobaric azeotropes (give T or P)
+        gamma_model: 'wilson', 'nrtl' or a binary ActivityModel
+        A12, A21: Wilson parameters
+        tau12, tau21, alpha12: NRTL parameters
+        T_guess: Initial temperature of the isobaric bubble point solve (K)
+        n_grid: Number of grid compositions searched for sign changes of y1 - x1
+        
+        Returns:
+        dict: count, x1, T, P, kind and converged (see src.core.azeotropes)
+        """
+        gamma_model = self._binary_activity_model(gamma_model, A12, A21, tau12, tau21, alpha12)
+        
+        def P_sat_func(T):
+            return np.stack([P_sat_1_func(T), P_sat_2_func(T)], axis=-1)
+        
+        return find_azeotropes(gamma_model, P_sat_func, T=T, P=P, n_grid=n_grid,
+                               T_guess=T_guess)
+    
     def plot_phase_diagrams(self, txy_data=None, pxy_data=None):
         """
         Plot Txy and/or Pxy diagrams
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""
+Rankine Cycle Flowsheets
+Component graph for reheat and regenerative (feedwater heater) Rankine
+cycles with dependency-ordered, incremental state evaluation and a linear
+solve of the extraction fractions
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+
+
+class Component:
+    """
+    Base class of a flowsheet component (graph node)
+
+    Streams (graph edges) are referenced by name. Parameters may be numbers
+    or the name of a flowsheet parameter, so that one value (e.g. a bleed
+    pressure) can drive several components.
+    """
+
+    def __init__(self, name, inlets, outlets, **params):
+        self.name = name
+        self.inlets = tuple(inlets)
+        self.outlets = tuple(outlets)
+        self.params = params
+
+    @property
+    def state_inputs(self):
+        """Inlet streams whose states the outlet states depend on"""
+        return self.inlets
+
+    def evaluate(self, inlet_states, params, props):
+        """
+        Compute the outlet states
+
+        Parameters:
+        inlet_states: Dict of inlet stream name to state dict
+        params: Resolved parameter values
+        props: Steam property function (steam_properties signature)
+
+        Returns:
+        dict: Outlet stream name to state dict
+        """
+        raise NotImplementedError
+
+    def mass_balance(self, states):
+        """
+        Linear mass and energy balance rows of this component
+
+        Parameters:
+        states: Dict of stream name to state dict
+
+        Returns:
+        list: Rows as dicts of stream name to coefficient (right-hand side 0)
+        """
+        inlet, = self.inlets
+        outlet, = self.outlets
+        return [{outlet: 1.0, inlet: -1.0}]
+
+    def duties(self, states, m):
+        """
+        Work and heat of the component per kg of boiler flow
+
+        Parameters:
+        states: Dict of stream name to state dict
+        m: Dict of stream name to mass fraction
+
+        Returns:
+        dict: 'work' (produced, kJ/kg) and 'heat' (added, kJ/kg)
+        """
+        return {'work': 0.0, 'heat': 0.0}
+
+
+class Pump(Component):
+    """Liquid pump (incompressible work with an isentropic efficiency)"""
+
+    def __init__(self, name, inlet, outlet, P_out, efficiency=0.85):
+        super().__init__(name, [inlet], [outlet], P_out=P_out, efficiency=efficiency)
+
+    def evaluate(self, inlet_states, params, props):
+        state_in = inlet_states[self.inlets[0]]
+        w = state_in['v'] * (params['P_out'] - state_in['P']) * 1000 / params['efficiency']
+        return {self.outlets[0]: props(P=params['P_out'], h=state_in['h'] + w)}
+
+    def duties(self, states, m):
+        inlet, outlet = self.inlets[0], self.outlets[0]
+        return {'work': -m[inlet] * (states[outlet]['h'] - states[inlet]['h']), 'heat': 0.0}
+
+
+class Turbine(Component):
+    """Turbine stage expanding to P_out with an isentropic efficiency"""
+
+    def __init__(self, name, inlet, outlet, P_out, efficiency=0.85):
+        super().__init__(name, [inlet], [outlet], P_out=P_out, efficiency=efficiency)
+
+    def evaluate(self, inlet_states, params, props):
+        state_in = inlet_states[self.inlets[0]]
+        state_s = props(P=params['P_out'], s=state_in['s'])
+        h = state_in['h'] - params['efficiency'] * (state_in['h'] - state_s['h'])
+        return {self.outlets[0]: props(P=params['P_out'], h=h)}
+
+    def duties(self, states, m):
+        inlet, outlet = self.inlets[0], self.outlets[0]
+        return {'work': m[inlet] * (states[inlet]['h'] - states[outlet]['h']), 'heat': 0.0}
+
+
+class Boiler(Component):
+    """Boiler delivering steam at a fixed pressure and temperature"""
+
+    def __init__(self, name, inlet, outlet, P, T):
+        super().__init__(name, [inlet], [outlet], P=P, T=T)
+
+    @property
+    def state_inputs(self):
+        return ()
+
+    def evaluate(self, inlet_states, params, props):
+        return {self.outlets[0]: props(P=params['P'], T=params['T'])}
+
+    def duties(self, states, m):
+        inlet, outlet = self.inlets[0], self.outlets[0]
+        return {'work': 0.0, 'heat': m[inlet] * (states[outlet]['h'] - states[inlet]['h'])}
+
+
+class Reheater(Component):
+    """Reheater raising the temperature at the inlet pressure"""
+
+    def __init__(self, name, inlet, outlet, T):
+        super().__init__(name, [inlet], [outlet], T=T)
+
+    def evaluate(self, inlet_states, params, props):
+        return {self.outlets[0]: props(P=inlet_states[self.inlets[0]]['P'], T=params['T'])}
+
+    def duties(self, states, m):
+        inlet, outlet = self.inlets[0], self.outlets[0]
+        return {'work': 0.0, 'heat': m[inlet] * (states[outlet]['h'] - states[inlet]['h'])}
+
+
+class Throttle(Component):
+    """Isenthalpic valve or steam trap"""
+
+    def __init__(self, name, inlet, outlet, P_out):
+        super().__init__(name, [inlet], [outlet], P_out=P_out)
+
+    def evaluate(self, inlet_states, params, props):
+        return {self.outlets[0]: props(P=params['P_out'], h=inlet_states[self.inlets[0]]['h'])}
+
+
+class Splitter(Component):
+    """Stream split (turbine bleed); the split fractions come from the heater balances"""
+
+    def __init__(self, name, inlet, outlets):
+        super().__init__(name, [inlet], outlets)
+
+    def evaluate(self, inlet_states, params, props):
+        state = inlet_states[self.inlets[0]]
+        return {outlet: dict(state) for outlet in self.outlets}
+
+    def mass_balance(self, states):
+        row = {outlet: 1.0 for outlet in self.outlets}
+        row[self.inlets[0]] = -1.0
+        return [row]
+
+
+class Condenser(Component):
+    """Condenser returning saturated liquid at pressure P from any number of inlets"""
+
+    def __init__(self, name, inlets, outlet, P):
+        super().__init__(name, inlets, [outlet], P=P)
+
+    @property
+    def state_inputs(self):
+        return ()
+
+    def evaluate(self, inlet_states, params, props):
+        return {self.outlets[0]: props(P=params['P'], x=0)}
+
+    def mass_balance(self, states):
+        row = {inlet: -1.0 for inlet in self.inlets}
+        row[self.outlets[0]] = 1.0
+        return [row]
+
+    def duties(self, states, m):
+        outlet = self.outlets[0]
+        heat = m[outlet] * states[outlet]['h'] - sum(m[i] * states[i]['h'] for i in self.inlets)
+        return {'work': 0.0, 'heat': heat}
+
+
+class OpenFeedwaterHeater(Component):
+    """
+    Open (direct-contact) feedwater heater leaving saturated liquid at its
+    operating pressure P; inlets are the bleed steam, the feedwater and any
+    throttled drains
+    """
+
+    def __init__(self, name, inlets, outlet, P):
+        super().__init__(name, inlets, [outlet], P=P)
+
+    @property
+    def state_inputs(self):
+        return ()
+
+    def evaluate(self, inlet_states, params, props):
+        return {self.outlets[0]: props(P=params['P'], x=0)}
+
+    def mass_balance(self, states):
+        outlet = self.outlets[0]
+        mass = {inlet: -1.0 for inlet in self.inlets}
+        mass[outlet] = 1.0
+        energy = {inlet: states[inlet]['h'] for inlet in self.inlets}
+        energy[outlet] = -states[outlet]['h']
+        return [mass, energy]
+
+
+class ClosedFeedwaterHeater(Component):
+    """
+    Closed (shell-and-tube) feedwater heater: the bleed leaves as saturated
+    liquid drain and the feedwater leaves at the bleed saturation temperature
+    minus a terminal temperature difference
+    """
+
+    def __init__(self, name, bleed, feed_in, drain, feed_out, ttd=0.0):
+        super().__init__(name, [bleed, feed_in], [drain, feed_out], ttd=ttd)
+
+    def evaluate(self, inlet_states, params, props):
+        bleed, feed_in = self.inlets
+        drain, feed_out = self.outlets
+        state_drain = props(P=inlet_states[bleed]['P'], x=0)
+        state_feed = props(P=inlet_states[feed_in]['P'], T=state_drain['T'] - params['ttd'])
+        return {drain: state_drain, feed_out: state_feed}
+
+    def mass_balance(self, states):
+        bleed, feed_in = self.inlets
+        drain, feed_out = self.outlets
+        return [
+            {drain: 1.0, bleed: -1.0},
+            {feed_out: 1.0, feed_in: -1.0},
+            {bleed: states[bleed]['h'] - states[drain]['h'],
+             feed_in: states[feed_in]['h'] - states[feed_out]['h']},
+        ]
+
+
+class RankineFlowsheet:
+    """
+    Steady-state Rankine cycle built from components connected by streams
+
+    Stream states are evaluated component by component in dependency order;
+    the Boiler, Condenser and OpenFeedwaterHeater outlets are fixed by their
+    parameters and break the loop. Mass fractions (per kg of boiler flow)
+    then follow from one linear system of the mass and heater energy
+    balances. After update() only the components downstream of a changed
+    parameter are re-evaluated.
+    """
+
+    def __init__(self, components, parameters=None, steam_properties=None):
+        """
+        Parameters:
+        components: List of Component instances
+        parameters: Dict of named parameters referenced by the components
+        steam_properties: Property function with the
+                          ThermodynamicsToolkit.steam_properties signature
+                          (default: a new ThermodynamicsToolkit)
+        """
+        if steam_properties is None:
+            from .thermodynamics_toolkit import ThermodynamicsToolkit
+            steam_properties = ThermodynamicsToolkit().steam_properties
+        self._steam_properties = steam_properties
+        self.components = {component.name: component for component in components}
+        if len(self.components) != len(components):
+            raise ValueError("Component names must be unique")
+        self.parameters = dict(parameters or {})
+        self.property_calls = 0
+        self.states = {}
+        self._dirty = set(self.components)
+
+        self._producer = {}
+        consumers = {}
+        for component in components:
+            for stream in component.outlets:
+                if stream in self._producer:
+                    raise ValueError(f"Stream '{stream}' has more than one source")
+                self._producer[stream] = component.name
+            for stream in component.inlets:
+                if stream in consumers:
+                    raise ValueError(f"Stream '{stream}' has more than one destination")
+                consumers[stream] = component.name
+        if set(self._producer) != set(consumers):
+            dangling = set(self._producer) ^ set(consumers)
+            raise ValueError(f"Streams not connected at both ends: {sorted(dangling)}")
+        self.streams = tuple(sorted(self._producer))
+        self._order = self._dependency_order()
+
+        boilers = [c for c in components if isinstance(c, Boiler)]
+        if not boilers:
+            raise ValueError("The flowsheet needs a Boiler")
+        self._reference_stream = boilers[0].inlets[0]
+
+    def _dependency_order(self):
+        """Topological order of the components along state dependencies"""
+        remaining = {name: {self._producer[s] for s in component.state_inputs}
+                     for name, component in self.components.items()}
+        order = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps & set(remaining))
+            if not ready:
+                raise ValueError("State dependency loop between components "
+                                 f"{sorted(remaining)}; close it with a Boiler, Condenser "
+                                 "or OpenFeedwaterHeater")
+            order.extend(ready)
+            for name in ready:
+                del remaining[name]
+        return order
+
+    def _props(self, **inputs):
+        """Counted steam property call that raises on failure"""
+        self.property_calls += 1
+        state = self._steam_properties(**inputs)
+        if state is None:
+            raise ValueError(f"Steam properties failed for {inputs}")
+        return state
+
+    def _resolve(self, component):
+        """Parameter values of a component with named parameters substituted"""
+        return {key: self.parameters[value] if isinstance(value, str) else value
+                for key, value in component.params.items()}
+
+    def update(self, **parameters):
+        """
+        Change named parameters and re-solve, re-evaluating only the states
+        downstream of the change
+
+        Parameters:
+        parameters: New values of named flowsheet parameters
+
+        Returns:
+        dict: Solution (see solve)
+        """
+        unknown = set(parameters) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Unknown flowsheet parameters: {sorted(unknown)}")
+        for key, value in parameters.items():
+            if self.parameters[key] != value:
+                self.parameters[key] = value
+                self._dirty.update(name for name, component in self.components.items()
+                                   if key in component.params.values())
+        return self.solve()
+
+    def update_component(self, name, **params):
+        """
+        Change parameters of one component and re-solve incrementally
+
+        Parameters:
+        name: Component name
+        params: New parameter values (numbers or flowsheet parameter names)
+
+        Returns:
+        dict: Solution (see solve)
+        """
+        component = self.components[name]
+        unknown = set(params) - set(component.params)
+        if unknown:
+            raise ValueError(f"Unknown parameters of {name}: {sorted(unknown)}")
+        component.params.update(params)
+        self._dirty.add(name)
+        return self.solve()
+
+    def _evaluate_states(self):
+        """Re-evaluate dirty components and everything downstream of them"""
+        changed = set()
+        for name in self._order:
+            component = self.components[name]
+            if name not in self._dirty and not changed.intersection(component.state_inputs):
+                continue
+            inlet_states = {stream: self.states[stream] for stream in component.state_inputs}
+            outlets = component.evaluate(inlet_states, self._resolve(component), self._props)
+            for stream, state in outlets.items():
+                if self.states.get(stream) != state:
+                    self.states[stream] = state
+                    changed.add(stream)
+        self._dirty.clear()
+
+    def _solve_mass_fractions(self):
+        """Solve the mass and heater energy balances as one linear system"""
+        index = {stream: i for i, stream in enumerate(self.streams)}
+        rows = [{self._reference_stream: 1.0}]
+        for name in self._order:
+            rows.extend(self.components[name].mass_balance(self.states))
+        A = np.zeros((len(rows), len(self.streams)))
+        b = np.zeros(len(rows))
+        for i, row in enumerate(rows):
+            for stream, coefficient in row.items():
+                A[i, index[stream]] += coefficient
+        # Scale the energy rows so that every row weighs about the same
+        A /= np.abs(A).max(axis=1, keepdims=True)
+        b[0] = 1.0
+        m, _, rank, _ = np.linalg.lstsq(A, b, rcond=None)
+        if rank < len(self.streams):
+            raise ValueError("The mass balances do not determine every stream; "
+                             "check the splitters and heaters")
+        return dict(zip(self.streams, m.tolist()))
+
+    def solve(self):
+        """
+        Evaluate the outdated stream states and the mass fractions
+
+        Returns:
+        dict: 'streams' (state dict plus mass fraction 'm' per stream),
+              'components' (work and heat per component), work_turbine,
+              work_pump, work_net, heat_input, heat_output,
+              efficiency_thermal, back_work_ratio and property_calls (steam
+              property calls of this solve)
+        """
+        calls = self.property_calls
+        self._evaluate_states()
+        m = self._solve_mass_fractions()
+
+        duties = {name: component.duties(self.states, m)
+                  for name, component in self.components.items()}
+        w_turbine = sum(duties[name]['work'] for name, c in self.components.items()
+                        if isinstance(c, Turbine))
+        w_pump = -sum(duties[name]['work'] for name, c in self.components.items()
+                      if isinstance(c, Pump))
+        q_in = sum(d['heat'] for d in duties.values() if d['heat'] > 0)
+        q_out = -sum(d['heat'] for d in duties.values() if d['heat'] < 0)
+        w_net = w_turbine - w_pump
+        return {
+            'streams': {stream: {**self.states[stream], 'm': m[stream]} for stream in self.streams},
+            'components': duties,
+            'work_turbine': w_turbine,
+            'work_pump': w_pump,
+            'work_net': w_net,
+            'heat_input': q_in,
+            'heat_output': q_out,
+            'efficiency_thermal': w_net / q_in,
+            'back_work_ratio': w_pump / w_turbine,
+            'property_calls': self.property_calls - calls,
+        }
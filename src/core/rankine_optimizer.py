@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Rankine Cycle Design Optimizer
+Gradient-based search for the boiler/condenser conditions that maximize
+thermal efficiency or net work under turbine-exit and temperature limits
+@author: Bryan Piguave Llano
+"""
+
+import numpy as np
+from scipy.optimize import minimize
+from iapws._iapws import Pc
+
+from .if97_vectorized import saturation_temperature
+from .rankine_sweep import rankine_cycle_batch, RESULT_KEYS
+
+DESIGN_VARIABLES = ('P_boiler', 'T_boiler', 'P_condenser')
+DEFAULT_BOUNDS = {
+    'P_boiler': (0.5, 20.0),        # MPa
+    'T_boiler': (573.15, 873.15),   # K
+    'P_condenser': (0.005, 0.1),    # MPa
+}
+OBJECTIVES = ('efficiency_thermal', 'work_net')
+# Steam states evaluated per cycle: condenser exit, boiler exit, isentropic
+# and actual turbine exit
+STATES_PER_CYCLE = 4
+# Pressures are searched on a log scale
+_LOG_SCALED = ('P_boiler', 'P_condenser')
+
+
+class _CycleEvaluator:
+    """
+    Evaluates the cycle and its forward-difference gradient in one
+    vectorized batch and remembers the last point, so the objective,
+    constraints and their Jacobians at one iterate cost a single batch
+    """
+
+    def __init__(self, variables, bounds, fixed, objective, x_exit_min, superheat_min, step):
+        self.variables = variables
+        self.lower = np.array([bounds[name][0] for name in variables], dtype=float)
+        self.upper = np.array([bounds[name][1] for name in variables], dtype=float)
+        self.log = np.array([name in _LOG_SCALED for name in variables])
+        self.fixed = fixed
+        self.objective = objective
+        self.x_exit_min = x_exit_min
+        self.superheat_min = superheat_min
+        self.step = step
+        self.cycle_evaluations = 0
+        self._last = None
+
+    def to_physical(self, u):
+        """Map normalized coordinates (0-1) to physical design values"""
+        u = np.asarray(u, dtype=float)
+        lo = np.where(self.log, np.log(self.lower), self.lower)
+        hi = np.where(self.log, np.log(self.upper), self.upper)
+        value = lo + u * (hi - lo)
+        value[..., self.log] = np.exp(value[..., self.log])
+        return value
+
+    def to_normalized(self, values):
+        """Map physical design values to normalized coordinates (0-1)"""
+        values = np.asarray(values, dtype=float)
+        lo = np.where(self.log, np.log(self.lower), self.lower)
+        hi = np.where(self.log, np.log(self.upper), self.upper)
+        return (np.where(self.log, np.log(values), values) - lo) / (hi - lo)
+
+    def cycles(self, U):
+        """Evaluate the cycle at rows of normalized points U"""
+        X = self.to_physical(U)
+        inputs = dict(self.fixed)
+        for i, name in enumerate(self.variables):
+            inputs[name] = X[..., i]
+        self.cycle_evaluations += X[..., 0].size
+        result = rankine_cycle_batch(**inputs)
+        P_b = np.broadcast_to(inputs['P_boiler'], result['feasible'].shape)
+        T_b = np.broadcast_to(inputs['T_boiler'], result['feasible'].shape)
+        result['superheat'] = T_b - saturation_temperature(np.minimum(P_b, Pc))
+        return result
+
+    def _values(self, result):
+        """Objective (to minimize) and constraint values (>= 0 when met)"""
+        feasible = result['feasible']
+        # Infeasible points get the worst possible objective instead of NaN
+        f = -np.where(feasible, result[self.objective], 0.0)
+        g = [result['superheat'] - self.superheat_min]
+        if self.x_exit_min is not None:
+            g.append(np.where(feasible, result['quality_turbine_exit'], 0.0)
+                     - self.x_exit_min)
+        return f, np.stack(g, axis=-1)
+
+    def evaluate(self, u):
+        """Objective, constraints and their gradients at u (memoized)"""
+        u = np.asarray(u, dtype=float)
+        if self._last is not None and np.array_equal(u, self._last[0]):
+            return self._last[1]
+        # Forward steps, taken backwards at the upper bound
+        h = np.where(u + self.step <= 1, self.step, -self.step)
+        U = np.vstack([u, u + np.diag(h)])
+        result = self.cycles(U)
+        f, g = self._values(result)
+        values = {
+            'f': f[0],
+            'df': (f[1:] - f[0]) / h,
+            'g': g[0],
+            'dg': ((g[1:] - g[0]) / h[:, None]).T,
+            'cycle': {key: float(result[key][0]) for key in RESULT_KEYS},
+            'feasible': bool(result['feasible'][0]),
+        }
+        values['cycle']['superheat'] = float(result['superheat'][0])
+        self._last = (u.copy(), values)
+        return values
+
+
+def optimize_rankine(objective='efficiency_thermal', bounds=None, fixed=None, x_exit_min=0.88,
+                     T_max=None, superheat_min=0.0, x0=None, efficiency_pump=0.85,
+                     efficiency_turbine=0.85, n_start=3, step=1e-6, tol=1e-10, max_iter=100):
+    """
+    Maximize the Rankine cycle efficiency or net work over the design
+    variables P_boiler, T_boiler and P_condenser
+
+    The search runs SLSQP in normalized coordinates (pressures on a log
+    scale). Every iterate evaluates the point and its forward-difference
+    neighbours in a single vectorized batch, which serves the objective,
+    the constraints and both gradients. The start point is the best
+    feasible case of a coarse batched grid unless x0 is given.
+
+    Parameters:
+    objective: 'efficiency_thermal' or 'work_net'
+    bounds: Dict of (lower, upper) bounds per design variable (defaults
+            to DEFAULT_BOUNDS)
+    fixed: Dict of design variables held at a fixed value
+    x_exit_min: Minimum turbine-exit quality (None to disable)
+    T_max: Metallurgical cap on the boiler exit temperature (K)
+    superheat_min: Minimum boiler exit superheat above saturation (K)
+    x0: Dict of starting values (e.g. the 'x' of a previous result)
+    efficiency_pump: Pump isentropic efficiency
+    efficiency_turbine: Turbine isentropic efficiency
+    n_start: Points per variable of the warm-start grid
+    step: Finite-difference step in normalized coordinates
+    tol: Convergence tolerance of SLSQP
+    max_iter: Maximum number of SLSQP iterations
+
+    Returns:
+    dict: success, message, optimal design 'x', objective value, the cycle
+          results at the optimum, iterations and the number of cycle and
+          steam property evaluations used
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    fixed = dict(fixed or {})
+    unknown = set(fixed) - set(DESIGN_VARIABLES)
+    if unknown:
+        raise ValueError(f"Unknown design variables: {sorted(unknown)}")
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    if T_max is not None:
+        lower, upper = bounds['T_boiler']
+        bounds['T_boiler'] = (lower, min(upper, T_max))
+    variables = tuple(name for name in DESIGN_VARIABLES if name not in fixed)
+    if not variables:
+        raise ValueError("At least one design variable must be free")
+    for name in variables:
+        lower, upper = bounds[name]
+        if not lower < upper:
+            raise ValueError(f"Empty bounds for {name}: {bounds[name]}")
+
+    fixed.update(efficiency_pump=efficiency_pump, efficiency_turbine=efficiency_turbine)
+    evaluator = _CycleEvaluator(variables, bounds, fixed, objective, x_exit_min,
+                                superheat_min, step)
+
+    if x0 is not None:
+        u0 = np.clip(evaluator.to_normalized([x0[name] for name in variables]), 0, 1)
+    else:
+        # Warm start: best feasible point of a coarse grid, in one batch
+        axes = np.meshgrid(*([np.linspace(0, 1, n_start)] * len(variables)), indexing='ij')
+        U = np.stack([axis.ravel() for axis in axes], axis=-1)
+        f, g = evaluator._values(evaluator.cycles(U))
+        score = np.where(np.all(g >= 0, axis=-1), f, np.inf)
+        u0 = U[np.argmin(score)] if np.isfinite(score).any() else np.full(len(variables), 0.5)
+
+    result = minimize(
+        lambda u: evaluator.evaluate(u)['f'],
+        u0,
+        jac=lambda u: evaluator.evaluate(u)['df'],
+        method='SLSQP',
+        bounds=[(0, 1)] * len(variables),
+        constraints=[{
+            'type': 'ineq',
+            'fun': lambda u: evaluator.evaluate(u)['g'],
+            'jac': lambda u: evaluator.evaluate(u)['dg'],
+        }],
+        options={'ftol': tol, 'maxiter': max_iter}
+    )
+
+    u_opt = np.clip(result.x, 0, 1)
+    best = evaluator.evaluate(u_opt)
+    optimum = dict(zip(variables, evaluator.to_physical(u_opt).tolist()))
+    design = {name: optimum[name] if name in optimum else fixed[name]
+              for name in DESIGN_VARIABLES}
+    return {
+        'success': bool(result.success) and best['feasible'] and bool(np.all(best['g'] >= -1e-8)),
+        'message': result.message,
+        'objective': objective,
+        'x': design,
+        'value': best['cycle'][objective],
+        'cycle': best['cycle'],
+        'iterations': int(result.nit),
+        'cycle_evaluations': evaluator.cycle_evaluations,
+        'property_evaluations': STATES_PER_CYCLE * evaluator.cycle_evaluations,
+    }
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Rankine Cycle Parametric Sweeps
+Vectorized Rankine cycle evaluation and a process-pool sweep engine over
+boiler/condenser design grids
+@author: Bryan Piguave Llano
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .if97_vectorized import (steam_properties_batch, PHASE_LIQUID,
+                              PHASE_COMPRESSIBLE_LIQUID)
+
+SWEEP_PARAMETERS = ('P_boiler', 'T_boiler', 'P_condenser',
+                    'efficiency_pump', 'efficiency_turbine')
+RESULT_KEYS = ('work_pump', 'work_turbine', 'work_net', 'heat_input', 'heat_output',
+               'efficiency_thermal', 'efficiency_carnot', 'back_work_ratio',
+               'quality_turbine_exit', 'T_turbine_exit')
+# Fixed default chunk size, so results do not depend on the worker count
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def rankine_cycle_batch(P_boiler, T_boiler, P_condenser, efficiency_pump=0.85,
+                        efficiency_turbine=0.85):
+    """
+    Analyze many Rankine cycles at once (same model as
+    ThermodynamicsToolkit.rankine_cycle_analysis)
+
+    Parameters:
+    P_boiler: Boiler pressure (MPa), scalar or array
+    T_boiler: Boiler temperature (K), scalar or array
+    P_condenser: Condenser pressure (MPa), scalar or array
+    efficiency_pump: Pump isentropic efficiency, scalar or array
+    efficiency_turbine: Turbine isentropic efficiency, scalar or array
+
+    Returns:
+    dict: Arrays (broadcast shape of the inputs) of the cycle results plus
+          turbine-exit quality and temperature and a boolean 'feasible'
+          mask (boiler exit must not be liquid and the cycle must produce net
+          work); infeasible cases are NaN instead of raising
+    """
+    P_b, T_b, P_c, eta_p, eta_t = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in
+          (P_boiler, T_boiler, P_condenser, efficiency_pump, efficiency_turbine)))
+
+    # State 1: Condenser exit (saturated liquid)
+    state_1 = steam_properties_batch(P_c, x=0)
+
+    # State 2: Pump exit (compressed liquid)
+    w_pump = state_1['v'] * (P_b - P_c) * 1000 / eta_p  # kJ/kg
+    h_2 = state_1['h'] + w_pump
+
+    # State 3: Boiler exit (superheated steam)
+    state_3 = steam_properties_batch(P_b, T=T_b)
+
+    # State 4: Turbine exit
+    state_4s = steam_properties_batch(P_c, s=state_3['s'])
+    w_turbine = (state_3['h'] - state_4s['h']) * eta_t
+    h_4 = state_3['h'] - w_turbine
+    state_4 = steam_properties_batch(P_c, h=h_4)
+
+    # Heat input and output
+    q_in = state_3['h'] - h_2
+    q_out = h_4 - state_1['h']
+    w_net = w_turbine - w_pump
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = {
+            'work_pump': w_pump,
+            'work_turbine': w_turbine,
+            'work_net': w_net,
+            'heat_input': q_in,
+            'heat_output': q_out,
+            'efficiency_thermal': w_net / q_in,
+            'efficiency_carnot': 1 - state_1['T'] / state_3['T'],
+            'back_work_ratio': w_pump / w_turbine,
+            'quality_turbine_exit': state_4['x'],
+            'T_turbine_exit': state_4['T'],
+        }
+
+    feasible = ((P_b > P_c) & (eta_p > 0) & (eta_p <= 1) & (eta_t > 0) & (eta_t <= 1)
+                & (w_net > 0) & (q_in > 0)
+                & (state_3['phase'] != PHASE_LIQUID)
+                & (state_3['phase'] != PHASE_COMPRESSIBLE_LIQUID))
+    for key in RESULT_KEYS:
+        feasible &= np.isfinite(result[key])
+    for key in RESULT_KEYS:
+        result[key] = np.where(feasible, result[key], np.nan)
+    result['feasible'] = feasible
+    return result
+
+
+def _evaluate_chunk(columns):
+    """Worker entry point: evaluate one chunk of flattened cases"""
+    return rankine_cycle_batch(**columns)
+
+
+def _case_table(cases):
+    """Normalize a case table (dict of columns, list of dicts or DataFrame)"""
+    if hasattr(cases, 'to_dict'):
+        cases = cases.to_dict('list')
+    if isinstance(cases, (list, tuple)):
+        cases = {key: [case[key] for case in cases] for key in cases[0]}
+    unknown = set(cases) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    columns = {key: np.atleast_1d(np.asarray(value, dtype=float))
+               for key, value in cases.items()}
+    lengths = {column.size for column in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError("All case columns must have the same length")
+    return columns
+
+
+def rankine_sweep(P_boiler=None, T_boiler=None, P_condenser=None, efficiency_pump=0.85,
+                  efficiency_turbine=0.85, cases=None, n_workers=None, chunk_size=None,
+                  progress=None):
+    """
+    Evaluate a Rankine cycle design grid or case table across a process pool
+
+    In grid mode every parameter given as a 1-D array becomes an axis of the
+    result (in the order of SWEEP_PARAMETERS) and scalars are held fixed. In
+    case-table mode the result has a single 'case' axis. Cases are split
+    into chunks that are evaluated with the vectorized cycle model; chunk
+    results are written back by position, so the output order does not
+    depend on which worker finishes first.
+
+    Parameters:
+    P_boiler: Boiler pressure (MPa), scalar or 1-D array
+    T_boiler: Boiler temperature (K), scalar or 1-D array
+    P_condenser: Condenser pressure (MPa), scalar or 1-D array
+    efficiency_pump: Pump isentropic efficiency, scalar or 1-D array
+    efficiency_turbine: Turbine isentropic efficiency, scalar or 1-D array
+    cases: Explicit case table instead of axes (dict of equal-length
+           columns, list of dicts or pandas DataFrame)
+    n_workers: Number of worker processes (default: CPU count; 1 runs in
+               the calling process)
+    chunk_size: Cases per task (default: DEFAULT_CHUNK_SIZE)
+    progress: Optional callable progress(cases_done, cases_total)
+
+    Returns:
+    dict: 'dims' (axis names), 'coords' (axis values), one N-D array per
+          cycle result and the boolean 'feasible' mask
+    """
+    if cases is not None:
+        columns = _case_table(cases)
+        n_cases = next(iter(columns.values())).size
+        dims = ('case',)
+        coords = dict(columns)
+        coords['case'] = np.arange(n_cases)
+        shape = (n_cases,)
+        for key, default in (('efficiency_pump', efficiency_pump),
+                             ('efficiency_turbine', efficiency_turbine)):
+            columns.setdefault(key, np.full(n_cases, default, dtype=float))
+        missing = set(SWEEP_PARAMETERS) - set(columns)
+        if missing:
+            raise ValueError(f"Case table is missing: {sorted(missing)}")
+    else:
+        values = dict(zip(SWEEP_PARAMETERS, (P_boiler, T_boiler, P_condenser,
+                                             efficiency_pump, efficiency_turbine)))
+        if any(value is None for value in values.values()):
+            raise ValueError("P_boiler, T_boiler and P_condenser are required")
+        dims = tuple(key for key, value in values.items() if np.ndim(value) == 1)
+        coords = {key: np.asarray(values[key], dtype=float) for key in dims}
+        grids = np.meshgrid(*(coords[key] for key in dims), indexing='ij')
+        shape = grids[0].shape if grids else ()
+        columns = {}
+        for key, value in values.items():
+            if key in coords:
+                columns[key] = grids[dims.index(key)].ravel()
+            else:
+                columns[key] = np.full(int(np.prod(shape)), float(value))
+
+    n_total = next(iter(columns.values())).size
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    starts = range(0, n_total, chunk_size)
+    chunks = [{key: column[start:start + chunk_size] for key, column in columns.items()}
+              for start in starts]
+
+    flat = {key: np.full(n_total, np.nan) for key in RESULT_KEYS}
+    flat['feasible'] = np.zeros(n_total, dtype=bool)
+    done = 0
+
+    def store(start, chunk_result):
+        nonlocal done
+        stop = start + chunk_result['feasible'].size
+        for key in flat:
+            flat[key][start:stop] = chunk_result[key]
+        done += stop - start
+        if progress is not None:
+            progress(done, n_total)
+
+    if n_workers == 1 or len(chunks) == 1:
+        for start, chunk in zip(starts, chunks):
+            store(start, _evaluate_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = {executor.submit(_evaluate_chunk, chunk): start
+                       for start, chunk in zip(starts, chunks)}
+            for future in as_completed(futures):
+                store(futures[future], future.result())
+
+    result = {'dims': dims, 'coords': coords}
+    for key, value in flat.items():
+        result[key] = value.reshape(shape)
+    return result
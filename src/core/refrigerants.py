@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Refrigerant Property Tables
+Saturation and superheated-vapour properties of R134a, R410A, R717 and R744
+interpolated from precomputed tables (see src/data/generate_refrigerant_tables.py)
+@author: Bryan Piguave Llano
+"""
+
+from pathlib import Path
+
+import numpy as np
+from scipy.interpolate import CubicSpline, PchipInterpolator, RectBivariateSpline
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data' / 'refrigerants'
+
+REFRIGERANTS = ('R134a', 'R410A', 'R717', 'R744')
+TABLE_VERSION = 1
+# Saturation table columns
+_SAT_COLUMNS = ('log_P', 'h_f', 'h_g', 's_f', 's_g', 'logv_f', 'logv_g')
+
+
+class RefrigerantTables:
+    """
+    Interpolated refrigerant properties (kJ, kg, MPa, K; CoolProp default
+    reference states)
+
+    The saturation line is a cubic spline in temperature. Superheated
+    vapour is tabulated on (log P, s - s_g) and (log P, h - h_g) grids and
+    interpolated with bicubic splines, so (P, s) and (P, h) states need no
+    iteration. States outside the tables come back as NaN.
+    """
+
+    def __init__(self, name, data_dir=DATA_DIR):
+        """
+        Parameters:
+        name: Refrigerant ('R134a', 'R410A', 'R717' or 'R744')
+        data_dir: Directory with the generated .npz tables
+        """
+        if name not in REFRIGERANTS:
+            raise ValueError(f"Unknown refrigerant '{name}'; use one of {REFRIGERANTS}")
+        self.name = name
+        self.path = Path(data_dir) / f'{name}.npz'
+        self._sat = None
+
+    def load(self):
+        """
+        Load the tables and build the interpolants
+
+        Returns:
+        RefrigerantTables: self
+        """
+        with np.load(self.path) as data:
+            if int(data['version']) != TABLE_VERSION:
+                raise ValueError(f"{self.path} was generated with another table version; "
+                                 "rerun src/data/generate_refrigerant_tables.py")
+            T_sat = data['T_sat']
+            saturation = data['saturation']
+            log_P = data['log_P']
+            self.T_crit = float(data['T_crit'])
+            self.P_crit = float(data['P_crit'])
+            self.molar_mass = float(data['molar_mass'])
+            self.sigma_max = float(data['sigma'][-1])
+            self.epsilon_max = float(data['epsilon'][-1])
+            self._sat = CubicSpline(T_sat, saturation, axis=0)
+            self._T_of_log_P = PchipInterpolator(saturation[:, 0], T_sat)
+            self._h_g = CubicSpline(log_P, data['h_g'])
+            self._s_g = CubicSpline(log_P, data['s_g'])
+            self._ps = [RectBivariateSpline(log_P, data['sigma'], values) for values in data['ps']]
+            self._ph = [RectBivariateSpline(log_P, data['epsilon'], values) for values in data['ph']]
+        self.T_min, self.T_max = float(T_sat[0]), float(T_sat[-1])
+        self.log_P_min, self.log_P_max = float(log_P[0]), float(log_P[-1])
+        return self
+
+    def _ensure_loaded(self):
+        if self._sat is None:
+            self.load()
+
+    def saturation(self, T):
+        """
+        Saturated liquid and vapour properties
+
+        Parameters:
+        T: Saturation temperature (K), scalar or array
+
+        Returns:
+        dict: Arrays of P (MPa), h_f, h_g (kJ/kg), s_f, s_g (kJ/kg·K),
+              v_f, v_g (m³/kg)
+        """
+        self._ensure_loaded()
+        T = np.asarray(T, dtype=float)
+        valid = (T >= self.T_min) & (T <= self.T_max)
+        Y = self._sat(np.where(valid, T, self.T_min))
+        Y[~valid] = np.nan
+        cols = {key: Y[..., i] for i, key in enumerate(_SAT_COLUMNS)}
+        return {
+            'P': np.exp(cols['log_P']),
+            'h_f': cols['h_f'], 'h_g': cols['h_g'],
+            's_f': cols['s_f'], 's_g': cols['s_g'],
+            'v_f': np.exp(cols['logv_f']), 'v_g': np.exp(cols['logv_g']),
+        }
+
+    def saturation_temperature(self, P):
+        """
+        Saturation temperature (K) at pressure P (MPa), scalar or array
+        """
+        self._ensure_loaded()
+        log_P = np.log(np.asarray(P, dtype=float))
+        valid = (log_P >= self.log_P_min) & (log_P <= self.log_P_max)
+        return np.where(valid, self._T_of_log_P(np.where(valid, log_P, self.log_P_min)), np.nan)
+
+    def _state(self, P, value, key):
+        """(P, s) or (P, h) state, two-phase or superheated"""
+        self._ensure_loaded()
+        P, value = np.broadcast_arrays(np.asarray(P, dtype=float),
+                                       np.asarray(value, dtype=float))
+        log_P = np.log(P)
+        T_sat = self.saturation_temperature(P)
+        sat = self.saturation(T_sat)
+        f, g = sat[f'{key}_f'], sat[f'{key}_g']
+        x = (value - f) / (g - f)
+
+        # Superheated vapour from the bicubic tables
+        if key == 's':
+            offset = value - self._s_g(log_P)
+            limit, splines, names = self.sigma_max, self._ps, ('h', 'T', 'logv')
+        else:
+            offset = value - self._h_g(log_P)
+            limit, splines, names = self.epsilon_max, self._ph, ('T', 's', 'logv')
+        superheated = (x > 1) & (offset <= limit)
+        offset = np.clip(offset, 0, limit)
+        out = {name: spline.ev(log_P, offset) for name, spline in zip(names, splines)}
+        out['v'] = np.exp(out.pop('logv'))
+        out[key] = value.copy()
+
+        # Two-phase mixture by the lever rule
+        wet = (x >= 0) & (x <= 1)
+        other = 'h' if key == 's' else 's'
+        out[other] = np.where(wet, sat[f'{other}_f'] + x * (sat[f'{other}_g'] - sat[f'{other}_f']),
+                              out[other])
+        out['T'] = np.where(wet, T_sat, out['T'])
+        out['v'] = np.where(wet, sat['v_f'] + x * (sat['v_g'] - sat['v_f']), out['v'])
+
+        valid = wet | superheated
+        result = {'P': P, 'x': np.where(wet, x, np.where(superheated, 1.0, np.nan))}
+        for name in ('T', 'h', 's', 'v'):
+            result[name] = np.where(valid, out[name], np.nan)
+        result['P'] = np.where(valid, P, np.nan)
+        return result
+
+    def state_ps(self, P, s):
+        """
+        Two-phase or superheated state from pressure and entropy
+
+        Parameters:
+        P: Pressure (MPa), scalar or array
+        s: Entropy (kJ/kg·K), scalar or array
+
+        Returns:
+        dict: Arrays of P, T, h, s, v and x (1 for superheated vapour);
+              NaN for subcooled states or outside the tables
+        """
+        return self._state(P, s, 's')
+
+    def state_ph(self, P, h):
+        """
+        Two-phase or superheated state from pressure and enthalpy
+
+        Parameters:
+        P: Pressure (MPa), scalar or array
+        h: Enthalpy (kJ/kg), scalar or array
+
+        Returns:
+        dict: Arrays of P, T, h, s, v and x (1 for superheated vapour);
+              NaN for subcooled states or outside the tables
+        """
+        return self._state(P, h, 'h')
+
+
+_tables = {}
+
+
+def get_refrigerant(name):
+    """
+    Get the shared, loaded RefrigerantTables instance of a refrigerant
+
+    Parameters:
+    name: 'R134a', 'R410A', 'R717' or 'R744'
+
+    Returns:
+    RefrigerantTables: Loaded tables
+    """
+    if name not in _tables:
+        _tables[name] = RefrigerantTables(name).load()
+    return _tables[name]
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Binary Interaction Parameter Regression
+Levenberg-Marquardt fits of Wilson and NRTL parameters to isothermal or
+isobaric VLE data (P, x1, y1) with the modified Raoult's law, analytic
+Jacobians, process-pool multi-start and linearized confidence intervals
+@author: Bryan Piguave Llano
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import stats
+from scipy.optimize import least_squares
+
+from .activity_models import NRTL, Wilson
+
+REGRESSION_MODELS = ('wilson', 'nrtl')
+# Ranges the multi-start points are drawn from (fitted variables)
+START_RANGES = {
+    'ln_A': (-3.0, 1.0),       # Wilson ln Λ
+    'tau': (-1.0, 3.0),        # NRTL τ
+    'alpha': (0.2, 0.47),      # NRTL α
+}
+
+
+def _wilson_terms(theta, x):
+    """
+    Wilson ln γ (m, 2) from activity_models.Wilson and its derivatives
+    (m, 2, 2) with respect to θ = (ln Λ12, ln Λ21)
+    """
+    L12, L21 = np.exp(theta)
+    ln_gamma = Wilson(Lambda=[[1.0, L12], [L21, 1.0]]).ln_gamma(x)
+    x1, x2 = x[:, 0], x[:, 1]
+    S1 = x1 + L12 * x2
+    S2 = x2 + L21 * x1
+    d = np.empty(x1.shape + (2, 2))
+    d[:, 0, 0] = -L12 * x2 ** 2 / S1 ** 2
+    d[:, 0, 1] = -x2 ** 2 / S2 ** 2
+    d[:, 1, 0] = -x1 ** 2 / S1 ** 2
+    d[:, 1, 1] = -L21 * x1 ** 2 / S2 ** 2
+    return ln_gamma, d * np.array([L12, L21])
+
+
+def _nrtl_terms(theta, x, alpha=None):
+    """
+    NRTL ln γ (m, 2) from activity_models.NRTL and its derivatives (m, 2, p)
+    with respect to θ = (τ12, τ21) or (τ12, τ21, α12) when alpha is None
+    """
+    tau12, tau21 = theta[0], theta[1]
+    fit_alpha = alpha is None
+    if fit_alpha:
+        alpha = theta[2]
+    ln_gamma = NRTL(tau=[[0.0, tau12], [tau21, 0.0]], alpha=alpha).ln_gamma(x)
+    x1, x2 = x[:, 0], x[:, 1]
+    G12, G21 = np.exp(-alpha * tau12), np.exp(-alpha * tau21)
+    A = G21 / (x1 + x2 * G21)
+    B = G12 / (x2 + x1 * G12)
+
+    # dA/dG21 = x1 A²/G21², dB/dG12 = x2 B²/G12², with dG/dτ = -α G, dG/dα = -τ G
+    dA = -x1 * A ** 2 / G21           # dA/dτ21 per unit α, dA/dα per unit τ21
+    dB = -x2 * B ** 2 / G12
+    d = np.zeros(x1.shape + (2, 3 if fit_alpha else 2))
+    # τ12
+    d[:, 0, 0] = x2 ** 2 * (B ** 2 / G12 + tau12 * (2 * B * alpha * dB + alpha * B ** 2) / G12)
+    d[:, 1, 0] = x1 ** 2 * (B ** 2 + 2 * tau12 * B * alpha * dB)
+    # τ21
+    d[:, 0, 1] = x2 ** 2 * (A ** 2 + 2 * tau21 * A * alpha * dA)
+    d[:, 1, 1] = x1 ** 2 * (A ** 2 / G21 + tau21 * (2 * A * alpha * dA + alpha * A ** 2) / G21)
+    if fit_alpha:
+        d[:, 0, 2] = x2 ** 2 * (2 * tau21 ** 2 * A * dA
+                                + tau12 ** 2 * (2 * B * dB + B ** 2) / G12)
+        d[:, 1, 2] = x1 ** 2 * (2 * tau12 ** 2 * B * dB
+                                + tau21 ** 2 * (2 * A * dA + A ** 2) / G21)
+    return ln_gamma, d
+
+
+def _terms(problem, theta):
+    if problem['model'] == 'wilson':
+        return _wilson_terms(theta, problem['x'])
+    return _nrtl_terms(theta, problem['x'], problem['alpha12'])
+
+
+def _residuals(theta, problem):
+    """Weighted residuals: ln(P_calc/P)/σ_P for every point, then (y1_calc - y1)/σ_y"""
+    ln_gamma, _ = _terms(problem, theta)
+    p = problem['x'] * np.exp(ln_gamma) * problem['P_sat']
+    P_calc = p.sum(axis=-1)
+    r_P = np.log(P_calc / problem['P']) / problem['sigma_P']
+    r_y = np.where(problem['has_y'], p[:, 0] / P_calc - problem['y1'], 0.0) / problem['sigma_y']
+    return np.concatenate([r_P, r_y])
+
+
+def _jacobian(theta, problem):
+    """
+    Analytic Jacobian of _residuals: d ln P_calc = Σ_i y_i d ln γ_i and
+    d y1 = y1 (d ln γ1 - d ln P_calc)
+    """
+    ln_gamma, d = _terms(problem, theta)
+    p = problem['x'] * np.exp(ln_gamma) * problem['P_sat']
+    y = p / p.sum(axis=-1, keepdims=True)
+    d_ln_P = np.einsum('mi,mip->mp', y, d)
+    d_y1 = y[:, :1] * (d[:, 0] - d_ln_P)
+    d_y1[~problem['has_y']] = 0.0
+    return np.concatenate([d_ln_P / problem['sigma_P'], d_y1 / problem['sigma_y']])
+
+
+def _fit_start(problem, theta0):
+    """Levenberg-Marquardt from one starting point (runs in a worker process)"""
+    with np.errstate(all='ignore'):
+        fit = least_squares(_residuals, theta0, jac=_jacobian, args=(problem,), method='lm',
+                            xtol=1e-12, ftol=1e-12, max_nfev=200 * len(theta0))
+    return {'theta': fit.x, 'cost': fit.cost if np.isfinite(fit.cost) else np.inf,
+            'success': bool(fit.success), 'evaluations': int(fit.nfev)}
+
+
+def _starting_points(model, n_starts, fit_alpha, initial, seed):
+    if model == 'wilson':
+        names = ['ln_A', 'ln_A']
+    else:
+        names = ['tau', 'tau', 'alpha'] if fit_alpha else ['tau', 'tau']
+    rng = np.random.default_rng(seed)
+    low, high = np.array([START_RANGES[name] for name in names]).T
+    starts = low + (high - low) * rng.random((n_starts, len(names)))
+    if initial is not None:
+        starts[0] = initial
+    return starts
+
+
+def fit_binary_parameters(x1, y1, P, P_sat_1, P_sat_2, model='wilson', alpha12=0.3,
+                          fit_alpha=False, sigma_P=0.01, sigma_y=0.01, initial=None,
+                          n_starts=8, n_workers=None, confidence=0.95, seed=0):
+    """
+    Fit binary Wilson (A12, A21) or NRTL (tau12, tau21[, alpha12]) parameters
+    to VLE data
+
+    The residuals of all points are evaluated at once: relative errors of the
+    bubble pressure P = Σ x_i γ_i P_sat_i and absolute errors of the vapour
+    composition, each divided by its standard deviation. Every start is a
+    Levenberg-Marquardt run with the analytic Jacobian; starts run in a
+    process pool and the lowest cost wins. Wilson parameters are fitted as
+    ln Λ, which keeps them positive, so their confidence intervals are
+    asymmetric.
+
+    Parameters:
+    x1: Liquid mole fractions of component 1, shape (m,)
+    y1: Vapour mole fractions of component 1, shape (m,); NaN where not measured
+    P: Measured pressures (Pa), shape (m,) or scalar
+    P_sat_1, P_sat_2: Saturation pressures (Pa) at each point's temperature
+                      (the parameters themselves are temperature independent,
+                      as in PhaseEquilibrium)
+    model: 'wilson' or 'nrtl'
+    alpha12: Fixed NRTL non-randomness (initial value when fit_alpha)
+    fit_alpha: Also fit alpha12 (NRTL)
+    sigma_P: Standard deviation of ln P (relative pressure error)
+    sigma_y: Standard deviation of y1
+    initial: Optional first starting point, in model parameters
+    n_starts: Number of starting points
+    n_workers: Worker processes (default: CPU count, at most n_starts; 1 runs
+               in the calling process)
+    confidence: Confidence level of the parameter intervals
+    seed: Seed of the random starting points
+
+    Returns:
+    dict: parameters (dict name -> value), standard_errors,
+          confidence_intervals (name -> (low, high)), covariance (of the
+          fitted variables), rmse_P (relative), rmse_y, cost, success,
+          n_points, dof and starts (cost and parameters of every start)
+    """
+    if model not in REGRESSION_MODELS:
+        raise ValueError(f"Unknown model '{model}'; use one of {REGRESSION_MODELS}")
+    x1 = np.asarray(x1, dtype=float)
+    m = x1.size
+    y1 = np.broadcast_to(np.asarray(y1 if y1 is not None else np.nan, dtype=float), (m,))
+    P_sat = np.stack([np.broadcast_to(np.asarray(P_sat_1, dtype=float), (m,)),
+                      np.broadcast_to(np.asarray(P_sat_2, dtype=float), (m,))], axis=-1)
+    fit_alpha = fit_alpha and model == 'nrtl'
+    problem = {
+        'model': model,
+        'x': np.stack([x1, 1 - x1], axis=-1),
+        'y1': np.nan_to_num(y1),
+        'has_y': np.isfinite(y1),
+        'P': np.broadcast_to(np.asarray(P, dtype=float), (m,)),
+        'P_sat': P_sat,
+        'sigma_P': sigma_P,
+        'sigma_y': sigma_y,
+        'alpha12': None if fit_alpha or model == 'wilson' else alpha12,
+    }
+    if model == 'wilson':
+        names = ('A12', 'A21')
+    else:
+        names = ('tau12', 'tau21', 'alpha12') if fit_alpha else ('tau12', 'tau21')
+    n_residuals = m + int(problem['has_y'].sum())
+    if n_residuals <= len(names):
+        raise ValueError(f"{n_residuals} residuals cannot determine {len(names)} parameters")
+
+    if initial is not None:
+        initial = np.asarray(initial, dtype=float)
+        if model == 'wilson':
+            initial = np.log(initial)
+    elif fit_alpha:
+        initial = np.array([1.0, 1.0, alpha12])
+    starts = _starting_points(model, n_starts, fit_alpha, initial, seed)
+
+    if n_workers is None:
+        n_workers = min(os.cpu_count() or 1, n_starts)
+    if n_workers == 1 or n_starts == 1:
+        fits = [_fit_start(problem, theta0) for theta0 in starts]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            fits = list(executor.map(_fit_start, [problem] * n_starts, starts))
+    best = min(fits, key=lambda fit: fit['cost'])
+    theta = best['theta']
+
+    # Linearized covariance, scaled by the residual variance
+    residuals = _residuals(theta, problem)
+    J = _jacobian(theta, problem)
+    keep = np.concatenate([np.ones(m, dtype=bool), problem['has_y']])
+    dof = n_residuals - len(names)
+    variance = np.sum(residuals[keep] ** 2) / dof
+    covariance = variance * np.linalg.pinv(J[keep].T @ J[keep])
+    se = np.sqrt(np.diag(covariance))
+    t = stats.t.ppf(0.5 + confidence / 2, dof)
+
+    values = np.exp(theta) if model == 'wilson' else theta
+    if model == 'wilson':
+        standard_errors = values * se
+        intervals = np.stack([np.exp(theta - t * se), np.exp(theta + t * se)], axis=-1)
+    else:
+        standard_errors = se
+        intervals = np.stack([theta - t * se, theta + t * se], axis=-1)
+    r_P = residuals[:m] * sigma_P
+    r_y = residuals[m:][problem['has_y']] * sigma_y
+
+    return {
+        'parameters': dict(zip(names, values)),
+        'standard_errors': dict(zip(names, standard_errors)),
+        'confidence_intervals': {name: tuple(interval) for name, interval in zip(names, intervals)},
+        'covariance': covariance,
+        'rmse_P': np.sqrt(np.mean(r_P ** 2)),
+        'rmse_y': np.sqrt(np.mean(r_y ** 2)) if r_y.size else np.nan,
+        'cost': best['cost'],
+        'success': best['success'],
+        'n_points': m,
+        'dof': dof,
+        'starts': [{'cost': fit['cost'],
+                    'parameters': np.exp(fit['theta']) if model == 'wilson' else fit['theta']}
+                   for fit in fits],
+    }
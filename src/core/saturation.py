@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Saturation Line Tables for Water and Steam
+Monotone spline interpolants of the IF97 saturated-liquid and saturated-vapour
+properties for fast (P, x) and (T, x) states and saturation-dome plots
+@author: Bryan Piguave Llano
+"""
+
+from bisect import bisect_right
+from math import exp
+from pathlib import Path
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator, PPoly
+import iapws
+from iapws._iapws import Tc
+
+from .if97_vectorized import (steam_properties_batch, region1, region2,
+                              saturation_pressure, saturation_temperature, T_13)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+TABLE_VERSION = 2
+T_TRIPLE = 273.16  # K
+# Interpolated columns; specific volumes are interpolated as log(v)
+SAT_KEYS = ('h_f', 'h_g', 's_f', 's_g', 'logv_f', 'logv_g')
+# Steam state cache tag of the states served by SaturationTables.state
+SATURATION_TABLE_TAG = 'saturation-table'
+# Fractions of each grid interval where the interpolation error is measured
+ERROR_POINTS = (0.25, 0.5, 0.75)
+
+
+def _interpolant(T, Y):
+    """
+    PCHIP of the table columns with a break at 623.15 K
+
+    Above 623.15 K the exact values come from region 3 instead of regions 1
+    and 2, so the two sides are interpolated separately (neither side's
+    slopes see the other) and joined into one piecewise polynomial.
+    """
+    k = int(np.searchsorted(T, T_13))
+    if k == 0 or k >= T.size - 1:
+        return PchipInterpolator(T, Y, axis=0)
+    low = PchipInterpolator(T[:k + 1], Y[:k + 1], axis=0)
+    high = PchipInterpolator(T[k:], Y[k:], axis=0)
+    return PPoly(np.concatenate([low.c, high.c], axis=1), T)
+
+
+class SaturationTables:
+    """
+    Saturated-liquid and saturated-vapour properties of water on a dense
+    temperature grid, interpolated with monotone (PCHIP) splines
+
+    Psat(T) and Tsat(P) use the closed-form IF97 region 4 equation, which
+    is exact and cheaper than any interpolant. Every grid interval carries
+    the largest interpolation error measured at the ERROR_POINTS inside it;
+    states in intervals that miss the tolerance (just above 623.15 K and
+    close to the critical point) come back as NaN so callers can fall back
+    to IAPWS97.
+    """
+
+    def __init__(self, dT=0.25, n_near_critical=150, tolerance=1e-6, data_dir=DATA_DIR):
+        """
+        Parameters:
+        dT: Grid spacing below 623.15 K (K)
+        n_near_critical: Grid points between 623.15 K and the critical point,
+                         clustered towards Tc
+        tolerance: Accuracy target (relative error) for fast lookups
+        data_dir: Directory where the built table is stored
+        """
+        self.dT = dT
+        self.n_near_critical = n_near_critical
+        self.tolerance = tolerance
+        self.path = Path(data_dir) / 'saturation_tables.npz'
+        self._data = None
+        self._props = None
+        self._T_list = []
+
+    def load(self, rebuild=False):
+        """
+        Load the table from disk, building and saving it if needed
+
+        Parameters:
+        rebuild: Force a rebuild even if a stored table exists
+
+        Returns:
+        SaturationTables: self
+        """
+        data = None
+        if not rebuild and self.path.exists():
+            with np.load(self.path) as stored:
+                data = {key: stored[key] for key in stored.files}
+            if (int(data['version']) != TABLE_VERSION
+                    or str(data['iapws_version']) != iapws.__version__
+                    or float(data['dT']) != self.dT
+                    or int(data['n_near_critical']) != self.n_near_critical):
+                data = None
+        if data is None:
+            data = self._build()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                np.savez_compressed(self.path, **data)
+            except OSError:
+                pass  # Read-only install: keep the table in memory only
+        self._data = data
+        self._props = _interpolant(data['T'], data['Y'])
+        self._T_list = data['T'].tolist()
+        return self
+
+    def _exact(self, T):
+        """Exact saturated properties at temperatures T (columns of SAT_KEYS)"""
+        P = saturation_pressure(T)
+        low = T <= T_13
+        Y = np.empty((T.size, len(SAT_KEYS)))
+        if np.any(low):
+            liq = region1(T[low], P[low])
+            vap = region2(T[low], P[low])
+            Y[low] = np.column_stack([liq['h'], vap['h'], liq['s'], vap['s'],
+                                      np.log(liq['v']), np.log(vap['v'])])
+        if np.any(~low):
+            liq = steam_properties_batch(P[~low], x=0)
+            vap = steam_properties_batch(P[~low], x=1)
+            Y[~low] = np.column_stack([liq['h'], vap['h'], liq['s'], vap['s'],
+                                       np.log(liq['v']), np.log(vap['v'])])
+        return Y
+
+    def _build(self):
+        """Evaluate IF97 on the grid and measure the interpolation error"""
+        T_low = np.append(np.arange(T_TRIPLE, T_13, self.dT), T_13)
+        u = np.linspace(0, 1, self.n_near_critical + 1)[1:]
+        T_top = Tc - 1e-3
+        T_high = T_13 + (T_top - T_13) * (1 - (1 - u) ** 2)
+        T = np.concatenate([T_low, T_high])
+        Y = self._exact(T)
+
+        # Error of every grid interval, the largest at the ERROR_POINTS
+        props = _interpolant(T, Y)
+        error = np.zeros(T.size - 1)
+        for fraction in ERROR_POINTS:
+            T_in = T[:-1] + fraction * np.diff(T)
+            exact = self._exact(T_in)
+            scale = np.maximum(np.abs(exact), 1e-2 * np.abs(Y).max(axis=0))
+            error = np.maximum(error, (np.abs(props(T_in) - exact) / scale).max(axis=1))
+        return {
+            'version': np.array(TABLE_VERSION),
+            'iapws_version': np.array(iapws.__version__),
+            'dT': np.array(self.dT),
+            'n_near_critical': np.array(self.n_near_critical),
+            'T': T,
+            'Y': Y,
+            'error': np.nan_to_num(error, nan=np.inf),
+        }
+
+    def saturation_pressure(self, T):
+        """
+        Saturation pressure (MPa) at temperature T (K), scalar or array
+        """
+        return saturation_pressure(T)
+
+    def saturation_temperature(self, P):
+        """
+        Saturation temperature (K) at pressure P (MPa), scalar or array
+        """
+        return saturation_temperature(P)
+
+    def properties(self, x, P=None, T=None):
+        """
+        Saturated or two-phase properties by lever-rule mixing
+
+        Parameters:
+        x: Quality (0-1), scalar or array
+        P: Pressure (MPa), scalar or array
+        T: Temperature (K), scalar or array (used when P is None)
+
+        Returns:
+        dict: Arrays of P, T, v, h, s, u, x plus the saturated-liquid and
+              saturated-vapour columns (h_f, h_g, s_f, s_g, v_f, v_g);
+              NaN outside the saturation line or in intervals that miss
+              the tolerance
+        """
+        if self._props is None:
+            self.load()
+        if P is not None:
+            P, x = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(x, dtype=float))
+            T = saturation_temperature(P)
+        else:
+            T, x = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(x, dtype=float))
+            P = saturation_pressure(T)
+        T_grid = self._data['T']
+        valid = (T >= T_TRIPLE) & (T <= T_grid[-1]) & (x >= 0) & (x <= 1)
+        i = np.clip(np.searchsorted(T_grid, T) - 1, 0, T_grid.size - 2)
+        valid &= self._data['error'][i] <= self.tolerance
+        Y = self._props(np.where(valid, T, T_TRIPLE))
+        Y[~valid] = np.nan
+        cols = {key: Y[..., i] for i, key in enumerate(SAT_KEYS)}
+        v_f = np.exp(cols['logv_f'])
+        v_g = np.exp(cols['logv_g'])
+        result = {
+            'P': np.where(valid, P, np.nan),
+            'T': np.where(valid, T, np.nan),
+            'v': v_f + x * (v_g - v_f),
+            'h': cols['h_f'] + x * (cols['h_g'] - cols['h_f']),
+            's': cols['s_f'] + x * (cols['s_g'] - cols['s_f']),
+            'x': np.where(valid, x, np.nan),
+            'h_f': cols['h_f'], 'h_g': cols['h_g'],
+            's_f': cols['s_f'], 's_g': cols['s_g'],
+            'v_f': v_f, 'v_g': v_g,
+        }
+        result['u'] = result['h'] - P * 1000 * result['v']
+        return result
+
+    def state(self, x, P=None, T=None):
+        """
+        Single saturated or two-phase state in the steam_properties layout
+
+        Parameters:
+        x: Quality (0-1)
+        P: Pressure (MPa)
+        T: Temperature (K) (used when P is None)
+
+        Returns:
+        dict: P, T, v, h, s, u, x and phase, or None when the state is
+              outside the accurate part of the table and IAPWS97 should
+              be used instead
+        """
+        if self._props is None:
+            self.load()
+        x = float(x)
+        if not 0 <= x <= 1:
+            return None
+        if P is not None:
+            P = float(P)
+            T = float(saturation_temperature(P))
+        else:
+            T = float(T)
+            P = float(saturation_pressure(T))
+        T_grid = self._T_list
+        if not T_grid[0] <= T <= T_grid[-1]:
+            return None
+        i = min(bisect_right(T_grid, T) - 1, len(T_grid) - 2)
+        if self._data['error'][i] > self.tolerance:
+            return None
+
+        # Evaluate the PCHIP piece of interval i directly (scalar fast path)
+        c = self._props.c[:, i, :]
+        d = T - T_grid[i]
+        h_f, h_g, s_f, s_g, logv_f, logv_g = (((c[0] * d + c[1]) * d + c[2]) * d + c[3]).tolist()
+        v_f = exp(logv_f)
+        v = v_f + x * (exp(logv_g) - v_f)
+        h = h_f + x * (h_g - h_f)
+        if x == 0:
+            phase = 'Liquid'
+        elif x == 1:
+            phase = 'Vapour'
+        else:
+            phase = 'Two phases'
+        return {
+            'P': P,
+            'T': T,
+            'v': v,
+            'h': h,
+            's': s_f + x * (s_g - s_f),
+            'u': h - P * 1000 * v,
+            'x': x,
+            'phase': phase
+        }
+
+    def dome(self, n_points=200):
+        """
+        Saturation dome for T-s and P-h diagrams
+
+        Parameters:
+        n_points: Number of points on each branch
+
+        Returns:
+        dict: Arrays T (K), P (MPa), s_f, s_g (kJ/kg·K), h_f, h_g (kJ/kg)
+              from the triple point up to the end of the table
+        """
+        if self._props is None:
+            self.load()
+        T_grid = self._data['T']
+        T = np.linspace(T_TRIPLE, T_grid[-1], n_points)
+        Y = self._props(T)
+        return {
+            'T': T,
+            'P': saturation_pressure(T),
+            'h_f': Y[:, 0], 'h_g': Y[:, 1],
+            's_f': Y[:, 2], 's_g': Y[:, 3],
+        }
+
+
+_saturation_tables = None
+
+
+def get_saturation_tables():
+    """
+    Get the shared SaturationTables instance, loading it on first use
+
+    Returns:
+    SaturationTables: Loaded tables
+    """
+    global _saturation_tables
+    if _saturation_tables is None:
+        _saturation_tables = SaturationTables().load()
+    return _saturation_tables
@@ -0,0 +1,520 @@
+# -*- coding: utf-8 -*-
+"""
+Tabulated IAPWS-IF97 Steam Property Backend
+Bicubic interpolation tables on log(P) x h and log(P) x s grids
+@author: Bryan Piguave Llano
+"""
+
+from bisect import bisect_right
+from math import exp, log
+from pathlib import Path
+
+import numpy as np
+from scipy.interpolate import CubicSpline, RectBivariateSpline
+import iapws
+from iapws._iapws import Tc, Pc
+
+from .if97_vectorized import (steam_properties_batch, region1, region2,
+                              saturation_temperature, P_MAX, T_MIN, T_13, T_25)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+TABLE_VERSION = 1
+P_TABLE_MIN = 1e-3  # Lowest tabulated pressure (MPa)
+FAMILIES = ('h', 's')
+TABLES = ('liquid', 'vapour', 'supercritical')
+
+# Maps corner values and scaled derivatives of a unit cell to the
+# coefficients of the bicubic polynomial
+_BICUBIC_M = np.array([[1., 0., 0., 0.],
+                       [0., 0., 1., 0.],
+                       [-3., 3., -2., -1.],
+                       [2., -2., 1., 1.]])
+
+
+class _Cubic:
+    """Piecewise cubic in one variable with a pure-Python scalar path"""
+
+    def __init__(self, x, f):
+        spline = CubicSpline(x, f)
+        self.x = np.asarray(x, dtype=float)
+        self.c = spline.c
+        self._x_list = self.x.tolist()
+        self._c_list = spline.c.T.tolist()
+
+    def __call__(self, xq):
+        i = np.clip(np.searchsorted(self.x, xq) - 1, 0, self.x.size - 2)
+        d = xq - self.x[i]
+        c = self.c[:, i]
+        return ((c[0] * d + c[1]) * d + c[2]) * d + c[3]
+
+    def scalar(self, xq):
+        i = min(max(bisect_right(self._x_list, xq) - 1, 0), len(self._c_list) - 1)
+        d = xq - self._x_list[i]
+        c0, c1, c2, c3 = self._c_list[i]
+        return ((c0 * d + c1) * d + c2) * d + c3
+
+
+class _Bicubic:
+    """
+    Bicubic interpolant stored as one 4x4 coefficient block per cell,
+    with corner derivatives taken from a cubic tensor-product spline
+    """
+
+    def __init__(self, x, y, f):
+        spline = RectBivariateSpline(x, y, f, kx=3, ky=3)
+        fx = spline(x, y, dx=1)
+        fy = spline(x, y, dy=1)
+        fxy = spline(x, y, dx=1, dy=1)
+        hx = np.diff(x)[:, None]
+        hy = np.diff(y)[None, :]
+        F = np.empty((x.size - 1, y.size - 1, 4, 4))
+        for p in (0, 1):
+            for q in (0, 1):
+                corner = (slice(p, x.size - 1 + p), slice(q, y.size - 1 + q))
+                F[..., p, q] = f[corner]
+                F[..., p, q + 2] = fy[corner] * hy
+                F[..., p + 2, q] = fx[corner] * hx
+                F[..., p + 2, q + 2] = fxy[corner] * hx * hy
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.coef = _BICUBIC_M @ F @ _BICUBIC_M.T
+        self._x_list = self.x.tolist()
+        self._y_list = self.y.tolist()
+        self._coef_list = self.coef.tolist()
+
+    def __call__(self, xq, yq):
+        i = np.clip(np.searchsorted(self.x, xq) - 1, 0, self.x.size - 2)
+        j = np.clip(np.searchsorted(self.y, yq) - 1, 0, self.y.size - 2)
+        t = (xq - self.x[i]) / (self.x[i + 1] - self.x[i])
+        u = (yq - self.y[j]) / (self.y[j + 1] - self.y[j])
+        tp = np.stack([np.ones_like(t), t, t ** 2, t ** 3], axis=-1)
+        up = np.stack([np.ones_like(u), u, u ** 2, u ** 3], axis=-1)
+        return np.einsum('np,npq,nq->n', tp, self.coef[i, j], up)
+
+    def scalar(self, xq, yq):
+        xs, ys = self._x_list, self._y_list
+        i = min(max(bisect_right(xs, xq) - 1, 0), len(xs) - 2)
+        j = min(max(bisect_right(ys, yq) - 1, 0), len(ys) - 2)
+        t = (xq - xs[i]) / (xs[i + 1] - xs[i])
+        u = (yq - ys[j]) / (ys[j + 1] - ys[j])
+        value = 0.0
+        for row in reversed(self._coef_list[i][j]):
+            value = value * t + (((row[3] * u + row[2]) * u + row[1]) * u + row[0])
+        return value
+
+
+class SteamTables:
+    """
+    Interpolation tables for IAPWS-IF97 (P, h) and (P, s) lookups
+
+    Each table is a bicubic spline over log(P) and a normalized coordinate
+    xi in [0, 1] that spans the single-phase region between two boundary
+    curves. Subcritical liquid and vapour tables end exactly on the
+    saturation line, so no spline crosses the kink at the dome; two-phase
+    states are served by lever-rule mixing of 1-D saturation splines.
+    Every table cell carries the interpolation error measured at its
+    centre, so the accuracy target can be changed without a rebuild.
+    """
+
+    def __init__(self, n_pressure=120, n_xi=80, tolerance=1e-4, critical_margin=0.05,
+                 data_dir=DATA_DIR):
+        """
+        Parameters:
+        n_pressure: Number of log-spaced pressure nodes between P_TABLE_MIN
+                    and P_MAX
+        n_xi: Number of nodes across each single-phase table
+        tolerance: Accuracy target (maximum relative error of T, v, h, s);
+                   cells that miss it fall back to the exact calculation
+        critical_margin: Relative pressure band around Pc that is never
+                         tabulated
+        data_dir: Directory where built tables are stored
+        """
+        self.n_pressure = n_pressure
+        self.n_xi = n_xi
+        self.tolerance = tolerance
+        self.critical_margin = critical_margin
+        self.path = Path(data_dir) / f'steam_tables_{n_pressure}x{n_xi}.npz'
+        self.P_sub_max = Pc * (1 - critical_margin)
+        self.P_sup_min = Pc * (1 + critical_margin)
+        self._splines = {}
+        self._logP_sub = []
+        self._data = None
+
+    # ------------------------------------------------------------------
+    # Building and storage
+    # ------------------------------------------------------------------
+
+    def load(self, rebuild=False):
+        """
+        Load the tables from disk, building and saving them if needed
+
+        Parameters:
+        rebuild: Force a rebuild even if a stored table exists
+
+        Returns:
+        SteamTables: self
+        """
+        data = None
+        if not rebuild and self.path.exists():
+            with np.load(self.path) as stored:
+                data = {key: stored[key] for key in stored.files}
+            if (int(data['version']) != TABLE_VERSION
+                    or str(data['iapws_version']) != iapws.__version__
+                    or float(data['critical_margin']) != self.critical_margin):
+                data = None
+        if data is None:
+            data = self._build()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                np.savez_compressed(self.path, **data)
+            except OSError:
+                pass  # Read-only install: keep the tables in memory only
+        self._data = data
+        self._make_splines()
+        return self
+
+    def _pressure_nodes(self):
+        """Log-spaced pressure nodes for the subcritical and supercritical tables"""
+        grid = np.geomspace(P_TABLE_MIN, P_MAX, self.n_pressure)
+        sub = np.append(grid[grid < self.P_sub_max], self.P_sub_max)
+        sup = np.insert(grid[grid > self.P_sup_min], 0, self.P_sup_min)
+        return sub, sup
+
+    def _bounds(self, table, family, P):
+        """Exact lower and upper boundary of a table at pressures P"""
+        y_min = region1(np.full(P.shape, T_MIN), P)[family]
+        y_max = region2(np.full(P.shape, T_25), P)[family]
+        if table == 'liquid':
+            return y_min, steam_properties_batch(P, x=0)[family]
+        if table == 'vapour':
+            return steam_properties_batch(P, x=1)[family], y_max
+        return y_min, y_max
+
+    def _build(self):
+        """Evaluate IF97 on every table node and measure the cell errors"""
+        P_sub, P_sup = self._pressure_nodes()
+        xi = np.linspace(0, 1, self.n_xi)
+        data = {
+            'version': np.array(TABLE_VERSION),
+            'iapws_version': np.array(iapws.__version__),
+            'critical_margin': np.array(self.critical_margin),
+            'xi': xi,
+            'P_sub': P_sub,
+            'P_sup': P_sup,
+        }
+
+        # Saturation line for the two-phase region and the table edges
+        liquid = steam_properties_batch(P_sub, x=0)
+        vapour = steam_properties_batch(P_sub, x=1)
+        for key in ('h', 's'):
+            data[f'sat_{key}_f'] = liquid[key]
+            data[f'sat_{key}_g'] = vapour[key]
+        data['sat_logv_f'] = np.log(liquid['v'])
+        data['sat_logv_g'] = np.log(vapour['v'])
+
+        for family in FAMILIES:
+            other = 's' if family == 'h' else 'h'
+            for table in TABLES:
+                P = P_sub if table != 'supercritical' else P_sup
+                lo, hi = self._bounds(table, family, P)
+                Y = lo[:, None] + xi[None, :] * (hi - lo)[:, None]
+                state = steam_properties_batch(P[:, None], **{family: Y})
+                prefix = f'{family}_{table}'
+                data[f'{prefix}_lo'] = lo
+                data[f'{prefix}_hi'] = hi
+                data[f'{prefix}_T'] = state['T']
+                data[f'{prefix}_logv'] = np.log(state['v'])
+                data[f'{prefix}_{other}'] = state[other]
+
+        self._data = data
+        self._make_splines()
+        for family in FAMILIES:
+            for table in TABLES:
+                data[f'{family}_{table}_error'] = self._cell_errors(family, table)
+        data['sat_error'] = self._saturation_errors()
+        return data
+
+    def _make_splines(self):
+        """Create the interpolants from the stored node values"""
+        data = self._data
+        xi = data['xi']
+        logP = {'sub': np.log(data['P_sub']), 'sup': np.log(data['P_sup'])}
+        splines = {}
+        for key in ('h_f', 'h_g', 's_f', 's_g', 'logv_f', 'logv_g'):
+            splines[f'sat_{key}'] = _Cubic(logP['sub'], data[f'sat_{key}'])
+        for family in FAMILIES:
+            other = 's' if family == 'h' else 'h'
+            for table in TABLES:
+                lp = logP['sup'] if table == 'supercritical' else logP['sub']
+                prefix = f'{family}_{table}'
+                splines[f'{prefix}_lo'] = _Cubic(lp, data[f'{prefix}_lo'])
+                splines[f'{prefix}_hi'] = _Cubic(lp, data[f'{prefix}_hi'])
+                for key in ('T', 'logv', other):
+                    splines[f'{prefix}_{key}'] = _Bicubic(lp, xi, data[f'{prefix}_{key}'])
+        self._splines = splines
+        self._logP_sub = logP['sub'].tolist()
+
+    def _cell_errors(self, family, table):
+        """Maximum relative error of the interpolation at each cell centre"""
+        data = self._data
+        P_nodes = data['P_sup'] if table == 'supercritical' else data['P_sub']
+        P_mid = np.sqrt(P_nodes[:-1] * P_nodes[1:])
+        xi = data['xi']
+        xi_mid = 0.5 * (xi[:-1] + xi[1:])
+        P = np.repeat(P_mid, xi_mid.size)
+        XI = np.tile(xi_mid, P_mid.size)
+        lo = self._splines[f'{family}_{table}_lo'](np.log(P))
+        hi = self._splines[f'{family}_{table}_hi'](np.log(P))
+        y = lo + XI * (hi - lo)
+        approx = self._interpolate(family, table, P, y)
+        exact = steam_properties_batch(P, **{family: y})
+        error = np.zeros(P.shape)
+        for key in ('T', 'v', 'h', 's'):
+            rel = np.abs(approx[key] - exact[key]) / np.maximum(np.abs(exact[key]), 1e-3)
+            error = np.maximum(error, np.nan_to_num(rel, nan=np.inf))
+        return error.reshape(P_mid.size, xi_mid.size)
+
+    def _saturation_errors(self):
+        """Maximum relative error of the saturation splines between nodes"""
+        P_nodes = self._data['P_sub']
+        P_mid = np.sqrt(P_nodes[:-1] * P_nodes[1:])
+        error = np.zeros(P_mid.shape)
+        for x, tag in ((0, 'f'), (1, 'g')):
+            exact = steam_properties_batch(P_mid, x=x)
+            for key in ('h', 's', 'logv'):
+                approx = self._splines[f'sat_{key}_{tag}'](np.log(P_mid))
+                value = np.log(exact['v']) if key == 'logv' else exact[key]
+                scale = 1.0 if key == 'logv' else np.maximum(np.abs(value), 1e-3)
+                error = np.maximum(error, np.abs(approx - value) / scale)
+        return error
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _interpolate(self, family, table, P, y):
+        """Evaluate one table at arrays of (P, y) inside its bounds"""
+        other = 's' if family == 'h' else 'h'
+        prefix = f'{family}_{table}'
+        logP = np.log(P)
+        lo = self._splines[f'{prefix}_lo'](logP)
+        hi = self._splines[f'{prefix}_hi'](logP)
+        xi = (y - lo) / (hi - lo)
+        T = self._splines[f'{prefix}_T'](logP, xi)
+        result = {
+            'T': T,
+            'v': np.exp(self._splines[f'{prefix}_logv'](logP, xi)),
+            family: np.asarray(y, dtype=float),
+            other: self._splines[f'{prefix}_{other}'](logP, xi),
+        }
+        if table == 'liquid':
+            result['x'] = np.zeros(P.shape)
+        elif table == 'vapour':
+            result['x'] = np.ones(P.shape)
+        else:
+            result['x'] = np.where(T <= T_13, 0.0, 1.0)
+        return result
+
+    def _cell_ok(self, family, table, P, xi):
+        """True where the table cell containing (P, xi) meets the tolerance"""
+        data = self._data
+        P_nodes = data['P_sup'] if table == 'supercritical' else data['P_sub']
+        i = np.clip(np.searchsorted(P_nodes, P) - 1, 0, P_nodes.size - 2)
+        j = np.clip(np.searchsorted(data['xi'], xi) - 1, 0, data['xi'].size - 2)
+        return data[f'{family}_{table}_error'][i, j] <= self.tolerance
+
+    def lookup_batch(self, P, h=None, s=None):
+        """
+        Interpolate properties for arrays of (P, h) or (P, s) states
+
+        Parameters:
+        P: Pressure (MPa), scalar or array
+        h: Enthalpy (kJ/kg), scalar or array
+        s: Entropy (kJ/kg·K), scalar or array
+
+        Returns:
+        dict: Arrays of P, T, v, h, s, u, x and a boolean 'tabulated' mask;
+              entries with tabulated=False must be evaluated exactly
+        """
+        if self._data is None:
+            self.load()
+        family = 'h' if h is not None else 's'
+        P_b, y_b = np.broadcast_arrays(np.asarray(P, dtype=float),
+                                       np.asarray(h if h is not None else s, dtype=float))
+        shape = P_b.shape
+        P_arr = P_b.ravel()
+        y = y_b.ravel()
+        out = {key: np.full(P_arr.size, np.nan) for key in ('T', 'v', 'h', 's', 'x')}
+        tabulated = np.zeros(P_arr.size, dtype=bool)
+
+        sub = (P_arr >= P_TABLE_MIN) & (P_arr <= self.P_sub_max)
+        sup = (P_arr >= self.P_sup_min) & (P_arr <= P_MAX)
+        logP = np.log(np.where(sub, P_arr, P_TABLE_MIN))
+        y_f = self._splines[f'sat_{family}_f'](logP)
+        y_g = self._splines[f'sat_{family}_g'](logP)
+
+        selections = (
+            ('liquid', sub & (y <= y_f)),
+            ('vapour', sub & (y >= y_g)),
+            ('supercritical', sup),
+        )
+        for table, mask in selections:
+            if not np.any(mask):
+                continue
+            idx = np.flatnonzero(mask)
+            prefix = f'{family}_{table}'
+            lp = np.log(P_arr[idx])
+            lo = self._splines[f'{prefix}_lo'](lp)
+            hi = self._splines[f'{prefix}_hi'](lp)
+            xi = (y[idx] - lo) / (hi - lo)
+            inside = (xi >= 0) & (xi <= 1)
+            idx, xi = idx[inside], xi[inside]
+            ok = self._cell_ok(family, table, P_arr[idx], xi)
+            idx = idx[ok]
+            if idx.size == 0:
+                continue
+            values = self._interpolate(family, table, P_arr[idx], y[idx])
+            for key in out:
+                out[key][idx] = values[key]
+            tabulated[idx] = True
+
+        # Two-phase states: lever rule on the saturation splines
+        dome = sub & (y > y_f) & (y < y_g)
+        if np.any(dome):
+            P_nodes = self._data['P_sub']
+            i = np.clip(np.searchsorted(P_nodes, P_arr[dome]) - 1, 0, P_nodes.size - 2)
+            ok = self._data['sat_error'][i] <= self.tolerance
+            idx = np.flatnonzero(dome)[ok]
+            lp = logP[idx]
+            x = (y[idx] - y_f[idx]) / (y_g[idx] - y_f[idx])
+            out['x'][idx] = x
+            out['T'][idx] = saturation_temperature(P_arr[idx])
+            for key in ('h', 's'):
+                f = self._splines[f'sat_{key}_f'](lp)
+                g = self._splines[f'sat_{key}_g'](lp)
+                out[key][idx] = f + x * (g - f)
+            v_f = np.exp(self._splines['sat_logv_f'](lp))
+            v_g = np.exp(self._splines['sat_logv_g'](lp))
+            out['v'][idx] = v_f + x * (v_g - v_f)
+            tabulated[idx] = True
+
+        out['P'] = np.where(tabulated, P_arr, np.nan)
+        out['u'] = out['h'] - P_arr * 1000 * out['v']
+        result = {key: value.reshape(shape) for key, value in out.items()}
+        result['tabulated'] = tabulated.reshape(shape)
+        return result
+
+    def lookup(self, P, h=None, s=None):
+        """
+        Interpolate the properties of a single (P, h) or (P, s) state
+
+        Parameters:
+        P: Pressure (MPa)
+        h: Enthalpy (kJ/kg)
+        s: Entropy (kJ/kg·K)
+
+        Returns:
+        dict: Same keys as ThermodynamicsToolkit.steam_properties, or None
+              when the state is outside the tables or in a cell that misses
+              the accuracy target
+        """
+        if self._data is None:
+            self.load()
+        family = 'h' if h is not None else 's'
+        other = 's' if family == 'h' else 'h'
+        y = float(h if h is not None else s)
+        P = float(P)
+        splines = self._splines
+
+        if P_TABLE_MIN <= P <= self.P_sub_max:
+            lp = log(P)
+            y_f = splines[f'sat_{family}_f'].scalar(lp)
+            y_g = splines[f'sat_{family}_g'].scalar(lp)
+            if y_f < y < y_g:
+                # Two-phase state: lever rule on the saturation splines
+                i = min(max(bisect_right(self._logP_sub, lp) - 1, 0), len(self._logP_sub) - 2)
+                if self._data['sat_error'][i] > self.tolerance:
+                    return None
+                x = (y - y_f) / (y_g - y_f)
+                props = {family: y}
+                f = splines[f'sat_{other}_f'].scalar(lp)
+                props[other] = f + x * (splines[f'sat_{other}_g'].scalar(lp) - f)
+                v_f = exp(splines['sat_logv_f'].scalar(lp))
+                v = v_f + x * (exp(splines['sat_logv_g'].scalar(lp)) - v_f)
+                T = float(saturation_temperature(P))
+                return self._state_dict(P, T, v, props['h'], props['s'], x, 'Two phases')
+            table = 'liquid' if y <= y_f else 'vapour'
+        elif self.P_sup_min <= P <= P_MAX:
+            lp = log(P)
+            table = 'supercritical'
+        else:
+            return None
+
+        prefix = f'{family}_{table}'
+        lo = splines[f'{prefix}_lo'].scalar(lp)
+        hi = splines[f'{prefix}_hi'].scalar(lp)
+        xi = (y - lo) / (hi - lo)
+        if not 0 <= xi <= 1:
+            return None
+        T_spline = splines[f'{prefix}_T']
+        i = min(max(bisect_right(T_spline._x_list, lp) - 1, 0), len(T_spline._x_list) - 2)
+        j = min(int(xi * (self.n_xi - 1)), self.n_xi - 2)
+        if self._data[f'{prefix}_error'][i, j] > self.tolerance:
+            return None
+
+        T = T_spline.scalar(lp, xi)
+        v = exp(splines[f'{prefix}_logv'].scalar(lp, xi))
+        props = {family: y, other: splines[f'{prefix}_{other}'].scalar(lp, xi)}
+        if table == 'liquid':
+            x, phase = 0.0, 'Liquid'
+        elif table == 'vapour':
+            # Named like IAPWS97: above Tc a subcritical-pressure state is a gas
+            x, phase = 1.0, 'Gas' if T > Tc else 'Vapour'
+        else:
+            x = 0.0 if T <= T_13 else 1.0
+            phase = 'Supercritical fluid' if T > Tc else 'Compressible liquid'
+        return self._state_dict(P, T, v, props['h'], props['s'], x, phase)
+
+    @staticmethod
+    def _state_dict(P, T, v, h, s, x, phase):
+        """Assemble a property dict in the steam_properties layout"""
+        return {
+            'P': P,
+            'T': T,
+            'v': v,
+            'h': h,
+            's': s,
+            'u': h - P * 1000 * v,
+            'x': x,
+            'phase': phase
+        }
+
+
+_tables = {}
+
+
+def get_steam_tables(n_pressure=120, n_xi=80, tolerance=1e-4, critical_margin=0.05):
+    """
+    Get a loaded SteamTables instance, shared by all callers with the same
+    grid configuration
+
+    Parameters:
+    n_pressure: Number of log-spaced pressure nodes
+    n_xi: Number of nodes across each single-phase table
+    tolerance: Accuracy target for served lookups
+    critical_margin: Relative pressure band around Pc that is never tabulated
+
+    Returns:
+    SteamTables: Loaded tables
+    """
+    key = (n_pressure, n_xi, critical_margin)
+    if key not in _tables:
+        _tables[key] = SteamTables(n_pressure, n_xi, tolerance, critical_margin).load()
+    tables = _tables[key]
+    if tables.tolerance != tolerance:
+        tables = SteamTables(n_pressure, n_xi, tolerance, critical_margin)
+        tables._data = _tables[key]._data
+        tables._splines = _tables[key]._splines
+        tables._logP_sub = _tables[key]._logP_sub
+    return tables
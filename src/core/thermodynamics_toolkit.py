@@ -8,15 +8,42 @@ A comprehensive collection of thermodynamic calculations and analysis tools
 import numpy as np
 import matplotlib.pyplot as plt
 from iapws import IAPWS97
+from .if97_vectorized import steam_properties_batch
+from .steam_tables import get_steam_tables
+from .saturation import get_saturation_tables, SATURATION_TABLE_TAG
+from .rankine_sweep import rankine_sweep, rankine_cycle_batch
+from .rankine_optimizer import optimize_rankine
+from .rankine_flowsheet import RankineFlowsheet
+from .uncertainty import propagate_uncertainty
+from .ideal_gas import get_gas
+from .refrigerants import get_refrigerant
+from ..utils.state_cache import steam_state_cache
 
 class ThermodynamicsToolkit:
     """
     A comprehensive toolkit for thermodynamic calculations
+    
+    Parameters:
+    steam_backend: 'iapws97' for exact IAPWS97 calls or 'tabulated' to serve
+                   (P, h) and (P, s) steam states from bicubic interpolation
+                   tables, falling back to IAPWS97 outside the tables
+    table_tolerance: Accuracy target of the tabulated backend (relative error)
     """
     
-    def __init__(self):
+    STEAM_BACKENDS = ('iapws97', 'tabulated')
+    
+    def __init__(self, steam_backend='iapws97', table_tolerance=1e-4):
+        if steam_backend not in self.STEAM_BACKENDS:
+            raise ValueError(f"Unknown steam backend: {steam_backend}")
         self.R = 8.314  # Universal gas constant (J/mol·K)
         self.g = 9.81   # Gravitational acceleration (m/s²)
+        self.steam_backend = steam_backend
+        self.table_tolerance = table_tolerance
+        self._steam_tables = None
+        if steam_backend == 'tabulated':
+            self._steam_cache_tag = f'tabulated:{table_tolerance:g}'
+        else:
+            self._steam_cache_tag = steam_backend
     
     def steam_properties(self, P=None, T=None, x=None, h=None, s=None):
         """
@@ -31,33 +58,101 @@ class ThermodynamicsToolkit:
         
         Returns:
         dict: Dictionary containing all thermodynamic properties
+        
+        Saturated and two-phase (P, x) or (T, x) states come from the
+        precomputed saturation tables. Repeated states are served from the shared steam state cache
+        (src.utils.state_cache.steam_state_cache).
         """
         try:
-            if P is not None and T is not None:
-                state = IAPWS97(P=P, T=T)
-            elif P is not None and x is not None:
-                state = IAPWS97(P=P, x=x)
-            elif P is not None and h is not None:
-                state = IAPWS97(P=P, h=h)
-            elif P is not None and s is not None:
-                state = IAPWS97(P=P, s=s)
-            else:
-                raise ValueError("Insufficient parameters provided")
-            
-            return {
-                'P': state.P,      # MPa
-                'T': state.T,      # K
-                'v': state.v,      # m³/kg
-                'h': state.h,      # kJ/kg
-                's': state.s,      # kJ/kg·K
-                'u': state.u,      # kJ/kg
-                'x': getattr(state, 'x', None),  # Quality
-                'phase': state.phase
-            }
+            key = self.steam_cache_key(P, T, x, h, s)
+            state = steam_state_cache.get_or_compute(
+                key, lambda: self._evaluate_steam_state(P, T, x, h, s))
+            return dict(state)
         except Exception as e:
             print(f"Error calculating steam properties: {e}")
             return None
     
+    def steam_cache_key(self, P=None, T=None, x=None, h=None, s=None):
+        """
+        Steam state cache key of a state; (P, x) and (T, x) states are tagged
+        SATURATION_TABLE_TAG because they are served from the saturation
+        tables, not from the configured backend
+        """
+        if self._uses_saturation_tables(P, T, x):
+            tag = SATURATION_TABLE_TAG
+        else:
+            tag = self._steam_cache_tag
+        return steam_state_cache.make_key(tag, P, T, x, h, s)
+    
+    @staticmethod
+    def _uses_saturation_tables(P, T, x):
+        return x is not None and (P is None) != (T is None)
+    
+    def _evaluate_steam_state(self, P, T, x, h, s):
+        """Evaluate one steam state with the configured backend (uncached)"""
+        if self._uses_saturation_tables(P, T, x):
+            props = get_saturation_tables().state(x, P=P, T=T)
+            if props is not None:
+                return props
+        
+        if (self.steam_backend == 'tabulated' and P is not None and T is None
+                and x is None and (h is not None or s is not None)):
+            if self._steam_tables is None:
+                self._steam_tables = get_steam_tables(tolerance=self.table_tolerance)
+            props = self._steam_tables.lookup(P, h=h, s=s)
+            if props is not None:
+                return props
+        
+        if P is not None and T is not None:
+            state = IAPWS97(P=P, T=T)
+        elif P is not None and x is not None:
+            state = IAPWS97(P=P, x=x)
+        elif P is not None and h is not None:
+            state = IAPWS97(P=P, h=h)
+        elif P is not None and s is not None:
+            state = IAPWS97(P=P, s=s)
+        elif T is not None and x is not None:
+            state = IAPWS97(T=T, x=x)
+        else:
+            raise ValueError("Insufficient parameters provided")
+        
+        return {
+            'P': state.P,      # MPa
+            'T': state.T,      # K
+            'v': state.v,      # m³/kg
+            'h': state.h,      # kJ/kg
+            's': state.s,      # kJ/kg·K
+            'u': state.u,      # kJ/kg
+            'x': getattr(state, 'x', None),  # Quality
+            'phase': state.phase
+        }
+    
+    def steam_properties_batch(self, P, T=None, x=None, h=None, s=None):
+        """
+        Calculate steam properties for arrays of states in one vectorized pass
+        
+        Parameters:
+        P: Pressure (MPa), scalar or array
+        T: Temperature (K), scalar or array
+        x: Quality (0-1), scalar or array
+        h: Enthalpy (kJ/kg), scalar or array
+        s: Entropy (kJ/kg·K), scalar or array
+        
+        Returns:
+        dict: Arrays of P, T, v, h, s, u, x, integer phase codes and IF97
+              region (NaN and phase code -1 for states outside IF97)
+        """
+        return steam_properties_batch(P, T=T, x=x, h=h, s=s)
+    
+    def steam_cache_stats(self):
+        """
+        Hit/miss/eviction counters of the shared steam state cache
+        
+        Returns:
+        dict: Cache statistics
+        """
+        return steam_state_cache.stats()
+    
     def rankine_cycle_analysis(self, P_boiler, T_boiler, P_condenser, efficiency_pump=0.85, efficiency_turbine=0.85):
         """
         Analyze a Rankine cycle with given parameters
@@ -125,11 +220,149 @@ class ThermodynamicsToolkit:
             'back_work_ratio': w_pump_actual / w_turbine_actual
         }
     
+    def rankine_parametric_sweep(self, P_boiler=None, T_boiler=None, P_condenser=None,
+                                 efficiency_pump=0.85, efficiency_turbine=0.85, cases=None,
+                                 n_workers=None, chunk_size=None, progress=None):
+        """
+        Evaluate the Rankine cycle over a design grid or case table in parallel
+        
+        Parameters:
+        P_boiler: Boiler pressure (MPa), scalar or 1-D array (grid axis)
+        T_boiler: Boiler temperature (K), scalar or 1-D array (grid axis)
+        P_condenser: Condenser pressure (MPa), scalar or 1-D array (grid axis)
+        efficiency_pump: Pump isentropic efficiency, scalar or 1-D array
+        efficiency_turbine: Turbine isentropic efficiency, scalar or 1-D array
+        cases: Explicit case table instead of grid axes
+        n_workers: Number of worker processes (default: CPU count)
+        chunk_size: Cases per worker task
+        progress: Optional callable progress(cases_done, cases_total)
+        
+        Returns:
+        dict: dims, coords and N-D arrays of efficiency, net work, back-work
+              ratio, heat input/output and the 'feasible' mask
+        """
+        return rankine_sweep(P_boiler, T_boiler, P_condenser, efficiency_pump,
+                             efficiency_turbine, cases=cases, n_workers=n_workers,
+                             chunk_size=chunk_size, progress=progress)
+    
+    def optimize_rankine_cycle(self, objective='efficiency_thermal', bounds=None, fixed=None,
+                               x_exit_min=0.88, T_max=None, superheat_min=0.0, x0=None,
+                               efficiency_pump=0.85, efficiency_turbine=0.85, max_iter=100):
+        """
+        Find the P_boiler, T_boiler and P_condenser that maximize the thermal
+        efficiency or net work of the Rankine cycle
+        
+        Parameters:
+        objective: 'efficiency_thermal' or 'work_net'
+        bounds: Dict of (lower, upper) bounds per design variable
+        fixed: Dict of design variables held at a fixed value
+        x_exit_min: Minimum turbine-exit quality (None to disable)
+        T_max: Metallurgical cap on the boiler exit temperature (K)
+        superheat_min: Minimum boiler exit superheat (K)
+        x0: Dict of starting values (e.g. the 'x' of a previous result)
+        efficiency_pump: Pump isentropic efficiency
+        efficiency_turbine: Turbine isentropic efficiency
+        max_iter: Maximum number of optimizer iterations
+        
+        Returns:
+        dict: Optimal design 'x', objective value, cycle results at the
+              optimum and the number of cycle and property evaluations used
+        """
+        return optimize_rankine(objective=objective, bounds=bounds, fixed=fixed,
+                                x_exit_min=x_exit_min, T_max=T_max, superheat_min=superheat_min,
+                                x0=x0, efficiency_pump=efficiency_pump,
+                                efficiency_turbine=efficiency_turbine, max_iter=max_iter)
+    
+    def rankine_flowsheet(self, components, parameters=None):
+        """
+        Build a reheat/regenerative Rankine cycle from flowsheet components
+        (see src.core.rankine_flowsheet) evaluated with this toolkit's steam
+        property backend
+        
+        Parameters:
+        components: List of Pump, Turbine, Boiler, Reheater, Throttle,
+                    Splitter, Condenser and feedwater heater components
+        parameters: Dict of named parameters referenced by the components
+                    (e.g. {'P_bleed': 1.2})
+        
+        Returns:
+        RankineFlowsheet: Flowsheet; call solve() and update(**parameters)
+        """
+        return RankineFlowsheet(components, parameters, steam_properties=self.steam_properties)
+    
+    def rankine_cycle_uncertainty(self, P_boiler, T_boiler, P_condenser, efficiency_pump=0.85,
+                                  efficiency_turbine=0.85, n_samples=10000, method='lhs',
+                                  outputs=('efficiency_thermal', 'work_net', 'back_work_ratio'),
+                                  percentiles=(5, 50, 95), sobol=False, chunk_size=8192, seed=None):
+        """
+        Rankine cycle analysis with uncertain inputs (Monte Carlo or Latin
+        hypercube sampling)
+        
+        Parameters:
+        P_boiler, T_boiler, P_condenser, efficiency_pump, efficiency_turbine:
+            Fixed values or distributions such as ('normal', mean, std),
+            ('uniform', low, high), ('triangular', low, mode, high)
+        n_samples: Number of samples
+        method: 'lhs' (Latin hypercube) or 'random'
+        outputs: Cycle results to summarize
+        percentiles: Percentiles to report (0-100)
+        sobol: Also estimate first-order and total Sobol indices
+        chunk_size: Samples evaluated per vectorized pass
+        seed: Random seed
+        
+        Returns:
+        dict: Per-output mean, std, percentiles and optional Sobol indices
+        """
+        parameters = {'P_boiler': P_boiler, 'T_boiler': T_boiler, 'P_condenser': P_condenser,
+                      'efficiency_pump': efficiency_pump, 'efficiency_turbine': efficiency_turbine}
+        return propagate_uncertainty(rankine_cycle_batch, parameters, outputs, n_samples=n_samples,
+                                     method=method, percentiles=percentiles, sobol=sobol,
+                                     chunk_size=chunk_size, seed=seed)
+    
+    def brayton_cycle_uncertainty(self, P_compressor_in, T_compressor_in, P_compressor_out,
+                                  T_turbine_in, efficiency_compressor=0.85, efficiency_turbine=0.85,
+                                  gamma=1.4, gas=None, gas_turbine=None, n_samples=10000,
+                                  method='lhs',
+                                  outputs=('efficiency_thermal', 'work_net', 'back_work_ratio'),
+                                  percentiles=(5, 50, 95), sobol=False, chunk_size=8192, seed=None):
+        """
+        Brayton cycle analysis with uncertain inputs (Monte Carlo or Latin
+        hypercube sampling)
+        
+        Parameters:
+        P_compressor_in, T_compressor_in, P_compressor_out, T_turbine_in,
+        efficiency_compressor, efficiency_turbine, gamma:
+            Fixed values or distributions (see rankine_cycle_uncertainty)
+        gas, gas_turbine: Gas property mode (see brayton_cycle_analysis)
+        n_samples: Number of samples
+        method: 'lhs' (Latin hypercube) or 'random'
+        outputs: Cycle results to summarize
+        percentiles: Percentiles to report (0-100)
+        sobol: Also estimate first-order and total Sobol indices
+        chunk_size: Samples evaluated per vectorized pass
+        seed: Random seed
+        
+        Returns:
+        dict: Per-output mean, std, percentiles and optional Sobol indices
+        """
+        parameters = {'P_compressor_in': P_compressor_in, 'T_compressor_in': T_compressor_in,
+                      'P_compressor_out': P_compressor_out, 'T_turbine_in': T_turbine_in,
+                      'efficiency_compressor': efficiency_compressor,
+                      'efficiency_turbine': efficiency_turbine, 'gamma': gamma,
+                      'gas': gas, 'gas_turbine': gas_turbine}
+        return propagate_uncertainty(self.brayton_cycle_analysis, parameters, outputs,
+                                     n_samples=n_samples, method=method, percentiles=percentiles,
+                                     sobol=sobol, chunk_size=chunk_size, seed=seed)
+    
     def brayton_cycle_analysis(self, P_compressor_in, T_compressor_in, P_compressor_out, T_turbine_in, 
-                               efficiency_compressor=0.85, efficiency_turbine=0.85, gamma=1.4):
+                               efficiency_compressor=0.85, efficiency_turbine=0.85, gamma=1.4,
+                               gas=None, gas_turbine=None):
         """
         Analyze a Brayton cycle (gas turbine cycle)
         
+        Every numeric argument may be an array; arrays broadcast against each
+        other, so a whole performance map is evaluated in one call.
+        
         Parameters:
         P_compressor_in: Compressor inlet pressure (kPa)
         T_compressor_in: Compressor inlet temperature (K)
@@ -137,47 +370,72 @@ class ThermodynamicsToolkit:
         T_turbine_in: Turbine inlet temperature (K)
         efficiency_compressor: Compressor isentropic efficiency
         efficiency_turbine: Turbine isentropic efficiency
-        gamma: Specific heat ratio
+        gamma: Specific heat ratio (constant specific heat mode)
+        gas: None for constant specific heats (energies per mole, J/mol), or
+             'air' / 'combustion_products' for variable specific heats from
+             NASA polynomials (energies in kJ/kg)
+        gas_turbine: Gas on the hot side (heat addition and turbine) in the
+                     variable specific heat mode (default: gas)
         
         Returns:
         dict: Cycle analysis results
         """
-        # State 1: Compressor inlet
-        T_1 = T_compressor_in
-        P_1 = P_compressor_in
-        
-        # State 2: Compressor outlet (isentropic)
-        P_2 = P_compressor_out
-        T_2s = T_1 * (P_2 / P_1) ** ((gamma - 1) / gamma)
-        
-        # Actual compressor work
-        w_compressor_isentropic = self.R * (T_2s - T_1) / (gamma - 1)
-        w_compressor_actual = w_compressor_isentropic / efficiency_compressor
-        T_2 = T_1 + w_compressor_actual * (gamma - 1) / self.R
-        
-        # State 3: Turbine inlet
-        T_3 = T_turbine_in
+        values = (P_compressor_in, T_compressor_in, P_compressor_out, T_turbine_in,
+                  efficiency_compressor, efficiency_turbine, gamma)
+        scalar = all(np.ndim(value) == 0 for value in values)
+        P_1, T_1, P_2, T_3, eta_c, eta_t, gamma = (np.asarray(value, dtype=float)
+                                                   for value in values)
         P_3 = P_2
-        
-        # State 4: Turbine outlet (isentropic)
         P_4 = P_1
-        T_4s = T_3 * (P_4 / P_3) ** ((gamma - 1) / gamma)
-        
-        # Actual turbine work
-        w_turbine_isentropic = self.R * (T_3 - T_4s) / (gamma - 1)
-        w_turbine_actual = w_turbine_isentropic * efficiency_turbine
-        T_4 = T_3 - w_turbine_actual * (gamma - 1) / self.R
         
-        # Heat input and output
-        q_in = self.R * (T_3 - T_2) / (gamma - 1)
-        q_out = self.R * (T_4 - T_1) / (gamma - 1)
+        if gas is None:
+            # State 2: Compressor outlet (isentropic)
+            T_2s = T_1 * (P_2 / P_1) ** ((gamma - 1) / gamma)
+            
+            # Actual compressor work
+            w_compressor_isentropic = self.R * (T_2s - T_1) / (gamma - 1)
+            w_compressor_actual = w_compressor_isentropic / eta_c
+            T_2 = T_1 + w_compressor_actual * (gamma - 1) / self.R
+            
+            # State 4: Turbine outlet (isentropic)
+            T_4s = T_3 * (P_4 / P_3) ** ((gamma - 1) / gamma)
+            
+            # Actual turbine work
+            w_turbine_isentropic = self.R * (T_3 - T_4s) / (gamma - 1)
+            w_turbine_actual = w_turbine_isentropic * eta_t
+            T_4 = T_3 - w_turbine_actual * (gamma - 1) / self.R
+            
+            # Heat input and output
+            q_in = self.R * (T_3 - T_2) / (gamma - 1)
+            q_out = self.R * (T_4 - T_1) / (gamma - 1)
+        else:
+            cold = get_gas(gas)
+            hot = get_gas(gas_turbine or gas)
+            h_1 = cold.h(T_1)
+            h_3 = hot.h(T_3)
+            
+            # Compressor: isentropic outlet from the s°(T) table
+            T_2s = cold.isentropic_T(T_1, P_1, P_2)
+            w_compressor_actual = (cold.h(T_2s) - h_1) / eta_c
+            h_2 = h_1 + w_compressor_actual
+            T_2 = cold.T_from_h(h_2)
+            
+            # Turbine
+            T_4s = hot.isentropic_T(T_3, P_3, P_4)
+            w_turbine_actual = eta_t * (h_3 - hot.h(T_4s))
+            h_4 = h_3 - w_turbine_actual
+            T_4 = hot.T_from_h(h_4)
+            
+            # Heat input and output
+            q_in = h_3 - h_2
+            q_out = h_4 - h_1
         
         # Cycle efficiency
         w_net = w_turbine_actual - w_compressor_actual
         efficiency_thermal = w_net / q_in
         efficiency_carnot = 1 - (T_1 / T_3)
         
-        return {
+        result = {
             'states': {
                 'state_1': {'T': T_1, 'P': P_1},
                 'state_2': {'T': T_2, 'P': P_2},
@@ -193,38 +451,62 @@ class ThermodynamicsToolkit:
             'efficiency_carnot': efficiency_carnot,
             'back_work_ratio': w_compressor_actual / w_turbine_actual
         }
+        if scalar:
+            result['states'] = {name: {key: float(value) for key, value in state.items()}
+                                for name, state in result['states'].items()}
+            result.update({key: float(value) for key, value in result.items()
+                           if key != 'states'})
+        return result
     
-    def refrigeration_cycle_analysis(self, T_evaporator, T_condenser, refrigerant='R134a'):
+    def refrigeration_cycle_analysis(self, T_evaporator, T_condenser, refrigerant='R134a',
+                                     efficiency_compressor=1.0):
         """
         Analyze a vapor compression refrigeration cycle
         
+        Properties come from the precomputed refrigerant tables in
+        src/data/refrigerants, so temperatures may be arrays (broadcast
+        against each other) and are evaluated without iteration.
+        
         Parameters:
-        T_evaporator: Evaporator temperature (K)
-        T_condenser: Condenser temperature (K)
-        refrigerant: Refrigerant type (simplified model)
+        T_evaporator: Evaporator temperature (K), scalar or array
+        T_condenser: Condenser temperature (K), scalar or array
+        refrigerant: 'R134a', 'R410A', 'R717' or 'R744'
+        efficiency_compressor: Compressor isentropic efficiency
         
         Returns:
-        dict: Cycle analysis results
+        dict: Cycle analysis results (kJ/kg, MPa, K); NaN where a
+              temperature is outside the refrigerant tables or the
+              condenser is not hotter than the evaporator
         """
-        # Simplified refrigeration cycle analysis
-        # For a real implementation, you'd need refrigerant property tables
+        scalar = all(np.ndim(value) == 0 for value in
+                     (T_evaporator, T_condenser, efficiency_compressor))
+        T_evap, T_cond, eta_c = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in
+              (T_evaporator, T_condenser, efficiency_compressor)))
+        T_cond = np.where(T_cond > T_evap, T_cond, np.nan)
+        tables = get_refrigerant(refrigerant)
+        evaporator = tables.saturation(T_evap)
+        condenser = tables.saturation(T_cond)
         
         # State 1: Evaporator exit (saturated vapor)
-        h_1 = 400  # kJ/kg (typical for R134a)
-        s_1 = 1.7  # kJ/kg·K
+        P_1 = evaporator['P']
+        h_1 = evaporator['h_g']
+        s_1 = evaporator['s_g']
         
         # State 2: Compressor exit (superheated vapor)
-        P_2 = 1.0  # MPa
-        h_2 = 430  # kJ/kg
-        s_2 = 1.8  # kJ/kg·K
+        P_2 = condenser['P']
+        h_2s = tables.state_ps(P_2, s_1)['h']
+        h_2 = h_1 + (h_2s - h_1) / eta_c
+        state_2 = tables.state_ph(P_2, h_2)
         
         # State 3: Condenser exit (saturated liquid)
-        h_3 = 250  # kJ/kg
-        s_3 = 1.2  # kJ/kg·K
+        h_3 = condenser['h_f']
+        s_3 = condenser['s_f']
         
         # State 4: Expansion valve exit (two-phase)
         h_4 = h_3  # Isenthalpic expansion
-        s_4 = 1.3  # kJ/kg·K
+        x_4 = (h_4 - evaporator['h_f']) / (h_1 - evaporator['h_f'])
+        s_4 = evaporator['s_f'] + x_4 * (s_1 - evaporator['s_f'])
         
         # Cycle analysis
         w_compressor = h_2 - h_1
@@ -232,18 +514,24 @@ class ThermodynamicsToolkit:
         q_condenser = h_2 - h_3
         cop = q_evaporator / w_compressor
         
-        return {
+        result = {
             'states': {
-                'state_1': {'h': h_1, 's': s_1, 'T': T_evaporator},
-                'state_2': {'h': h_2, 's': s_2, 'T': T_condenser + 20},
-                'state_3': {'h': h_3, 's': s_3, 'T': T_condenser},
-                'state_4': {'h': h_4, 's': s_4, 'T': T_evaporator}
+                'state_1': {'h': h_1, 's': s_1, 'T': T_evap, 'P': P_1},
+                'state_2': {'h': h_2, 's': state_2['s'], 'T': state_2['T'], 'P': P_2},
+                'state_3': {'h': h_3, 's': s_3, 'T': T_cond, 'P': P_2},
+                'state_4': {'h': h_4, 's': s_4, 'T': T_evap, 'P': P_1, 'x': x_4}
             },
             'work_compressor': w_compressor,
             'heat_evaporator': q_evaporator,
             'heat_condenser': q_condenser,
             'cop': cop
         }
+        if scalar:
+            result['states'] = {name: {key: float(value) for key, value in state.items()}
+                                for name, state in result['states'].items()}
+            result.update({key: float(value) for key, value in result.items()
+                           if key != 'states'})
+        return result
     
     def plot_cycle_diagram(self, cycle_data, cycle_type='rankine'):
         """
@@ -256,6 +544,13 @@ class ThermodynamicsToolkit:
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
         
         if cycle_type == 'rankine':
+            # Saturation dome from the precomputed saturation tables
+            dome = get_saturation_tables().dome()
+            ax1.plot(dome['s_f'], dome['T'], 'k-', linewidth=1, alpha=0.5, label='Saturation dome')
+            ax1.plot(dome['s_g'], dome['T'], 'k-', linewidth=1, alpha=0.5)
+            ax2.plot(dome['h_f'], dome['P'], 'k-', linewidth=1, alpha=0.5, label='Saturation dome')
+            ax2.plot(dome['h_g'], dome['P'], 'k-', linewidth=1, alpha=0.5)
+            
             # T-s diagram
             states = cycle_data['states']
             s_values = [states['state_1']['s'], states['state_2']['s'], 
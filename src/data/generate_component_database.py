@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Component Database Generator
+Builds the columnar component database read by src.core.components from
+the CoolProp pure-fluid and mixture equations of state: critical constants,
+acentric factors, liquid molar volumes, DIPPR-101 and Antoine vapour-pressure
+fits, and Wilson/NRTL parameters regressed from low-pressure bubble points
+of every binary pair with CoolProp interaction parameters.
+Run offline (CoolProp is not needed at runtime):
+
+    python -m src.data.generate_component_database
+
+@author: Bryan Piguave Llano
+"""
+
+import itertools
+import re
+from pathlib import Path
+
+import numpy as np
+import CoolProp
+import CoolProp.CoolProp as CP
+from scipy.optimize import curve_fit, least_squares
+
+OUTPUT_DIR = Path(__file__).resolve().parent / 'components'
+DATABASE_VERSION = 1
+
+# CoolProp pseudo-pure mixtures are not components
+EXCLUDED = {'Air', 'R404A', 'R407C', 'R410A', 'R507A'}
+P_ATM = 101325.0
+T_REFERENCE = 298.15
+DIPPR_EXPONENTS = (1.0, 2.0, 6.0)
+N_SATURATION = 200
+# Pair regression: compositions and pressure window of the bubble points
+PAIR_COMPOSITIONS = np.linspace(0.05, 0.95, 9)
+PAIR_P_MIN, PAIR_P_MAX = 2e3, 3e5        # Pa
+PAIR_T_OFFSETS = (-15.0, 0.0, 15.0)     # K around the 1 atm temperature
+NRTL_ALPHA = 0.3
+
+
+def _formula(fluid):
+    """Hill-style formula without CoolProp's braces and unit subscripts"""
+    raw = CP.get_fluid_param_string(fluid, 'formula')
+    formula = re.sub(r'_\{(\d+)\}', r'\1', raw).replace('{', '').replace('}', '')
+    return re.sub(r'([A-Z][a-z]?)1(?!\d)', r'\1', formula)
+
+
+def _saturation_pressure(fluid, T):
+    """CoolProp vapour pressures (Pa), NaN where the saturation solver fails"""
+    P = np.full(np.shape(np.atleast_1d(T)), np.nan)
+    for k, t in enumerate(np.atleast_1d(T)):
+        try:
+            P[k] = CP.PropsSI('P', 'T', t, 'Q', 0, fluid)
+        except ValueError:
+            pass
+    return P
+
+
+def _fit_dippr(T, P):
+    """ln P = A + B/T + C ln T + D T^E, linear least squares for each E"""
+    best = None
+    for E in DIPPR_EXPONENTS:
+        X = np.column_stack([np.ones_like(T), 1 / T, np.log(T), T ** E])
+        coefficients = np.linalg.lstsq(X, np.log(P), rcond=None)[0]
+        error = np.max(np.abs(X @ coefficients - np.log(P)))
+        if best is None or error < best[1]:
+            best = (np.append(coefficients, E), error)
+    return best
+
+
+def _fit_antoine(T, P):
+    """ln P = A - B/(T + C) (Pa, K)"""
+    def model(T, A, B, C):
+        return A - B / (T + C)
+
+    # Linear in (A, B) for fixed C: scan C for the starting point
+    best = None
+    for C in np.linspace(-0.9 * T[0], 0.5 * T[0], 141):
+        X = np.column_stack([np.ones_like(T), -1 / (T + C)])
+        A, B = np.linalg.lstsq(X, np.log(P), rcond=None)[0]
+        error = np.sum((model(T, A, B, C) - np.log(P)) ** 2)
+        if best is None or error < best[1]:
+            best = ((A, B, C), error)
+    try:
+        coefficients = curve_fit(model, T, np.log(P), p0=best[0], maxfev=20000)[0]
+    except RuntimeError:
+        coefficients = np.array(best[0])
+    return coefficients, np.max(np.abs(model(T, *coefficients) - np.log(P)))
+
+
+def build_components():
+    """
+    Pure-component columns
+
+    Returns:
+    dict: Column arrays, one row per component
+    """
+    rows = []
+    for fluid in sorted(CP.get_global_param_string('FluidsList').split(','), key=str.lower):
+        if fluid in EXCLUDED:
+            continue
+        Tc = CP.PropsSI('Tcrit', fluid)
+        T_triple = CP.PropsSI('Tmin', fluid)
+        T = np.linspace(T_triple, Tc - 0.5, N_SATURATION)
+        P = _saturation_pressure(fluid, T)
+        # DIPPR over the saturation line above 1 Pa
+        keep = np.isfinite(P) & (P >= 1.0)
+        T, P = T[keep], P[keep]
+        T_min, T_max = T[0], T[-1]
+        dippr, error_dippr = _fit_dippr(T, P)
+
+        # Antoine over 1 kPa - 10 bar, inside the saturation range
+        window = (P >= 1e3) & (P <= 1e6)
+        if window.sum() < 10:
+            window = np.ones_like(T, dtype=bool)
+        antoine, error_antoine = _fit_antoine(T[window], P[window])
+
+        Tb = CP.PropsSI('T', 'P', P_ATM, 'Q', 0, fluid) if P[0] < P_ATM < P[-1] else np.nan
+        if T_min < T_REFERENCE < T_max:
+            T_volume = T_REFERENCE
+        else:
+            T_volume = Tb if np.isfinite(Tb) else 0.7 * Tc
+        V_liquid = 1 / CP.PropsSI('Dmolar', 'T', T_volume, 'Q', 0, fluid)
+        rows.append({
+            'name': fluid,
+            'cas': CP.get_fluid_param_string(fluid, 'CAS'),
+            'formula': _formula(fluid),
+            'molar_mass': CP.PropsSI('molarmass', fluid) * 1e3,
+            'Tc': Tc,
+            'Pc': CP.PropsSI('pcrit', fluid),
+            'Vc': 1 / CP.PropsSI('rhomolar_critical', fluid),
+            'omega': CP.PropsSI('acentric', fluid),
+            'Tb': Tb,
+            'T_triple': T_triple,
+            'V_liquid': V_liquid,
+            'T_V_liquid': T_volume,
+            'dippr': dippr,
+            'dippr_range': (T_min, T_max),
+            'dippr_error': error_dippr,
+            'antoine': antoine,
+            'antoine_range': (T[window][0], T[window][-1]),
+            'antoine_error': error_antoine,
+        })
+    columns = {key: np.array([row[key] for row in rows]) for key in rows[0]}
+    for key in ('name', 'cas', 'formula'):
+        columns[key] = columns[key].astype(str)
+    return columns
+
+
+def _pair_temperatures(components, i, j):
+    """Regression temperatures of a pair (around its 1 atm mixture boiling range)"""
+    T_low = max(components['T_triple'][i], components['T_triple'][j]) + 5
+    T_high = 0.85 * min(components['Tc'][i], components['Tc'][j])
+    if T_high <= T_low:
+        return None
+    T = np.linspace(T_low, T_high, 60)
+    P_i = _saturation_pressure(components['name'][i], T)
+    P_j = _saturation_pressure(components['name'][j], T)
+    valid = (np.minimum(P_i, P_j) >= PAIR_P_MIN) & (np.maximum(P_i, P_j) <= PAIR_P_MAX)
+    if not valid.any():
+        return None
+    T, mean = T[valid], np.sqrt(P_i[valid] * P_j[valid])
+    T_mid = T[np.argmin(np.abs(np.log(mean / P_ATM)))]
+    return np.unique(np.clip(T_mid + np.array(PAIR_T_OFFSETS), T[0], T[-1]))
+
+
+def _bubble_points(names, temperatures):
+    state = CP.AbstractState('HEOS', '&'.join(names))
+    points = []
+    for T in temperatures:
+        for x in PAIR_COMPOSITIONS:
+            try:
+                state.set_mole_fractions([x, 1 - x])
+                state.update(CP.QT_INPUTS, 0, T)
+                points.append((T, x, state.p(), state.mole_fractions_vapor()[0]))
+            except ValueError:
+                continue
+    return np.array(points)
+
+
+def _regress_pair(model_gamma, data, P_sat):
+    """Fit two parameters to bubble pressures and vapour compositions"""
+    T, x1, P, y1 = data.T
+    x = np.column_stack([x1, 1 - x1])
+
+    def residuals(p):
+        p_partial = x * model_gamma(p, x, T) * P_sat
+        P_calc = p_partial.sum(axis=1)
+        return np.concatenate([np.log(P_calc / P), p_partial[:, 0] / P_calc - y1])
+
+    fit = least_squares(residuals, np.zeros(2), x_scale=100.0)
+    r = residuals(fit.x)
+    return fit.x, np.sqrt(np.mean(r[:len(T)] ** 2))
+
+
+def build_pairs(components):
+    """
+    Wilson (a_ij, K) and NRTL (b_ij, K, α = 0.3) parameters of every pair with
+    CoolProp binary interaction data, regressed with the modified Raoult's law
+
+    Returns:
+    dict: Pair columns
+    """
+    from src.core.activity_models import Wilson, NRTL
+
+    V = components['V_liquid']
+    rows = []
+    for i, j in itertools.combinations(range(len(components['name'])), 2):
+        try:
+            CP.get_mixture_binary_pair_data(components['cas'][i], components['cas'][j], 'betaT')
+        except ValueError:
+            continue
+        temperatures = _pair_temperatures(components, i, j)
+        if temperatures is None:
+            continue
+        names = [components['name'][i], components['name'][j]]
+        data = _bubble_points(names, temperatures)
+        if len(data) < 2 * len(PAIR_COMPOSITIONS):
+            continue
+        P_sat = np.column_stack([_saturation_pressure(name, data[:, 0]) for name in names])
+
+        def wilson(p, x, T):
+            a = np.array([[0.0, p[0]], [p[1], 0.0]]) * 100
+            return Wilson(a=a, V=V[[i, j]]).gamma(x, T)
+
+        def nrtl(p, x, T):
+            b = np.array([[0.0, p[0]], [p[1], 0.0]]) * 100
+            return NRTL(alpha=NRTL_ALPHA, b=b).gamma(x, T)
+
+        try:
+            a, error_wilson = _regress_pair(wilson, data, P_sat)
+            b, error_nrtl = _regress_pair(nrtl, data, P_sat)
+        except (ValueError, FloatingPointError):
+            continue
+        rows.append({
+            'pair_index': (i, j),
+            'wilson_a': a * 100,
+            'nrtl_b': b * 100,
+            'nrtl_alpha': NRTL_ALPHA,
+            'pair_range': (data[:, 0].min(), data[:, 0].max()),
+            'pair_error': (error_wilson, error_nrtl),
+        })
+    columns = {key: np.array([row[key] for row in rows]) for key in rows[0]}
+    columns['pair_index'] = columns['pair_index'].astype(np.int32)
+    return columns
+
+
+def build_index(components):
+    """Sorted lower-case lookup keys (name, CAS, formula) and their rows"""
+    keys, rows = [], []
+    for key in ('name', 'cas', 'formula'):
+        for row, value in enumerate(components[key]):
+            if value:
+                keys.append(value.lower())
+                rows.append(row)
+    keys = np.array(keys)
+    order = np.argsort(keys, kind='stable')
+    return {'index_keys': keys[order], 'index_rows': np.array(rows, dtype=np.int32)[order]}
+
+
+def check(n=200, seed=0):
+    """
+    Compare database vapour pressures with CoolProp at random temperatures
+
+    Returns:
+    dict: Largest relative errors of the DIPPR and Antoine evaluators
+    """
+    from src.core.components import ComponentDatabase
+
+    database = ComponentDatabase(OUTPUT_DIR)
+    rng = np.random.default_rng(seed)
+    errors = {'dippr': 0.0, 'antoine': 0.0}
+    for method in errors:
+        low, high = database.column(f'{method}_range').T
+        for k, name in enumerate(database.names):
+            T = rng.uniform(low[k], high[k], n // 20)
+            P = database.P_sat(name, T, method=method)[:, 0]
+            errors[method] = max(errors[method],
+                                 np.max(np.abs(P / _saturation_pressure(name, T) - 1)))
+    return errors
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    components = build_components()
+    columns = {**components, **build_pairs(components), **build_index(components)}
+    columns['version'] = np.array(DATABASE_VERSION)
+    columns['coolprop_version'] = np.array(CoolProp.__version__)
+    for key, values in columns.items():
+        np.save(OUTPUT_DIR / f'{key}.npy', values, allow_pickle=False)
+    errors = check()
+    print(f"{len(components['name'])} components, {len(columns['pair_index'])} pairs; "
+          f"max vapour pressure error DIPPR {errors['dippr']:.1e}, "
+          f"Antoine {errors['antoine']:.1e}")
+
+
+if __name__ == '__main__':
+    main()
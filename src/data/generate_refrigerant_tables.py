@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Refrigerant Table Generator
+Builds the saturation and superheated-vapour tables used by
+src.core.refrigerants from the CoolProp Helmholtz-energy equations of state.
+Run offline (CoolProp is not needed at runtime):
+
+    python -m src.data.generate_refrigerant_tables
+
+@author: Bryan Piguave Llano
+"""
+
+from pathlib import Path
+
+import numpy as np
+import CoolProp
+import CoolProp.CoolProp as CP
+
+OUTPUT_DIR = Path(__file__).resolve().parent / 'refrigerants'
+TABLE_VERSION = 1
+
+# Lowest tabulated saturation temperature and highest superheated
+# temperature per refrigerant (K)
+REFRIGERANTS = {
+    'R134a': (200.0, 450.0),
+    'R410A': (200.0, 490.0),
+    'R717': (200.0, 700.0),
+    'R744': (217.0, 600.0),
+}
+CRITICAL_MARGIN = 1.0  # K below the critical temperature
+N_SATURATION = 160
+N_PRESSURE = 40
+N_SUPERHEAT = 28
+
+
+def _props(outputs, name1, values1, name2, values2, fluid):
+    """Evaluate CoolProp on arrays, SI units"""
+    return np.array([[CP.PropsSI(out, name1, a, name2, b, fluid) for out in outputs]
+                     for a, b in zip(np.ravel(values1), np.ravel(values2))])
+
+
+def _clustered(n, power=2.0):
+    """Points on [0, 1] clustered towards 0"""
+    return np.linspace(0, 1, n) ** power
+
+
+def build(fluid, T_low, T_high):
+    """
+    Build the tables of one refrigerant (kJ, kg, MPa, K)
+
+    Returns:
+    dict: Arrays to store in the .npz file
+    """
+    T_crit = CP.PropsSI('Tcrit', fluid)
+    T_top = T_crit - CRITICAL_MARGIN
+
+    # Saturation line, clustered towards the critical point
+    u = np.linspace(0, 1, N_SATURATION)
+    T_sat = T_low + (T_top - T_low) * (1 - (1 - u) ** 2)
+    liq = _props(['P', 'H', 'S', 'D'], 'T', T_sat, 'Q', np.zeros_like(T_sat), fluid)
+    vap = _props(['H', 'S', 'D'], 'T', T_sat, 'Q', np.ones_like(T_sat), fluid)
+    saturation = np.column_stack([
+        np.log(liq[:, 0] / 1e6),
+        liq[:, 1] / 1e3, vap[:, 0] / 1e3,
+        liq[:, 2] / 1e3, vap[:, 1] / 1e3,
+        -np.log(liq[:, 3]), -np.log(vap[:, 2]),
+    ])
+
+    # Superheated vapour on (log P, s - s_g) and (log P, h - h_g) grids
+    P_sat = np.exp(saturation[:, 0])
+    # Pressures clustered towards the critical point, where the vapour
+    # properties change fastest
+    u = np.linspace(0, 1, N_PRESSURE)
+    log_P = np.log(P_sat[0]) + np.log(P_sat[-1] / P_sat[0]) * (1 - (1 - u) ** 2)
+    P = np.exp(log_P)
+    T_g = np.interp(log_P, saturation[:, 0], T_sat)
+    gas = _props(['H', 'S'], 'P', P * 1e6, 'T', np.full_like(P, T_high), fluid) / 1e3
+    sat_g = _props(['H', 'S'], 'P', P * 1e6, 'Q', np.ones_like(P), fluid) / 1e3
+    sigma_max = np.min(gas[:, 1] - sat_g[:, 1])
+    epsilon_max = np.min(gas[:, 0] - sat_g[:, 0])
+    sigma = sigma_max * _clustered(N_SUPERHEAT)
+    epsilon = epsilon_max * _clustered(N_SUPERHEAT)
+
+    PP, SS = np.meshgrid(P, sigma, indexing='ij')
+    ps = _props(['H', 'T', 'D'], 'P', PP * 1e6, 'S', (SS + sat_g[:, 1:2]) * 1e3, fluid)
+    PP, EE = np.meshgrid(P, epsilon, indexing='ij')
+    ph = _props(['T', 'S', 'D'], 'P', PP * 1e6, 'H', (EE + sat_g[:, 0:1]) * 1e3, fluid)
+    shape = (N_PRESSURE, N_SUPERHEAT)
+
+    return {
+        'version': np.array(TABLE_VERSION),
+        'coolprop_version': np.array(CoolProp.__version__),
+        'fluid': np.array(fluid),
+        'T_crit': np.array(T_crit),
+        'P_crit': np.array(CP.PropsSI('pcrit', fluid) / 1e6),
+        'molar_mass': np.array(CP.PropsSI('molarmass', fluid) * 1e3),
+        'T_sat': T_sat,
+        'saturation': saturation,
+        'log_P': log_P,
+        'T_g': T_g,
+        'h_g': sat_g[:, 0],
+        's_g': sat_g[:, 1],
+        'sigma': sigma,
+        'epsilon': epsilon,
+        # (P, s): h, T, log v
+        'ps': np.stack([ps[:, 0].reshape(shape) / 1e3, ps[:, 1].reshape(shape),
+                        -np.log(ps[:, 2]).reshape(shape)]),
+        # (P, h): T, s, log v
+        'ph': np.stack([ph[:, 0].reshape(shape), ph[:, 1].reshape(shape) / 1e3,
+                        -np.log(ph[:, 2]).reshape(shape)]),
+    }
+
+
+def check(fluid, n=400, seed=0):
+    """
+    Compare table lookups with CoolProp at random states
+
+    Returns:
+    dict: Maximum relative errors of saturated and superheated lookups
+    """
+    from src.core.refrigerants import RefrigerantTables
+
+    tables = RefrigerantTables(fluid, data_dir=OUTPUT_DIR).load()
+    rng = np.random.default_rng(seed)
+    T = rng.uniform(tables.T_min, tables.T_max, n)
+    sat = tables.saturation(T)
+    ref = _props(['P', 'H', 'H'], 'T', T, 'Q', np.zeros_like(T), fluid)
+    ref[:, 2] = _props(['H'], 'T', T, 'Q', np.ones_like(T), fluid)[:, 0]
+    error_sat = max(np.max(np.abs(sat['P'] * 1e6 / ref[:, 0] - 1)),
+                    np.max(np.abs(sat['h_f'] * 1e3 / ref[:, 1] - 1)),
+                    np.max(np.abs(sat['h_g'] * 1e3 / ref[:, 2] - 1)))
+
+    P = np.exp(rng.uniform(tables.log_P_min, tables.log_P_max, n))
+    s_g = tables.saturation(tables.saturation_temperature(P))['s_g']
+    s = s_g + rng.uniform(0, 1, n) * tables.sigma_max
+    state = tables.state_ps(P, s)
+    ref = _props(['H', 'T'], 'P', P * 1e6, 'S', s * 1e3, fluid)
+    error_ps = max(np.max(np.abs(state['h'] * 1e3 / ref[:, 0] - 1)),
+                   np.max(np.abs(state['T'] / ref[:, 1] - 1)))
+    return {'saturation': error_sat, 'superheated': error_ps}
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    for fluid, (T_low, T_high) in REFRIGERANTS.items():
+        data = build(fluid, T_low, T_high)
+        np.savez_compressed(OUTPUT_DIR / f'{fluid}.npz', **data)
+        errors = check(fluid)
+        print(f"{fluid}: max relative error saturation {errors['saturation']:.1e}, "
+              f"superheated {errors['superheated']:.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded memoization cache for thermodynamic state evaluations
+Thread-safe LRU cache with optional time-to-live, shared by core and web
+@author: Bryan Piguave Llano
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class StateCache:
+    """
+    Thread-safe LRU cache with an optional time-to-live
+
+    Keys are built from the input values rounded to a relative tolerance,
+    so states that differ only by floating-point noise share an entry.
+    Values are computed outside the lock; two threads missing the same key
+    at the same time may both compute it, which is harmless for pure
+    property functions.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, rel_tol=1e-10):
+        """
+        Parameters:
+        maxsize: Maximum number of cached entries (least recently used
+                 entries are evicted first)
+        ttl: Time-to-live of an entry in seconds (None keeps entries until
+             they are evicted)
+        rel_tol: Relative tolerance used to round the inputs of a key
+        """
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.configure(maxsize=maxsize, ttl=ttl, rel_tol=rel_tol)
+
+    def configure(self, maxsize=None, ttl=None, rel_tol=None):
+        """
+        Change the cache limits; the cache is cleared because existing keys
+        may have been rounded with a different tolerance
+
+        Parameters:
+        maxsize: Maximum number of cached entries
+        ttl: Time-to-live in seconds (use 0 to disable expiry)
+        rel_tol: Relative rounding tolerance of the keys
+        """
+        with self._lock:
+            if maxsize is not None:
+                if maxsize < 1:
+                    raise ValueError("maxsize must be at least 1")
+                self.maxsize = maxsize
+            if ttl is not None or not hasattr(self, 'ttl'):
+                self.ttl = ttl or None
+            if rel_tol is not None:
+                if not 0 < rel_tol < 1:
+                    raise ValueError("rel_tol must be between 0 and 1")
+                self.rel_tol = rel_tol
+                self._digits = max(1, int(round(-math.log10(rel_tol))))
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def _round(self, value):
+        """Round a number to the key tolerance (None and strings pass through)"""
+        if value is None or isinstance(value, str):
+            return value
+        value = float(value)
+        if value == 0 or not math.isfinite(value):
+            return value
+        return round(value, self._digits - 1 - math.floor(math.log10(abs(value))))
+
+    def make_key(self, *values):
+        """
+        Build a cache key from a tag and input values
+
+        Parameters:
+        values: Backend or calculation tag followed by the input values
+
+        Returns:
+        tuple: Hashable key with every number rounded to the tolerance
+        """
+        return tuple(self._round(value) for value in values)
+
+    def get(self, key, default=None):
+        """
+        Cached value for key, counted as a hit or a miss
+
+        Parameters:
+        key: Key from make_key
+        default: Returned when the key is missing or expired
+
+        Returns:
+        object: Cached value or default
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """
+        Store a value computed elsewhere (e.g. in a worker process)
+
+        Parameters:
+        key: Key from make_key
+        value: Value to cache
+        """
+        now = time.monotonic()
+        with self._lock:
+            expires = now + self.ttl if self.ttl else None
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Parameters:
+        key: Key from make_key
+        compute: Callable with no arguments that evaluates the state;
+                 exceptions propagate and nothing is cached
+
+        Returns:
+        object: Cached or freshly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        self.configure()
+
+    def stats(self):
+        """
+        Cache counters
+
+        Returns:
+        dict: hits, misses, evictions, expirations, size, maxsize, ttl,
+              rel_tol and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'rel_tol': self.rel_tol,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# Shared cache for steam (IAPWS-IF97) state evaluations
+steam_state_cache = StateCache(maxsize=8192)
@@ -4,21 +4,72 @@ Flask Backend for Chemical Engineering Thermodynamics Toolkit
 @author: Bryan Piguave Llano
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g
 from flask_cors import CORS
-import numpy as np
 from iapws import IAPWS97
 import json
 import sys
 from pathlib import Path
 
-# Add src to Python path for imports
-src_path = Path(__file__).parent.parent
-sys.path.insert(0, str(src_path))
+# Add the project root to Python path so the shared src packages import
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.state_cache import steam_state_cache
+from src.core.saturation import get_saturation_tables, SATURATION_TABLE_TAG
+from src.core.activity_models import Wilson
+from src.web.batch import run_batch, BATCH_MAX_CASES
+from src.web.workers import CalculationPool, PoolSaturated, CalculationTimeout
+from src.web.response_cache import ResponseCache, canonical_key, MiB
 
 app = Flask(__name__)
+app.config.setdefault('BATCH_MAX_CASES', BATCH_MAX_CASES)
+# Worker pool for slow calculations (0 workers runs them inline); changes
+# to these keys are applied to calculation_pool before the next request
+app.config.setdefault('CALCULATION_WORKERS', None)
+app.config.setdefault('CALCULATION_QUEUE_SIZE', None)
+app.config.setdefault('CALCULATION_TIMEOUT', 30.0)
+app.config.setdefault('CALCULATION_RETRY_AFTER', 1)
+# Encoded responses of the POST /api/* routes by request content; set
+# RESPONSE_CACHE_DIR to share them between server processes (changes are
+# applied to response_cache before the next request)
+app.config.setdefault('RESPONSE_CACHE_ENABLED', True)
+app.config.setdefault('RESPONSE_CACHE_SIZE', 1024)
+app.config.setdefault('RESPONSE_CACHE_BYTES', 64 * MiB)
+app.config.setdefault('RESPONSE_CACHE_MAX_ENTRY_BYTES', 1 * MiB)
+app.config.setdefault('RESPONSE_CACHE_TTL', None)
+app.config.setdefault('RESPONSE_CACHE_DIR', None)
+app.config.setdefault('RESPONSE_CACHE_DISK_BYTES', 1024 * MiB)
 CORS(app)
 
+CALCULATION_SETTINGS = ('CALCULATION_WORKERS', 'CALCULATION_QUEUE_SIZE',
+                        'CALCULATION_TIMEOUT', 'CALCULATION_RETRY_AFTER')
+
+def calculation_settings():
+    """Pool arguments (max_workers, max_pending, timeout, retry_after) from app.config"""
+    return tuple(app.config[key] for key in CALCULATION_SETTINGS)
+
+calculation_pool = CalculationPool(*calculation_settings())
+RESPONSE_CACHE_SETTINGS = ('RESPONSE_CACHE_SIZE', 'RESPONSE_CACHE_BYTES',
+                           'RESPONSE_CACHE_MAX_ENTRY_BYTES', 'RESPONSE_CACHE_TTL',
+                           'RESPONSE_CACHE_DIR', 'RESPONSE_CACHE_DISK_BYTES')
+
+def response_cache_settings():
+    """Cache arguments (maxsize, max_bytes, max_entry_bytes, ttl, directory, max_disk_bytes)"""
+    return tuple(app.config[key] for key in RESPONSE_CACHE_SETTINGS)
+
+response_cache = ResponseCache(*response_cache_settings())
+# Settings the services were last configured with, by service
+applied_settings = {'calculation_pool': calculation_settings(),
+                    'response_cache': response_cache_settings()}
+
+def binary_activity_coefficients(x1, model='ideal', A12=None, A21=None):
+    """Activity coefficients of a binary liquid (Wilson, or ideal solution)"""
+    if model == 'wilson' and A12 is not None and A21 is not None:
+        gamma = Wilson(Lambda=[[1.0, A12], [A21, 1.0]]).gamma([x1, 1 - x1])
+        return float(gamma[0]), float(gamma[1])
+    return 1.0, 1.0
+
 class ThermodynamicsAPI:
     """API class for thermodynamic calculations"""
     
@@ -26,32 +77,61 @@ class ThermodynamicsAPI:
         self.R = 8.314  # J/mol·K
     
     def steam_properties(self, P=None, T=None, x=None, h=None, s=None):
-        """Calculate steam properties using IAPWS-IF97"""
+        """Calculate steam properties using IAPWS-IF97 (shared state cache)"""
         try:
-            if P is not None and T is not None:
-                state = IAPWS97(P=P, T=T)
-            elif P is not None and x is not None:
-                state = IAPWS97(P=P, x=x)
-            elif P is not None and h is not None:
-                state = IAPWS97(P=P, h=h)
-            elif P is not None and s is not None:
-                state = IAPWS97(P=P, s=s)
-            else:
-                raise ValueError("Insufficient parameters provided")
-            
-            return {
-                'P': state.P,      # MPa
-                'T': state.T,      # K
-                'v': state.v,      # m³/kg
-                'h': state.h,      # kJ/kg
-                's': state.s,      # kJ/kg·K
-                'u': state.u,      # kJ/kg
-                'x': getattr(state, 'x', None),  # Quality
-                'phase': state.phase
-            }
+            key = self.steam_cache_key(P, T, x, h, s)
+            state = steam_state_cache.get_or_compute(
+                key, lambda: self._evaluate_steam_state(P, T, x, h, s))
+            return dict(state)
         except Exception as e:
             return {'error': str(e)}
     
+    def steam_cache_key(self, P=None, T=None, x=None, h=None, s=None):
+        """Steam state cache key; (P, x) states come from the saturation tables"""
+        tag = SATURATION_TABLE_TAG if self._uses_saturation_tables(P, T, x) else 'iapws97'
+        return steam_state_cache.make_key(tag, P, T, x, h, s)
+    
+    @staticmethod
+    def _uses_saturation_tables(P, T, x):
+        return P is not None and T is None and x is not None
+    
+    def _evaluate_steam_state(self, P, T, x, h, s):
+        """Evaluate one steam state (uncached): saturation tables, else IAPWS97"""
+        props = self._table_steam_state(P, T, x)
+        if props is not None:
+            return props
+        return self._solve_steam_state(P, T, x, h, s)
+    
+    def _table_steam_state(self, P, T, x):
+        """(P, x) state from the saturation tables; None when IAPWS97 must solve it"""
+        if self._uses_saturation_tables(P, T, x):
+            return get_saturation_tables().state(x, P=P)
+        return None
+    
+    def _solve_steam_state(self, P, T, x, h, s):
+        """Solve one steam state with IAPWS97"""
+        if P is not None and T is not None:
+            state = IAPWS97(P=P, T=T)
+        elif P is not None and x is not None:
+            state = IAPWS97(P=P, x=x)
+        elif P is not None and h is not None:
+            state = IAPWS97(P=P, h=h)
+        elif P is not None and s is not None:
+            state = IAPWS97(P=P, s=s)
+        else:
+            raise ValueError("Insufficient parameters provided")
+        
+        return {
+            'P': state.P,      # MPa
+            'T': state.T,      # K
+            'v': state.v,      # m³/kg
+            'h': state.h,      # kJ/kg
+            's': state.s,      # kJ/kg·K
+            'u': state.u,      # kJ/kg
+            'x': getattr(state, 'x', None),  # Quality
+            'phase': state.phase
+        }
+    
     def rankine_cycle_analysis(self, P_boiler, T_boiler, P_condenser, efficiency_pump=0.85, efficiency_turbine=0.85):
         """Analyze Rankine cycle"""
         try:
@@ -184,16 +264,7 @@ class ThermodynamicsAPI:
             x2 = 1 - x1
             
             # Calculate activity coefficients
-            if model == 'wilson' and A12 is not None and A21 is not None:
-                # Wilson equation
-                ln_gamma1 = -np.log(x1 + A12 * x2) + x2 * (A12 / (x1 + A12 * x2) - A21 / (x2 + A21 * x1))
-                ln_gamma2 = -np.log(x2 + A21 * x1) - x1 * (A12 / (x1 + A12 * x2) - A21 / (x2 + A21 * x1))
-                gamma1 = np.exp(ln_gamma1)
-                gamma2 = np.exp(ln_gamma2)
-            else:
-                # Ideal solution
-                gamma1 = 1.0
-                gamma2 = 1.0
+            gamma1, gamma2 = binary_activity_coefficients(x1, model, A12, A21)
             
             # Total pressure
             P_total = x1 * gamma1 * P_sat_1 + x2 * gamma2 * P_sat_2
@@ -218,6 +289,87 @@ class ThermodynamicsAPI:
 # Initialize API
 thermo_api = ThermodynamicsAPI()
 
+# Single-case evaluation of each batch calculation type
+SINGLE_CASE = {
+    'steam-properties': thermo_api.steam_properties,
+    'rankine-cycle': thermo_api.rankine_cycle_analysis,
+    'brayton-cycle': thermo_api.brayton_cycle_analysis,
+    'vle-calculation': thermo_api.vle_calculation,
+}
+
+def evaluate_single_case(kind, case):
+    """Evaluate one batch case with its single-case method"""
+    return SINGLE_CASE[kind](**case)
+
+def run_batch_cases(cases):
+    """Batch evaluation (runs in a worker process)"""
+    return run_batch(cases, fallback=evaluate_single_case)
+
+@app.errorhandler(PoolSaturated)
+def handle_pool_saturated(e):
+    """All worker slots are taken: ask the client to retry"""
+    return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+
+@app.errorhandler(CalculationTimeout)
+def handle_calculation_timeout(e):
+    """The calculation did not finish within the pool timeout"""
+    return jsonify({'error': str(e)}), 504
+
+@app.before_request
+def apply_settings():
+    """Reconfigure the worker pool and response cache when their keys in app.config have changed"""
+    for name, service, current in (('calculation_pool', calculation_pool, calculation_settings),
+                                   ('response_cache', response_cache, response_cache_settings)):
+        settings = current()
+        if settings != applied_settings[name]:
+            service.configure(*settings)
+            applied_settings[name] = settings
+
+def _cached_response(body, etag):
+    """Response for a stored body, or 304 when the client already has it"""
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+@app.before_request
+def serve_cached_response():
+    """Answer a repeated calculation request from the response cache"""
+    g.response_cache_key = None
+    if (not app.config['RESPONSE_CACHE_ENABLED'] or request.method != 'POST'
+            or not request.path.startswith('/api/')):
+        return None
+    try:
+        key = canonical_key(request.path, request.get_data())
+    except ValueError:
+        return None  # Not JSON: the route reports the error
+    entry = response_cache.get(key)
+    if entry is not None:
+        response = _cached_response(*entry)
+        response.headers['X-Cache'] = 'HIT'
+        return response
+    g.response_cache_key = key
+    return None
+
+@app.after_request
+def store_cached_response(response):
+    """Keep successful calculation responses for identical requests"""
+    key = g.get('response_cache_key')
+    if key is None or response.status_code != 200 or not response.is_json:
+        return response
+    result = response.get_json(silent=True)
+    if isinstance(result, dict) and 'error' in result:
+        return response  # Errors may be transient (e.g. a failed worker)
+    body, etag = response_cache.put(key, response.get_data())
+    if request.if_none_match.contains(etag):
+        response = _cached_response(body, etag)
+    else:
+        response.set_etag(etag)
+    response.headers['X-Cache'] = 'MISS'
+    return response
+
 @app.route('/')
 def index():
     """Serve the main page"""
@@ -234,17 +386,49 @@ def api_steam_properties():
         h = data.get('h')
         s = data.get('s')
         
-        result = thermo_api.steam_properties(P=P, T=T, x=x, h=h, s=s)
-        return jsonify(result)
+        # Cached states and saturation-table lookups are answered inline; only
+        # IAPWS97 solves go to a worker
+        key = thermo_api.steam_cache_key(P, T, x, h, s)
+        cached = steam_state_cache.get(key)
+        if cached is not None:
+            return jsonify(dict(cached))
+        try:
+            result = thermo_api._table_steam_state(P, T, x)
+            if result is None:
+                result = calculation_pool.run(thermo_api._solve_steam_state, P, T, x, h, s)
+        except (PoolSaturated, CalculationTimeout):
+            raise
+        except Exception as e:
+            return jsonify({'error': str(e)})
+        steam_state_cache.put(key, result)
+        return jsonify(dict(result))
+    except (PoolSaturated, CalculationTimeout):
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/cache-stats', methods=['GET'])
+def api_cache_stats():
+    """API endpoint for steam state cache counters"""
+    return jsonify(steam_state_cache.stats())
+
+@app.route('/api/response-cache-stats', methods=['GET'])
+def api_response_cache_stats():
+    """API endpoint for response cache counters"""
+    return jsonify(response_cache.stats())
+
+@app.route('/api/worker-stats', methods=['GET'])
+def api_worker_stats():
+    """API endpoint for the calculation worker pool limits and load"""
+    return jsonify(calculation_pool.stats())
+
 @app.route('/api/rankine-cycle', methods=['POST'])
 def api_rankine_cycle():
     """API endpoint for Rankine cycle analysis"""
     try:
         data = request.get_json()
-        result = thermo_api.rankine_cycle_analysis(
+        result = calculation_pool.run(
+            thermo_api.rankine_cycle_analysis,
             P_boiler=data['P_boiler'],
             T_boiler=data['T_boiler'],
             P_condenser=data['P_condenser'],
@@ -252,6 +436,8 @@ def api_rankine_cycle():
             efficiency_turbine=data.get('efficiency_turbine', 0.85)
         )
         return jsonify(result)
+    except (PoolSaturated, CalculationTimeout):
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -290,6 +476,35 @@ def api_vle_calculation():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """
+    API endpoint for many calculations in one request
+    
+    Body: {"cases": [{"type": "steam-properties", "P": 1.0, "T": 500}, ...]}
+    (or the bare list), where type names one of the single-case routes and
+    the other fields are that route's parameters. Cases of the same type
+    are evaluated together; results and per-case errors come back in order.
+    """
+    try:
+        data = request.get_json()
+        cases = data.get('cases') if isinstance(data, dict) else data
+        if not isinstance(cases, list):
+            raise ValueError("Body must be a list of cases or {'cases': [...]}")
+        limit = app.config['BATCH_MAX_CASES']
+        if len(cases) > limit:
+            return jsonify({'error': f"At most {limit} cases per batch, got {len(cases)}"}), 413
+        results = calculation_pool.run(run_batch_cases, cases)
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'errors': sum('error' in result for result in results)
+        })
+    except (PoolSaturated, CalculationTimeout):
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/api/vle-phase-diagram', methods=['POST'])
 def api_vle_phase_diagram():
     """API endpoint for VLE phase diagram data"""
@@ -317,14 +532,7 @@ def api_vle_phase_diagram():
             x2 = 1 - x
             
             # Calculate activity coefficients
-            if model == 'wilson' and A12 is not None and A21 is not None:
-                ln_gamma1 = -np.log(x + A12 * x2) + x2 * (A12 / (x + A12 * x2) - A21 / (x2 + A21 * x))
-                ln_gamma2 = -np.log(x2 + A21 * x) - x * (A12 / (x + A12 * x2) - A21 / (x2 + A21 * x))
-                gamma1 = np.exp(ln_gamma1)
-                gamma2 = np.exp(ln_gamma2)
-            else:
-                gamma1 = 1.0
-                gamma2 = 1.0
+            gamma1, gamma2 = binary_activity_coefficients(x, model, A12, A21)
             
             # Calculate total pressure
             P_total = x * gamma1 * P_sat_1 + x2 * gamma2 * P_sat_2
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Batch Evaluation for the Flask API
+Many calculation cases of any type in one request: cases of the same type
+(and, for steam, the same input pair) are evaluated together by the
+vectorized IF97 and cycle code, and results come back in request order
+@author: Bryan Piguave Llano
+"""
+
+import math
+
+import numpy as np
+
+from src.core.if97_vectorized import steam_properties_batch, phase_names, PHASE_INVALID
+from src.core.activity_models import Wilson
+
+BATCH_MAX_CASES = 10000
+
+# Calculation types (named after the single-case routes): required
+# parameters and optional parameters with their defaults
+CALCULATIONS = {
+    'steam-properties': ((), {'P': None, 'T': None, 'x': None, 'h': None, 's': None}),
+    'rankine-cycle': (('P_boiler', 'T_boiler', 'P_condenser'),
+                      {'efficiency_pump': 0.85, 'efficiency_turbine': 0.85}),
+    'brayton-cycle': (('P_compressor_in', 'T_compressor_in', 'P_compressor_out', 'T_turbine_in'),
+                      {'efficiency_compressor': 0.85, 'efficiency_turbine': 0.85}),
+    'vle-calculation': (('T', 'P_sat_1', 'P_sat_2', 'x1'),
+                        {'model': 'ideal', 'A12': None, 'A21': None}),
+}
+# Steam input pairs in the order ThermodynamicsAPI.steam_properties tries them
+STEAM_MODES = ('T', 'x', 'h', 's')
+STEAM_KEYS = ('P', 'T', 'v', 'h', 's', 'u', 'x')
+R_GAS = 8.314  # J/mol·K, as in ThermodynamicsAPI
+
+
+def _number(value):
+    """Plain float for JSON (None for NaN/inf)"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _parse(case):
+    """
+    Type and parameters of one case
+
+    Returns:
+    tuple: (type, parameters); raises ValueError for an invalid case
+    """
+    if not isinstance(case, dict):
+        raise ValueError("Each case must be an object")
+    kind = case.get('type')
+    if kind not in CALCULATIONS:
+        raise ValueError(f"Unknown calculation type {kind!r}; use one of {tuple(CALCULATIONS)}")
+    required, optional = CALCULATIONS[kind]
+    parameters = {}
+    for name in required:
+        if case.get(name) is None:
+            raise ValueError(f"Missing parameter '{name}'")
+        parameters[name] = case[name]
+    for name, default in optional.items():
+        parameters[name] = case.get(name, default)
+    for name, value in parameters.items():
+        if name != 'model' and value is not None:
+            try:
+                parameters[name] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parameter '{name}' must be a number") from None
+    return kind, parameters
+
+
+def _columns(cases, names):
+    """Arrays of the named parameters over a group of parsed cases"""
+    return {name: np.array([case[name] for case in cases], dtype=float) for name in names}
+
+
+def _steam_states(P, mode, values):
+    """
+    Steam states in the format of ThermodynamicsAPI.steam_properties, or
+    an error dict where the state is outside IAPWS-IF97
+    """
+    state = steam_properties_batch(P, **{mode: values})
+    names = phase_names(state['phase'])
+    valid = (state['phase'] != PHASE_INVALID) & np.isfinite(state['h'])
+    return [{key: _number(state[key][i]) for key in STEAM_KEYS} | {'phase': names[i]}
+            if valid[i] else {'error': "State outside the IAPWS-IF97 range"}
+            for i in range(len(P))]
+
+
+def _steam_group(cases):
+    results = [None] * len(cases)
+    by_mode = {}
+    for i, case in enumerate(cases):
+        mode = next((m for m in STEAM_MODES if case[m] is not None), None)
+        if case['P'] is None or mode is None:
+            results[i] = {'error': "Insufficient parameters provided"}
+        else:
+            by_mode.setdefault(mode, []).append(i)
+    for mode, rows in by_mode.items():
+        P = np.array([cases[i]['P'] for i in rows])
+        values = np.array([cases[i][mode] for i in rows])
+        for i, state in zip(rows, _steam_states(P, mode, values)):
+            results[i] = state
+    return results
+
+
+def _rankine_group(cases):
+    """Same model as ThermodynamicsAPI.rankine_cycle_analysis, for all cases at once"""
+    c = _columns(cases, ('P_boiler', 'T_boiler', 'P_condenser',
+                         'efficiency_pump', 'efficiency_turbine'))
+    P_b, P_c = c['P_boiler'], c['P_condenser']
+    state_1 = _steam_states(P_c, 'x', np.zeros_like(P_c))
+    state_3 = _steam_states(P_b, 'T', c['T_boiler'])
+    s_1 = np.array([state.get('s') for state in state_1], dtype=float)
+    s_3 = np.array([state.get('s') for state in state_3], dtype=float)
+    state_2s = _steam_states(P_b, 's', s_1)
+    state_4s = _steam_states(P_c, 's', s_3)
+
+    results = []
+    for i in range(len(cases)):
+        failed = next((state for state in (state_1[i], state_2s[i], state_3[i], state_4s[i])
+                       if 'error' in state), None)
+        if failed is not None:
+            results.append(failed)
+            continue
+        h_1, v_1 = state_1[i]['h'], state_1[i]['v']
+        w_pump = v_1 * (P_b[i] - P_c[i]) * 1000 / c['efficiency_pump'][i]
+        h_2 = h_1 + w_pump
+        h_3 = state_3[i]['h']
+        w_turbine = (h_3 - state_4s[i]['h']) * c['efficiency_turbine'][i]
+        h_4 = h_3 - w_turbine
+        q_in = h_3 - h_2
+        w_net = w_turbine - w_pump
+        try:
+            results.append({
+                'states': {
+                    'state_1': state_1[i],
+                    'state_2': {'h': h_2, 'P': P_b[i], 's': state_1[i]['s']},
+                    'state_3': state_3[i],
+                    'state_4': {'h': h_4, 'P': P_c[i], 's': state_3[i]['s']}
+                },
+                'work_pump': w_pump,
+                'work_turbine': w_turbine,
+                'work_net': w_net,
+                'heat_input': q_in,
+                'heat_output': h_4 - h_1,
+                'efficiency_thermal': w_net / q_in,
+                'efficiency_carnot': 1 - state_1[i]['T'] / state_3[i]['T'],
+                'back_work_ratio': w_pump / w_turbine
+            })
+        except ZeroDivisionError as e:
+            results.append({'error': str(e)})
+    return _plain(results)
+
+
+def _brayton_group(cases):
+    """Same model as ThermodynamicsAPI.brayton_cycle_analysis (gamma = 1.4)"""
+    c = _columns(cases, ('P_compressor_in', 'T_compressor_in', 'P_compressor_out',
+                         'T_turbine_in', 'efficiency_compressor', 'efficiency_turbine'))
+    gamma = 1.4
+    k = (gamma - 1) / gamma
+    T_1, P_1 = c['T_compressor_in'], c['P_compressor_in']
+    P_2, T_3 = c['P_compressor_out'], c['T_turbine_in']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        T_2s = T_1 * (P_2 / P_1) ** k
+        w_compressor = R_GAS * (T_2s - T_1) / (gamma - 1) / c['efficiency_compressor']
+        T_2 = T_1 + w_compressor * (gamma - 1) / R_GAS
+        T_4s = T_3 * (P_1 / P_2) ** k
+        w_turbine = R_GAS * (T_3 - T_4s) / (gamma - 1) * c['efficiency_turbine']
+        T_4 = T_3 - w_turbine * (gamma - 1) / R_GAS
+        q_in = R_GAS * (T_3 - T_2) / (gamma - 1)
+        q_out = R_GAS * (T_4 - T_1) / (gamma - 1)
+        w_net = w_turbine - w_compressor
+        columns = {
+            'work_compressor': w_compressor,
+            'work_turbine': w_turbine,
+            'work_net': w_net,
+            'heat_input': q_in,
+            'heat_output': q_out,
+            'efficiency_thermal': w_net / q_in,
+            'efficiency_carnot': 1 - T_1 / T_3,
+            'back_work_ratio': w_compressor / w_turbine,
+        }
+    results = []
+    for i in range(len(cases)):
+        item = {'states': {
+            'state_1': {'T': T_1[i], 'P': P_1[i]},
+            'state_2': {'T': T_2[i], 'P': P_2[i]},
+            'state_3': {'T': T_3[i], 'P': P_2[i]},
+            'state_4': {'T': T_4[i], 'P': P_1[i]}
+        }}
+        item.update({key: values[i] for key, values in columns.items()})
+        results.append(item)
+    return _plain(results)
+
+
+def _vle_group(cases):
+    """Modified Raoult bubble pressures; binary Wilson where A12 and A21 are given"""
+    c = _columns(cases, ('T', 'P_sat_1', 'P_sat_2', 'x1'))
+    wilson = np.array([case['model'] == 'wilson' and case['A12'] is not None
+                       and case['A21'] is not None for case in cases])
+    # Stacked (m, 2, 2) Λ for the shared Wilson model; ideal rows get Λ = 1
+    Lambda = np.ones((len(cases), 2, 2))
+    Lambda[wilson, 0, 1] = [case['A12'] for case, w in zip(cases, wilson) if w]
+    Lambda[wilson, 1, 0] = [case['A21'] for case, w in zip(cases, wilson) if w]
+    x1 = c['x1']
+    x2 = 1 - x1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = Wilson(Lambda=Lambda).gamma(np.stack([x1, x2], axis=-1))
+        gamma1 = np.where(wilson, gamma[:, 0], 1.0)
+        gamma2 = np.where(wilson, gamma[:, 1], 1.0)
+        P_total = x1 * gamma1 * c['P_sat_1'] + x2 * gamma2 * c['P_sat_2']
+        y1 = x1 * gamma1 * c['P_sat_1'] / P_total
+    columns = {'P_total': P_total, 'y1': y1, 'y2': 1 - y1, 'gamma1': gamma1,
+               'gamma2': gamma2, 'x1': x1, 'x2': x2, 'T': c['T']}
+    return _plain([{key: values[i] for key, values in columns.items()}
+                   for i in range(len(cases))])
+
+
+def _plain(value):
+    """Convert numpy numbers in nested results to JSON-safe floats"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, (float, np.floating, np.integer)):
+        return _number(value)
+    return value
+
+
+GROUP_EVALUATORS = {
+    'steam-properties': _steam_group,
+    'rankine-cycle': _rankine_group,
+    'brayton-cycle': _brayton_group,
+    'vle-calculation': _vle_group,
+}
+
+
+def run_batch(cases, fallback=None):
+    """
+    Evaluate a list of calculation cases, grouped by type
+
+    Parameters:
+    cases: List of dicts, each with 'type' (a key of CALCULATIONS) and the
+           parameters of the matching single-case route
+    fallback: Optional callable fallback(type, parameters) evaluating one
+              case; used for the cases of a group whose vectorized
+              evaluation raised
+
+    Returns:
+    list: One result dict per case, in order; invalid or failed cases get
+          {'error': message}
+    """
+    results = [None] * len(cases)
+    groups = {}
+    for i, case in enumerate(cases):
+        try:
+            kind, parameters = _parse(case)
+        except ValueError as e:
+            results[i] = {'error': str(e)}
+            continue
+        groups.setdefault(kind, ([], []))
+        groups[kind][0].append(i)
+        groups[kind][1].append(parameters)
+
+    for kind, (rows, parameters) in groups.items():
+        try:
+            group_results = GROUP_EVALUATORS[kind](parameters)
+        except Exception as e:
+            if fallback is None:
+                group_results = [{'error': str(e)}] * len(rows)
+            else:
+                group_results = [fallback(kind, case) for case in parameters]
+        for i, result in zip(rows, group_results):
+            results[i] = result
+    return results
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP Response Cache for the Flask API
+Encoded JSON responses keyed by a hash of the route and the canonical
+request body, in an in-process LRU with an optional on-disk tier shared by
+several server processes, with ETags and If-None-Match / 304 support
+@author: Bryan Piguave Llano
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+MiB = 1024 * 1024
+
+
+def _normalize(value):
+    """Numbers as floats (1 and 1.0 give the same calculation), containers recursively"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def canonical_key(route, body):
+    """
+    Content hash of a request
+
+    Parameters:
+    route: Request path
+    body: Raw request body (bytes); must be JSON
+
+    Returns:
+    str: Hex SHA-256 of the route and the body with sorted keys, no
+         whitespace and every number as a float
+    """
+    canonical = json.dumps(_normalize(json.loads(body or b'null')), sort_keys=True,
+                           separators=(',', ':'), allow_nan=True)
+    return hashlib.sha256(f'{route}\n{canonical}'.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Encoded responses by request hash: in-memory LRU, then an optional
+    directory of files (one per response, written atomically, so several
+    processes can share it)
+
+    Entries are (body bytes, ETag). The ETag is a hash of the body, so
+    clients can revalidate with If-None-Match even after the entry was
+    evicted and recomputed. The memory tier is bounded by entry count and
+    by total bytes; the disk tier by total bytes, pruned (expired files
+    first, then the oldest) every prune_interval writes. Responses larger
+    than max_entry_bytes (e.g. big batches) are not cached at all.
+    """
+
+    def __init__(self, maxsize=1024, max_bytes=64 * MiB, max_entry_bytes=1 * MiB, ttl=None,
+                 directory=None, max_disk_bytes=1024 * MiB, prune_interval=256):
+        """
+        Parameters:
+        maxsize: Entries kept in memory (least recently used evicted first)
+        max_bytes: Total size of the bodies kept in memory
+        max_entry_bytes: Largest body that is cached
+        ttl: Time-to-live of an entry in seconds, both tiers (None or 0: no expiry)
+        directory: Directory of the shared on-disk tier (None: memory only)
+        max_disk_bytes: Total size of the files in the disk tier
+        prune_interval: Writes to the disk tier between two prunes
+        """
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.configure(maxsize, max_bytes, max_entry_bytes, ttl, directory, max_disk_bytes,
+                       prune_interval)
+
+    def configure(self, maxsize=1024, max_bytes=64 * MiB, max_entry_bytes=1 * MiB, ttl=None,
+                  directory=None, max_disk_bytes=1024 * MiB, prune_interval=256):
+        """
+        Set every limit (see __init__); the memory tier and the counters
+        are cleared, files already on disk are kept
+        """
+        if maxsize < 1 or max_bytes < 1 or max_entry_bytes < 1 or prune_interval < 1:
+            raise ValueError("Cache sizes and prune_interval must be at least 1")
+        with self._lock:
+            self.maxsize = int(maxsize)
+            self.max_bytes = int(max_bytes)
+            self.max_entry_bytes = int(max_entry_bytes)
+            self.ttl = ttl or None
+            self.directory = None if directory is None else Path(directory)
+            self.max_disk_bytes = int(max_disk_bytes)
+            self.prune_interval = int(prune_interval)
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.oversized = 0
+            self.disk_hits = 0
+            self.disk_misses = 0
+            self.disk_pruned = 0
+            self._writes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def etag(body):
+        """ETag value (unquoted) of an encoded response"""
+        return hashlib.sha256(body).hexdigest()[:32]
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.json'
+
+    def _remember(self, key, entry):
+        """Put an entry in the memory tier and evict down to the limits (lock held)"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old[0])
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (entry[0], entry[1], expires)
+        self.bytes += len(entry[0])
+        while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+            _, (body, _, _) = self._entries.popitem(last=False)
+            self.bytes -= len(body)
+            self.evictions += 1
+
+    def get(self, key):
+        """
+        Cached response
+
+        Parameters:
+        key: Hash from canonical_key
+
+        Returns:
+        tuple: (body bytes, ETag) or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                body, etag, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body, etag
+                del self._entries[key]
+                self.bytes -= len(body)
+                self.expirations += 1
+            self.misses += 1
+            directory = self.directory
+        if directory is None:
+            return None
+        path = self._path(key)
+        try:
+            if self.ttl and time.time() - path.stat().st_mtime > self.ttl:
+                raise FileNotFoundError
+            body = path.read_bytes()
+        except OSError:
+            with self._lock:
+                self.disk_misses += 1
+            return None
+        entry = (body, self.etag(body))
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, body):
+        """
+        Store an encoded response in both tiers
+
+        Parameters:
+        key: Hash from canonical_key
+        body: Encoded response body (bytes)
+
+        Returns:
+        tuple: (body, ETag); the entry is not stored if the body is larger
+               than max_entry_bytes
+        """
+        entry = (body, self.etag(body))
+        with self._lock:
+            if len(body) > self.max_entry_bytes:
+                self.oversized += 1
+                return entry
+            self._remember(key, entry)
+            directory = self.directory
+            self._writes += 1
+            prune = self._writes % self.prune_interval == 0
+        if directory is not None:
+            path = self._path(key)
+            try:
+                path.parent.mkdir(exist_ok=True)
+                handle, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+                with os.fdopen(handle, 'wb') as f:
+                    f.write(body)
+                os.replace(temporary, path)
+            except OSError:
+                pass  # The disk tier is best effort; memory still holds the entry
+            if prune:
+                self.prune()
+        return entry
+
+    def prune(self):
+        """
+        Delete expired files from the disk tier, then the oldest ones until
+        the tier fits in max_disk_bytes
+
+        Returns:
+        int: Number of files deleted
+        """
+        if self.directory is None:
+            return 0
+        now = time.time()
+        files = []
+        for path in self.directory.glob('*/*.json'):
+            try:
+                status = path.stat()
+            except OSError:
+                continue  # Deleted by another process
+            files.append((status.st_mtime, status.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        deleted = 0
+        for mtime, size, path in files:
+            expired = self.ttl and now - mtime > self.ttl
+            if not expired and total <= self.max_disk_bytes:
+                continue
+            try:
+                path.unlink()
+                deleted += 1
+            except OSError:
+                pass
+            total -= size
+        with self._lock:
+            self.disk_pruned += deleted
+        return deleted
+
+    def clear(self):
+        """Remove every entry from memory and disk"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob('*/*.json'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        Cache counters
+
+        Returns:
+        dict: hits, misses, evictions, expirations, oversized (responses too
+              large to cache), size, bytes and the limits of the memory
+              tier; disk_hits, disk_misses, disk_pruned and directory
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'oversized': self.oversized,
+                'size': len(self._entries),
+                'bytes': self.bytes,
+                'maxsize': self.maxsize,
+                'max_bytes': self.max_bytes,
+                'max_entry_bytes': self.max_entry_bytes,
+                'ttl': self.ttl,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'disk_hits': self.disk_hits,
+                'disk_misses': self.disk_misses,
+                'disk_pruned': self.disk_pruned,
+                'directory': str(self.directory) if self.directory else None,
+            }
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Worker Pool for CPU-Bound API Calculations
+Process-pool executor with a bounded number of queued and running tasks,
+per-call timeouts and cancellation, usable from WSGI threads (run) or an
+ASGI event loop (run_async)
+@author: Bryan Piguave Llano
+"""
+
+import asyncio
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when the pool already holds its maximum number of tasks"""
+
+    def __init__(self, retry_after):
+        super().__init__("Server busy: calculation queue is full, retry later")
+        self.retry_after = retry_after
+
+
+class CalculationTimeout(TimeoutError):
+    """Raised when a calculation does not finish within its timeout"""
+
+
+class CalculationPool:
+    """
+    Bounded process pool for calculations that would block request threads
+
+    At most max_pending tasks are queued or running at once; beyond that,
+    submit raises PoolSaturated immediately instead of queueing, so the
+    server can answer 503 with Retry-After. A call that times out is
+    cancelled if it has not been handed to a worker yet; a calculation
+    already in a worker process cannot be interrupted and keeps its slot
+    until it finishes. Workers are started with 'spawn' (safe in multi-threaded
+    servers, and the only method on Windows), on first use.
+
+    With max_workers=0 calculations run inline in the calling thread
+    (development server, tests); the queue bound still applies.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, timeout=30.0, retry_after=1):
+        """
+        Parameters:
+        max_workers: Worker processes (default: CPU count, at most 4; 0 runs inline)
+        max_pending: Most tasks queued or running at once (default 4 per worker)
+        timeout: Default timeout of a call (s), measured from submission
+        retry_after: Seconds suggested to clients when the pool is saturated
+        """
+        self._lock = threading.Lock()
+        self._executor = None
+        self.configure(max_workers, max_pending, timeout, retry_after)
+        atexit.register(self.shutdown)
+
+    def configure(self, max_workers=None, max_pending=None, timeout=None, retry_after=None):
+        """
+        Change the pool limits; running workers are shut down and restarted
+        on the next call
+
+        Parameters:
+        max_workers, max_pending, timeout, retry_after: See __init__ (None
+        keeps the current value, or the default on the first call)
+        """
+        self.shutdown()
+        with self._lock:
+            if max_workers is not None or not hasattr(self, 'max_workers'):
+                self.max_workers = (min(os.cpu_count() or 1, 4) if max_workers is None
+                                    else int(max_workers))
+            if max_pending is not None or not hasattr(self, 'max_pending'):
+                self.max_pending = (4 * max(self.max_workers, 1) if max_pending is None
+                                    else int(max_pending))
+            if self.max_workers < 0 or self.max_pending < 1:
+                raise ValueError("max_workers must be >= 0 and max_pending >= 1")
+            if timeout is not None:
+                self.timeout = float(timeout)
+            if retry_after is not None:
+                self.retry_after = int(retry_after)
+            # Tasks still running from before keep releasing their own semaphore
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            if not hasattr(self, 'pending'):
+                self.pending = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _release(self, slots):
+        with self._lock:
+            self.pending -= 1
+        slots.release()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue a calculation without waiting for it
+
+        Parameters:
+        func: Picklable callable (module-level function or method of a
+              module-level object)
+        args, kwargs: Its arguments
+
+        Returns:
+        Future: concurrent.futures.Future of the result
+        """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PoolSaturated(self.retry_after)
+        with self._lock:
+            self.pending += 1
+        try:
+            try:
+                future = self._get_executor().submit(func, *args, **kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed by the OS): start a fresh pool once
+                self.shutdown()
+                future = self._get_executor().submit(func, *args, **kwargs)
+        except BaseException:
+            self._release(slots)
+            raise
+        future.add_done_callback(lambda _: self._release(slots))
+        return future
+
+    def run(self, func, *args, timeout=None, **kwargs):
+        """
+        Run a calculation and wait for its result (WSGI request threads)
+
+        Parameters:
+        func, args, kwargs: See submit
+        timeout: Seconds to wait (default: the pool timeout)
+
+        Returns:
+        object: Result of func; exceptions raised by func propagate
+        """
+        if self.max_workers == 0:
+            slots = self._slots
+            if not slots.acquire(blocking=False):
+                raise PoolSaturated(self.retry_after)
+            with self._lock:
+                self.pending += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._release(slots)
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise CalculationTimeout("Calculation timed out") from None
+
+    async def run_async(self, func, *args, timeout=None, **kwargs):
+        """
+        Await a calculation from an event loop (ASGI deployments)
+
+        Cancelling the awaiting task (e.g. on client disconnect) cancels
+        the calculation if it has not been handed to a worker yet.
+
+        Parameters:
+        func, args, kwargs: See submit
+        timeout: Seconds to wait (default: the pool timeout)
+
+        Returns:
+        object: Result of func
+        """
+        if self.max_workers == 0:
+            return self.run(func, *args, **kwargs)
+        future = asyncio.wrap_future(self.submit(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            raise CalculationTimeout("Calculation timed out") from None
+
+    def stats(self):
+        """
+        Pool counters
+
+        Returns:
+        dict: max_workers, max_pending, pending (queued or running), timeout
+              and retry_after
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'timeout': self.timeout,
+                'retry_after': self.retry_after,
+            }
+
+    def shutdown(self):
+        """Stop the worker processes, cancelling queued calculations"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
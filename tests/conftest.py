@@ -0,0 +1,21 @@
+"""Shared fixtures of the test suite"""
+
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def web():
+    """
+    The Flask app module with calculations run inline and the response
+    cache off (tests that need it switch it on); settings are restored after
+    """
+    module = importlib.import_module('src.web.app')
+    saved = dict(module.app.config)
+    module.app.config.update(CALCULATION_WORKERS=0, RESPONSE_CACHE_ENABLED=False)
+    module.app.testing = True
+    yield module
+    module.app.config.clear()
+    module.app.config.update(saved)
+    module.response_cache.clear()
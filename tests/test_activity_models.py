@@ -0,0 +1,59 @@
+"""Tests for the activity coefficient models (src/core/activity_models.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.activity_models import get_activity_model, Margules, VanLaar
+
+# Temperature-dependent ternary parameter sets of every registered model
+MODELS = {
+    'wilson': dict(a=[[0.0, 300.0, -150.0], [450.0, 0.0, 200.0], [100.0, 250.0, 0.0]],
+                   V=[5.9e-5, 1.8e-5, 7.4e-5]),
+    'nrtl': dict(b=[[0.0, 350.0, 120.0], [600.0, 0.0, -80.0], [200.0, 400.0, 0.0]],
+                 alpha=0.3),
+    'uniquac': dict(r=[2.11, 0.92, 3.19], q=[1.97, 1.40, 2.40],
+                    a=[[0.0, 150.0, -50.0], [300.0, 0.0, 80.0], [40.0, 120.0, 0.0]]),
+    'margules': dict(A=[[0.0, 0.8, 0.3], [1.1, 0.0, 0.5], [0.4, 0.6, 0.0]],
+                     B=[[0.0, 50.0, 0.0], [-30.0, 0.0, 20.0], [10.0, 0.0, 0.0]]),
+}
+X = np.random.default_rng(6).dirichlet(np.ones(3), size=20)
+T = 340.0
+
+
+@pytest.mark.parametrize('name', sorted(MODELS))
+def test_analytic_composition_derivatives(name):
+    model = get_activity_model(name, **MODELS[name])
+    result = model.derivatives(X, T)
+    np.testing.assert_allclose(result['ln_gamma'], model.ln_gamma(X, T), atol=1e-14)
+
+    # ∂ ln γ_i/∂n_j by central differences in the mole numbers
+    h = 1e-6
+    numeric = np.empty((len(X), 3, 3))
+    for j in range(3):
+        dn = np.zeros(3)
+        dn[j] = h
+        plus, minus = X + dn, X - dn
+        numeric[:, :, j] = (model.ln_gamma(plus / plus.sum(-1, keepdims=True), T)
+                            - model.ln_gamma(minus / minus.sum(-1, keepdims=True), T)) / (2 * h)
+    np.testing.assert_allclose(result['dln_gamma_dx'], numeric, atol=1e-7)
+    # Symmetric, and Gibbs-Duhem: Σ_i x_i ∂ ln γ_i/∂n_j = 0
+    np.testing.assert_allclose(result['dln_gamma_dx'],
+                               np.swapaxes(result['dln_gamma_dx'], -1, -2), atol=1e-10)
+    np.testing.assert_allclose(np.einsum('mi,mij->mj', X, result['dln_gamma_dx']), 0.0,
+                               atol=1e-10)
+
+
+@pytest.mark.parametrize('name', sorted(MODELS))
+def test_analytic_temperature_derivatives(name):
+    model = get_activity_model(name, **MODELS[name])
+    dT = 1e-4
+    numeric = (model.ln_gamma(X, T + dT) - model.ln_gamma(X, T - dT)) / (2 * dT)
+    np.testing.assert_allclose(model.derivatives(X, T)['dln_gamma_dT'], numeric, atol=1e-8)
+
+
+def test_binary_infinite_dilution_limits():
+    x = np.array([[1e-12, 1 - 1e-12], [1 - 1e-12, 1e-12]])
+    ln_gamma = Margules(A=[[0.0, 0.7], [1.2, 0.0]]).ln_gamma(x)
+    np.testing.assert_allclose([ln_gamma[0, 0], ln_gamma[1, 1]], [0.7, 1.2], atol=1e-9)
+    ln_gamma = VanLaar(A=[0.9, 1.6]).ln_gamma(x)
+    np.testing.assert_allclose([ln_gamma[0, 0], ln_gamma[1, 1]], [0.9, 1.6], atol=1e-9)
@@ -0,0 +1,42 @@
+"""Tests for the binary azeotrope finder (src/core/azeotropes.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.activity_models import Wilson
+from src.core.azeotropes import find_azeotropes, azeotrope_map
+from src.core.components import get_component_database
+
+
+def test_ethanol_water_azeotrope_at_one_atmosphere():
+    database = get_component_database()
+    gamma = database.activity_model(['Ethanol', 'Water'])
+    result = find_azeotropes(gamma, database.P_sat_function(['Ethanol', 'Water']), P=101325.0)
+    assert result['count'] == 1
+    # Literature: x1 = 0.894, 351.3 K (78.2 °C), minimum boiling
+    assert result['x1'][0] == pytest.approx(0.894, abs=0.03)
+    assert result['T'][0] == pytest.approx(351.3, abs=0.5)
+    assert result['kind'][0] == 'minimum_boiling'
+    assert result['converged'][0]
+
+
+def test_isothermal_azeotrope_condition():
+    # Positive deviations, close vapour pressures: γ1 P_sat,1 = γ2 P_sat,2 at the azeotrope
+    gamma = Wilson(Lambda=[[1.0, 0.3], [0.4, 1.0]])
+    P_sat = np.array([1.0e5, 0.9e5])
+    T = np.array([330.0, 340.0])
+    result = find_azeotropes(gamma, lambda T: np.broadcast_to(P_sat, np.shape(T) + (2,)), T=T)
+    np.testing.assert_array_equal(result['count'], [1, 1])
+    x1 = result['x1'][:, 0]
+    g = gamma.gamma(np.stack([x1, 1 - x1], axis=-1))
+    np.testing.assert_allclose(g[:, 0] * P_sat[0], g[:, 1] * P_sat[1], rtol=1e-9)
+    np.testing.assert_allclose(result['P'][:, 0], g[:, 0] * P_sat[0], rtol=1e-9)
+    assert list(result['kind'][:, 0]) == ['minimum_boiling'] * 2
+
+
+def test_ideal_system_has_no_azeotrope():
+    result = azeotrope_map({'ideal': (Wilson(Lambda=np.ones((2, 2))),
+                                      lambda T: np.stack([2e5 * np.ones_like(T),
+                                                          1e5 * np.ones_like(T)], axis=-1))},
+                           T=np.array([300.0, 350.0]))
+    np.testing.assert_array_equal(result['ideal']['count'], [0, 0])
@@ -0,0 +1,51 @@
+"""Tests for the /api/batch endpoint and grouped evaluation (src/web/batch.py)"""
+
+import pytest
+
+CASES = [
+    {'type': 'steam-properties', 'P': 1.0, 'T': 500.0},
+    {'type': 'steam-properties', 'P': 0.1, 'x': 0.5},
+    {'type': 'steam-properties', 'P': 5.0, 'h': 3000.0},
+    {'type': 'rankine-cycle', 'P_boiler': 10.0, 'T_boiler': 773.15, 'P_condenser': 0.01},
+    {'type': 'brayton-cycle', 'P_compressor_in': 100.0, 'T_compressor_in': 300.0,
+     'P_compressor_out': 1000.0, 'T_turbine_in': 1400.0},
+    {'type': 'vle-calculation', 'T': 350.0, 'P_sat_1': 1.2e5, 'P_sat_2': 0.8e5, 'x1': 0.3,
+     'model': 'wilson', 'A12': 0.45, 'A21': 0.7},
+    {'type': 'vle-calculation', 'T': 350.0, 'P_sat_1': 1.2e5, 'P_sat_2': 0.8e5, 'x1': 0.3},
+]
+
+
+def _assert_close(actual, expected):
+    if isinstance(expected, dict):
+        for key, value in expected.items():
+            _assert_close(actual[key], value)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-6, abs=1e-9)
+    else:
+        assert actual == expected
+
+
+def test_batch_matches_single_case_routes(web):
+    response = web.app.test_client().post('/api/batch', json={'cases': CASES})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == len(CASES) and data['errors'] == 0
+    for case, result in zip(CASES, data['results']):
+        parameters = {key: value for key, value in case.items() if key != 'type'}
+        _assert_close(result, web.SINGLE_CASE[case['type']](**parameters))
+
+
+def test_per_case_errors_keep_their_place(web):
+    cases = [CASES[0], {'type': 'unknown'}, {'type': 'rankine-cycle', 'P_boiler': 10.0},
+             {'type': 'steam-properties', 'P': 1.0}, CASES[4]]
+    data = web.app.test_client().post('/api/batch', json=cases).get_json()
+    assert [('error' in result) for result in data['results']] == [False, True, True, True,
+                                                                    False]
+    assert data['errors'] == 3
+
+
+def test_batch_size_limit(web):
+    web.app.config['BATCH_MAX_CASES'] = 3
+    response = web.app.test_client().post('/api/batch', json={'cases': CASES})
+    assert response.status_code == 413
+    assert web.app.test_client().post('/api/batch', json={'cases': 'x'}).status_code == 400
@@ -0,0 +1,47 @@
+"""Tests for the component property database (src/core/components.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.components import get_component_database
+
+
+@pytest.fixture(scope='module')
+def database():
+    return get_component_database()
+
+
+def test_lookup_by_name_cas_and_formula(database):
+    row = database.index('Water')
+    assert database.index('water') == row
+    assert database.index('7732-18-5') == row
+    assert database.get('Unobtainium') is None
+    with pytest.raises(ValueError):
+        database.index('Unobtainium')
+
+
+def test_critical_constants(database):
+    properties = database.properties(['Water', 'Ethanol'])
+    np.testing.assert_allclose(properties['Tc'], [647.096, 514.71], rtol=1e-3)
+    np.testing.assert_allclose(properties['Pc'], [22.064e6, 6.268e6], rtol=1e-2)
+
+
+@pytest.mark.parametrize('method', ['dippr', 'antoine'])
+def test_vapour_pressure_at_normal_boiling_point(database, method):
+    components = ['Water', 'Ethanol', 'Benzene', 'Toluene']
+    Tb = database.properties(components)['Tb']
+    P = database.P_sat(components, Tb, method)      # P[i, j] = P_sat,j(Tb_i)
+    np.testing.assert_allclose(np.diagonal(P), 101325.0, rtol=2e-2)
+    # The reference boiling points themselves: water 373.12 K, ethanol 351.4 K
+    np.testing.assert_allclose(Tb[:2], [373.12, 351.4], atol=0.5)
+
+
+def test_interaction_parameters_are_transposed_with_the_order(database):
+    forward = database.interaction_parameters(['Ethanol', 'Water'])['parameters']
+    backward = database.interaction_parameters(['Water', 'Ethanol'])['parameters']
+    np.testing.assert_array_equal(forward, backward.T)
+    # The model of the mixture is the same in either order
+    x = np.array([[0.3, 0.7]])
+    np.testing.assert_allclose(database.activity_model(['Ethanol', 'Water']).gamma(x, 350.0),
+                               database.activity_model(['Water', 'Ethanol'])
+                               .gamma(x[:, ::-1], 350.0)[:, ::-1], rtol=1e-12)
@@ -0,0 +1,69 @@
+"""Tests for the Peng-Robinson / SRK equations of state (src/core/cubic_eos.py)"""
+
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from src.core.cubic_eos import CubicEOS, cubic_roots, phi_phi_flash
+
+# Propane and methane: Tc (K), Pc (Pa), acentric factor
+PROPANE = (369.89, 4.251165e6, 0.1521)
+METHANE = (190.564, 4.5992e6, 0.01142)
+
+
+def test_cubic_roots_match_numpy():
+    rng = np.random.default_rng(10)
+    # Cubics with three real roots and with one real root
+    roots = np.sort(rng.uniform(-1, 2, size=(50, 3)), axis=-1)
+    c2 = -roots.sum(-1)
+    c1 = roots[:, 0] * roots[:, 1] + roots[:, 0] * roots[:, 2] + roots[:, 1] * roots[:, 2]
+    c0 = -roots.prod(-1)
+    np.testing.assert_allclose(cubic_roots(c2, c1, c0), roots, atol=1e-7)
+    single = cubic_roots(0.0, 1.0, -2.0)                  # Z³ + Z - 2 = (Z - 1)(Z² + Z + 2)
+    np.testing.assert_allclose(np.sort(single[~np.isnan(single)]), [1.0], atol=1e-12)
+
+
+@pytest.mark.parametrize('family, reference', [('pr', 997429.8), ('srk', 1008665.2)])
+def test_pure_vapour_pressure(family, reference):
+    # Reference: the same equation of state in CoolProp, propane at 300 K
+    eos = CubicEOS(*([value] for value in PROPANE), family=family)
+    x = np.array([1.0])
+
+    def equal_fugacity(P):
+        return (eos.ln_phi(x, 300.0, P, 'liquid')['ln_phi']
+                - eos.ln_phi(x, 300.0, P, 'vapour')['ln_phi'])[0]
+
+    P_sat = brentq(equal_fugacity, 8e5, 1.2e6, xtol=1e-6)
+    assert P_sat == pytest.approx(reference, rel=1e-5)
+    # Experimental value 0.9977 MPa (NIST)
+    assert P_sat == pytest.approx(0.9977e6, rel=0.015)
+
+
+def test_ln_phi_are_partial_molar_residual_gibbs_energies():
+    eos = CubicEOS(*zip(METHANE, PROPANE), kij=[[0.0, 0.014], [0.014, 0.0]])
+    n = np.array([0.3, 0.7])
+    T, P = 300.0, 3.0e6
+
+    def G(n, phase):
+        x = n / n.sum()
+        return n.sum() * np.sum(x * eos.ln_phi(x, T, P, phase)['ln_phi'])
+
+    for phase in ('liquid', 'vapour'):
+        h = 1e-6
+        numeric = [(G(n + h * e, phase) - G(n - h * e, phase)) / (2 * h) for e in np.eye(2)]
+        np.testing.assert_allclose(eos.ln_phi(n, T, P, phase)['ln_phi'], numeric, atol=1e-7)
+
+
+def test_flash_equal_fugacities():
+    eos = CubicEOS(*zip(METHANE, PROPANE))
+    z = np.stack([np.linspace(0.1, 0.6, 20), 1 - np.linspace(0.1, 0.6, 20)], axis=-1)
+    result = phi_phi_flash(eos, z, 3.0e6, 300.0)
+    split = (result['V'] > 0) & (result['V'] < 1)
+    assert split.sum() > 5 and result['converged'].all()
+    x, y, V = result['x'][split], result['y'][split], result['V'][split]
+    np.testing.assert_allclose(x * eos.fugacity_coefficients(x, 300.0, 3.0e6, 'liquid'),
+                               y * eos.fugacity_coefficients(y, 300.0, 3.0e6, 'vapour'),
+                               rtol=1e-8)
+    np.testing.assert_allclose(V[:, None] * y + (1 - V[:, None]) * x, z[split], atol=1e-12)
+    # Tie lines at fixed T, P share the same phase compositions
+    np.testing.assert_allclose(x, np.broadcast_to(x[0], x.shape), atol=1e-8)
@@ -0,0 +1,55 @@
+"""Tests for the McCabe-Thiele design engine (src/core/distillation.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.distillation import EquilibriumCurve, minimum_reflux, minimum_stages, mccabe_thiele
+
+ALPHA = 2.5
+
+
+@pytest.fixture(scope='module')
+def curve():
+    # Constant relative volatility, where Underwood and Fenske are exact
+    x1 = np.linspace(0.0, 1.0, 2001)
+    return EquilibriumCurve(x1, ALPHA * x1 / (1 + (ALPHA - 1) * x1))
+
+
+def test_minimum_reflux_matches_underwood(curve):
+    x_D, z_F = 0.95, np.array([0.3, 0.5, 0.7])
+    # Saturated liquid feed: R_min = (x_D/z_F - α (1 - x_D)/(1 - z_F)) / (α - 1)
+    expected = (x_D / z_F - ALPHA * (1 - x_D) / (1 - z_F)) / (ALPHA - 1)
+    result = minimum_reflux(curve, x_D, 0.05, z_F, q=1.0)
+    np.testing.assert_allclose(result['R_min'], expected, rtol=1e-4)
+    np.testing.assert_allclose(result['x_pinch'], z_F, atol=1e-8)
+
+
+def test_minimum_stages_match_fenske(curve):
+    # Symmetric separation with a whole Fenske number of stages, N = 8
+    ratio = ALPHA ** 4
+    x_D = ratio / (1 + ratio)
+    result = minimum_stages(curve, x_D, 1 - x_D)
+    fenske = np.log((x_D / (1 - x_D)) ** 2) / np.log(ALPHA)
+    assert fenske == pytest.approx(8.0)
+    assert result['N_min'] == pytest.approx(fenske, abs=1e-3)
+
+
+def test_stages_between_the_limits(curve):
+    R_factor = np.array([0.9, 1.1, 1.5, 3.0, 50.0])
+    result = mccabe_thiele(curve, 0.95, 0.05, 0.5, q=1.0, R_factor=R_factor)
+    N_min = minimum_stages(curve, 0.95, 0.05)['N_min']
+    stages = result['stages']
+    # Below the minimum reflux the column is infeasible
+    assert not result['feasible'][0] and np.isnan(stages[0])
+    # More reflux, fewer stages, tending to the total reflux minimum
+    assert np.all(np.diff(stages[1:]) < 0)
+    assert stages[-1] == pytest.approx(N_min, rel=0.05)
+    assert np.all(stages[1:] > N_min)
+
+
+def test_database_curves_are_shared_and_bounded():
+    from src.core import distillation
+    first = distillation.get_equilibrium_curve(['Ethanol', 'Water'], P=101325, n_points=51)
+    assert distillation.get_equilibrium_curve(['Ethanol', 'Water'], P=101325.0,
+                                              n_points=51) is first
+    assert distillation._curves.stats()['maxsize'] == 64
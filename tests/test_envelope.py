@@ -0,0 +1,40 @@
+"""Tests for the arc-length continuation tracer (src/core/envelope.py)"""
+
+import numpy as np
+
+from src.core.activity_models import Wilson
+from src.core.envelope import trace_curve
+from src.core.phase_equilibrium import PhaseEquilibrium
+
+
+def test_trace_circle_around_turning_points():
+    # x² + y² = 1 from (1, 0) counter-clockwise, stopping at y = -0.5 on the
+    # other side; turning points at x = ±1 defeat naive parameterizations
+    trace = trace_curve(lambda u: [u[0] ** 2 + u[1] ** 2 - 1], [1.0, 0.0], direction=[0.0, 1.0],
+                        constraints=(lambda u: u[1] + 0.5 if u[0] < 0 else 1.0,),
+                        events={'x_zero': lambda u: u[0]})
+    points = trace['points']
+    np.testing.assert_allclose(np.hypot(points[:, 0], points[:, 1]), 1.0, atol=1e-9)
+    assert trace['terminated_by'] == 'constraint 0'
+    np.testing.assert_allclose(points[-1], [-np.sqrt(0.75), -0.5], atol=1e-8)
+    crossings = [event['u'] for event in trace['events'] if event['name'] == 'x_zero']
+    np.testing.assert_allclose(crossings, [[0.0, 1.0]], atol=1e-8)
+
+
+def test_pxy_envelope_azeotrope():
+    # Strong positive deviation with close vapour pressures: maximum-pressure azeotrope
+    A12, A21 = 0.3, 0.4
+    P_sat = np.array([1.0e5, 0.9e5])
+    result = PhaseEquilibrium().trace_pxy_envelope(350.0, *P_sat, gamma_model='wilson',
+                                                   A12=A12, A21=A21)
+    x1 = result['x1']
+    gamma = Wilson(Lambda=[[1.0, A12], [A21, 1.0]]).gamma(np.stack([x1, 1 - x1], axis=-1))
+    np.testing.assert_allclose(result['P'], np.sum(np.stack([x1, 1 - x1], axis=-1)
+                                                   * gamma * P_sat, axis=-1), rtol=1e-8)
+
+    (azeotrope,) = result['azeotropes']
+    x = np.array([azeotrope['x1'], 1 - azeotrope['x1']])
+    g = Wilson(Lambda=[[1.0, A12], [A21, 1.0]]).gamma(x)
+    # At the azeotrope γ1 P_sat,1 = γ2 P_sat,2 and the pressure is a maximum
+    np.testing.assert_allclose(g[0] * P_sat[0], g[1] * P_sat[1], rtol=1e-6)
+    np.testing.assert_allclose(azeotrope['P'], np.max(result['P']), rtol=1e-4)
@@ -0,0 +1,130 @@
+"""Tests for the Rachford-Rice / modified Raoult flash engine (src/core/flash.py)"""
+
+import numpy as np
+
+from src.core.activity_models import Wilson
+from src.core.flash import (rachford_rice, modified_raoult_flash, bubble_pressure, dew_pressure,
+                            bubble_temperature, dew_temperature, bubble_dew_temperatures)
+
+
+def test_rachford_rice_residual():
+    rng = np.random.default_rng(1)
+    z = rng.dirichlet(np.ones(4), size=500)
+    K = np.exp(rng.normal(0.0, 1.5, size=(500, 4)))
+    V = rachford_rice(z, K)
+
+    two_phase = (np.sum(z * K, axis=-1) > 1) & (np.sum(z / K, axis=-1) > 1)
+    residual = np.sum(z * (K - 1) / (1 + V[:, None] * (K - 1)), axis=-1)
+    assert np.all((V >= 0) & (V <= 1))
+    assert np.max(np.abs(residual[two_phase])) < 1e-10
+    # Subcooled feeds stay liquid, superheated feeds all vapour
+    assert np.all(V[np.sum(z * K, axis=-1) <= 1] == 0)
+    assert np.all(V[np.sum(z / K, axis=-1) <= 1] == 1)
+
+
+def test_binary_rachford_rice_closed_form():
+    z = np.array([0.4, 0.6])
+    K = np.array([2.5, 0.3])
+    # Binary Rachford-Rice reduces to a linear equation in V
+    c = K - 1
+    expected = -np.sum(z * c) / (c[0] * c[1])
+    np.testing.assert_allclose(rachford_rice(z, K), expected, rtol=1e-12)
+
+
+def test_modified_raoult_flash_fugacity_equality():
+    rng = np.random.default_rng(2)
+    model = Wilson(Lambda=[[1.0, 0.6, 0.9], [0.4, 1.0, 1.2], [0.7, 0.8, 1.0]])
+    P_sat = np.array([2.0e5, 1.0e5, 0.5e5])
+    z = rng.dirichlet(np.ones(3), size=200)
+    P = np.sum(z * P_sat, axis=-1) * 0.9      # Mostly inside the two-phase region
+    result = modified_raoult_flash(z, P, P_sat, model.gamma)
+
+    assert result['converged'].all()
+    V, x, y = result['V'], result['x'], result['y']
+    two_phase = (V > 1e-9) & (V < 1 - 1e-9)
+    assert two_phase.sum() > 100
+    # y P = x γ P_sat in both phases, and the material balance closes
+    np.testing.assert_allclose((y * P[:, None])[two_phase],
+                               (x * model.gamma(x) * P_sat)[two_phase], rtol=1e-8)
+    np.testing.assert_allclose(V[:, None] * y + (1 - V[:, None]) * x, z, atol=1e-12)
+
+
+def _ternary():
+    model = Wilson(Lambda=[[1.0, 0.6, 0.9], [0.4, 1.0, 1.2], [0.7, 0.8, 1.0]])
+    return model, np.array([2.0e5, 1.0e5, 0.5e5])
+
+
+def test_accelerations_agree():
+    model, P_sat = _ternary()
+    z = np.random.default_rng(3).dirichlet(np.ones(3), size=100)
+    P = np.sum(z * P_sat, axis=-1) * 0.9
+    results = [modified_raoult_flash(z, P, P_sat, model.gamma, acceleration=method)
+               for method in ('dem', 'anderson', None)]
+    for result in results[1:]:
+        np.testing.assert_allclose(result['V'], results[0]['V'], atol=1e-8)
+    # Acceleration needs fewer K-value updates than plain substitution
+    assert results[0]['iterations'] <= results[2]['iterations']
+    assert results[1]['iterations'] <= results[2]['iterations']
+
+
+def test_bubble_and_dew_points_are_consistent():
+    model, P_sat = _ternary()
+    x = np.random.default_rng(4).dirichlet(np.ones(3), size=50)
+    bubble = bubble_pressure(x, P_sat, model.gamma)
+    np.testing.assert_allclose(np.sum(bubble['y'], axis=-1), 1.0)
+    # The dew point of the incipient vapour is the original liquid
+    dew = dew_pressure(bubble['y'], P_sat, model.gamma)
+    np.testing.assert_allclose(dew['P'], bubble['P'], rtol=1e-8)
+    np.testing.assert_allclose(dew['x'], x, atol=1e-8)
+
+
+def test_bubble_and_dew_temperatures():
+    model, P_sat = _ternary()
+    # Clausius-Clapeyron vapour pressures through the 350 K values above
+    B = np.array([3500.0, 4000.0, 4500.0])
+
+    def P_sat_func(T):
+        return P_sat * np.exp(-B * (1 / np.asarray(T)[..., None] - 1 / 350.0))
+
+    x = np.random.default_rng(5).dirichlet(np.ones(3), size=40)
+    T = bubble_temperature(x, np.full(40, 1.0e5), P_sat_func, model.gamma)['T']
+    np.testing.assert_allclose(np.sum(x * model.gamma(x) * P_sat_func(T), axis=-1), 1.0e5,
+                               rtol=1e-8)
+    y = bubble_pressure(x, P_sat_func(T), model.gamma)['y']
+    dew = dew_temperature(y, np.full(40, 1.0e5), P_sat_func, model.gamma)
+    np.testing.assert_allclose(dew['T'], T, atol=1e-6)
+
+
+def test_anderson_safeguard_on_superheated_feed():
+    # Anderson mixing used to extrapolate ln K to overflow on this feed
+    model = Wilson(Lambda=[[1.0, 0.0952], [0.2713, 1.0]])
+    z = np.array([0.58351227, 0.41648773])
+    P_sat = np.array([1.8e5, 7.4e4])
+    results = [modified_raoult_flash(z, 121526.0, P_sat, model.gamma, acceleration=method)
+               for method in ('dem', 'anderson')]
+    assert all(result['converged'] for result in results)
+    assert results[1]['V'] == results[0]['V'] == 1.0
+    np.testing.assert_allclose(results[1]['x'], results[0]['x'], atol=1e-9)
+
+
+def test_bubble_temperatures_with_temperature_dependent_model():
+    # Wilson with Λ_ij = (V_j/V_i) exp(-a_ij/T): the Newton slopes include
+    # the analytic d ln γ/dT
+    model = Wilson(a=[[0.0, 300.0], [500.0, 0.0]], V=[58.7, 18.1])
+    B = np.array([4600.0, 4900.0])
+    T_boiling = np.array([351.4, 373.15])
+
+    def P_sat_func(T):
+        return 1.0e5 * np.exp(-B * (1 / np.asarray(T)[..., None] - 1 / T_boiling))
+
+    x1 = np.linspace(0.02, 0.98, 25)
+    x = np.stack([x1, 1 - x1], axis=-1)
+    T = bubble_temperature(x, np.full(25, 1.0e5), P_sat_func, model, max_iter=5)['T']
+    np.testing.assert_allclose(np.sum(x * model.gamma(x, T) * P_sat_func(T), axis=-1), 1.0e5,
+                               rtol=1e-12)
+
+    both = bubble_dew_temperatures(x, x, 1.0e5, P_sat_func, model)
+    assert both['converged_bubble'].all() and both['converged_dew'].all()
+    np.testing.assert_allclose(both['T_bubble'], T, atol=1e-8)
+    q = x * 1.0e5 / (model.gamma(both['x_dew'], both['T_dew']) * P_sat_func(both['T_dew']))
+    np.testing.assert_allclose(np.sum(q, axis=-1), 1.0, rtol=1e-8)
@@ -0,0 +1,98 @@
+"""Tests for the ideal-gas properties and the Brayton cycle (src/core/ideal_gas.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.ideal_gas import NASA7, IdealGas, get_gas
+from src.core.thermodynamics_toolkit import ThermodynamicsToolkit
+
+# JANAF values at 298.15 K: cp and S° (J/mol·K)
+JANAF_298 = {'N2': (29.124, 191.609), 'O2': (29.376, 205.147),
+             'CO2': (37.135, 213.795), 'H2O': (33.590, 188.834), 'Ar': (20.786, 154.845)}
+
+KEYS = ('work_compressor', 'work_turbine', 'work_net', 'heat_input', 'heat_output',
+        'efficiency_thermal', 'efficiency_carnot', 'back_work_ratio')
+
+
+@pytest.mark.parametrize('species', sorted(JANAF_298))
+def test_species_match_janaf_at_298_K(species):
+    gas = IdealGas({species: 1.0})
+    molar_mass = NASA7[species][0]
+    cp, s0 = JANAF_298[species]
+    assert gas.cp(298.15) * molar_mass == pytest.approx(cp, rel=3e-3)
+    assert gas.s0(298.15) * molar_mass == pytest.approx(s0, rel=1e-3)
+    assert gas.h(298.15) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_air_matches_ideal_gas_air_table():
+    # Ideal-gas properties of air (Cengel & Boles, Tables A-2 and A-17)
+    air = get_gas('air')
+    assert air.R == pytest.approx(0.2870, rel=1e-3)
+    assert air.cp(300.0) == pytest.approx(1.005, rel=3e-3)
+    assert air.cp(1000.0) == pytest.approx(1.142, rel=3e-3)
+    assert air.h(1000.0) - air.h(300.0) == pytest.approx(1046.04 - 300.19, rel=1e-3)
+    assert air.s0(1000.0) - air.s0(300.0) == pytest.approx(2.96770 - 1.70203, rel=1e-3)
+    # cp is continuous where the polynomials switch
+    assert air.cp(1000.0 - 1e-9) == pytest.approx(air.cp(1000.0), rel=1e-3)
+
+
+def test_inversions_and_isentropic_temperature():
+    gas = get_gas('combustion_products')
+    T = np.linspace(250.0, 3000.0, 200)
+    np.testing.assert_allclose(gas.T_from_h(gas.h(T)), T, rtol=1e-9)
+    np.testing.assert_allclose(gas.T_from_s0(gas.s0(T)), T, rtol=1e-9)
+    # Compression outlets stay inside the 3500 K inversion table
+    T_1 = T[T < 1600.0]
+    T_2 = gas.isentropic_T(T_1, 100.0, 1000.0)
+    np.testing.assert_allclose(gas.s0(T_2) - gas.s0(T_1), gas.R * np.log(10.0), rtol=1e-9)
+    with pytest.raises(ValueError):
+        IdealGas('helium')
+    with pytest.raises(ValueError):
+        IdealGas({'He': 1.0})
+
+
+def test_constant_gamma_brayton_matches_closed_form():
+    toolkit = ThermodynamicsToolkit()
+    result = toolkit.brayton_cycle_analysis(100.0, 300.0, 1000.0, 1400.0, 0.85, 0.9)
+    T_2 = 300.0 + 300.0 * (10.0 ** (0.4 / 1.4) - 1) / 0.85
+    T_4 = 1400.0 - 0.9 * 1400.0 * (1 - 10.0 ** (-0.4 / 1.4))
+    # Energies per mole with cv = R / (gamma - 1), as in the original model
+    cv = toolkit.R / 0.4
+    assert result['states']['state_2']['T'] == pytest.approx(T_2, rel=1e-12)
+    assert result['states']['state_4']['T'] == pytest.approx(T_4, rel=1e-12)
+    assert result['work_compressor'] == pytest.approx(cv * (T_2 - 300.0), rel=1e-12)
+    assert result['work_turbine'] == pytest.approx(cv * (1400.0 - T_4), rel=1e-12)
+    assert result['efficiency_thermal'] == pytest.approx(
+        (result['work_turbine'] - result['work_compressor']) / (cv * (1400.0 - T_2)), rel=1e-12)
+    assert isinstance(result['work_net'], float)
+
+
+@pytest.mark.parametrize('gas', [None, 'air'])
+def test_array_inputs_match_scalar_calls(gas):
+    toolkit = ThermodynamicsToolkit()
+    ratio = np.array([4.0, 8.0, 16.0, 30.0])[:, None]
+    T_3 = np.array([1100.0, 1400.0, 1700.0])[None, :]
+    batch = toolkit.brayton_cycle_analysis(100.0, 300.0, 100.0 * ratio, T_3, gas=gas)
+    assert batch['work_net'].shape == (4, 3)
+    for i, j in np.ndindex(4, 3):
+        single = toolkit.brayton_cycle_analysis(100.0, 300.0, 100.0 * ratio[i, 0], T_3[0, j],
+                                                gas=gas)
+        for key in KEYS:
+            value = np.broadcast_to(batch[key], (4, 3))[i, j]
+            assert value == pytest.approx(single[key], rel=1e-12)
+        for name, state in single['states'].items():
+            assert np.broadcast_to(batch['states'][name]['T'], (4, 3))[i, j] == \
+                pytest.approx(state['T'], rel=1e-12)
+
+
+def test_variable_specific_heats_approach_constant_gamma_when_cold():
+    # Between 300 and 600 K cp of air changes by a few percent only, so the
+    # NASA model stays close to the cold-air-standard efficiency
+    toolkit = ThermodynamicsToolkit()
+    constant = toolkit.brayton_cycle_analysis(100.0, 300.0, 400.0, 600.0, 1.0, 1.0)
+    variable = toolkit.brayton_cycle_analysis(100.0, 300.0, 400.0, 600.0, 1.0, 1.0, gas='air')
+    assert variable['efficiency_thermal'] == pytest.approx(constant['efficiency_thermal'],
+                                                           rel=2e-2)
+    hot = toolkit.brayton_cycle_analysis(100.0, 300.0, 1000.0, 1400.0, 1.0, 1.0, gas='air',
+                                         gas_turbine='combustion_products')
+    assert hot['heat_input'] - hot['heat_output'] == pytest.approx(hot['work_net'], rel=1e-12)
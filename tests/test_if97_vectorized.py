@@ -0,0 +1,96 @@
+"""Tests for the vectorized IAPWS-IF97 steam properties (src/core/if97_vectorized.py)"""
+
+import numpy as np
+import pytest
+from iapws import IAPWS97
+
+from src.core.if97_vectorized import (PHASE_INVALID, phase_names, saturation_pressure,
+                                      steam_properties_batch)
+
+
+def _assert_matches_iapws97(result, **inputs):
+    """Every point against a single IAPWS97 evaluation: T, v, h, s, x, phase and region"""
+    names = phase_names(result['phase'])
+    for i in range(len(result['T'])):
+        state = IAPWS97(**{key: float(value[i]) for key, value in inputs.items()})
+        np.testing.assert_allclose([result[key][i] for key in ('T', 'v', 'h', 's')],
+                                   [state.T, state.v, state.h, state.s], rtol=1e-9)
+        if state.region == 4:
+            assert abs(result['x'][i] - state.x) < 1e-9
+        assert result['region'][i] == state.region
+        assert names[i] == state.phase
+
+
+# (P in MPa, T in K) boxes inside regions 1, 2 and 5
+REGIONS = {
+    1: ((15.0, 90.0), (280.0, 600.0)),
+    2: ((0.001, 0.5), (450.0, 1000.0)),
+    5: ((0.01, 45.0), (1100.0, 2200.0)),
+}
+
+
+@pytest.mark.parametrize('region', sorted(REGIONS))
+def test_PT_states(region):
+    rng = np.random.default_rng(region)
+    (P_lo, P_hi), (T_lo, T_hi) = REGIONS[region]
+    P, T = rng.uniform(P_lo, P_hi, 25), rng.uniform(T_lo, T_hi, 25)
+    result = steam_properties_batch(P, T=T)
+    assert np.all(result['region'] == region)
+    _assert_matches_iapws97(result, P=P, T=T)
+
+
+@pytest.mark.parametrize('prop', ['h', 's'])
+@pytest.mark.parametrize('region', sorted(REGIONS))
+def test_Ph_and_Ps_states_invert_PT(region, prop):
+    rng = np.random.default_rng(10 + region)
+    (P_lo, P_hi), (T_lo, T_hi) = REGIONS[region]
+    P, T = rng.uniform(P_lo, P_hi, 25), rng.uniform(T_lo, T_hi, 25)
+    forward = steam_properties_batch(P, T=T)
+    result = steam_properties_batch(P, **{prop: forward[prop]})
+    np.testing.assert_allclose(result['T'], T, atol=1e-8)
+    assert np.all(result['region'] == region)
+    _assert_matches_iapws97(result, P=P, **{prop: forward[prop]})
+
+
+def test_two_phase_states():
+    rng = np.random.default_rng(4)
+    P, x = rng.uniform(0.005, 16.0, 25), rng.uniform(0.0, 1.0, 25)
+    result = steam_properties_batch(P, x=x)
+    assert np.all(result['region'] == 4)
+    _assert_matches_iapws97(result, P=P, x=x)
+    # The same states given by enthalpy or entropy inside the dome
+    for prop in ('h', 's'):
+        _assert_matches_iapws97(steam_properties_batch(P, **{prop: result[prop]}),
+                                P=P, **{prop: result[prop]})
+    # Saturation pressure is the inverse of the saturation temperature
+    np.testing.assert_allclose(saturation_pressure(result['T']), P, rtol=1e-9)
+
+
+def test_region3_and_near_critical_fallback():
+    P = np.array([25.0, 40.0, 60.0])
+    T = np.array([650.0, 700.0, 680.0])
+    result = steam_properties_batch(P, T=T)
+    assert np.all(result['region'] == 3)
+    _assert_matches_iapws97(result, P=P, T=T)
+    _assert_matches_iapws97(steam_properties_batch(P, h=result['h']), P=P, h=result['h'])
+    # Qualities above 623.15 K are evaluated point by point
+    P_sat, x = np.array([18.0, 21.0]), np.array([0.3, 0.9])
+    _assert_matches_iapws97(steam_properties_batch(P_sat, x=x), P=P_sat, x=x)
+
+
+def test_out_of_range_states_are_invalid():
+    result = steam_properties_batch(np.array([200.0, -1.0, 10.0, 0.1]),
+                                    T=np.array([500.0, 500.0, 100.0, 3000.0]))
+    quality = steam_properties_batch(np.array([1.0, 1.0, 30.0]), x=np.array([1.5, -0.1, 0.5]))
+    for invalid in (result, quality):
+        assert np.all(invalid['phase'] == PHASE_INVALID)
+        assert np.all(invalid['region'] == 0)
+        assert np.all(np.isnan(invalid['h']) & np.isnan(invalid['P']))
+        assert all(name is None for name in phase_names(invalid['phase']))
+
+
+def test_broadcasting_and_missing_inputs():
+    result = steam_properties_batch(np.array([[0.1], [1.0]]), T=np.array([400.0, 500.0, 600.0]))
+    assert result['h'].shape == (2, 3)
+    with pytest.raises(ValueError):
+        steam_properties_batch(1.0)
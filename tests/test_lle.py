@@ -0,0 +1,54 @@
+"""Tests for the stability test and liquid-liquid flash (src/core/lle.py)"""
+
+import numpy as np
+from scipy.optimize import brentq
+
+from src.core.activity_models import Margules, NRTL
+from src.core.lle import stability_test, liquid_liquid_flash, binary_binodal
+
+A = 2.5
+SYMMETRIC = Margules(A=[[0.0, A], [A, 0.0]])
+# Symmetric two-suffix Margules: the binodal solves ln(x/(1 - x)) = A (2x - 1)
+X_BINODAL = brentq(lambda x: np.log(x / (1 - x)) - A * (2 * x - 1), 1e-6, 0.45)
+
+
+def test_stability_test_on_symmetric_margules():
+    z = np.array([[0.5, 0.5], [0.3, 0.7], [0.05, 0.95], [X_BINODAL / 2, 1 - X_BINODAL / 2]])
+    result = stability_test(SYMMETRIC, z)
+    np.testing.assert_array_equal(result['stable'], [False, False, True, True])
+    assert np.all(result['tpd'][:2] < 0)
+
+
+def test_liquid_liquid_flash_matches_analytic_binodal():
+    z = np.array([[0.5, 0.5], [0.3, 0.7], [0.6, 0.4], [0.05, 0.95]])
+    result = liquid_liquid_flash(SYMMETRIC, z)
+    np.testing.assert_array_equal(result['two_phase'], [True, True, True, False])
+    split = result['two_phase']
+    x1 = np.sort(np.stack([result['x1'][split, 0], result['x2'][split, 0]], axis=-1), axis=-1)
+    np.testing.assert_allclose(x1, np.tile([X_BINODAL, 1 - X_BINODAL], (3, 1)), atol=1e-8)
+    # Stable feed: one liquid
+    assert result['beta'][3] == 0
+    np.testing.assert_allclose(result['x1'][3], z[3])
+
+
+def test_flash_equal_activities_and_material_balance():
+    model = NRTL(tau=[[0.0, 2.0, 0.5], [3.5, 0.0, 0.3], [0.8, 0.2, 0.0]], alpha=0.2)
+    z = np.random.default_rng(9).dirichlet(np.ones(3), size=100)
+    result = liquid_liquid_flash(model, z)
+    split = result['two_phase']
+    assert split.sum() > 10 and result['converged'].all()
+    x_I, x_II, beta = result['x1'][split], result['x2'][split], result['beta'][split]
+    np.testing.assert_allclose(x_I * model.gamma(x_I), x_II * model.gamma(x_II), atol=1e-8)
+    np.testing.assert_allclose((1 - beta[:, None]) * x_I + beta[:, None] * x_II, z[split],
+                               atol=1e-10)
+
+
+def test_binodal_over_temperature():
+    # A(T) = 750 / T: upper critical solution temperature at A = 2, T = 375 K
+    model = Margules(A=[[0.0, 0.0], [0.0, 0.0]], B=[[0.0, 750.0], [750.0, 0.0]])
+    result = binary_binodal(model, [300.0, 360.0, 400.0])
+    x = brentq(lambda x: np.log(x / (1 - x)) - 2.5 * (2 * x - 1), 1e-6, 0.45)
+    np.testing.assert_allclose(result['x1_I'][0], x, atol=1e-7)
+    np.testing.assert_allclose(result['x1_II'][0], 1 - x, atol=1e-7)
+    assert result['x1_I'][1] > x                      # Narrower gap closer to the UCST
+    assert np.isnan(result['x1_I'][2])                # Miscible above it
@@ -0,0 +1,77 @@
+"""Tests for the binary phase-equilibrium API (src/core/phase_equilibrium.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.activity_models import Wilson
+from src.core.components import get_component_database
+from src.core.flash import bubble_temperature
+from src.core.phase_equilibrium import PhaseEquilibrium
+
+
+def _ethanol_water():
+    database = get_component_database()
+    components = ['Ethanol', 'Water']
+    return database.activity_model(components, 'wilson'), database.P_sat_function(components)
+
+
+def test_txy_envelope_with_temperature_dependent_model():
+    model, P_sat = _ethanol_water()
+    result = PhaseEquilibrium().trace_txy_envelope(
+        lambda T: P_sat(T)[..., 0], lambda T: P_sat(T)[..., 1], 101325.0,
+        gamma_model=model, T_guess=373.0)
+
+    x1 = result['x1_bubble']
+    assert x1[0] == 0.0 and abs(x1[-1] - 1.0) < 1e-8
+    # Every traced point is a bubble point of the model at its own temperature
+    x = np.stack([x1, 1 - x1], axis=-1)
+    T = bubble_temperature(x, np.full(len(x1), 101325.0), P_sat, model, T0=360.0)['T']
+    np.testing.assert_allclose(result['T_bubble'], T, atol=1e-5)
+
+    # Minimum-boiling ethanol-water azeotrope near x1 = 0.89, 351.3 K
+    (azeotrope,) = result['azeotropes']
+    assert 0.8 < azeotrope['x1'] < 0.95
+    assert abs(azeotrope['T'] - 351.3) < 0.5
+
+
+def _antoine(A, B, C):
+    return lambda T: np.exp(A - B / (np.asarray(T) + C))
+
+
+# Benzene (1) - toluene (2), Antoine in Pa and K
+P_SAT_BENZENE = _antoine(20.7936, 2788.51, -52.36)
+P_SAT_TOLUENE = _antoine(20.9065, 3096.52, -53.67)
+
+
+def test_txy_diagram_bubble_and_dew_curves():
+    result = PhaseEquilibrium().generate_txy_diagram(
+        P_SAT_BENZENE, P_SAT_TOLUENE, 101325.0, gamma_model='wilson', A12=1.1, A21=0.85,
+        T_range=[340.0, 390.0], n_points=41)
+    x1 = np.asarray(result['x1_bubble'])
+    x = np.stack([x1, 1 - x1], axis=-1)
+    gamma = Wilson(Lambda=[[1.0, 1.1], [0.85, 1.0]])
+
+    def P_sat(T):
+        return np.stack([P_SAT_BENZENE(T), P_SAT_TOLUENE(T)], axis=-1)
+
+    T = bubble_temperature(x, np.full(len(x1), 101325.0), P_sat, gamma.gamma, T0=360.0)['T']
+    np.testing.assert_allclose(result['T_bubble'], T, atol=1e-6)
+    # Dew curve: Σ y P / (γ(x) P_sat) = 1 with the returned incipient liquid
+    y1, x1_dew = np.asarray(result['y1_dew']), np.asarray(result['x1_dew'])
+    y = np.stack([y1, 1 - y1], axis=-1)
+    x_dew = np.stack([x1_dew, 1 - x1_dew], axis=-1)
+    liquid = y * 101325.0 / (gamma.gamma(x_dew) * P_sat(np.asarray(result['T_dew'])))
+    np.testing.assert_allclose(np.sum(liquid, axis=-1), 1.0, atol=1e-7)
+    assert np.all(np.asarray(result['T_dew']) >= np.asarray(result['T_bubble']) - 1e-9)
+
+
+def test_missing_model_parameters_are_named():
+    equilibrium = PhaseEquilibrium()
+    with pytest.raises(ValueError, match="'A12', 'A21'"):
+        equilibrium.flash_calculation(0.5, 1.0e5, 360.0, 1.8e5, 7.4e4)
+    with pytest.raises(ValueError, match="'alpha12'"):
+        equilibrium.flash_calculation(0.5, 1.0e5, 360.0, 1.8e5, 7.4e4, gamma_model='nrtl',
+                                      tau12=0.3, tau21=0.5)
+    # The ideal solution needs no parameters
+    assert 0 < equilibrium.flash_calculation(0.5, 1.15e5, 360.0, 1.8e5, 7.4e4,
+                                             gamma_model='ideal')['V'] < 1
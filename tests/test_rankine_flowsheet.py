@@ -0,0 +1,84 @@
+"""Tests for the Rankine cycle flowsheets (src/core/rankine_flowsheet.py)"""
+
+import pytest
+
+from src.core.rankine_flowsheet import (Boiler, Condenser, OpenFeedwaterHeater, Pump,
+                                        RankineFlowsheet, Splitter, Turbine)
+from src.core.thermodynamics_toolkit import ThermodynamicsToolkit
+
+
+def _simple_cycle(P_boiler=8.0, T_boiler=773.15, P_condenser=0.01):
+    return [Pump('pump', '1', '2', P_out=P_boiler),
+            Boiler('boiler', '2', '3', P=P_boiler, T=T_boiler),
+            Turbine('turbine', '3', '4', P_out=P_condenser),
+            Condenser('condenser', ['4'], '1', P=P_condenser)]
+
+
+def _regenerative_cycle():
+    """Simple cycle with one open feedwater heater fed by a turbine bleed at P_fwh"""
+    return [Pump('pump_1', '1', '2', P_out='P_fwh'),
+            OpenFeedwaterHeater('heater', ['bleed', '2'], '5', P='P_fwh'),
+            Pump('pump_2', '5', '6', P_out=8.0),
+            Boiler('boiler', '6', '3', P=8.0, T=773.15),
+            Turbine('turbine_hp', '3', '3a', P_out='P_fwh'),
+            Splitter('bleed_split', '3a', ['bleed', '3b']),
+            Turbine('turbine_lp', '3b', '4', P_out=0.01),
+            Condenser('condenser', ['4'], '1', P=0.01)]
+
+
+def test_simple_cycle_matches_rankine_cycle_analysis():
+    toolkit = ThermodynamicsToolkit()
+    result = toolkit.rankine_flowsheet(_simple_cycle()).solve()
+    expected = toolkit.rankine_cycle_analysis(8.0, 773.15, 0.01)
+    for key in ('work_pump', 'work_turbine', 'work_net', 'heat_input', 'heat_output',
+                'efficiency_thermal', 'back_work_ratio'):
+        assert result[key] == pytest.approx(expected[key], rel=1e-9)
+    assert all(stream['m'] == pytest.approx(1.0) for stream in result['streams'].values())
+
+
+def test_open_feedwater_heater_closes_mass_and_energy():
+    flowsheet = RankineFlowsheet(_regenerative_cycle(), {'P_fwh': 0.5})
+    result = flowsheet.solve()
+    streams = result['streams']
+    m = {name: stream['m'] for name, stream in streams.items()}
+    h = {name: stream['h'] for name, stream in streams.items()}
+
+    # Textbook bleed fraction of an open heater
+    y = (h['5'] - h['2']) / (h['bleed'] - h['2'])
+    assert m['bleed'] == pytest.approx(y, rel=1e-10)
+    assert m['bleed'] + m['3b'] == pytest.approx(m['3a'], abs=1e-12)
+    assert m['1'] == pytest.approx(1 - y, rel=1e-10)
+    assert m['5'] == pytest.approx(1.0, abs=1e-12)
+    assert m['6'] == pytest.approx(1.0, abs=1e-12)
+    # Heater energy balance and the first law over the whole cycle
+    heater_in = m['bleed'] * h['bleed'] + m['2'] * h['2']
+    assert heater_in == pytest.approx(m['5'] * h['5'], rel=1e-10)
+    assert result['heat_input'] - result['heat_output'] == pytest.approx(result['work_net'],
+                                                                        rel=1e-10)
+    # Regeneration beats the simple cycle between the same pressures
+    simple = RankineFlowsheet(_simple_cycle()).solve()
+    assert result['efficiency_thermal'] > simple['efficiency_thermal']
+
+
+def test_update_equals_full_resolve():
+    flowsheet = RankineFlowsheet(_regenerative_cycle(), {'P_fwh': 0.5})
+    first = flowsheet.solve()
+    updated = flowsheet.update(P_fwh=1.2)
+    fresh = RankineFlowsheet(_regenerative_cycle(), {'P_fwh': 1.2}).solve()
+    for key in ('work_net', 'heat_input', 'heat_output', 'efficiency_thermal'):
+        assert updated[key] == pytest.approx(fresh[key], rel=1e-12)
+    for name, stream in fresh['streams'].items():
+        assert updated['streams'][name] == pytest.approx(stream, rel=1e-12)
+    # Boiler and condenser states are not recomputed
+    assert 0 < updated['property_calls'] < first['property_calls']
+    assert flowsheet.update(P_fwh=1.2)['property_calls'] == 0
+
+
+def test_invalid_flowsheets():
+    with pytest.raises(ValueError, match='not connected'):
+        RankineFlowsheet(_simple_cycle()[:3])
+    with pytest.raises(ValueError, match='Boiler'):
+        RankineFlowsheet([Pump('pump', '1', '2', P_out=8.0),
+                          Condenser('condenser', ['2'], '1', P=0.01)])
+    with pytest.raises(ValueError, match='Unknown flowsheet parameters'):
+        RankineFlowsheet(_simple_cycle()).update(P_fwh=1.0)
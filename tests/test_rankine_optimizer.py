@@ -0,0 +1,61 @@
+"""Tests for the Rankine cycle design optimizer (src/core/rankine_optimizer.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.if97_vectorized import saturation_temperature
+from src.core.rankine_optimizer import DEFAULT_BOUNDS, STATES_PER_CYCLE, optimize_rankine
+from src.core.rankine_sweep import rankine_cycle_batch
+
+
+def _warm_start_best(objective, n_start=3, x_exit_min=0.88, T_max=None):
+    """Best feasible point of the optimizer's warm-start grid, evaluated directly"""
+    bounds = dict(DEFAULT_BOUNDS)
+    if T_max is not None:
+        bounds['T_boiler'] = (bounds['T_boiler'][0], T_max)
+    axes = {}
+    for name, (lower, upper) in bounds.items():
+        if name.startswith('P_'):
+            axes[name] = np.geomspace(lower, upper, n_start)
+        else:
+            axes[name] = np.linspace(lower, upper, n_start)
+    grid = np.meshgrid(*axes.values(), indexing='ij')
+    result = rankine_cycle_batch(*grid)
+    ok = result['feasible'] & (result['quality_turbine_exit'] >= x_exit_min)
+    return np.max(result[objective][ok])
+
+
+@pytest.mark.parametrize('objective', ['efficiency_thermal', 'work_net'])
+def test_optimum_meets_constraints_and_beats_warm_start(objective):
+    result = optimize_rankine(objective=objective, T_max=823.15, x_exit_min=0.88)
+    assert result['success']
+    design, cycle = result['x'], result['cycle']
+    for name, (lower, upper) in DEFAULT_BOUNDS.items():
+        assert lower - 1e-9 <= design[name] <= upper + 1e-9
+    assert design['T_boiler'] <= 823.15 + 1e-9
+    assert cycle['quality_turbine_exit'] >= 0.88 - 1e-6
+    assert design['T_boiler'] >= saturation_temperature(design['P_boiler']) - 1e-6
+    assert result['value'] > _warm_start_best(objective, T_max=823.15)
+
+    # The reported cycle is the cycle at the reported design
+    check = rankine_cycle_batch(design['P_boiler'], design['T_boiler'], design['P_condenser'])
+    assert check[objective] == pytest.approx(result['value'], rel=1e-12)
+
+
+def test_evaluation_counts_are_reported():
+    result = optimize_rankine(fixed={'P_condenser': 0.01})
+    assert result['x']['P_condenser'] == 0.01
+    assert result['iterations'] >= 1
+    # Warm-start grid (3 x 3) plus one point and two gradient neighbours per evaluation
+    assert result['cycle_evaluations'] >= 9 + 3
+    assert (result['cycle_evaluations'] - 9) % 3 == 0
+    assert result['property_evaluations'] == STATES_PER_CYCLE * result['cycle_evaluations']
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        optimize_rankine(objective='cost')
+    with pytest.raises(ValueError):
+        optimize_rankine(fixed={'flow': 1.0})
+    with pytest.raises(ValueError):
+        optimize_rankine(fixed=dict.fromkeys(DEFAULT_BOUNDS, 1.0))
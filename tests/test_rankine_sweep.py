@@ -0,0 +1,62 @@
+"""Tests for the Rankine cycle sweep engine (src/core/rankine_sweep.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.rankine_sweep import RESULT_KEYS, rankine_cycle_batch, rankine_sweep
+from src.core.thermodynamics_toolkit import ThermodynamicsToolkit
+
+GRID = {'P_boiler': np.array([4.0, 8.0, 12.0]),
+        'T_boiler': np.array([673.15, 773.15]),
+        'P_condenser': np.array([0.01, 0.05])}
+
+
+def test_grid_matches_single_cycle_analysis():
+    result = rankine_sweep(**GRID, n_workers=1)
+    assert result['dims'] == ('P_boiler', 'T_boiler', 'P_condenser')
+    assert result['work_net'].shape == (3, 2, 2)
+    assert result['feasible'].all()
+    toolkit = ThermodynamicsToolkit()
+    for index in np.ndindex(result['work_net'].shape):
+        P_b, T_b, P_c = (GRID[key][i] for key, i in zip(result['dims'], index))
+        single = toolkit.rankine_cycle_analysis(P_b, T_b, P_c)
+        for key in ('work_pump', 'work_turbine', 'work_net', 'heat_input', 'heat_output',
+                    'efficiency_thermal', 'efficiency_carnot', 'back_work_ratio'):
+            # The single-state path reads state 1 from the saturation tables
+            assert result[key][index] == pytest.approx(single[key], rel=1e-5)
+
+
+def test_results_do_not_depend_on_the_worker_count():
+    P_boiler = np.linspace(2.0, 16.0, 15)
+    T_boiler = np.linspace(650.0, 850.0, 11)
+    serial = rankine_sweep(P_boiler, T_boiler, 0.01, n_workers=1, chunk_size=16)
+    calls = []
+    parallel = rankine_sweep(P_boiler, T_boiler, 0.01, n_workers=2, chunk_size=16,
+                             progress=lambda done, total: calls.append((done, total)))
+    for key in RESULT_KEYS + ('feasible',):
+        np.testing.assert_array_equal(parallel[key], serial[key])
+    assert calls[-1] == (165, 165)
+
+
+def test_infeasible_points_are_nan_and_masked():
+    # Liquid boiler exit, condenser above boiler pressure, efficiency above one
+    result = rankine_cycle_batch(P_boiler=np.array([10.0, 10.0, 0.01, 10.0]),
+                                 T_boiler=np.array([773.15, 500.0, 773.15, 773.15]),
+                                 P_condenser=np.array([0.01, 0.01, 0.05, 0.01]),
+                                 efficiency_turbine=np.array([0.85, 0.85, 0.85, 1.2]))
+    np.testing.assert_array_equal(result['feasible'], [True, False, False, False])
+    for key in RESULT_KEYS:
+        assert np.isfinite(result[key][0])
+        assert np.all(np.isnan(result[key][1:]))
+
+
+def test_case_table_mode():
+    cases = [{'P_boiler': 8.0, 'T_boiler': 773.15, 'P_condenser': 0.01},
+             {'P_boiler': 0.005, 'T_boiler': 773.15, 'P_condenser': 0.01}]
+    result = rankine_sweep(cases=cases, n_workers=1)
+    assert result['dims'] == ('case',)
+    np.testing.assert_array_equal(result['feasible'], [True, False])
+    expected = rankine_cycle_batch(8.0, 773.15, 0.01)
+    assert result['work_net'][0] == expected['work_net']
+    with pytest.raises(ValueError):
+        rankine_sweep(cases=[{'P_boiler': 8.0, 'T_boiler': 773.15}])
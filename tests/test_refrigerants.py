@@ -0,0 +1,108 @@
+"""Tests for the refrigerant property tables (src/core/refrigerants.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.refrigerants import REFRIGERANTS, RefrigerantTables, get_refrigerant
+from src.core.thermodynamics_toolkit import ThermodynamicsToolkit
+
+# CoolProp 6 reference states, stored so the tests do not need CoolProp
+# Saturation: P (MPa), h_f, h_g (kJ/kg), s_f, s_g (kJ/kg·K)
+SATURATION = {
+    ('R134a', 253.15): (0.13273498, 173.63574, 386.55426, 0.90024593, 1.7413224),
+    ('R134a', 313.15): (1.016593, 256.40924, 419.42852, 1.1904767, 1.7110556),
+    ('R410A', 253.15): (0.40068507, 170.48193, 414.14342, 0.88906509, 1.8516713),
+    ('R410A', 313.15): (2.4256418, 266.3243, 425.44683, 1.2209209, 1.729136),
+    ('R717', 253.15): (0.1900261, 254.27747, 1583.0815, 1.1374418, 6.3865195),
+    ('R717', 313.15): (1.5545332, 536.12126, 1635.775, 2.1273842, 5.638972),
+    ('R744', 253.15): (1.969628, 154.44833, 436.8914, 0.83282726, 1.9485415),
+    ('R744', 293.15): (5.7290526, 255.86854, 407.86539, 1.1877311, 1.7062262),
+}
+# Superheated vapour about 30 K above saturation: P (MPa), T (K), h, s
+SUPERHEATED = {
+    'R134a': (1.0, 342.54, 451.36467, 1.8097201),
+    'R410A': (2.5, 344.52, 468.32238, 1.857241),
+    'R717': (1.2, 334.1, 1721.1721, 6.0151904),
+    'R744': (4.0, 308.45, 474.12456, 1.9750723),
+}
+# Ideal R134a cycle between 263.15 K and 313.15 K
+COP_R134A = 4.0294709
+
+
+@pytest.mark.parametrize('name, T', sorted(SATURATION))
+def test_saturation_matches_reference(name, T):
+    sat = get_refrigerant(name).saturation(T)
+    got = [float(sat[key]) for key in ('P', 'h_f', 'h_g', 's_f', 's_g')]
+    np.testing.assert_allclose(got, SATURATION[name, T], rtol=1e-6)
+
+
+@pytest.mark.parametrize('name', REFRIGERANTS)
+def test_superheated_states_match_reference(name):
+    tables = get_refrigerant(name)
+    P, T, h, s = SUPERHEATED[name]
+    by_entropy = tables.state_ps(P, s)
+    by_enthalpy = tables.state_ph(P, h)
+    assert float(by_entropy['h']) == pytest.approx(h, rel=1e-6)
+    assert float(by_entropy['T']) == pytest.approx(T, rel=1e-6)
+    assert float(by_enthalpy['T']) == pytest.approx(T, rel=1e-6)
+    assert float(by_enthalpy['s']) == pytest.approx(s, rel=1e-6)
+    assert float(by_entropy['x']) == 1.0
+    # Round trip through the separately interpolated saturation temperature
+    T_sat = tables.saturation_temperature(tables.saturation(280.0)['P'])
+    assert float(T_sat) == pytest.approx(280.0, rel=1e-7)
+
+
+def test_two_phase_and_out_of_range_states():
+    tables = get_refrigerant('R134a')
+    sat = tables.saturation(273.15)
+    h = sat['h_f'] + 0.3 * (sat['h_g'] - sat['h_f'])
+    state = tables.state_ph(sat['P'], h)
+    # (P, h) states go through the interpolated saturation temperature
+    assert float(state['x']) == pytest.approx(0.3, rel=1e-6)
+    assert float(state['T']) == pytest.approx(273.15, rel=1e-7)
+    # Subcooled liquid and temperatures outside the tables are NaN
+    assert np.isnan(tables.state_ph(sat['P'], sat['h_f'] - 10.0)['T'])
+    assert np.all(np.isnan(tables.saturation([150.0, 400.0])['P']))
+
+
+def test_r744_is_nan_within_one_kelvin_of_the_critical_point():
+    # The tables stop 1 K below the critical temperature (304.13 K)
+    tables = get_refrigerant('R744')
+    assert tables.T_max == pytest.approx(tables.T_crit - 1.0)
+    assert np.isfinite(tables.saturation(tables.T_max - 0.01)['P'])
+    assert np.isnan(tables.saturation(tables.T_crit - 0.5)['P'])
+    result = ThermodynamicsToolkit().refrigeration_cycle_analysis(263.15, 303.5,
+                                                                  refrigerant='R744')
+    assert np.isnan(result['cop'])
+    assert np.isnan(result['work_compressor'])
+
+
+def test_cycle_matches_reference_and_broadcasts():
+    toolkit = ThermodynamicsToolkit()
+    result = toolkit.refrigeration_cycle_analysis(263.15, 313.15)
+    assert result['cop'] == pytest.approx(COP_R134A, rel=1e-5)
+    assert result['heat_condenser'] == pytest.approx(
+        result['heat_evaporator'] + result['work_compressor'], rel=1e-12)
+    assert 0 < result['states']['state_4']['x'] < 1
+
+    T_evaporator = np.array([253.15, 263.15, 273.15])[:, None]
+    T_condenser = np.array([303.15, 313.15, 323.15, 263.15])[None, :]
+    batch = toolkit.refrigeration_cycle_analysis(T_evaporator, T_condenser, 'R717', 0.8)
+    assert batch['cop'].shape == (3, 4)
+    for i, j in np.ndindex(3, 3):
+        single = toolkit.refrigeration_cycle_analysis(T_evaporator[i, 0], T_condenser[0, j],
+                                                      'R717', 0.8)
+        assert batch['cop'][i, j] == pytest.approx(single['cop'], rel=1e-12)
+    # Condenser not hotter than the evaporator
+    assert np.isnan(batch['cop'][1:, 3]).all()
+
+
+def test_unknown_refrigerant_and_stale_tables(tmp_path):
+    with pytest.raises(ValueError):
+        RefrigerantTables('R22')
+    with np.load(RefrigerantTables('R134a').path) as data:
+        arrays = dict(data)
+    arrays['version'] = np.array(0)
+    np.savez(tmp_path / 'R134a.npz', **arrays)
+    with pytest.raises(ValueError, match='table version'):
+        RefrigerantTables('R134a', data_dir=tmp_path).load()
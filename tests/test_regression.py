@@ -0,0 +1,76 @@
+"""Tests for the binary VLE parameter regression (src/core/regression.py)"""
+
+import numpy as np
+import pytest
+
+from src.core.activity_models import Wilson, NRTL
+from src.core.regression import _jacobian, _residuals, fit_binary_parameters
+
+X1 = np.linspace(0.05, 0.95, 15)
+P_SAT_1 = np.full(15, 1.2e5)
+P_SAT_2 = np.full(15, 0.8e5)
+
+
+def _synthetic_data(model):
+    x = np.stack([X1, 1 - X1], axis=-1)
+    p = x * model.gamma(x) * np.stack([P_SAT_1, P_SAT_2], axis=-1)
+    P = p.sum(axis=-1)
+    return p[:, 0] / P, P
+
+
+@pytest.mark.parametrize('model, true, names', [
+    ('wilson', Wilson(Lambda=[[1.0, 0.45], [0.7, 1.0]]), {'A12': 0.45, 'A21': 0.7}),
+    ('nrtl', NRTL(tau=[[0.0, 0.9], [0.3, 0.0]], alpha=0.3), {'tau12': 0.9, 'tau21': 0.3}),
+])
+def test_recovers_exact_parameters(model, true, names):
+    y1, P = _synthetic_data(true)
+    result = fit_binary_parameters(X1, y1, P, P_SAT_1, P_SAT_2, model=model, n_starts=4,
+                                   n_workers=1)
+    assert result['success']
+    for name, value in names.items():
+        assert result['parameters'][name] == pytest.approx(value, abs=1e-6)
+    assert result['rmse_P'] < 1e-8 and result['rmse_y'] < 1e-8
+
+
+def test_confidence_intervals_cover_noisy_data():
+    y1, P = _synthetic_data(Wilson(Lambda=[[1.0, 0.45], [0.7, 1.0]]))
+    rng = np.random.default_rng(8)
+    P = P * np.exp(rng.normal(0.0, 0.005, size=P.shape))
+    y1 = y1 + rng.normal(0.0, 0.005, size=y1.shape)
+    result = fit_binary_parameters(X1, y1, P, P_SAT_1, P_SAT_2, sigma_P=0.005, sigma_y=0.005,
+                                   n_starts=4, n_workers=1)
+    for name, value in {'A12': 0.45, 'A21': 0.7}.items():
+        low, high = result['confidence_intervals'][name]
+        assert low < result['parameters'][name] < high
+        assert low < value < high
+    assert result['dof'] == 2 * len(X1) - 2
+
+
+@pytest.mark.parametrize('model, theta, alpha12', [
+    ('wilson', [-0.5, 0.3], None),
+    ('nrtl', [0.9, 0.3], 0.3),
+    ('nrtl', [0.9, 0.3, 0.35], None),
+])
+def test_analytic_jacobian_matches_finite_differences(model, theta, alpha12):
+    theta = np.array(theta)
+    y1, P = _synthetic_data(Wilson(Lambda=[[1.0, 0.45], [0.7, 1.0]]))
+    problem = {'model': model, 'x': np.stack([X1, 1 - X1], axis=-1), 'y1': y1,
+               'has_y': np.ones(X1.size, dtype=bool), 'P': P,
+               'P_sat': np.stack([P_SAT_1, P_SAT_2], axis=-1), 'sigma_P': 0.01,
+               'sigma_y': 0.01, 'alpha12': alpha12}
+    step = 1e-6
+    numeric = np.stack([(_residuals(theta + step * e, problem)
+                         - _residuals(theta - step * e, problem)) / (2 * step)
+                        for e in np.eye(theta.size)], axis=-1)
+    np.testing.assert_allclose(_jacobian(theta, problem), numeric, atol=1e-6)
+
+
+def test_worker_pool_gives_the_serial_fit():
+    y1, P = _synthetic_data(NRTL(tau=[[0.0, 0.9], [0.3, 0.0]], alpha=0.3))
+    kwargs = dict(model='nrtl', fit_alpha=True, n_starts=4, seed=3)
+    serial = fit_binary_parameters(X1, y1, P, P_SAT_1, P_SAT_2, n_workers=1, **kwargs)
+    pooled = fit_binary_parameters(X1, y1, P, P_SAT_1, P_SAT_2, n_workers=2, **kwargs)
+    assert [start['cost'] for start in pooled['starts']] == \
+        [start['cost'] for start in serial['starts']]
+    for name, value in serial['parameters'].items():
+        assert pooled['parameters'][name] == value
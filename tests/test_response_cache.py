@@ -0,0 +1,81 @@
+"""Tests for the HTTP response cache (src/web/response_cache.py)"""
+
+import json
+import os
+import time
+
+from src.web.response_cache import ResponseCache, canonical_key
+
+BODY = {'P_compressor_in': 100.0, 'T_compressor_in': 300.0, 'P_compressor_out': 1000.0,
+        'T_turbine_in': 1400.0}
+
+
+def test_miss_hit_and_not_modified(web):
+    web.app.config['RESPONSE_CACHE_ENABLED'] = True
+    client = web.app.test_client()
+    miss = client.post('/api/brayton-cycle', json=BODY)
+    assert miss.status_code == 200 and miss.headers['X-Cache'] == 'MISS'
+    etag = miss.headers['ETag']
+
+    # Same request with other key order and integer-valued numbers
+    raw = json.dumps({key: int(value) for key, value in reversed(BODY.items())})
+    hit = client.post('/api/brayton-cycle', data=raw, content_type='application/json')
+    assert hit.headers['X-Cache'] == 'HIT'
+    assert hit.data == miss.data and hit.headers['ETag'] == etag
+
+    revalidated = client.post('/api/brayton-cycle', json=BODY, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304 and revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert client.get('/api/response-cache-stats').get_json()['hits'] == 2
+
+
+def test_errors_are_not_cached(web):
+    web.app.config['RESPONSE_CACHE_ENABLED'] = True
+    client = web.app.test_client()
+    for _ in range(2):
+        response = client.post('/api/brayton-cycle', json={'P_compressor_in': 100.0})
+        assert response.status_code == 400 and 'X-Cache' not in response.headers
+
+
+def test_canonical_key():
+    assert (canonical_key('/a', b'{"x": 1, "y": [2, 3]}')
+            == canonical_key('/a', b'{"y":[2.0,3],"x":1.0}'))
+    assert canonical_key('/a', b'{"x": 1}') != canonical_key('/b', b'{"x": 1}')
+    assert canonical_key('/a', b'{"x": true}') != canonical_key('/a', b'{"x": 1}')
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = ResponseCache(maxsize=100, max_bytes=1000, max_entry_bytes=400)
+    for i in range(10):
+        cache.put(f'{i:064x}', b'x' * 300)
+    stats = cache.stats()
+    assert stats['size'] == 3 and stats['bytes'] == 900 and stats['evictions'] == 7
+    cache.put('big', b'x' * 500)
+    assert cache.get('big') is None and cache.stats()['oversized'] == 1
+
+
+def test_disk_tier_is_shared_and_pruned(tmp_path):
+    writer = ResponseCache(directory=tmp_path, max_disk_bytes=3000, prune_interval=5)
+    reader = ResponseCache(directory=tmp_path)
+    keys = [f'{i:064x}' for i in range(10)]
+    for i, key in enumerate(keys):
+        writer.put(key, b'y' * 1000)
+        path = writer._path(key)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    assert reader.get(keys[0]) is None                  # Pruned: the oldest files go first
+    assert reader.get(keys[9]) == (b'y' * 1000, ResponseCache.etag(b'y' * 1000))
+    assert reader.stats()['disk_hits'] == 1
+
+    # Expired files are never served and are deleted by the next prune
+    expiring = ResponseCache(directory=tmp_path, ttl=10)
+    assert expiring.get(keys[8]) is None
+    remaining = len(list(tmp_path.glob('*/*.json')))
+    assert remaining == 3
+    assert expiring.prune() == remaining and not list(tmp_path.glob('*/*.json'))
+
+
+def test_settings_from_app_config(web, tmp_path):
+    web.app.config.update(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_DIR=str(tmp_path))
+    web.app.test_client().post('/api/brayton-cycle', json=BODY)
+    assert len(list(tmp_path.glob('*/*.json'))) == 1
+    assert web.response_cache.stats()['directory'] == str(tmp_path)
@@ -0,0 +1,68 @@
+"""Tests for the saturation-line tables of water (src/core/saturation.py)"""
+
+import numpy as np
+from iapws import IAPWS97
+from iapws._iapws import Pc
+
+from src.core.saturation import SaturationTables, get_saturation_tables
+
+# Relative errors of h and s are taken against at least these magnitudes
+# (both vanish at the triple point)
+FLOORS = {'T': 0.0, 'v': 0.0, 'h': 25.0, 's': 0.1}
+
+
+def _assert_close(props, P, x, tolerance):
+    liquid, vapour = IAPWS97(P=P, x=0), IAPWS97(P=P, x=1)
+    for key, floor in FLOORS.items():
+        f, g = getattr(liquid, key), getattr(vapour, key)
+        expected = f + x * (g - f)       # Lever rule between the saturated phases
+        assert abs(props[key] - expected) <= tolerance * max(abs(expected), floor), (P, x, key)
+
+
+def test_states_along_the_whole_saturation_line():
+    tables = get_saturation_tables()
+    P = np.concatenate([np.geomspace(6.12e-4, 15.0, 60), np.linspace(15.0, Pc, 400)])
+    served = []
+    for p in P:
+        for x in (0.0, 0.4, 1.0):
+            props = tables.state(x, P=p)
+            if props is not None:
+                _assert_close(props, p, x, tables.tolerance)
+                served.append(p)
+    # Including both sides of 16.53 MPa (623.15 K) and the near-critical end
+    assert np.any(np.abs(np.array(served) - 16.53) < 0.02)
+    assert max(served) > 22.0
+
+
+def test_near_critical_states_fall_back():
+    tables = get_saturation_tables()
+    assert tables.state(0.5, P=Pc - 1e-4) is None
+    assert tables.state(0.5, T=647.0955) is None
+    assert np.isnan(tables.properties(0.5, P=Pc - 1e-4)['h'])
+    assert tables.state(1.5, P=1.0) is None
+
+
+def test_batch_properties_match_single_states():
+    tables = get_saturation_tables()
+    T = np.linspace(280.0, 640.0, 50)
+    x = np.linspace(0.0, 1.0, 50)
+    batch = tables.properties(x, T=T)
+    for i in range(T.size):
+        props = tables.state(x[i], T=T[i])
+        np.testing.assert_allclose([batch[key][i] for key in ('P', 'v', 'h', 's', 'u')],
+                                   [props[key] for key in ('P', 'v', 'h', 's', 'u')],
+                                   rtol=1e-12)
+    assert tables.state(0.0, P=1.0)['phase'] == 'Liquid'
+    assert tables.state(1.0, P=1.0)['phase'] == 'Vapour'
+
+
+def test_intervals_are_checked_inside_not_only_at_the_midpoint(tmp_path):
+    tables = SaturationTables(data_dir=tmp_path).load()
+    T_grid, error = tables._data['T'], tables._data['error']
+    # Just above 623.15 K the exact values switch from regions 1/2 to region 3;
+    # the interval that cannot meet the tolerance is flagged and falls back
+    k = int(np.searchsorted(T_grid, 623.15))
+    assert error[k] > tables.tolerance
+    assert tables.state(1.0, T=0.5 * (T_grid[k] + T_grid[k + 1])) is None
+    assert np.all(error[k - 40:k] <= tables.tolerance)
+    assert np.all(error[k + 2:k + 40] <= tables.tolerance)
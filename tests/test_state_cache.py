@@ -0,0 +1,84 @@
+"""Tests for the steam state memoization cache (src/utils/state_cache.py)"""
+
+import pytest
+
+from src.core.saturation import SATURATION_TABLE_TAG
+from src.core.thermodynamics_toolkit import ThermodynamicsToolkit
+from src.utils import state_cache
+from src.utils.state_cache import StateCache, steam_state_cache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = StateCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1          # 'b' is now the least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(state_cache.time, 'monotonic', lambda: now[0])
+    cache = StateCache(ttl=10)
+    cache.put('a', 1)
+    now[0] += 9.5
+    assert cache.get('a') == 1
+    now[0] += 1.0
+    assert cache.get('a', 'expired') == 'expired'
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_keys_are_rounded_to_the_tolerance():
+    cache = StateCache(rel_tol=1e-10)
+    key = cache.make_key('iapws97', 1.0, 300.0, None)
+    assert cache.make_key('iapws97', 1.0 + 1e-13, 300.0 * (1 + 1e-12), None) == key
+    assert cache.make_key('iapws97', 1.0 + 1e-8, 300.0, None) != key
+    assert cache.make_key('iapws97', 1, 300, None) == key
+    # Tags and missing inputs take part in the key
+    assert cache.make_key('tabulated', 1.0, 300.0, None) != key
+    assert cache.make_key('iapws97', 1.0, None, 300.0) != key
+
+
+def test_counters_and_get_or_compute():
+    cache = StateCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'h': 1.0}
+
+    for _ in range(3):
+        assert cache.get_or_compute(('k',), compute) == {'h': 1.0}
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_rate'] == pytest.approx(2 / 3)
+
+    # Failed computations are not cached
+    with pytest.raises(ZeroDivisionError):
+        cache.get_or_compute(('bad',), lambda: 1 / 0)
+    assert cache.get(('bad',)) is None
+
+    cache.clear()
+    assert cache.stats()['size'] == cache.stats()['hits'] == 0
+    with pytest.raises(ValueError):
+        cache.configure(maxsize=0)
+
+
+def test_saturation_table_states_are_tagged_apart():
+    toolkit = ThermodynamicsToolkit()
+    assert toolkit.steam_cache_key(P=1.0, x=0.5)[0] == SATURATION_TABLE_TAG
+    assert toolkit.steam_cache_key(T=400.0, x=1.0)[0] == SATURATION_TABLE_TAG
+    assert toolkit.steam_cache_key(P=1.0, T=500.0)[0] == 'iapws97'
+    tabulated = ThermodynamicsToolkit('tabulated')
+    assert tabulated.steam_cache_key(P=1.0, h=3000.0)[0] == 'tabulated:0.0001'
+    assert tabulated.steam_cache_key(P=1.0, x=0.5) == toolkit.steam_cache_key(P=1.0, x=0.5)
+
+    steam_state_cache.clear()
+    state = toolkit.steam_properties(P=1.0, x=0.5)
+    assert steam_state_cache.get(toolkit.steam_cache_key(P=1.0, x=0.5)) == state
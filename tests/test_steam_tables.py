@@ -0,0 +1,91 @@
+"""Tests for the tabulated (P, h) / (P, s) steam properties (src/core/steam_tables.py)"""
+
+import numpy as np
+from iapws import IAPWS97
+from iapws._iapws import Pc
+
+from src.core.steam_tables import SteamTables, get_steam_tables
+from src.core.thermodynamics_toolkit import ThermodynamicsToolkit
+
+
+def _states(n, seed=0):
+    """Exact IAPWS97 states spread over the tabulated pressure and temperature range"""
+    rng = np.random.default_rng(seed)
+    P = np.exp(rng.uniform(np.log(0.002), np.log(99.0), n))
+    T = rng.uniform(280.0, 1070.0, n)
+    return [IAPWS97(P=p, T=t) for p, t in zip(P, T)]
+
+
+def test_lookups_meet_the_tolerance():
+    tables = get_steam_tables(tolerance=1e-4)
+    served = 0
+    for state in _states(300):
+        for family in ('h', 's'):
+            props = tables.lookup(state.P, **{family: getattr(state, family)})
+            if props is None:
+                continue
+            served += 1
+            for key in ('T', 'v', 'h', 's'):
+                assert abs(props[key] / getattr(state, key) - 1) < 1e-4
+            # Phase named like IAPWS97, including 'Gas' above Tc at subcritical pressure
+            assert props['phase'] == state.phase
+    assert served > 500
+
+
+def test_batch_lookup_matches_scalar_lookup():
+    tables = get_steam_tables()
+    states = _states(100, seed=1)
+    P = np.array([state.P for state in states])
+    h = np.array([state.h for state in states])
+    batch = tables.lookup_batch(P, h=h)
+    for i, state in enumerate(states):
+        props = tables.lookup(state.P, h=state.h)
+        assert batch['tabulated'][i] == (props is not None)
+        if props is not None:
+            np.testing.assert_allclose([batch[key][i] for key in ('T', 'v', 's')],
+                                       [props[key] for key in ('T', 'v', 's')], rtol=1e-12)
+
+
+def test_fallback_to_iapws97():
+    # A tolerance no cell meets and the untabulated band around Pc are not served
+    strict = get_steam_tables(tolerance=1e-14)
+    state = IAPWS97(P=5.0, T=600.0)
+    assert get_steam_tables().lookup(5.0, h=state.h) is not None
+    assert strict.lookup(5.0, h=state.h) is None
+    near_critical = IAPWS97(P=Pc, T=700.0)
+    assert get_steam_tables().lookup(Pc, h=near_critical.h) is None
+    assert not get_steam_tables().lookup_batch(Pc, s=near_critical.s)['tabulated']
+
+    # The tabulated backend then returns the exact IAPWS97 state
+    api = ThermodynamicsToolkit(steam_backend='tabulated', table_tolerance=1e-14)
+    props = api.steam_properties(P=5.0, h=state.h)
+    np.testing.assert_allclose([props['T'], props['v'], props['s']],
+                               [state.T, state.v, state.s], rtol=1e-12)
+    props = ThermodynamicsToolkit(steam_backend='tabulated').steam_properties(
+        P=Pc, h=near_critical.h)
+    np.testing.assert_allclose(props['T'], near_critical.T, rtol=1e-12)
+    assert props['phase'] == near_critical.phase
+
+
+def test_tables_are_stored_and_regenerated(tmp_path):
+    tables = SteamTables(n_pressure=40, n_xi=12, data_dir=tmp_path).load()
+    assert tables.path.exists()
+    state = IAPWS97(P=1.0, T=500.0)
+    expected = tables.lookup_batch(1.0, h=state.h)
+
+    # A stored table is loaded as is
+    reloaded = SteamTables(n_pressure=40, n_xi=12, data_dir=tmp_path).load()
+    np.testing.assert_array_equal(reloaded._data['h_vapour_T'], tables._data['h_vapour_T'])
+
+    # A table written by another format version is rebuilt and overwritten
+    with np.load(tables.path) as stored:
+        data = {key: stored[key] for key in stored.files}
+    data['version'] = np.array(-1)
+    data['h_vapour_T'] = data['h_vapour_T'] + 1.0
+    np.savez_compressed(tables.path, **data)
+    rebuilt = SteamTables(n_pressure=40, n_xi=12, data_dir=tmp_path).load()
+    np.testing.assert_array_equal(rebuilt._data['h_vapour_T'], tables._data['h_vapour_T'])
+    with np.load(tables.path) as stored:
+        assert int(stored['version']) != -1
+    result = rebuilt.lookup_batch(1.0, h=state.h)
+    np.testing.assert_array_equal(result['T'], expected['T'])
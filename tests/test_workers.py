@@ -0,0 +1,65 @@
+"""Tests for the bounded calculation pool (src/web/workers.py)"""
+
+import asyncio
+import math
+import time
+
+import pytest
+
+from src.web.workers import CalculationPool, PoolSaturated, CalculationTimeout
+
+
+def test_inline_pool_rejects_beyond_its_queue():
+    pool = CalculationPool(max_workers=0, max_pending=1, retry_after=3)
+    assert pool.run(math.factorial, 5) == 120
+    # The outer call holds the only slot while the inner one is submitted
+    with pytest.raises(PoolSaturated) as error:
+        pool.run(lambda: pool.run(math.factorial, 5))
+    assert error.value.retry_after == 3
+    assert pool.stats()['pending'] == 0
+    assert asyncio.run(pool.run_async(math.factorial, 4)) == 24
+
+
+def test_process_pool_results_and_timeout():
+    pool = CalculationPool(max_workers=1, max_pending=2)
+    try:
+        assert pool.run(math.factorial, 10, timeout=60) == 3628800
+        start = time.perf_counter()
+        with pytest.raises(CalculationTimeout):
+            pool.run(time.sleep, 5, timeout=0.2)
+        assert time.perf_counter() - start < 2
+    finally:
+        pool.shutdown()
+
+
+def test_api_answers_503_with_retry_after_when_saturated(web):
+    web.app.config.update(CALCULATION_QUEUE_SIZE=1, CALCULATION_RETRY_AFTER=7)
+    client = web.app.test_client()
+    assert client.get('/api/worker-stats').get_json()['max_pending'] == 1
+    body = {'P_boiler': 10.0, 'T_boiler': 773.15, 'P_condenser': 0.01}
+    response = web.calculation_pool.run(lambda: client.post('/api/rankine-cycle', json=body))
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert client.post('/api/rankine-cycle', json=body).status_code == 200
+
+
+def test_steam_route_sends_only_iapws97_solves_to_the_pool(web, monkeypatch):
+    web.steam_state_cache.clear()
+    submitted = []
+    run = web.calculation_pool.run
+
+    def recording_run(fn, *args, **kwargs):
+        submitted.append(fn.__name__)
+        return run(fn, *args, **kwargs)
+
+    monkeypatch.setattr(web.calculation_pool, 'run', recording_run)
+    client = web.app.test_client()
+    wet = client.post('/api/steam-properties', json={'P': 1.0, 'x': 0.5}).get_json()
+    assert submitted == []
+    assert wet == web.thermo_api.steam_properties(P=1.0, x=0.5)
+    # Superheated and near-critical states are solved with IAPWS97 in the pool
+    client.post('/api/steam-properties', json={'P': 1.0, 'T': 500.0})
+    near_critical = client.post('/api/steam-properties', json={'P': 22.06, 'x': 0.5}).get_json()
+    assert submitted == ['_solve_steam_state', '_solve_steam_state']
+    assert 'error' not in near_critical
+    web.steam_state_cache.clear()